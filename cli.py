@@ -9,6 +9,12 @@ from pathlib import Path
 import sys
 
 
+def _parse_modules(value: str | None) -> list[str] | None:
+    if not value:
+        return None
+    return [m.strip() for m in value.split(",") if m.strip()] or None
+
+
 def main() -> int:
     repo_root = Path(__file__).resolve().parent
     scripts_dir = repo_root / "scripts"
@@ -28,14 +34,68 @@ def main() -> int:
     runp.add_argument("--commit-each-module", action="store_true", default=None)
     runp.add_argument("--no-commit-each-module", action="store_false", dest="commit_each_module", default=None)
 
+    subp = sub.add_parser("submit", help="Queue a pipeline run for the daemon")
+    subp.add_argument("--topic", required=True)
+    subp.add_argument("--date", default=None)
+    subp.add_argument("--tenant", default=None)
+    subp.add_argument("--modules", default=None)
+    subp.add_argument("--skip-validation", action="store_true")
+    subp.add_argument("--force", action="store_true")
+    subp.add_argument("--commit-each-module", action="store_true", default=None)
+    subp.add_argument("--no-commit-each-module", action="store_false", dest="commit_each_module", default=None)
+    subp.add_argument("--queue", default=None, help="Queue DB path")
+    subp.add_argument("--wait", action="store_true", help="Block until the job finishes")
+    subp.add_argument("--timeout", type=float, default=None)
+
+    daep = sub.add_parser("daemon", help="Run the warm pipeline worker")
+    daep.add_argument("--queue", default=None, help="Queue DB path")
+    daep.add_argument("--poll-interval", type=float, default=1.0)
+    daep.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    daep.add_argument("--no-warm", action="store_true")
+
     valp = sub.add_parser("validate", help="Run system validation")
     valp.add_argument("--force", action="store_true")
+    valp.add_argument("--no-cache", action="store_true", help="Ignore cached validation results")
 
     args = ap.parse_args()
 
     if args.cmd == "validate":
         from run_pipeline import _run_validation
-        return 0 if _run_validation(force=args.force) else 1
+        return 0 if _run_validation(force=args.force, use_cache=not args.no_cache) else 1
+
+    if args.cmd == "submit":
+        from job_queue import JobQueue
+        queue = JobQueue(Path(args.queue) if args.queue else None)
+        job_id = queue.submit(
+            args.topic,
+            args.date,
+            modules=_parse_modules(args.modules),
+            tenant=args.tenant,
+            options={
+                "skip_validation": args.skip_validation,
+                "force": args.force,
+                "commit_each_module": args.commit_each_module,
+            },
+        )
+        print(f"Queued job {job_id}")
+        if not args.wait:
+            return 0
+        job = queue.wait(job_id, timeout=args.timeout)
+        status = job.status if job else "missing"
+        print(f"Job {job_id}: {status}")
+        if job and job.error:
+            print(job.error)
+        return 0 if status == "done" else 1
+
+    if args.cmd == "daemon":
+        from job_queue import JobQueue
+        from pipeline_daemon import serve
+        queue = JobQueue(Path(args.queue) if args.queue else None)
+        try:
+            serve(queue, poll_interval=args.poll_interval, once=args.once, warm=not args.no_warm)
+        except KeyboardInterrupt:
+            print("Pipeline daemon stopped")
+        return 0
 
     if args.tenant:
         os.environ["TENANT_ID"] = str(args.tenant).strip()
@@ -43,14 +103,10 @@ def main() -> int:
 
     from run_pipeline import run_for_topic
 
-    modules = None
-    if args.modules:
-        modules = [m.strip() for m in args.modules.split(",") if m.strip()]
-
     ok = run_for_topic(
         args.topic,
         args.date,
-        modules=modules,
+        modules=_parse_modules(args.modules),
         skip_validation=args.skip_validation,
         force=args.force,
         commit_each_module=args.commit_each_module,
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Record and replay external API calls (LLMs, search, image downloads).
+
+Offline runs used to go through the mock path, which skips prompt building,
+parsing, chunking and image handling. With a cassette, the real pipeline runs
+against recorded responses instead:
+
+  API_CASSETTE=<dir>           cassette directory (default .cache/cassettes/default)
+  API_CASSETTE_MODE=record     call the real API and store request, response and latency
+  API_CASSETTE_MODE=replay     serve stored responses, never touching the network
+  API_CASSETTE_SPEED=1.0       replay pacing: 1.0 sleeps the recorded latency, 2.0 half
+                               of it, 0 does not sleep
+  API_CASSETTE_MATCH=key       replay lookup; "sequence" falls back to the next unused
+                               recording of the same service when a request differs
+
+Recorded calls (service names): "openai" (create_openai_completion), "gemini"
+(gemini_utils request), "cse" (Custom Search result pages), "image_download".
+
+Layout: <dir>/<service>/<key>.json where key is the sha256 of the canonical
+request JSON. Each file holds the request and every interaction recorded for it
+(repeated requests, retries), replayed in order; the last one repeats once they
+run out. Binary responses are stored next to it as <key>.<n>.bin. Failed calls
+are recorded too and replay as the same exception type where it can be rebuilt
+(urllib HTTPError/URLError, timeouts), otherwise as CassetteReplayError.
+
+Credentials are never part of recorded requests. Replay still needs the client
+libraries installed and non-empty API keys (any value) so callers get past
+their credential checks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config import get_repo_root
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+MODES = ("off", "record", "replay")
+
+
+class CassetteReplayError(RuntimeError):
+    """A replayed call failed: no recording matches, or the recorded call failed."""
+
+
+def cassette_mode() -> str:
+    mode = (os.environ.get("API_CASSETTE_MODE") or "off").strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"API_CASSETTE_MODE must be one of {', '.join(MODES)} (got {mode!r})")
+    return mode
+
+
+def default_cassette_dir() -> Path:
+    raw = (os.environ.get("API_CASSETTE") or "").strip()
+    return Path(raw) if raw else get_repo_root() / ".cache" / "cassettes" / "default"
+
+
+def request_key(service: str, request: Dict[str, Any]) -> str:
+    canonical = json.dumps({"service": service, "request": request}, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _error_record(e: BaseException) -> Dict[str, Any]:
+    err: Dict[str, Any] = {"type": type(e).__name__, "message": str(e)}
+    if isinstance(e, urllib.error.HTTPError):
+        err["code"] = e.code
+        err["url"] = e.url
+    elif isinstance(e, urllib.error.URLError):
+        err["reason"] = str(e.reason)
+    return err
+
+
+def _rebuild_error(err: Dict[str, Any]) -> BaseException:
+    kind = err.get("type")
+    if kind == "HTTPError":
+        return urllib.error.HTTPError(err.get("url") or "", int(err.get("code") or 0), err.get("message") or "", None, None)
+    if kind == "URLError":
+        return urllib.error.URLError(err.get("reason") or err.get("message") or "")
+    if kind in ("TimeoutError", "timeout"):
+        return TimeoutError(err.get("message") or "")
+    if kind in ("ConnectionError", "ConnectionResetError"):
+        return ConnectionError(err.get("message") or "")
+    return CassetteReplayError(f"{kind}: {err.get('message')}")
+
+
+class Cassette:
+    """One cassette directory in record or replay mode."""
+
+    def __init__(self, directory: Path, mode: str, *, speed: float = 1.0, match: str = "key"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Cassette mode must be record or replay (got {mode!r})")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.speed = max(0.0, float(speed))
+        self.match = match
+        self._lock = threading.Lock()
+        self._served: Dict[str, int] = {}
+        self._by_service: Dict[str, List[str]] = {}
+
+    def _entry_path(self, service: str, key: str) -> Path:
+        return self.directory / service / f"{key}.json"
+
+    def _load(self, service: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = json.loads(self._entry_path(service, key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != CASSETTE_VERSION:
+            return None
+        return data
+
+    def call(
+        self,
+        service: str,
+        request: Dict[str, Any],
+        fn: Callable[[], Any],
+        *,
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """fn() in record mode (stored with its latency); the stored result in replay mode.
+
+        encode turns the live result into JSON data (or bytes); decode turns stored
+        data back into what callers expect.
+        """
+        key = request_key(service, request)
+        if self.mode == "replay":
+            return self._replay(service, key, decode)
+
+        t0 = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            self._record(service, key, request, {"latency_s": round(time.monotonic() - t0, 4), "error": _error_record(e)}, None)
+            raise
+        latency = round(time.monotonic() - t0, 4)
+        data = encode(result) if encode else result
+        self._record(service, key, request, {"latency_s": latency}, data)
+        return result
+
+    def _record(self, service: str, key: str, request: Dict[str, Any], interaction: Dict[str, Any], data: Any) -> None:
+        path = self._entry_path(service, key)
+        with self._lock:
+            entry = self._load(service, key) or {
+                "version": CASSETTE_VERSION,
+                "service": service,
+                "request": request,
+                "recorded_at": time.time(),
+                "interactions": [],
+            }
+            n = len(entry["interactions"])
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if "error" not in interaction:
+                    if isinstance(data, (bytes, bytearray)):
+                        body = path.with_name(f"{key}.{n}.bin")
+                        body.write_bytes(bytes(data))
+                        interaction["body_file"] = body.name
+                    else:
+                        interaction["response"] = data
+                entry["interactions"].append(interaction)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(entry, ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+                os.replace(tmp, path)
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning("Failed to record %s call in cassette (non-fatal): %s", service, e)
+
+    def _next_unused(self, service: str) -> Optional[str]:
+        """Earliest-recorded entry of service that has not been served yet (sequence matching)."""
+        keys = self._by_service.get(service)
+        if keys is None:
+            found = []
+            for p in (self.directory / service).glob("*.json"):
+                entry = self._load(service, p.stem)
+                if entry:
+                    found.append((entry.get("recorded_at") or 0, p.stem))
+            keys = self._by_service[service] = [k for _, k in sorted(found)]
+        for k in keys:
+            if k not in self._served:
+                return k
+        return None
+
+    def _replay(self, service: str, key: str, decode: Optional[Callable[[Any], Any]]) -> Any:
+        with self._lock:
+            entry = self._load(service, key)
+            if entry is None and self.match == "sequence":
+                fallback = self._next_unused(service)
+                if fallback:
+                    logger.warning("Cassette: no %s recording for this request; replaying %s in sequence", service, fallback[:12])
+                    key = fallback
+                    entry = self._load(service, key)
+            if entry is None or not entry.get("interactions"):
+                raise CassetteReplayError(
+                    f"No recorded {service} call matches this request (key {key[:12]}) in {self.directory}. "
+                    "Record it with API_CASSETTE_MODE=record."
+                )
+            interactions = entry["interactions"]
+            i = self._served.get(key, 0)
+            self._served[key] = i + 1
+            interaction = interactions[min(i, len(interactions) - 1)]
+
+        latency = float(interaction.get("latency_s") or 0.0)
+        if self.speed > 0 and latency > 0:
+            time.sleep(latency / self.speed)
+        if "error" in interaction:
+            raise _rebuild_error(interaction["error"])
+        if interaction.get("body_file"):
+            data: Any = (self.directory / service / interaction["body_file"]).read_bytes()
+        else:
+            data = interaction.get("response")
+        return decode(data) if decode else data
+
+
+_CASSETTES: Dict[tuple, Cassette] = {}
+_CASSETTES_LOCK = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Process-wide cassette for the current env settings, or None when disabled."""
+    mode = cassette_mode()
+    if mode == "off":
+        return None
+    directory = default_cassette_dir()
+    try:
+        speed = float(os.environ.get("API_CASSETTE_SPEED") or 1.0)
+    except ValueError:
+        speed = 1.0
+    match = (os.environ.get("API_CASSETTE_MATCH") or "key").strip().lower()
+    ident = (str(directory.resolve()), mode, speed, match)
+    with _CASSETTES_LOCK:
+        cassette = _CASSETTES.get(ident)
+        if cassette is None:
+            cassette = _CASSETTES[ident] = Cassette(directory, mode, speed=speed, match=match)
+            print(f"  ⏺ API cassette: {mode} {directory}")
+        return cassette
+
+
+def recorded_call(
+    service: str,
+    request: Dict[str, Any],
+    fn: Callable[[], Any],
+    *,
+    encode: Optional[Callable[[Any], Any]] = None,
+    decode: Optional[Callable[[Any], Any]] = None,
+) -> Any:
+    """fn() passed through the active cassette (plain fn() when API_CASSETTE_MODE is off)."""
+    cassette = get_cassette()
+    if cassette is None:
+        return fn()
+    return cassette.call(service, request, fn, encode=encode, decode=decode)
+
+
+class ReplayedResponse:
+    """Attribute view of a recorded OpenAI response (Responses or Chat Completions).
+
+    Nested dicts become attribute objects, so extract_completion_text and
+    callers reading .status, .usage or .choices[0].message.content work as on
+    the SDK objects.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+        for k, v in data.items():
+            setattr(self, k, _attr_view(v))
+
+    def model_dump(self) -> Dict[str, Any]:
+        return self._data
+
+    def model_dump_json(self, indent: int = 2) -> str:
+        return json.dumps(self._data, indent=indent)
+
+
+def _attr_view(value: Any) -> Any:
+    if isinstance(value, dict):
+        return ReplayedResponse(value)
+    if isinstance(value, list):
+        return [_attr_view(v) for v in value]
+    return value
+
+
+def encode_openai_response(response: Any) -> Dict[str, Any]:
+    """JSON form of an OpenAI SDK response (or StreamedResponse), keeping output_text."""
+    if hasattr(response, "model_dump"):
+        data = dict(response.model_dump())
+    else:
+        data = {}
+    if hasattr(response, "output_text") and "output_text" not in data:
+        data["output_text"] = response.output_text
+    for attr in ("status", "incomplete_details"):
+        if attr not in data and hasattr(response, attr):
+            value = getattr(response, attr)
+            data[attr] = value.model_dump() if hasattr(value, "model_dump") else value
+    return data
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Incremental, content-addressed cache bundles for release assets.
+
+A cached directory is published as one small index asset plus pack assets:
+
+    <index_name>                 JSON: relative path -> content hash, size and
+                                 location (pack + offset), or inline data
+    <pack_prefix><hex>.pack      concatenated file contents, named by the pack's
+                                 own content hash
+
+Files are stored as-is (images are already compressed). Publishing compares the
+local files against the remote index: content already in a pack keeps its
+location, only new content goes into new packs (up to TENANT_ASSETS_PACK_MAX_MB
+each), and the index is re-uploaded only if it changed. Restoring downloads
+just the packs holding files that are missing or different locally; every
+extracted file is verified against its hash.
+
+Files up to INLINE_MAX_BYTES (manifests) are embedded in the index.
+
+Packs no longer referenced by an index stay in the release; they are
+immutable, so deleting them is always safe once no index points at them.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from content_hash import algo_of, get_hash_index, hash_bytes, hash_file_uncached
+
+
+INDEX_VERSION = 1
+INLINE_MAX_BYTES = 16 * 1024
+_COPY_CHUNK = 1 << 20
+
+
+def pack_max_bytes() -> int:
+    try:
+        mb = float(os.environ.get("TENANT_ASSETS_PACK_MAX_MB", "64"))
+    except ValueError:
+        mb = 64.0
+    return max(1, int(mb * 1024 * 1024))
+
+
+def _local_files(root: Path, exclude: Iterable[str]) -> Dict[str, Path]:
+    skip = set(exclude)
+    out: Dict[str, Path] = {}
+    for p in sorted(root.rglob("*")):
+        rel = p.relative_to(root)
+        if any(part in skip or part.startswith((".", "_")) for part in rel.parts):
+            continue
+        if p.is_file():
+            out[rel.as_posix()] = p
+    return out
+
+
+def _safe_dest(root: Path, rel: str) -> Optional[Path]:
+    dest = (root / rel).resolve()
+    try:
+        dest.relative_to(root.resolve())
+    except ValueError:
+        return None
+    return dest
+
+
+def _write_atomic(dest: Path, data: bytes) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, dest)
+
+
+def load_index(store, index_name: str, tmp_dir: Path) -> Optional[dict]:
+    """The remote index, or None if it does not exist (or cannot be read)."""
+    try:
+        path = store.download(index_name, tmp_dir)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        path.unlink(missing_ok=True)
+    except Exception:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("files"), dict):
+        return None
+    return data
+
+
+def publish_dir(
+    store,
+    root: Path,
+    index_name: str,
+    pack_prefix: str,
+    tmp_dir: Path,
+    exclude: Iterable[str] = (),
+) -> Dict[str, int]:
+    """Upload root's files as new packs (new content only) plus an updated index.
+
+    Returns counts: files, reused, new_packs, uploaded_bytes, index_uploaded.
+    """
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    remote = load_index(store, index_name, tmp_dir) or {"files": {}}
+    located: Dict[str, dict] = {}
+    for e in remote["files"].values():
+        if isinstance(e, dict) and e.get("hash") and e.get("pack"):
+            located[e["hash"]] = {"pack": e["pack"], "offset": int(e["offset"])}
+
+    hash_index = get_hash_index()
+    files: Dict[str, dict] = {}
+    pending: List[Tuple[str, Path, int]] = []  # new content: (hash, path, size)
+    pending_hashes = set()
+    stats = {"files": 0, "reused": 0, "new_packs": 0, "uploaded_bytes": 0, "index_uploaded": 0}
+    for rel, path in _local_files(root, exclude).items():
+        size = path.stat().st_size
+        if size <= INLINE_MAX_BYTES:
+            data = path.read_bytes()
+            files[rel] = {"hash": hash_bytes(data), "size": size, "data": base64.b64encode(data).decode("ascii")}
+        else:
+            digest = hash_index.hash_file(path)
+            files[rel] = {"hash": digest, "size": size}
+            if digest in located:
+                files[rel].update(located[digest])
+                stats["reused"] += 1
+            elif digest not in pending_hashes:
+                pending_hashes.add(digest)
+                pending.append((digest, path, size))
+        stats["files"] += 1
+    hash_index.save()
+
+    # Group new content into packs of at most pack_max_bytes() (a larger file gets its own pack)
+    limit = pack_max_bytes()
+    groups: List[List[Tuple[str, Path, int]]] = []
+    group_size = 0
+    for item in pending:
+        if groups and group_size + item[2] <= limit:
+            groups[-1].append(item)
+            group_size += item[2]
+        else:
+            groups.append([item])
+            group_size = item[2]
+
+    for group in groups:
+        tmp_pack = tmp_dir / f"pack.{os.getpid()}.tmp"
+        offsets: Dict[str, int] = {}
+        with open(tmp_pack, "wb") as out:
+            for digest, path, _ in group:
+                offsets[digest] = out.tell()
+                with open(path, "rb") as src:
+                    while True:
+                        chunk = src.read(_COPY_CHUNK)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+        pack_name = f"{pack_prefix}{hash_file_uncached(tmp_pack).split(':', 1)[1]}.pack"
+        pack_path = tmp_dir / pack_name
+        os.replace(tmp_pack, pack_path)
+        try:
+            store.upload(pack_path, clobber=True)
+            stats["uploaded_bytes"] += pack_path.stat().st_size
+        finally:
+            pack_path.unlink(missing_ok=True)
+        stats["new_packs"] += 1
+        for digest, offset in offsets.items():
+            located[digest] = {"pack": pack_name, "offset": offset}
+
+    for e in files.values():
+        if "data" not in e and "pack" not in e:
+            e.update(located[e["hash"]])
+
+    if files != remote["files"]:
+        index_path = tmp_dir / index_name
+        payload = {"version": INDEX_VERSION, "files": files}
+        index_path.write_text(json.dumps(payload, sort_keys=True, indent=1), encoding="utf-8")
+        try:
+            store.upload(index_path, clobber=True)
+        finally:
+            index_path.unlink(missing_ok=True)
+        stats["index_uploaded"] = 1
+    return stats
+
+
+def restore_dir(store, root: Path, index_name: str, tmp_dir: Path) -> Optional[Dict[str, int]]:
+    """Bring root up to date with the remote index, fetching only the packs needed.
+
+    Returns counts (files, fetched, packs), or None if there is no remote index.
+    """
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    remote = load_index(store, index_name, tmp_dir)
+    if remote is None:
+        return None
+
+    hash_index = get_hash_index()
+    stats = {"files": 0, "fetched": 0, "packs": 0}
+    by_pack: Dict[str, List[Tuple[Path, dict]]] = {}
+    for rel, e in sorted(remote["files"].items()):
+        dest = _safe_dest(root, rel)
+        if dest is None or not isinstance(e, dict) or not e.get("hash"):
+            continue
+        stats["files"] += 1
+        if dest.is_file() and dest.stat().st_size == int(e.get("size", -1)) and hash_index.matches(dest, e["hash"]):
+            continue
+        if "data" in e:
+            data = base64.b64decode(e["data"])
+            if hash_bytes(data, algo_of(e["hash"])) == e["hash"]:
+                _write_atomic(dest, data)
+                stats["fetched"] += 1
+        elif e.get("pack"):
+            by_pack.setdefault(e["pack"], []).append((dest, e))
+
+    try:
+        for pack_name, items in by_pack.items():
+            pack_path = store.download(pack_name, tmp_dir)
+            stats["packs"] += 1
+            try:
+                with open(pack_path, "rb") as f:
+                    for dest, e in items:
+                        f.seek(int(e["offset"]))
+                        data = f.read(int(e["size"]))
+                        if hash_bytes(data, algo_of(e["hash"])) != e["hash"]:
+                            print(f"  ⚠ Pack {pack_name}: content mismatch for {dest.name}, skipping")
+                            continue
+                        _write_atomic(dest, data)
+                        stats["fetched"] += 1
+            finally:
+                pack_path.unlink(missing_ok=True)
+    finally:
+        hash_index.save()
+    return stats
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+ASS overlay compiler shared by the single-pass renderer and the burn-in step.
+
+Captions (bottom, speaker-coloured glow) and image titles (top) are compiled
+into one ASS script:
+
+- Text is wrapped by measured advance widths: glyphs of the caption font at the
+  libass font size (Pillow, when installed), otherwise a built-in DejaVu Sans
+  Bold table. Widths are cached per font and size, wrapped lines per
+  (text, font, size, width, max lines).
+- The compiled file is cached under ASS_OVERLAY_CACHE_DIR (default:
+  <repo>/.cache/ass_overlays), named by a hash of every input (resolution,
+  style, segments, speakers), so re-rendering the same item reuses it.
+
+Styling comes from OverlayStyle.from_env (CAPTIONS_* variables, read once per
+burner instead of once per segment).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import get_repo_root
+
+
+# Bump when the compiled output changes for identical inputs.
+COMPILER_VERSION = 1
+CACHE_MAX_FILES = 256
+
+FONT_NAME = "DejaVu Sans"
+FONT_PATH_CANDIDATES: Tuple[str, ...] = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
+    "/Library/Fonts/DejaVuSans-Bold.ttf",
+)
+
+
+# --- Text sanitization (remove visible backslashes in captions/titles) ---
+_LITERAL_UNICODE_RE = re.compile(r'\\u([0-9a-fA-F]{4})|\\U([0-9a-fA-F]{8})')
+_BACKSLASH_ESCAPE_RE = re.compile(r'\\([\\/"\'])')
+_ESCAPED_WS_RE = re.compile(r'\\[ \t]+')
+
+def _decode_literal_unicode(s: str) -> str:
+    def _repl(m: re.Match) -> str:
+        h4 = m.group(1)
+        h8 = m.group(2)
+        try:
+            if h4:
+                return chr(int(h4, 16))
+            if h8:
+                return chr(int(h8, 16))
+        except Exception:
+            return m.group(0)
+        return m.group(0)
+    return _LITERAL_UNICODE_RE.sub(_repl, s)
+
+def sanitize_dialog_text_for_burn(s: str) -> str:
+    """
+    Convert JSON-ish escaped strings into clean human text so burned captions/titles
+    do NOT display backslashes.
+    """
+    if s is None:
+        return ""
+    if not isinstance(s, str):
+        s = str(s)
+
+    s = _decode_literal_unicode(s)
+
+    # Common escape sequences
+    s = s.replace("\\r", "").replace("\\t", " ").replace("\\n", "\n")
+    s = s.replace('\\"', '"').replace("\\'", "'").replace("\\/", "/")
+    s = s.replace("\\\\", "\\")  # collapse double
+
+    # Remove escape markers
+    s = _BACKSLASH_ESCAPE_RE.sub(r"\1", s)
+    s = _ESCAPED_WS_RE.sub(" ", s)
+
+    # Safety: remove any remaining standalone backslashes
+    s = s.replace("\\", "")
+
+    # Normalize whitespace
+    s = re.sub(r"[ \t]+", " ", s)
+    s = re.sub(r"\n{3,}", "\n\n", s)
+    return s.strip()
+
+
+def _ass_time(t: float) -> str:
+    # ASS uses H:MM:SS.cs (centiseconds)
+    t = max(0.0, float(t))
+    hh = int(t // 3600)
+    mm = int((t % 3600) // 60)
+    ss = int(t % 60)
+    cs = int(round((t - int(t)) * 100))
+    cs = max(0, min(99, cs))
+    return f"{hh}:{mm:02d}:{ss:02d}.{cs:02d}"
+
+
+def _ass_color_rgba(hex_rgb: str, alpha: int) -> str:
+    """Return ASS &HAABBGGRR from #RRGGBB and alpha 0-255 (0=opaque)."""
+    h = (hex_rgb or "").strip()
+    if h.startswith("#"):
+        h = h[1:]
+    if len(h) != 6:
+        rr, gg, bb = (255, 255, 255)
+    else:
+        rr = int(h[0:2], 16)
+        gg = int(h[2:4], 16)
+        bb = int(h[4:6], 16)
+    aa = max(0, min(255, int(alpha)))
+    return f"&H{aa:02X}{bb:02X}{gg:02X}{rr:02X}"
+
+
+def _ass_escape(text: str) -> str:
+    t = (text or "").replace("\r\n", "\n").replace("\r", "\n")
+    t = t.replace("\\", "\\\\")
+    t = t.replace("{", "\\{").replace("}", "\\}")
+    t = t.replace("\n", "\\N")
+    return t
+
+
+def _strip_speaker_prefix(text: str, known_names: List[str], hide: bool) -> str:
+    """Remove leading 'Name: ' (or A:/B:) prefix for display text."""
+    t = (text or "").strip()
+    if not t:
+        return ""
+    if not hide:
+        return t
+
+    # A: / B:
+    m = re.match(r"^\s*([AB])\s*:\s+(.+)$", t, flags=re.IGNORECASE)
+    if m:
+        return m.group(2).strip()
+
+    # Name: ...
+    m = re.match(r"^\s*([^:\n]{1,48})\s*:\s+(.+)$", t)
+    if not m:
+        return t
+    name = m.group(1).strip()
+    rest = m.group(2).strip()
+    if not rest:
+        return t
+
+    for kn in known_names:
+        if kn and name.lower() == kn.lower():
+            return rest
+    # If not a known name, keep as-is (avoid removing legitimate colon use).
+    return t
+
+
+# ---------------------------------------------------------------------------
+# Glyph widths
+# ---------------------------------------------------------------------------
+
+# DejaVu Sans Bold advance widths (font units, 2048/em) for printable ASCII.
+_DEJAVU_BOLD_UNITS_PER_EM = 2048
+_DEJAVU_BOLD_ASCENT_DESCENT = 2384  # hhea ascent + descent; libass sizes fonts by this height
+_DEJAVU_BOLD_ADVANCE: Dict[str, int] = dict(zip(
+    " !\"#$%&'()*+,-./0123456789:;<=>?@"
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`"
+    "abcdefghijklmnopqrstuvwxyz{|}~",
+    (
+        713, 901, 1067, 1706, 1425, 2052, 1751, 615, 934, 934, 1067, 1706, 779, 852, 779, 745,
+        1425, 1425, 1425, 1425, 1425, 1425, 1425, 1425, 1425, 1425, 819, 819, 1706, 1706, 1706, 1188, 2048,
+        1585, 1565, 1499, 1696, 1399, 1399, 1686, 1712, 760, 760, 1595, 1298, 2034, 1712, 1741, 1499,
+        1741, 1587, 1475, 1397, 1665, 1585, 2257, 1579, 1485, 1483, 934, 745, 934, 1706, 1024, 1024,
+        1382, 1466, 1214, 1466, 1389, 891, 1466, 1458, 702, 702, 1362, 702, 2134, 1458, 1407, 1466,
+        1466, 1010, 1219, 979, 1458, 1327, 1806, 1321, 1327, 1200, 1458, 739, 1458, 1706,
+    ),
+))
+_DEJAVU_BOLD_DEFAULT = 1400
+
+
+@lru_cache(maxsize=None)
+def _resolve_font_path() -> Optional[str]:
+    explicit = (os.environ.get("CAPTIONS_FONT_FILE") or "").strip()
+    for cand in ((explicit,) if explicit else ()) + FONT_PATH_CANDIDATES:
+        if cand and os.path.isfile(cand):
+            return cand
+    return None
+
+
+class GlyphMetrics:
+    """Advance widths in pixels for one font file at one ASS font size."""
+
+    def __init__(self, font_path: Optional[str], size: int):
+        self.size = int(size)
+        self._widths: Dict[str, float] = {}
+        self._font = None
+        self._scale = self.size / _DEJAVU_BOLD_ASCENT_DESCENT
+        if font_path:
+            try:
+                from PIL import ImageFont
+                self._font = ImageFont.truetype(font_path, self.size)
+                ascent, descent = self._font.getmetrics()
+                # Pillow sizes by em; libass by ascent+descent
+                self._scale = self.size / max(1, ascent + descent)
+            except Exception:
+                self._font = None
+
+    def char_width(self, ch: str) -> float:
+        w = self._widths.get(ch)
+        if w is None:
+            if self._font is not None:
+                w = float(self._font.getlength(ch)) * self._scale
+            else:
+                units = _DEJAVU_BOLD_ADVANCE.get(ch)
+                if units is None:
+                    wide = unicodedata.east_asian_width(ch) in ("W", "F")
+                    units = _DEJAVU_BOLD_UNITS_PER_EM if wide else _DEJAVU_BOLD_DEFAULT
+                w = units * self._scale
+            self._widths[ch] = w
+        return w
+
+    def text_width(self, text: str) -> float:
+        cw = self.char_width
+        return sum(cw(ch) for ch in text)
+
+
+@lru_cache(maxsize=32)
+def get_glyph_metrics(font_path: Optional[str], size: int) -> GlyphMetrics:
+    return GlyphMetrics(font_path, size)
+
+
+@lru_cache(maxsize=8192)
+def wrap_text(text: str, font_path: Optional[str], size: int, max_px: int, max_lines: int) -> Tuple[str, ...]:
+    """Greedy word wrap to max_px using measured widths; overflow ends with '...'.
+
+    Words wider than max_px stay whole on their own line.
+    """
+    words = text.split()
+    if not words:
+        return ()
+    m = get_glyph_metrics(font_path, size)
+    space = m.char_width(" ")
+    lines: List[str] = []
+    current: List[str] = []
+    current_w = 0.0
+    for word in words:
+        ww = m.text_width(word)
+        if current and current_w + space + ww > max_px:
+            lines.append(" ".join(current))
+            current, current_w = [word], ww
+        else:
+            current_w = current_w + space + ww if current else ww
+            current.append(word)
+    if current:
+        lines.append(" ".join(current))
+
+    if len(lines) > max_lines > 0:
+        lines = lines[:max_lines]
+        last = lines[-1].rstrip(" .")
+        ellipsis_w = m.text_width("...")
+        while last and m.text_width(last) + ellipsis_w > max_px:
+            last = last[:-1].rstrip()
+        lines[-1] = (last + "...").strip()
+    return tuple(lines)
+
+
+# ---------------------------------------------------------------------------
+# Style
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class OverlayStyle:
+    font_size_fraction: float = 0.033
+    bottom_margin_fraction: float = 0.20
+    left_right_margin_fraction: float = 0.05
+    main_outline: int = 10
+    glow_outline: int = 20
+    shadow: int = 3
+    glow_alpha_ass: float = 0.55
+    title_glow_color: str = "#C0C0C0"
+    glow_color_male: str = "#00D1FF"
+    glow_color_female: str = "#FF4FD8"
+    glow_color_neutral: str = "#C0C0C0"
+    title_max_lines: int = 2
+    caption_max_lines: int = 2
+    font_path: Optional[str] = None
+
+    @classmethod
+    def from_env(
+        cls,
+        font_size_fraction: float = 0.033,
+        bottom_margin_fraction: float = 0.20,
+        left_right_margin_fraction: float = 0.05,
+    ) -> "OverlayStyle":
+        env = os.environ.get
+        return cls(
+            font_size_fraction=font_size_fraction,
+            bottom_margin_fraction=bottom_margin_fraction,
+            left_right_margin_fraction=left_right_margin_fraction,
+            main_outline=int(env("CAPTIONS_MAIN_OUTLINE", "10")),
+            glow_outline=int(env("CAPTIONS_GLOW_OUTLINE", "20")),
+            shadow=int(env("CAPTIONS_SHADOW", "3")),
+            glow_alpha_ass=float(env("CAPTIONS_GLOW_ALPHA_ASS", "0.55")),
+            title_glow_color=env("CAPTIONS_TITLE_GLOW_COLOR", "#C0C0C0").strip(),
+            glow_color_male=env("CAPTIONS_GLOW_COLOR_MALE", "#00D1FF").strip(),
+            glow_color_female=env("CAPTIONS_GLOW_COLOR_FEMALE", "#FF4FD8").strip(),
+            glow_color_neutral=env("CAPTIONS_GLOW_COLOR_NEUTRAL", "#C0C0C0").strip(),
+            title_max_lines=int(env("CAPTIONS_TITLE_MAX_LINES", "2")),
+            caption_max_lines=int(env("CAPTIONS_CAPTION_MAX_LINES", "2")),
+            font_path=_resolve_font_path(),
+        )
+
+    def glow_color_for_gender(self, gender: str) -> str:
+        g = (gender or "unknown").lower()
+        if g == "male":
+            return self.glow_color_male
+        if g == "female":
+            return self.glow_color_female
+        return self.glow_color_neutral
+
+
+# ---------------------------------------------------------------------------
+# Compiler
+# ---------------------------------------------------------------------------
+
+def compile_overlays(
+    *,
+    width: int,
+    height: int,
+    caption_segments: List[Dict[str, Any]],
+    title_segments: List[Dict[str, Any]],
+    a_gender: str,
+    b_gender: str,
+    known_names: List[str],
+    hide_speaker_names: bool,
+    style: OverlayStyle,
+) -> str:
+    """ASS script text with TikTok-style glow for titles (top) and captions (bottom)."""
+    font_size = max(24, int(height * style.font_size_fraction))
+    title_font_size = font_size
+
+    margin_v_bottom = max(24, int(height * style.bottom_margin_fraction))
+    margin_v_top = max(24, int(height * 0.10))  # inside top ~20%
+    margin_lr = max(24, int(width * style.left_right_margin_fraction))
+    # The glow outline extends past the glyphs on both sides; keep it inside the frame.
+    wrap_px = max(120, width - 2 * margin_lr - 2 * max(style.glow_outline, style.main_outline))
+
+    # Opacity: 0=opaque in ASS; use partially transparent glow
+    glow_alpha = max(0, min(255, int(round(255 * style.glow_alpha_ass))))
+    glow_aa = max(0, min(255, 255 - glow_alpha))
+
+    # Colors
+    white = _ass_color_rgba("#FFFFFF", 0)
+    black = _ass_color_rgba("#000000", 0)
+    glow_primary = _ass_color_rgba("#FFFFFF", glow_aa)
+    title_outline = _ass_color_rgba(style.title_glow_color, glow_aa)
+    male_outline = _ass_color_rgba(style.glow_color_for_gender("male"), glow_aa)
+    female_outline = _ass_color_rgba(style.glow_color_for_gender("female"), glow_aa)
+    neutral_outline = _ass_color_rgba(style.glow_color_for_gender("unknown"), glow_aa)
+
+    def style_line(
+        name: str,
+        font_sz: int,
+        primary: str,
+        outline: str,
+        outline_sz: int,
+        shadow_sz: int,
+        alignment: int,
+        margin_v: int,
+    ) -> str:
+        # BorderStyle=1, outline+shadow enabled
+        return (
+            f"Style: {name},{FONT_NAME},{font_sz},{primary},&H00000000,{outline},&H00000000,"
+            f"-1,0,0,0,100,100,0,0,1,{outline_sz},{shadow_sz},{alignment},{margin_lr},{margin_lr},{margin_v},1"
+        )
+
+    def wrapped(text: str, font_sz: int, max_lines: int) -> str:
+        t = " ".join(str(text).split())
+        return _ass_escape("\n".join(wrap_text(t, style.font_path, font_sz, wrap_px, max_lines)))
+
+    lines: List[str] = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 2",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name,Fontname,Fontsize,PrimaryColour,SecondaryColour,OutlineColour,BackColour,Bold,Italic,Underline,StrikeOut,ScaleX,ScaleY,Spacing,Angle,BorderStyle,Outline,Shadow,Alignment,MarginL,MarginR,MarginV,Encoding",
+        # Captions bottom (alignment 2 = bottom-center)
+        style_line("CapGlowMale", font_size, glow_primary, male_outline, style.glow_outline, 0, 2, margin_v_bottom),
+        style_line("CapGlowFemale", font_size, glow_primary, female_outline, style.glow_outline, 0, 2, margin_v_bottom),
+        style_line("CapGlowNeutral", font_size, glow_primary, neutral_outline, style.glow_outline, 0, 2, margin_v_bottom),
+        style_line("CapMain", font_size, white, black, style.main_outline, style.shadow, 2, margin_v_bottom),
+        # Titles top (alignment 8 = top-center)
+        style_line("TitleGlow", title_font_size, glow_primary, title_outline, style.glow_outline, 0, 8, margin_v_top),
+        style_line("TitleMain", title_font_size, white, black, style.main_outline, style.shadow, 8, margin_v_top),
+        "",
+        "[Events]",
+        "Format: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text",
+    ]
+
+    def glow_style_for_gender(gender: str) -> str:
+        return {"male": "CapGlowMale", "female": "CapGlowFemale"}.get(gender, "CapGlowNeutral")
+
+    glow_by_speaker = {"A": glow_style_for_gender(a_gender), "B": glow_style_for_gender(b_gender)}
+
+    # Titles (top)
+    for seg in title_segments:
+        start = _ass_time(seg["start"])
+        end = _ass_time(seg["end"])
+        txt = wrapped(sanitize_dialog_text_for_burn(str(seg["text"])), title_font_size, style.title_max_lines)
+        lines.append(f"Dialogue: 0,{start},{end},TitleGlow,,0,0,0,,{txt}")
+        lines.append(f"Dialogue: 1,{start},{end},TitleMain,,0,0,0,,{txt}")
+
+    # Captions (bottom)
+    for seg in caption_segments:
+        raw_text = sanitize_dialog_text_for_burn(str(seg.get("text", ""))).strip()
+        if not raw_text:
+            continue
+        visible = _strip_speaker_prefix(raw_text, known_names, hide_speaker_names)
+        if not visible:
+            continue
+
+        start = _ass_time(seg["start"])
+        end = _ass_time(seg["end"])
+        glow_style = glow_by_speaker.get(str(seg.get("speaker", "")).strip().upper(), "CapGlowNeutral")
+        txt = wrapped(visible, font_size, style.caption_max_lines)
+        lines.append(f"Dialogue: 0,{start},{end},{glow_style},,0,0,0,,{txt}")
+        lines.append(f"Dialogue: 1,{start},{end},CapMain,,0,0,0,,{txt}")
+
+    return "\n".join(lines)
+
+
+def _cache_dir() -> Path:
+    explicit = (os.environ.get("ASS_OVERLAY_CACHE_DIR") or "").strip()
+    return Path(explicit) if explicit else get_repo_root() / ".cache" / "ass_overlays"
+
+
+def _segment_keys(segments: List[Dict[str, Any]], fields: Tuple[str, ...]) -> List[List[Any]]:
+    return [[seg.get(f) for f in fields] for seg in segments]
+
+
+def _prune_cache(cache_dir: Path) -> None:
+    try:
+        files = sorted(cache_dir.glob("*.ass"), key=lambda p: p.stat().st_mtime)
+    except OSError:
+        return
+    for p in files[:-CACHE_MAX_FILES]:
+        p.unlink(missing_ok=True)
+
+
+def build_overlays_ass(
+    *,
+    width: int,
+    height: int,
+    caption_segments: List[Dict[str, Any]],
+    title_segments: List[Dict[str, Any]],
+    a_gender: str,
+    b_gender: str,
+    known_names: List[str],
+    hide_speaker_names: bool,
+    style: OverlayStyle,
+) -> Path:
+    """Compiled ASS overlays file for these inputs, reused from the cache when present."""
+    key_payload = json.dumps(
+        [
+            COMPILER_VERSION, int(width), int(height), asdict(style),
+            _segment_keys(caption_segments, ("start", "end", "text", "speaker")),
+            _segment_keys(title_segments, ("start", "end", "text")),
+            a_gender, b_gender, list(known_names), bool(hide_speaker_names),
+        ],
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    key = hashlib.blake2b(key_payload.encode("utf-8"), digest_size=16).hexdigest()
+    cache_dir = _cache_dir()
+    ass_path = cache_dir / f"{key}.ass"
+    if ass_path.exists() and ass_path.stat().st_size > 0:
+        try:
+            os.utime(ass_path)  # most recently used survives pruning
+        except OSError:
+            pass
+        return ass_path
+
+    text = compile_overlays(
+        width=int(width),
+        height=int(height),
+        caption_segments=caption_segments,
+        title_segments=title_segments,
+        a_gender=a_gender,
+        b_gender=b_gender,
+        known_names=known_names,
+        hide_speaker_names=hide_speaker_names,
+        style=style,
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = ass_path.with_name(f".{ass_path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, ass_path)
+    _prune_cache(cache_dir)
+    return ass_path
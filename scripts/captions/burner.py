@@ -30,6 +30,7 @@ Configuration
 - CAPTIONS_GLOW_COLOR_NEUTRAL (default: #C0C0C0)
 - CAPTIONS_TITLE_GLOW_COLOR (default: #00D1FF)
 - VIDEO_FRAME_PNG or FRAME_PNG: explicit frame path (absolute or repo-relative)
+- ASS_OVERLAY_CACHE_DIR: compiled overlays cache (see captions/ass_overlays.py)
 """
 
 from __future__ import annotations
@@ -42,58 +43,13 @@ import os
 import re
 import subprocess
 import tempfile
-import textwrap
 
 from config import load_topic_config
+from resource_governor import get_governor, apply_ffmpeg_thread_budget
 
+from .ass_overlays import OverlayStyle, build_overlays_ass
 
-# --- Text sanitization (remove visible backslashes in captions/titles) ---
-_LITERAL_UNICODE_RE = re.compile(r'\\u([0-9a-fA-F]{4})|\\U([0-9a-fA-F]{8})')
-_BACKSLASH_ESCAPE_RE = re.compile(r'\\([\\/"\'])')
-_ESCAPED_WS_RE = re.compile(r'\\[ \t]+')
 
-def _decode_literal_unicode(s: str) -> str:
-    def _repl(m: re.Match) -> str:
-        h4 = m.group(1)
-        h8 = m.group(2)
-        try:
-            if h4:
-                return chr(int(h4, 16))
-            if h8:
-                return chr(int(h8, 16))
-        except Exception:
-            return m.group(0)
-        return m.group(0)
-    return _LITERAL_UNICODE_RE.sub(_repl, s)
-
-def sanitize_dialog_text_for_burn(s: str) -> str:
-    """
-    Convert JSON-ish escaped strings into clean human text so burned captions/titles
-    do NOT display backslashes.
-    """
-    if s is None:
-        return ""
-    if not isinstance(s, str):
-        s = str(s)
-
-    s = _decode_literal_unicode(s)
-
-    # Common escape sequences
-    s = s.replace("\\r", "").replace("\\t", " ").replace("\\n", "\n")
-    s = s.replace('\\"', '"').replace("\\'", "'").replace("\\/", "/")
-    s = s.replace("\\\\", "\\")  # collapse double
-
-    # Remove escape markers
-    s = _BACKSLASH_ESCAPE_RE.sub(r"\1", s)
-    s = _ESCAPED_WS_RE.sub(" ", s)
-
-    # Safety: remove any remaining standalone backslashes
-    s = s.replace("\\", "")
-
-    # Normalize whitespace
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)
-    return s.strip()
 _TIME_RE = re.compile(r"(\d+):(\d+):(\d+)[,\.](\d+)")
 
 
@@ -141,51 +97,28 @@ def _parse_srt_simple(srt_path: Path) -> List[Dict[str, Any]]:
     return out
 
 
-def _ass_time(t: float) -> str:
-    # ASS uses H:MM:SS.cs (centiseconds)
-    t = max(0.0, float(t))
-    hh = int(t // 3600)
-    mm = int((t % 3600) // 60)
-    ss = int(t % 60)
-    cs = int(round((t - int(t)) * 100))
-    cs = max(0, min(99, cs))
-    return f"{hh}:{mm:02d}:{ss:02d}.{cs:02d}"
-
-
-def _ass_color_rgba(hex_rgb: str, alpha: int) -> str:
-    """Return ASS &HAABBGGRR from #RRGGBB and alpha 0-255 (0=opaque)."""
-    h = (hex_rgb or "").strip()
-    if h.startswith("#"):
-        h = h[1:]
-    if len(h) != 6:
-        rr, gg, bb = (255, 255, 255)
-    else:
-        rr = int(h[0:2], 16)
-        gg = int(h[2:4], 16)
-        bb = int(h[4:6], 16)
-    aa = max(0, min(255, int(alpha)))
-    return f"&H{aa:02X}{bb:02X}{gg:02X}{rr:02X}"
+def _escape_filter_path(p: str) -> str:
+    # For ffmpeg filters, escape backslashes and single quotes.
+    return p.replace("\\", "\\\\").replace("'", r"\'")
 
 
-def _ass_escape(text: str) -> str:
-    t = (text or "").replace("\r\n", "\n").replace("\r", "\n")
-    t = t.replace("\\", "\\\\")
-    t = t.replace("{", "\\{").replace("}", "\\}")
-    t = t.replace("\n", "\\N")
-    return t
+_FFMPEG_FILTERS_OUTPUT: Optional[str] = None
 
 
-def _escape_filter_path(p: str) -> str:
-    # For ffmpeg filters, escape backslashes and single quotes.
-    return p.replace("\\", "\\\\").replace("'", r"\'")
+def _ffmpeg_filters_output() -> str:
+    # `ffmpeg -filters` does not change within a process; probe once.
+    global _FFMPEG_FILTERS_OUTPUT
+    if _FFMPEG_FILTERS_OUTPUT is None:
+        try:
+            r = subprocess.run(["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True, check=False)
+            _FFMPEG_FILTERS_OUTPUT = r.stdout or ""
+        except Exception:
+            return ""
+    return _FFMPEG_FILTERS_OUTPUT
 
 
 def _ffmpeg_has_filter(name: str) -> bool:
-    try:
-        r = subprocess.run(["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True, check=False)
-        return name in (r.stdout or "")
-    except Exception:
-        return False
+    return name in _ffmpeg_filters_output()
 
 
 _TOPIC_ID_RE = re.compile(r"\b(topic-\d+)\b", re.IGNORECASE)
@@ -211,18 +144,6 @@ def _normalize_gender(g: Optional[str]) -> str:
     return "unknown"
 
 
-def _pick_glow_color_for_gender(gender: str) -> str:
-    male = os.environ.get("CAPTIONS_GLOW_COLOR_MALE", "#00D1FF").strip()
-    female = os.environ.get("CAPTIONS_GLOW_COLOR_FEMALE", "#FF4FD8").strip()
-    neutral = os.environ.get("CAPTIONS_GLOW_COLOR_NEUTRAL", "#C0C0C0").strip()
-    g = (gender or "unknown").lower()
-    if g == "male":
-        return male
-    if g == "female":
-        return female
-    return neutral
-
-
 def _repo_root_from_here() -> Path:
     # .../repo_root/scripts/captions/burner.py
     return Path(__file__).resolve().parents[2]
@@ -263,35 +184,6 @@ def _discover_frame_png(repo_root: Path, width: int, height: int) -> Optional[Pa
     return candidates[0] if candidates else None
 
 
-def _strip_speaker_prefix(text: str, known_names: List[str], hide: bool) -> str:
-    """Remove leading 'Name: ' (or A:/B:) prefix for display text."""
-    t = (text or "").strip()
-    if not t:
-        return ""
-    if not hide:
-        return t
-
-    # A: / B:
-    m = re.match(r"^\s*([AB])\s*:\s+(.+)$", t, flags=re.IGNORECASE)
-    if m:
-        return m.group(2).strip()
-
-    # Name: ...
-    m = re.match(r"^\s*([^:\n]{1,48})\s*:\s+(.+)$", t)
-    if not m:
-        return t
-    name = m.group(1).strip()
-    rest = m.group(2).strip()
-    if not rest:
-        return t
-
-    for kn in known_names:
-        if kn and name.lower() == kn.lower():
-            return rest
-    # If not a known name, keep as-is (avoid removing legitimate colon use).
-    return t
-
-
 @dataclass(frozen=True)
 class CaptionBurnConfig:
     enabled: bool = True
@@ -356,6 +248,11 @@ def _load_config_from_env() -> CaptionBurnConfig:
 class CaptionBurner:
     def __init__(self, config: Optional[CaptionBurnConfig] = None):
         self.config = config or _load_config_from_env()
+        self.style = OverlayStyle.from_env(
+            font_size_fraction=self.config.font_size_fraction,
+            bottom_margin_fraction=self.config.bottom_margin_fraction,
+            left_right_margin_fraction=self.config.left_right_margin_fraction,
+        )
 
     def _discover_captions_json(self, video_path: Path, audio_path: Optional[Path]) -> Optional[Path]:
         cands: List[Path] = []
@@ -481,144 +378,18 @@ class CaptionBurner:
         known_names: List[str],
         hide_speaker_names: bool,
     ) -> Path:
-        """Build a temporary ASS file with TikTok-style glow."""
-        font_size = max(24, int(height * self.config.font_size_fraction))
-        title_font_size = font_size
-
-        margin_v_bottom = max(24, int(height * self.config.bottom_margin_fraction))
-        margin_v_top = max(24, int(height * 0.10))  # inside top ~20%
-        margin_lr = max(24, int(width * self.config.left_right_margin_fraction))
-
-        # Glow parameters
-        main_outline = int(os.environ.get("CAPTIONS_MAIN_OUTLINE", "10"))
-        glow_outline = int(os.environ.get("CAPTIONS_GLOW_OUTLINE", "20"))
-        shadow = int(os.environ.get("CAPTIONS_SHADOW", "3"))
-
-        # Opacity: 0=opaque in ASS; use partially transparent glow
-        glow_alpha_float = float(os.environ.get("CAPTIONS_GLOW_ALPHA_ASS", "0.55"))
-        glow_alpha = max(0, min(255, int(round(255 * glow_alpha_float))))
-        glow_aa = max(0, min(255, 255 - glow_alpha))
-
-        # Colors
-        white = _ass_color_rgba("#FFFFFF", 0)
-        black = _ass_color_rgba("#000000", 0)
-
-        title_glow = os.environ.get("CAPTIONS_TITLE_GLOW_COLOR", "#C0C0C0").strip()
-        glow_primary = _ass_color_rgba("#FFFFFF", glow_aa)
-        title_outline = _ass_color_rgba(title_glow, glow_aa)
-
-        male_outline = _ass_color_rgba(_pick_glow_color_for_gender("male"), glow_aa)
-        female_outline = _ass_color_rgba(_pick_glow_color_for_gender("female"), glow_aa)
-        neutral_outline = _ass_color_rgba(_pick_glow_color_for_gender("unknown"), glow_aa)
-
-        def style_line(
-            name: str,
-            font_sz: int,
-            primary: str,
-            outline: str,
-            outline_sz: int,
-            shadow_sz: int,
-            alignment: int,
-            margin_v: int,
-        ) -> str:
-            # BorderStyle=1, outline+shadow enabled
-            return (
-                f"Style: {name},DejaVu Sans,{font_sz},{primary},&H00000000,{outline},&H00000000,"
-                f"-1,0,0,0,100,100,0,0,1,{outline_sz},{shadow_sz},{alignment},{margin_lr},{margin_lr},{margin_v},1"
-            )
-
-        def wrap_to_safe_area(text: str, *, font_sz: int, max_lines: int) -> str:
-            """Hard-wrap text so it stays fully visible inside the frame.
-
-            ASS glow/outline can clip at edges, so we wrap based on an approximate character capacity.
-            """
-            t = " ".join(str(text).replace("\r", " ").replace("\n", " ").split()).strip()
-            if not t:
-                return ""
-            # Approximate monospace char width for DejaVu Sans ~0.55em
-            usable_px = max(120, width - 2 * margin_lr)
-            approx_chars = max(18, int(usable_px / max(10, int(font_sz * 0.55))))
-            lines_wrapped = textwrap.wrap(t, width=approx_chars, break_long_words=False, break_on_hyphens=False)
-            if not lines_wrapped:
-                return t
-            if len(lines_wrapped) > max_lines:
-                lines_wrapped = lines_wrapped[:max_lines]
-                # Ellipsis on the last line if truncated
-                last = lines_wrapped[-1]
-                if len(last) > 3 and not last.endswith("..."):
-                    # ensure ellipsis fits
-                    if len(last) >= approx_chars:
-                        last = last[: max(0, approx_chars - 3)].rstrip()
-                    lines_wrapped[-1] = (last.rstrip(" .") + "...").strip()
-            return r"\N".join(lines_wrapped)
-
-        lines: List[str] = []
-        lines.append("[Script Info]")
-        lines.append("ScriptType: v4.00+")
-        lines.append(f"PlayResX: {width}")
-        lines.append(f"PlayResY: {height}")
-        lines.append("WrapStyle: 2")
-        lines.append("ScaledBorderAndShadow: yes")
-        lines.append("")
-
-        lines.append("[V4+ Styles]")
-        lines.append("Format: Name,Fontname,Fontsize,PrimaryColour,SecondaryColour,OutlineColour,BackColour,Bold,Italic,Underline,StrikeOut,ScaleX,ScaleY,Spacing,Angle,BorderStyle,Outline,Shadow,Alignment,MarginL,MarginR,MarginV,Encoding")
-        # Captions bottom (alignment 2 = bottom-center)
-        lines.append(style_line("CapGlowMale", font_size, glow_primary, male_outline, glow_outline, 0, 2, margin_v_bottom))
-        lines.append(style_line("CapGlowFemale", font_size, glow_primary, female_outline, glow_outline, 0, 2, margin_v_bottom))
-        lines.append(style_line("CapGlowNeutral", font_size, glow_primary, neutral_outline, glow_outline, 0, 2, margin_v_bottom))
-        lines.append(style_line("CapMain", font_size, white, black, main_outline, shadow, 2, margin_v_bottom))
-        # Titles top (alignment 8 = top-center)
-        lines.append(style_line("TitleGlow", title_font_size, glow_primary, title_outline, glow_outline, 0, 8, margin_v_top))
-        lines.append(style_line("TitleMain", title_font_size, white, black, main_outline, shadow, 8, margin_v_top))
-        lines.append("")
-
-        lines.append("[Events]")
-        lines.append("Format: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text")
-
-        def glow_style_for_speaker_token(token: str) -> str:
-            t = (token or "").strip().upper()
-            if t == "A":
-                return "CapGlowMale" if a_gender == "male" else ("CapGlowFemale" if a_gender == "female" else "CapGlowNeutral")
-            if t == "B":
-                return "CapGlowMale" if b_gender == "male" else ("CapGlowFemale" if b_gender == "female" else "CapGlowNeutral")
-            return "CapGlowNeutral"
-
-        # Titles (top)
-        for seg in title_segments:
-            start = _ass_time(seg["start"])
-            end = _ass_time(seg["end"])
-            clean_title = sanitize_dialog_text_for_burn(str(seg["text"]))
-            wrapped = wrap_to_safe_area(clean_title, font_sz=title_font_size, max_lines=int(os.environ.get("CAPTIONS_TITLE_MAX_LINES","2")))
-            txt = _ass_escape(wrapped)
-            lines.append(f"Dialogue: 0,{start},{end},TitleGlow,,0,0,0,,{txt}")
-            lines.append(f"Dialogue: 1,{start},{end},TitleMain,,0,0,0,,{txt}")
-
-        # Captions (bottom)
-        for seg in caption_segments:
-            start = _ass_time(seg["start"])
-            end = _ass_time(seg["end"])
-            raw_text = sanitize_dialog_text_for_burn(str(seg.get("text", "")))
-            raw_text = raw_text.strip()
-            if not raw_text:
-                continue
-
-            visible = _strip_speaker_prefix(raw_text, known_names, hide_speaker_names)
-            if not visible:
-                continue
-
-            sp = str(seg.get("speaker", "")).strip()
-            glow_style = glow_style_for_speaker_token(sp)
-            wrapped = wrap_to_safe_area(visible, font_sz=font_size, max_lines=int(os.environ.get("CAPTIONS_CAPTION_MAX_LINES","2")))
-            txt = _ass_escape(wrapped)
-
-            lines.append(f"Dialogue: 0,{start},{end},{glow_style},,0,0,0,,{txt}")
-            lines.append(f"Dialogue: 1,{start},{end},CapMain,,0,0,0,,{txt}")
-
-        tmp_dir = Path(tempfile.mkdtemp(prefix="ass_"))
-        ass_path = tmp_dir / "overlays.ass"
-        ass_path.write_text("\n".join(lines), encoding="utf-8")
-        return ass_path
+        """ASS file with TikTok-style glow (compiled once per distinct input; see captions.ass_overlays)."""
+        return build_overlays_ass(
+            width=width,
+            height=height,
+            caption_segments=caption_segments,
+            title_segments=title_segments,
+            a_gender=a_gender,
+            b_gender=b_gender,
+            known_names=known_names,
+            hide_speaker_names=hide_speaker_names,
+            style=self.style,
+        )
 
     def burn(
         self,
@@ -704,7 +475,9 @@ class CaptionBurner:
                     str(tmp_out),
                 ]
 
-            r = subprocess.run(cmd, capture_output=True, text=True, check=False)
+            with get_governor().encode_slot() as grant:
+                r = subprocess.run(apply_ffmpeg_thread_budget(cmd, grant.threads),
+                                   capture_output=True, text=True, check=False)
             if r.returncode != 0:
                 print(f"  ✗ Overlay burn-in failed: ffmpeg exit {r.returncode}")
                 if r.stderr:
@@ -751,11 +524,13 @@ def build_overlays_ass_from_segments(
     height: int,
     caption_segments: List[Dict[str, Any]] | None = None,
     title_segments: List[Dict[str, Any]] | None = None,
+    hide_speaker_names: Optional[bool] = None,
 ) -> Path:
     """Build an ASS overlays file for the given caption/title segments.
 
     This is a lightweight wrapper around CaptionBurner._build_ass_file, exposed as a
-    stable import for the slideshow/video renderer.
+    stable import for the slideshow/video renderer. The file lives in the overlay
+    cache, so rendering the same item again returns the same path without recompiling.
 
     Args:
         video_path: Used to infer topic context (speaker names/genders). Only the path
@@ -763,9 +538,10 @@ def build_overlays_ass_from_segments(
         width/height: Target video resolution.
         caption_segments: List of {start,end,text[,speaker]}.
         title_segments: List of {start,end,text}.
+        hide_speaker_names: Defaults to CAPTIONS_HIDE_SPEAKER_NAMES.
 
     Returns:
-        Path to a temporary .ass file.
+        Path to a cached .ass file (do not modify or delete it).
     """
 
     burner = CaptionBurner(config=_load_config_from_env())
@@ -784,7 +560,7 @@ def build_overlays_ass_from_segments(
         a_gender=str(ctx.get("a_gender", "unknown")),
         b_gender=str(ctx.get("b_gender", "unknown")),
         known_names=known_names,
-        hide_speaker_names=burner.config.hide_speaker_names,
+        hide_speaker_names=burner.config.hide_speaker_names if hide_speaker_names is None else bool(hide_speaker_names),
     )
 
 def _preprocess_frame_png(frame_png: str, width: int, height: int, cache_dir: Path) -> str:
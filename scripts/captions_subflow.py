@@ -16,6 +16,8 @@ from typing import Optional, Tuple
 
 # New post-processing burner (supports image titles + gender glow) 
 from captions.burner import burn_captions_subflow as burn_overlays_subflow, CaptionBurnConfig
+from media_probe import media_duration, media_resolution, probe_media
+from resource_governor import get_governor, apply_ffmpeg_thread_budget
 
 
 def find_caption_file(audio_path: Path, video_path: Path) -> Optional[Path]:
@@ -72,37 +74,17 @@ def _escape_subtitles_path(p: Path) -> str:
 def _probe_video_resolution(video_path: Path) -> Tuple[int, int]:
     """Return (width,height) using ffprobe; falls back to (0,0) on failure."""
     try:
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=width,height',
-            '-of', 'csv=p=0:s=x',
-            str(video_path),
-        ]
-        res = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        if res.returncode == 0 and res.stdout.strip():
-            w_str, h_str = res.stdout.strip().split('x')
-            return int(w_str), int(h_str)
+        return media_resolution(probe_media(video_path))
     except Exception:
-        pass
-    return 0, 0
+        return 0, 0
 
 
 def _probe_video_duration(video_path: Path) -> float:
     """Return duration in seconds (0.0 on failure)."""
     try:
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(video_path),
-        ]
-        res = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        if res.returncode == 0 and res.stdout.strip():
-            return float(res.stdout.strip())
+        return media_duration(probe_media(video_path))
     except Exception:
-        pass
-    return 0.0
+        return 0.0
 
 
 def _parse_srt_events(srt_path: Path):
@@ -275,7 +257,8 @@ def burn_captions(
         str(video_out),
     ]
 
-    res = subprocess.run(cmd, capture_output=True, text=True)
+    with get_governor().encode_slot() as grant:
+        res = subprocess.run(apply_ffmpeg_thread_budget(cmd, grant.threads), capture_output=True, text=True)
     if res.returncode != 0:
         # Surface a concise error for workflow logs.
         err = (res.stderr or '').strip().splitlines()[-12:]
@@ -123,6 +123,22 @@ def cleanup_topic_outputs(topic_dir: Path, topic: str, date_yyyymmdd: str) -> in
     return removed
 
 
+def gc_image_store() -> None:
+    """Release shared image-store objects no topic references any more."""
+    from global_config import IMAGE_STORE_ENABLED
+    if not IMAGE_STORE_ENABLED:
+        return
+    try:
+        from image_store import get_image_store
+        r = get_image_store().gc()
+        print(
+            f"Image store GC: removed {r['objects']} object(s), {r['derived']} derived file(s), "
+            f"{r['bytes'] / (1024 * 1024):.1f} MB; pruned {r['dead_refs']} dead reference(s)"
+        )
+    except Exception as e:
+        print(f"Image store GC skipped: {e}")
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--topic", required=True)
@@ -137,6 +153,7 @@ def main() -> int:
         return 0
 
     cleanup_topic_outputs(topic_dir, args.topic, args.date)
+    gc_image_store()
     return 0
 
 
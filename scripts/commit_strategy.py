@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Commit strategy for --commit-each-module.
+
+Instead of `git add`-ing the whole output dir after every stage (which makes git
+rehash multi-hundred-MB MP4/WAV files and image pools), each stage declares the
+outputs it writes. The committer:
+
+  - stages only those declared files
+  - skips (or routes through Git LFS) files above COMMIT_MAX_FILE_MB
+  - coalesces stage commits until a time/size budget is exceeded
+  - runs git on a single background thread so the next stage keeps going
+
+Call close() at the end of a run to flush and wait for pending commits.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from git_commit import commit, git_available, lfs_available, lfs_track, stage_files
+
+
+# Output globs per stage, relative to the topic output dir. {topic}/{date} are
+# substituted; patterns ending in "/**" match every file below that dir.
+STAGE_OUTPUT_PATTERNS: Dict[str, List[str]] = {
+    "scripts": [
+        "{topic}-{date}.sources.json",
+        "{topic}-{date}.search_queries.json",
+        "{topic}-{date}-PASS_A.txt",
+        "{topic}-{date}-*.script.txt",
+        "{topic}-{date}-*.script.json",
+        "{topic}-{date}-*.chapters.json",
+        "{topic}-{date}-*.ffmeta",
+    ],
+    "images": [
+        "images/**",
+    ],
+    "tts": [
+        "{topic}-{date}-*.m4a",
+        "{topic}-{date}-*.captions.srt",
+        "{topic}-{date}-*.captions.json",
+        "{topic}-{date}-*.tts_ledger.json",
+    ],
+    "prepare_images": [
+        "{topic}-{date}.images_prepared.json",
+        "_prepared_images/**",
+    ],
+    "video": [
+        "{topic}-{date}-*.mp4",
+        "{topic}-{date}-*.image_titles.json",
+    ],
+}
+
+
+def resolve_stage_outputs(stage: str, out_dir: Path, topic_id: str, date_str: str) -> List[Path]:
+    """Expand a stage's declared output patterns into existing files."""
+    files: List[Path] = []
+    seen = set()
+    for pattern in STAGE_OUTPUT_PATTERNS.get(stage, []):
+        patt = pattern.format(topic=topic_id, date=date_str)
+        if patt.endswith("/**"):
+            base = out_dir / patt[:-3]
+            matches = sorted(base.rglob("*")) if base.is_dir() else []
+        else:
+            matches = sorted(out_dir.glob(patt))
+        for p in matches:
+            if p.is_file() and p not in seen:
+                seen.add(p)
+                files.append(p)
+    return files
+
+
+def partition_by_size(files: Iterable[Path], max_bytes: int) -> Tuple[List[Path], List[Path], int]:
+    """Split files into (small, large, small_total_bytes) by max_bytes."""
+    small: List[Path] = []
+    large: List[Path] = []
+    total = 0
+    for p in files:
+        try:
+            size = p.stat().st_size
+        except OSError:
+            continue
+        if max_bytes > 0 and size > max_bytes:
+            large.append(p)
+        else:
+            small.append(p)
+            total += size
+    return small, large, total
+
+
+@dataclass
+class _PendingBatch:
+    stages: List[str] = field(default_factory=list)
+    files: List[Path] = field(default_factory=list)
+    lfs_files: List[Path] = field(default_factory=list)
+    bytes: int = 0
+    started: float = 0.0
+
+
+class StageCommitter:
+    """Coalescing, optionally asynchronous committer for pipeline stages."""
+
+    def __init__(
+        self,
+        repo_root: Path,
+        message_prefix: str,
+        *,
+        max_file_bytes: int,
+        large_file_policy: str = "skip",
+        batch_max_seconds: float = 120.0,
+        batch_max_bytes: int = 200 * 1024 * 1024,
+        run_async: bool = True,
+    ):
+        self.repo_root = Path(repo_root)
+        self.message_prefix = message_prefix
+        self.max_file_bytes = int(max_file_bytes)
+        self.large_file_policy = large_file_policy
+        self.batch_max_seconds = float(batch_max_seconds)
+        self.batch_max_bytes = int(batch_max_bytes)
+        self._pending = _PendingBatch()
+        self._executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="git-commit") if run_async else None
+        )
+        self._futures: List[Future] = []
+        self._lfs_ok: Optional[bool] = None
+        self.commits_made = 0
+        self.skipped_large: List[Path] = []
+
+    def add_stage(self, stage: str, files: Iterable[Path]) -> None:
+        """Queue a finished stage's outputs; flushes when the budget is exceeded."""
+        small, large, total = partition_by_size(files, self.max_file_bytes)
+        if large:
+            if self.large_file_policy == "include":
+                small.extend(large)
+            elif self.large_file_policy == "lfs" and self._lfs_available():
+                self._pending.lfs_files.extend(large)
+                small.extend(large)
+            else:
+                self.skipped_large.extend(large)
+                print(f"  Commit: skipping {len(large)} file(s) over {self.max_file_bytes // (1024 * 1024)} MB from {stage}")
+
+        if not self._pending.stages:
+            self._pending.started = time.monotonic()
+        self._pending.stages.append(stage)
+        self._pending.files.extend(small)
+        self._pending.bytes += total
+
+        elapsed = time.monotonic() - self._pending.started
+        if elapsed >= self.batch_max_seconds or self._pending.bytes >= self.batch_max_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit everything queued so far (in the background when async)."""
+        batch = self._pending
+        self._pending = _PendingBatch()
+        if not batch.stages:
+            return
+        if self._executor is not None:
+            self._futures.append(self._executor.submit(self._commit_batch, batch))
+        else:
+            self._commit_batch(batch)
+
+    def close(self) -> int:
+        """Flush, wait for background commits and return how many were made."""
+        self.flush()
+        for fut in self._futures:
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"  Commit failed (non-fatal): {e}")
+        self._futures.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        return self.commits_made
+
+    def _lfs_available(self) -> bool:
+        if self._lfs_ok is None:
+            self._lfs_ok = lfs_available(self.repo_root)
+            if not self._lfs_ok:
+                print("  Commit: git-lfs not available; large files will be skipped")
+        return self._lfs_ok
+
+    def _commit_batch(self, batch: _PendingBatch) -> bool:
+        if not git_available(self.repo_root):
+            return False
+        files = list(batch.files)
+        if batch.lfs_files:
+            if lfs_track(self.repo_root, batch.lfs_files):
+                files.append(self.repo_root / ".gitattributes")
+            else:
+                lfs_set = set(batch.lfs_files)
+                files = [p for p in files if p not in lfs_set]
+                self.skipped_large.extend(batch.lfs_files)
+        stage_files(self.repo_root, files)
+        msg = f"{self.message_prefix} - {', '.join(batch.stages)}"
+        ok = commit(self.repo_root, msg)
+        if ok:
+            self.commits_made += 1
+        return ok
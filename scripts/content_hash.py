@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Fast content hashes with a persistent per-file index.
+
+Prepared-image manifests identify sources and outputs by content instead of
+size+mtime, so caches survive fresh checkouts, tenant release restores and CI
+cache restores (all of which rewrite mtimes).
+
+Hashes are "<algo>:<hex>": xxh3_128 when the optional `xxhash` package is
+installed, otherwise blake2b-128 from hashlib. A value written with one algorithm
+is verified with that algorithm, so manifests stay valid either way.
+
+The index (.cache/content_hashes.json, CONTENT_HASH_INDEX overrides) remembers
+path -> (size, mtime_ns, hashes), so a file is only read again when it changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import get_repo_root
+
+
+INDEX_VERSION = 1
+_CHUNK = 1 << 20
+
+try:
+    import xxhash as _xxhash
+    DEFAULT_ALGO = "xxh3_128"
+except ImportError:
+    _xxhash = None
+    DEFAULT_ALGO = "blake2b"
+
+
+def _hasher(algo: str):
+    if algo == "xxh3_128":
+        if _xxhash is None:
+            raise ValueError("xxh3_128 requires the xxhash package")
+        return _xxhash.xxh3_128()
+    if algo == "blake2b":
+        return hashlib.blake2b(digest_size=16)
+    if algo == "sha256":
+        # What GitHub reports as a release asset's digest
+        return hashlib.sha256()
+    raise ValueError(f"Unknown hash algorithm: {algo}")
+
+
+def hash_file_uncached(path: Path, algo: str = DEFAULT_ALGO) -> str:
+    """Hash a file's contents without consulting the index."""
+    h = _hasher(algo)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return f"{algo}:{h.hexdigest()}"
+
+
+def hash_bytes(data: bytes, algo: str = DEFAULT_ALGO) -> str:
+    h = _hasher(algo)
+    h.update(data)
+    return f"{algo}:{h.hexdigest()}"
+
+
+def algo_of(digest: str) -> str:
+    return digest.split(":", 1)[0] if ":" in digest else ""
+
+
+def get_index_path() -> Path:
+    env = os.environ.get("CONTENT_HASH_INDEX", "").strip()
+    if env:
+        return Path(env)
+    return get_repo_root() / ".cache" / "content_hashes.json"
+
+
+class HashIndex:
+    """path -> (size, mtime_ns, {algo: digest}), persisted as JSON."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else get_index_path()
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                self._entries = entries
+
+    def hash_file(self, path: Path, algo: Optional[str] = None) -> str:
+        """Content hash of path; served from the index while size and mtime are unchanged."""
+        algo = algo or DEFAULT_ALGO
+        p = Path(path)
+        st = p.stat()
+        key = str(p.resolve())
+        with self._lock:
+            e = self._entries.get(key)
+            if e and e.get("size") == st.st_size and e.get("mtime_ns") == st.st_mtime_ns:
+                cached = (e.get("hashes") or {}).get(algo)
+                if cached:
+                    return cached
+            else:
+                e = None
+
+        digest = hash_file_uncached(p, algo)
+
+        with self._lock:
+            if e is None:
+                e = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hashes": {}}
+            e.setdefault("hashes", {})[algo] = digest
+            self._entries[key] = e
+            self._dirty = True
+        return digest
+
+    def seed(self, path: Path, digest: str, size: int, mtime_ns: int) -> None:
+        """Record a digest computed elsewhere (e.g. at download time) for path at size/mtime_ns."""
+        p = Path(path)
+        key = str(p.resolve())
+        algo = algo_of(digest)
+        with self._lock:
+            e = self._entries.get(key)
+            if not e or e.get("size") != size or e.get("mtime_ns") != mtime_ns:
+                e = {"size": size, "mtime_ns": mtime_ns, "hashes": {}}
+            hashes = e.setdefault("hashes", {})
+            if hashes.get(algo) == digest:
+                return
+            hashes[algo] = digest
+            self._entries[key] = e
+            self._dirty = True
+
+    def matches(self, path: Path, expected: Optional[str]) -> bool:
+        """True if path's content hash equals expected (hashed with expected's algorithm)."""
+        if not expected:
+            return False
+        try:
+            return self.hash_file(path, algo_of(expected)) == expected
+        except (OSError, ValueError):
+            return False
+
+    def save(self) -> None:
+        """Write the index if it changed; entries for deleted files are pruned."""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = {k: v for k, v in self._entries.items() if os.path.exists(k)}
+            self._entries = entries
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": INDEX_VERSION, "entries": entries}), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"  ⚠ Failed to write content hash index (non-fatal): {e}")
+
+
+_INDEX: Optional[HashIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_hash_index() -> HashIndex:
+    """Process-wide hash index, loaded on first use."""
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None or _INDEX.path != get_index_path():
+            _INDEX = HashIndex()
+        return _INDEX
+
+
+def file_hash(path: Path, algo: Optional[str] = None) -> str:
+    return get_hash_index().hash_file(path, algo)
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""Batched, concurrent Google Cloud TTS synthesis straight into the TTS cache.
+
+Premium topics used to synthesize one chunk at a time through
+generate_tts_gemini, so a long script waited on hundreds of sequential round
+trips. synthesize_to_cache(items, cache_dir) takes every (voice, text) chunk of
+a script up front and fills the TTS cache with them before the usual
+per-chunk loop runs (which then only reads the cache):
+
+  - short consecutive chunks with the same voice (<= GOOGLE_TTS_BATCH_UTTERANCE_CHARS)
+    are sent as one SSML request of up to GOOGLE_TTS_BATCH_MAX_CHARS, with a
+    <mark/> before each chunk; the returned mark timepoints split the audio
+    back into one cache WAV per chunk. Voices without SSML support (Journey,
+    Chirp) are always sent one chunk per request.
+  - requests run concurrently on one event loop, at most
+    GOOGLE_TTS_CONCURRENCY at a time and spaced to stay under
+    GOOGLE_TTS_REQUESTS_PER_MINUTE. A 429/5xx answer is retried after its
+    Retry-After (or exponential backoff) and pushes back every later request.
+  - a batch whose marks do not come back is re-sent chunk by chunk. Anything
+    that still fails is left uncached; generate_tts_chunk then synthesizes it
+    the usual way, with its own retries.
+
+Requests go to the REST API (GOOGLE_TTS_ENDPOINT, v1beta1 for timepoints) with
+GOOGLE_API_KEY, or application-default credentials when no key is set, so a
+local stub server can stand in for it. httpx is used when installed (pooled
+connections), otherwise urllib in worker threads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from global_config import (
+    GOOGLE_TTS_BATCH_MAX_CHARS,
+    GOOGLE_TTS_BATCH_UTTERANCE_CHARS,
+    GOOGLE_TTS_CONCURRENCY,
+    GOOGLE_TTS_ENDPOINT,
+    GOOGLE_TTS_LANGUAGE_CODE,
+    GOOGLE_TTS_REQUESTS_PER_MINUTE,
+    GOOGLE_TTS_SAMPLE_RATE,
+    TTS_RETRY_ATTEMPTS,
+)
+
+try:
+    import httpx
+except ImportError:  # urllib fallback
+    httpx = None
+
+PROVIDER = "gemini"  # cache key provider used by generate_tts_chunk for premium TTS
+MARK_BREAK_MS = 250  # pause synthesized between batched chunks, where the audio is cut
+REQUEST_TIMEOUT_S = 120.0
+
+# Voice families that reject SSML marks
+_NO_SSML_VOICES = ("journey", "chirp")
+
+
+def supports_marks(voice: str) -> bool:
+    v = (voice or "").lower()
+    return not any(k in v for k in _NO_SSML_VOICES)
+
+
+class RequestLimiter:
+    """Concurrency cap plus request spacing for a per-minute quota; usable with `async with`."""
+
+    def __init__(self, concurrency: int, per_minute: int):
+        self._sem = asyncio.Semaphore(max(1, int(concurrency)))
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self._sem.acquire()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._sem.release()
+        return False
+
+    def back_off(self, seconds: float) -> None:
+        """Hold every request not yet started for at least `seconds` (quota exceeded)."""
+        self._next = max(self._next, asyncio.get_running_loop().time() + seconds)
+
+
+class TTSRequestError(RuntimeError):
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Google TTS HTTP {status}: {message[:300]}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _auth() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(query params, headers) authenticating a REST request."""
+    key = (os.environ.get("GOOGLE_API_KEY") or "").strip()
+    if key:
+        return {"key": key}, {}
+    try:
+        import google.auth
+        import google.auth.transport.requests
+        creds, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+        creds.refresh(google.auth.transport.requests.Request())
+        return {}, {"Authorization": f"Bearer {creds.token}"}
+    except Exception as e:
+        raise RuntimeError(f"No Google credentials for Cloud TTS (set GOOGLE_API_KEY): {e}")
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def _urllib_post(url: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, bytes, Optional[str]]:
+    req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT_S) as resp:
+            return resp.status, resp.read(), None
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), e.headers.get("Retry-After") if e.headers else None
+
+
+class _Synthesizer:
+    def __init__(self, endpoint: str, limiter: RequestLimiter, attempts: int):
+        self.url = endpoint.rstrip("/") + "/v1beta1/text:synthesize"
+        self.limiter = limiter
+        self.attempts = max(1, attempts)
+        self.params, self.headers = _auth()
+        self.headers = dict(self.headers, **{"Content-Type": "application/json"})
+        self.client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT_S) if httpx is not None else None
+        self.requests = 0
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        body = json.dumps(payload).encode("utf-8")
+        self.requests += 1
+        if self.client is not None:
+            resp = await self.client.post(self.url, params=self.params, content=body, headers=self.headers)
+            status, raw, retry = resp.status_code, resp.content, resp.headers.get("Retry-After")
+        else:
+            url = self.url + ("?" + urllib.parse.urlencode(self.params) if self.params else "")
+            status, raw, retry = await asyncio.to_thread(_urllib_post, url, body, self.headers)
+        if status >= 400:
+            raise TTSRequestError(status, raw.decode("utf-8", "replace"), _retry_after(retry))
+        return json.loads(raw.decode("utf-8"))
+
+    async def synthesize(self, voice: str, *, text: str = "", ssml: str = "") -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "input": {"ssml": ssml} if ssml else {"text": text},
+            "voice": {"languageCode": GOOGLE_TTS_LANGUAGE_CODE, "name": voice},
+            "audioConfig": {"audioEncoding": "LINEAR16", "sampleRateHertz": GOOGLE_TTS_SAMPLE_RATE},
+        }
+        if ssml:
+            payload["enableTimePointing"] = ["SSML_MARK"]
+        for attempt in range(self.attempts):
+            try:
+                async with self.limiter:
+                    return await self._post(payload)
+            except TTSRequestError as e:
+                retryable = e.status == 429 or e.status >= 500
+                if not retryable or attempt == self.attempts - 1:
+                    raise
+                wait = e.retry_after if e.retry_after is not None else float(2 ** attempt)
+                self.limiter.back_off(wait)
+            except Exception:
+                # Transport errors (connection reset, timeout)
+                if attempt == self.attempts - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+        raise RuntimeError("unreachable")
+
+
+def build_ssml(texts: List[str]) -> str:
+    parts = [f'<mark name="u{i}"/>{escape(t)}<break time="{MARK_BREAK_MS}ms"/>' for i, t in enumerate(texts)]
+    return "<speak>" + "".join(parts) + "</speak>"
+
+
+def plan_requests(items: List[Tuple[str, str]]) -> List[Tuple[str, List[str]]]:
+    """Group (voice, text) items in order into requests: (voice, [texts]).
+
+    Consecutive short texts of one mark-capable voice share a request while the
+    SSML stays under GOOGLE_TTS_BATCH_MAX_CHARS; everything else goes alone.
+    """
+    requests: List[Tuple[str, List[str]]] = []
+    for voice, text in items:
+        batchable = supports_marks(voice) and len(text) <= GOOGLE_TTS_BATCH_UTTERANCE_CHARS
+        if batchable and requests:
+            last_voice, last_texts = requests[-1]
+            if (
+                last_voice == voice
+                and len(last_texts[0]) <= GOOGLE_TTS_BATCH_UTTERANCE_CHARS
+                and len(build_ssml(last_texts + [text])) <= GOOGLE_TTS_BATCH_MAX_CHARS
+            ):
+                last_texts.append(text)
+                continue
+        requests.append((voice, [text]))
+    return requests
+
+
+def _decode_wav(audio_b64: str) -> Tuple[Tuple[int, int, int], bytes]:
+    """((channels, sample width, rate), PCM frames) of a LINEAR16 audioContent."""
+    data = base64.b64decode(audio_b64)
+    if not data.startswith(b"RIFF"):
+        # Raw LINEAR16 without a header
+        return (1, 2, GOOGLE_TTS_SAMPLE_RATE), data
+    with wave.open(io.BytesIO(data), "rb") as w:
+        return (w.getnchannels(), w.getsampwidth(), w.getframerate()), w.readframes(w.getnframes())
+
+
+def _write_wav(path: Path, fmt: Tuple[int, int, int], frames: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with wave.open(str(tmp), "wb") as w:
+        w.setnchannels(fmt[0])
+        w.setsampwidth(fmt[1])
+        w.setframerate(fmt[2])
+        w.writeframes(frames)
+    os.replace(tmp, path)
+
+
+def split_by_marks(response: Dict[str, Any], count: int) -> Optional[Tuple[Any, List[bytes]]]:
+    """Cut a batched response into `count` PCM segments at its mark timepoints (None if marks are missing)."""
+    fmt, frames = _decode_wav(response.get("audioContent") or "")
+    times: Dict[str, float] = {}
+    for tp in response.get("timepoints") or []:
+        try:
+            times[str(tp.get("markName"))] = float(tp.get("timeSeconds"))
+        except (TypeError, ValueError):
+            continue
+    if any(f"u{i}" not in times for i in range(count)):
+        return None
+    frame_bytes = fmt[0] * fmt[1]
+    total = len(frames) // frame_bytes
+    bounds = [min(total, int(round(times[f"u{i}"] * fmt[2]))) for i in range(count)] + [total]
+    if any(b > a for a, b in zip(bounds[1:], bounds[:-1])):
+        return None
+    return fmt, [frames[bounds[i] * frame_bytes:bounds[i + 1] * frame_bytes] for i in range(count)]
+
+
+def _cache_path(cache_dir: Path, voice: str, text: str) -> Path:
+    from tts_generate import compute_tts_cache_key
+    return cache_dir / f"{compute_tts_cache_key(PROVIDER, voice, text)}.wav"
+
+
+async def _store(cache_dir: Path, voice: str, text: str, fmt: Tuple[int, int, int], frames: bytes,
+                 batched: bool) -> None:
+    from tts_generate import finalize_cache_entry
+
+    path = _cache_path(cache_dir, voice, text)
+    _write_wav(path, fmt, frames)
+    # ffmpeg trim and word alignment stay off the event loop
+    await asyncio.to_thread(finalize_cache_entry, path, text, PROVIDER, voice, batched=batched)
+
+
+async def _run_request(synth: _Synthesizer, cache_dir: Path, voice: str, texts: List[str], stats: Dict[str, int]) -> None:
+    if len(texts) > 1:
+        try:
+            response = await synth.synthesize(voice, ssml=build_ssml(texts))
+            split = split_by_marks(response, len(texts))
+        except Exception as e:
+            print(f"  ⚠ Batched TTS request ({len(texts)} chunks) failed: {e}; sending chunks one by one")
+            split = None
+        if split is not None:
+            fmt, segments = split
+            for text, frames in zip(texts, segments):
+                await _store(cache_dir, voice, text, fmt, frames, True)
+                stats["synthesized"] += 1
+            return
+        await asyncio.gather(*(_run_request(synth, cache_dir, voice, [t], stats) for t in texts))
+        return
+
+    try:
+        response = await synth.synthesize(voice, text=texts[0])
+        fmt, frames = _decode_wav(response.get("audioContent") or "")
+        if not frames:
+            raise RuntimeError("empty audioContent")
+        await _store(cache_dir, voice, texts[0], fmt, frames, False)
+        stats["synthesized"] += 1
+    except Exception as e:
+        print(f"  ⚠ TTS chunk left for sequential synthesis: {e}")
+        stats["failed"] += 1
+
+
+async def _synthesize_all(items: List[Tuple[str, str]], cache_dir: Path, *, endpoint: str,
+                          concurrency: int, per_minute: int, attempts: int) -> Dict[str, int]:
+    stats = {"cached": 0, "synthesized": 0, "failed": 0, "requests": 0}
+    todo: List[Tuple[str, str]] = []
+    seen = set()
+    for voice, text in items:
+        text = (text or "").strip()
+        if not text or (voice, text) in seen:
+            continue
+        seen.add((voice, text))
+        if _cache_path(cache_dir, voice, text).exists():
+            stats["cached"] += 1
+        else:
+            todo.append((voice, text))
+    if not todo:
+        return stats
+
+    synth = _Synthesizer(endpoint, RequestLimiter(concurrency, per_minute), attempts)
+    try:
+        plan = plan_requests(todo)
+        await asyncio.gather(*(_run_request(synth, cache_dir, v, texts, stats) for v, texts in plan))
+    finally:
+        await synth.close()
+    stats["requests"] = synth.requests
+    return stats
+
+
+def synthesize_to_cache(
+    items: List[Tuple[str, str]],
+    cache_dir: Path,
+    *,
+    endpoint: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    per_minute: Optional[int] = None,
+    attempts: Optional[int] = None,
+) -> Dict[str, int]:
+    """Synthesize every uncached (voice, text) into cache_dir; returns counts.
+
+    Counts: cached (already present), synthesized, failed (left for the
+    sequential path), requests (HTTP requests sent, including retries).
+    """
+    t0 = time.monotonic()
+    stats = asyncio.run(_synthesize_all(
+        list(items),
+        Path(cache_dir),
+        endpoint=endpoint or GOOGLE_TTS_ENDPOINT,
+        concurrency=concurrency or GOOGLE_TTS_CONCURRENCY,
+        per_minute=GOOGLE_TTS_REQUESTS_PER_MINUTE if per_minute is None else per_minute,
+        attempts=attempts or TTS_RETRY_ATTEMPTS,
+    ))
+    if stats["synthesized"] or stats["failed"]:
+        print(
+            f"  ✓ Premium TTS: {stats['synthesized']} chunk(s) in {stats['requests']} request(s), "
+            f"{stats['cached']} cached, {stats['failed']} left over ({time.monotonic() - t0:.1f}s)"
+        )
+    return stats
@@ -7,6 +7,9 @@ Gemini models. This module adds a minimal, CI-friendly interface for:
 1) One-shot generation (single prompt -> text)
 2) Chunked continuation for large outputs using the user-required rule:
    "Provide next part after <last 5 words received from previous part>".
+   Parts are sized from the caller's output-token budget and generation stops
+   exactly when the JSON document is balanced (JsonProgress).
+3) Independent requests (e.g. one per content item) run concurrently.
 
 Auth:
   - GOOGLE_API_KEY (GitHub secret)
@@ -19,7 +22,6 @@ Notes:
 from __future__ import annotations
 
 import logging
-import httpx
 import os
 import json
 import re
@@ -68,19 +70,14 @@ def _tail(text: str, n_chars: int) -> str:
 
 
 def _get_client():
-    """Create a google-genai client using GOOGLE_API_KEY."""
+    """Return the shared google-genai client for GOOGLE_API_KEY."""
     api_key = os.getenv("GOOGLE_API_KEY", "").strip()
     if not api_key:
         raise RuntimeError("GOOGLE_API_KEY is not set. Add it as an env var / GitHub secret.")
 
-    try:
-        from google import genai  # type: ignore
-    except Exception as e:
-        raise ImportError(
-            "google-genai is required for Gemini support. Install with: pip install google-genai"
-        ) from e
+    from http_clients import get_genai_client
 
-    return genai.Client(api_key=api_key)
+    return get_genai_client(api_key)
 
 
 def gemini_model_max_output_tokens(model: str) -> int:
@@ -94,21 +91,45 @@ def gemini_model_max_output_tokens(model: str) -> int:
     return 8192
 
 
-def gemini_generate_once(
+def _gemini_request(
     *,
     model: str,
-    prompt: str = "",
-    max_output_tokens: int = 0,
-    temperature: float = 0.2,
-    json_mode: bool = False,
-    **kwargs,
-) -> str:
-    """
-    Single request to Gemini Developer API (v1beta) via raw HTTP.
-    This intentionally avoids the python-genai AFC/agentic loop behavior to guarantee:
-      - exactly ONE HTTP request per call
-      - no automatic tool calls / remote call chains
+    prompt: str,
+    max_output_tokens: int,
+    temperature: float,
+    json_mode: bool,
+) -> Tuple[str, str]:
+    """One generateContent request; returns (text, finishReason).
+
+    Passes through the API cassette (api_cassette) when recording or replaying.
     """
+    from api_cassette import recorded_call
+
+    request = {
+        "model": _normalize_model(model),
+        "prompt": str(prompt),
+        "max_output_tokens": int(max_output_tokens or 0),
+        "temperature": float(temperature),
+        "json_mode": bool(json_mode),
+    }
+    text, finish_reason = recorded_call(
+        "gemini",
+        request,
+        lambda: _gemini_request_live(**request),
+        encode=list,
+        decode=tuple,
+    )
+    return text, finish_reason
+
+
+def _gemini_request_live(
+    *,
+    model: str,
+    prompt: str,
+    max_output_tokens: int,
+    temperature: float,
+    json_mode: bool,
+) -> Tuple[str, str]:
     if not _is_gemini_model(model):
         raise ValueError(f"Not a Gemini model: {model}")
 
@@ -132,35 +153,31 @@ def gemini_generate_once(
         },
     }
 
-    # Single, non-streaming request.
+    # Single, non-streaming request on the shared keep-alive pool (http_clients).
     # Default timeout is intentionally high because long-form generation can take minutes.
+    from http_clients import get_http_client, request_timeout
+
     timeout_s = float(os.getenv("GEMINI_HTTP_TIMEOUT_S", os.getenv("OPENAI_TIMEOUT", "20000")))
-    connect_s = float(os.getenv("GEMINI_HTTP_CONNECT_TIMEOUT_S", "30"))
-    timeout = httpx.Timeout(
-        timeout_s,
-        connect=min(connect_s, timeout_s),
-        read=timeout_s,
-        write=timeout_s,
-        pool=timeout_s,
-    )
+    connect_raw = os.getenv("GEMINI_HTTP_CONNECT_TIMEOUT_S")
+    timeout = request_timeout(timeout_s, float(connect_raw) if connect_raw else None)
 
-    with httpx.Client(timeout=timeout) as client:
-        resp = client.post(url, params={"key": api_key}, headers=headers, json=payload)
-        if resp.status_code >= 400:
-            raise RuntimeError(f"Gemini HTTP {resp.status_code}: {resp.text[:500]}")
+    resp = get_http_client("gemini").post(url, params={"key": api_key}, headers=headers, json=payload, timeout=timeout)
+    if resp.status_code >= 400:
+        raise RuntimeError(f"Gemini HTTP {resp.status_code}: {resp.text[:500]}")
 
-        data = resp.json()
+    data = resp.json()
 
     # Fail fast on tool-call / malformed function call responses.
+    finish_reason = ""
     try:
         cand0 = (data.get("candidates") or [{}])[0]
         finish_reason = str(cand0.get("finishReason") or "").upper()
-        if finish_reason in {"MALFORMED_FUNCTION_CALL", "RECITATION", "SAFETY"}:
-            msg = cand0.get("finishMessage") or ""
-            raise RuntimeError(f"Gemini generation failed: {finish_reason}: {msg}")
     except Exception:
         # If parsing fails, continue to text extraction below.
         pass
+    if finish_reason in {"MALFORMED_FUNCTION_CALL", "RECITATION", "SAFETY"}:
+        msg = cand0.get("finishMessage") or ""
+        raise RuntimeError(f"Gemini generation failed: {finish_reason}: {msg}")
 
     # Extract text from first candidate.
     try:
@@ -168,58 +185,224 @@ def gemini_generate_once(
         text_out = "".join(p.get("text", "") for p in parts if isinstance(p, dict))
         if not (text_out or "").strip():
             raise RuntimeError("Gemini returned empty text output")
-        return text_out
+        return text_out, finish_reason
     except Exception as e:
         raise RuntimeError(f"Gemini response parsing failed: {e}. Raw: {json.dumps(data)[:1000]}")
 
 
+def gemini_generate_once(
+    *,
+    model: str,
+    prompt: str = "",
+    max_output_tokens: int = 0,
+    temperature: float = 0.2,
+    json_mode: bool = False,
+    **kwargs,
+) -> str:
+    """
+    Single request to Gemini Developer API (v1beta) via raw HTTP.
+    This intentionally avoids the python-genai AFC/agentic loop behavior to guarantee:
+      - exactly ONE HTTP request per call
+      - no automatic tool calls / remote call chains
+    """
+    text, _ = _gemini_request(
+        model=model,
+        prompt=prompt,
+        max_output_tokens=max_output_tokens,
+        temperature=temperature,
+        json_mode=json_mode,
+    )
+    return text
+
+
+class JsonProgress:
+    """Incremental structural state of a JSON document being generated in parts.
+
+    Tracks the stack of open containers and whether the scanner is inside a
+    string (and after a backslash), so `complete` is exact: the first top-level
+    object/array has been closed. Text before the first '{' or '[' (e.g. a
+    ```json fence) is skipped; `end` is the offset just past the closing
+    bracket in everything fed so far.
+    """
+
+    _CLOSERS = {"{": "}", "[": "]"}
+
+    def __init__(self):
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+        self.start = -1
+        self.end = -1
+        self._pos = 0
+
+    def feed(self, text: str) -> bool:
+        """Scan the next piece of output; returns `complete`."""
+        base = self._pos
+        self._pos += len(text)
+        if self.complete:
+            return True
+        for i, ch in enumerate(text):
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if not self.started:
+                if ch in self._CLOSERS:
+                    self.started = True
+                    self.start = base + i
+                    self.stack.append(ch)
+                continue
+            if ch == '"':
+                self.in_string = True
+            elif ch in self._CLOSERS:
+                self.stack.append(ch)
+            elif ch in "}]":
+                if self.stack and self._CLOSERS[self.stack[-1]] == ch:
+                    self.stack.pop()
+                if not self.stack:
+                    self.complete = True
+                    self.end = base + i + 1
+                    return True
+        return False
+
+    def describe(self) -> str:
+        """Where the output stopped, for the continuation prompt."""
+        if not self.started:
+            return "The JSON document has not started yet."
+        opened = "".join(self.stack)
+        closing = "".join(self._CLOSERS[c] for c in reversed(self.stack))
+        where = "inside a JSON string value" if self.in_string else "between JSON tokens"
+        return (
+            f"The output stopped {where}. Open containers (outermost first): {opened}. "
+            f"The document is complete once they are closed with {closing} after the remaining content."
+        )
+
+
+def _strip_overlap(full: str, chunk: str, min_overlap: int = 12, max_overlap: int = 2000) -> str:
+    """Drop the start of chunk when the model repeats the end of full before continuing."""
+    limit = min(len(full), len(chunk), max_overlap)
+    for n in range(limit, min_overlap - 1, -1):
+        if full.endswith(chunk[:n]):
+            return chunk[n:]
+    return chunk
+
+
+def _part_budget(remaining: int, *, cap: int, min_part: int) -> int:
+    """Output tokens for the next part: what is left of the budget, within [min_part, cap]."""
+    return max(min_part, min(cap, remaining))
+
+
 def gemini_generate_chunked(
     *,
     model: str,
     base_prompt: str,
-    max_output_tokens_per_part: int,
+    max_output_tokens_per_part: int = 0,
     max_parts: int = 80,
     tail_chars_for_context: int = 1400,
     temperature: float = 0.2,
+    total_output_tokens: int = 0,
+    min_part_tokens: int = 1024,
+    json_mode: bool = True,
 ) -> Tuple[str, List[str]]:
-    """Generate a large output in multiple small parts.
+    """Generate a large output in as few parts as it needs.
+
+    Each part asks for the output tokens still left of `total_output_tokens`
+    (the budget derived from the requested specs; tokens already received are
+    counted with model_limits), capped at `max_output_tokens_per_part` or the
+    model maximum. A part that ends with finishReason MAX_TOKENS, or whose
+    JSON is still unbalanced, is continued; generation stops as soon as the
+    JSON document closes and anything after it is dropped. With
+    json_mode=False, generation stops at the first part that finished
+    normally.
 
     Returns:
       (full_text, parts)
 
-    Continuation rule is fixed to the user's requested wording.
+    Continuation prompts keep the user's requested wording
+    ("Provide next part after <last 5 words>") and add the JSON state.
     """
+    from model_limits import count_tokens
+
+    cap = int(max_output_tokens_per_part or 0) or gemini_model_max_output_tokens(model)
+    cap = min(cap, gemini_model_max_output_tokens(model))
+    budget = int(total_output_tokens or 0)
+    progress = JsonProgress()
     parts: List[str] = []
     full = ""
 
     prompt = base_prompt
     for i in range(1, max_parts + 1):
-        chunk = gemini_generate_once(
+        if budget > 0:
+            part_tokens = _part_budget(budget - count_tokens(full, model), cap=cap, min_part=min(min_part_tokens, cap))
+        else:
+            part_tokens = cap
+        chunk, finish_reason = _gemini_request(
             model=model,
             prompt=prompt,
-            max_output_tokens=max_output_tokens_per_part,
+            max_output_tokens=part_tokens,
             temperature=temperature,
+            # Continuations are fragments, not documents
+            json_mode=json_mode and i == 1,
         )
+        if i > 1:
+            chunk = _strip_overlap(full, chunk)
         if not chunk:
             break
 
         parts.append(chunk)
-        full = (full + ("\n" if full else "") + chunk)
+        full += chunk
+        truncated = finish_reason == "MAX_TOKENS"
+        logger.info(
+            "Gemini part %d: %d chars, %d max tokens, finish=%s",
+            i, len(chunk), part_tokens, finish_reason or "?",
+        )
 
-        # If the model ended cleanly and output looks complete, callers can still validate.
-        if full.strip().endswith("}"):
+        if json_mode:
+            if progress.feed(chunk):
+                return full[progress.start:progress.end], parts
+        elif not truncated:
             break
 
         anchor = _last_n_words(full, 5)
         ctx_tail = _tail(full, tail_chars_for_context)
+        state = (progress.describe() + "\n") if json_mode else ""
 
         # Conservative continuation prompt to minimize repetition.
         prompt = (
             "You are continuing the SAME output, without restarting or repeating.\n"
             "Do NOT add commentary. Output ONLY the next text segment.\n"
-            "Continue EXACTLY where you left off.\n\n"
+            "Continue EXACTLY where you left off.\n"
+            f"{state}\n"
             f"LAST_OUTPUT_TAIL:\n{ctx_tail}\n\n"
             f"Provide next part after '{anchor}'."
         )
 
+    if json_mode and progress.started:
+        logger.warning("Gemini output still unbalanced after %d part(s): %s", len(parts), progress.describe())
+        return full[progress.start:], parts
     return full, parts
+
+
+def gemini_generate_parallel(jobs: List[dict], *, workers: int = 4) -> List[str]:
+    """Run independent gemini_generate_chunked jobs (keyword dicts) concurrently.
+
+    Results are returned in job order; the first failure is raised after all
+    jobs have finished.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(jobs)))) as pool:
+        futures = [pool.submit(gemini_generate_chunked, **job) for job in jobs]
+        errors = [f.exception() for f in futures]
+    for e in errors:
+        if e is not None:
+            raise e
+    return [f.result()[0] for f in futures]
@@ -13,11 +13,12 @@ from pathlib import Path
 from typing import Iterable, List, Optional
 
 
-def _run(cmd: List[str], cwd: Optional[Path] = None) -> subprocess.CompletedProcess:
+def _run(cmd: List[str], cwd: Optional[Path] = None, stdin: Optional[str] = None) -> subprocess.CompletedProcess:
     return subprocess.run(
         cmd,
         cwd=str(cwd) if cwd else None,
         check=False,
+        input=stdin,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
@@ -50,6 +51,40 @@ def stage_paths(repo_root: Path, paths: Iterable[Path]) -> None:
     _run(["git", "add", "-A", "--"] + rels, cwd=repo_root)
 
 
+def _relpath(repo_root: Path, p: Path) -> str:
+    try:
+        return str(Path(p).relative_to(repo_root))
+    except Exception:
+        return str(p)
+
+
+def stage_files(repo_root: Path, files: Iterable[Path]) -> None:
+    # Stage an explicit file list in one git call; the list goes over stdin so
+    # large image pools do not hit argv limits.
+    rels = [_relpath(repo_root, p) for p in files]
+    if not rels:
+        return
+    _run(
+        ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+        cwd=repo_root,
+        stdin="\0".join(rels) + "\0",
+    )
+
+
+def lfs_available(repo_root: Path) -> bool:
+    p = _run(["git", "lfs", "version"], cwd=repo_root)
+    return p.returncode == 0
+
+
+def lfs_track(repo_root: Path, files: Iterable[Path]) -> bool:
+    # Route files through Git LFS (updates .gitattributes, which callers must stage).
+    rels = [_relpath(repo_root, p) for p in files]
+    if not rels:
+        return True
+    p = _run(["git", "lfs", "track", "--filename", "--"] + rels, cwd=repo_root)
+    return p.returncode == 0
+
+
 def commit(repo_root: Path, message: str) -> bool:
     if not git_available(repo_root):
         return False
@@ -167,6 +167,14 @@ PIPER_VOICE_FALLBACKS = {
 GOOGLE_TTS_SAMPLE_RATE = 44100  # 44.1 kHz
 GOOGLE_TTS_LANGUAGE_CODE = "en-US"
 
+# Batched premium synthesis (gcloud_tts_batch.py): REST endpoint, concurrent requests,
+# per-minute request quota, and SSML batching of short consecutive same-voice utterances
+GOOGLE_TTS_ENDPOINT = os.environ.get('GOOGLE_TTS_ENDPOINT', 'https://texttospeech.googleapis.com')
+GOOGLE_TTS_CONCURRENCY = int(os.environ.get('GOOGLE_TTS_CONCURRENCY', '8'))
+GOOGLE_TTS_REQUESTS_PER_MINUTE = int(os.environ.get('GOOGLE_TTS_REQUESTS_PER_MINUTE', '500'))
+GOOGLE_TTS_BATCH_MAX_CHARS = int(os.environ.get('GOOGLE_TTS_BATCH_MAX_CHARS', '3000'))  # SSML per request (API limit 5000 bytes)
+GOOGLE_TTS_BATCH_UTTERANCE_CHARS = int(os.environ.get('GOOGLE_TTS_BATCH_UTTERANCE_CHARS', '300'))  # longer ones go alone
+
 # Google Cloud TTS Gender-based Voice Mapping
 GOOGLE_VOICE_MAP = {
     'male': 'en-US-Journey-D',
@@ -186,6 +194,9 @@ IMAGE_TRANSITION_MAX_SEC = 5  # Maximum seconds to display each image
 GOOGLE_SEARCH_DAILY_LIMIT = 1000  # Maximum API results per day (up to 1000)
 GOOGLE_SEARCH_MAX_RESULTS_PER_QUERY = 100  # Maximum results per query (API limit)
 GOOGLE_SEARCH_RESULTS_PER_PAGE = 10  # Results per page (API hard limit)
+# Cached cse().list pages (keyed by query, page and search params) are reused for this long
+# without spending quota. 0 disables the cache.
+GOOGLE_SEARCH_CACHE_TTL_HOURS = float(os.environ.get('GOOGLE_SEARCH_CACHE_TTL_HOURS', '24'))
 
 # ============================================================================
 # Video Rendering Settings
@@ -338,6 +349,44 @@ MAX_ERROR_MESSAGE_LENGTH = 500  # Maximum length for sanitized error messages
 REQUIRE_GPT_KEY = True  # Whether to fail if GPT_KEY not available (required for production)
 REQUIRE_GOOGLE_API_KEY_FOR_PREMIUM = True  # Whether to fail if GOOGLE_API_KEY not available for premium topics
 # Note: MIN_SOURCES_REQUIRED removed - no source pre-validation in v2 architecture
+# Reuse per-check system validation results while their inputs (tool versions, env vars,
+# voice/binary files, topic configs) are unchanged. Cache lives in .cache/system_validation.json.
+SYSTEM_VALIDATION_CACHE_ENABLED = os.environ.get('SYSTEM_VALIDATION_CACHE', 'true').lower() in ('true', '1', 'yes')
+
+# Commit-each-module Settings (run_pipeline --commit-each-module)
+# Only each stage's declared outputs are staged. Files above COMMIT_MAX_FILE_MB are handled by
+# COMMIT_LARGE_FILE_POLICY: 'skip' (leave untracked), 'lfs' (git lfs track, falls back to skip
+# when git-lfs is missing) or 'include' (stage as-is).
+COMMIT_MAX_FILE_MB = float(os.environ.get('COMMIT_MAX_FILE_MB', '50'))
+COMMIT_LARGE_FILE_POLICY = os.environ.get('COMMIT_LARGE_FILE_POLICY', 'skip').strip().lower()
+# Stage commits are coalesced until the oldest pending stage is this old or this much data is pending
+COMMIT_BATCH_MAX_SECONDS = float(os.environ.get('COMMIT_BATCH_MAX_SECONDS', '120'))
+COMMIT_BATCH_MAX_MB = float(os.environ.get('COMMIT_BATCH_MAX_MB', '200'))
+# Run git add/commit on a background thread so the next stage does not wait on git
+COMMIT_ASYNC = os.environ.get('COMMIT_ASYNC', 'true').lower() in ('true', '1', 'yes')
+
+# Near-duplicate Image Filtering (image_dedup.py)
+# Downloads whose 64-bit dHash is within IMAGE_DEDUP_MAX_DISTANCE bits of an already accepted
+# image (same photo resized/cropped/recompressed by another host) are rejected and replaced
+# by the next unused search result.
+IMAGE_DEDUP_ENABLED = os.environ.get('IMAGE_DEDUP', 'true').lower() in ('true', '1', 'yes')
+IMAGE_DEDUP_MAX_DISTANCE = int(os.environ.get('IMAGE_DEDUP_MAX_DISTANCE', '6'))
+
+# Shared Image Store (image_store.py)
+# Downloaded images and their composites are stored once, keyed by URL hash and content hash,
+# and hardlinked into each topic's images/ and processed/ directories. Objects no topic
+# references any more are removed by garbage collection after IMAGE_STORE_GC_GRACE_HOURS.
+IMAGE_STORE_ENABLED = os.environ.get('IMAGE_STORE', 'true').lower() in ('true', '1', 'yes')
+IMAGE_STORE_DIR = os.environ.get('IMAGE_STORE_DIR', str(REPO_ROOT / '.cache' / 'image_store'))
+IMAGE_STORE_GC_GRACE_HOURS = float(os.environ.get('IMAGE_STORE_GC_GRACE_HOURS', '24'))
+
+# Resource Budget (resource_governor.py)
+# CPU threads and memory handed out to ffmpeg encodes, Piper workers and preprocessing pools.
+# 0 = auto-detect from CPU affinity / cgroup quota and cgroup memory limit / physical RAM.
+RESOURCE_CPU_LIMIT = int(os.environ.get('RESOURCE_CPU_LIMIT', '0'))
+RESOURCE_MEMORY_LIMIT_MB = int(os.environ.get('RESOURCE_MEMORY_LIMIT_MB', '0'))
+FFMPEG_ENCODE_MEM_MB = int(os.environ.get('FFMPEG_ENCODE_MEM_MB', '1024'))  # Reserved per concurrent encode
+PIPER_PROCESS_MEM_MB = int(os.environ.get('PIPER_PROCESS_MEM_MB', '512'))  # Reserved per Piper process
 
 # ============================================================================
 # Voice Download Settings
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Process-wide API clients with pooled keep-alive connections.
+
+Every stage and topic in one process shares these, so repeated calls (Gemini
+continuation parts, Pass A/B, TTS chunks, search pages) reuse open TLS
+connections instead of handshaking each time:
+
+  get_http_client(name)          httpx.Client per logical service ("gemini", "openai")
+  get_openai_client(...)         OpenAI SDK client on the "openai" pool
+  get_genai_client(api_key)      google-genai client
+  get_search_service(api_key)    Custom Search service (bundled discovery document,
+                                 built once)
+  get_gcloud_tts_client()        Cloud Text-to-Speech client (one gRPC channel)
+
+Pool settings (env):
+  HTTP_MAX_CONNECTIONS      open connections per pool (default 20)
+  HTTP_MAX_KEEPALIVE        idle keep-alive connections kept (default 10)
+  HTTP_KEEPALIVE_EXPIRY_S   idle connection lifetime in seconds (default 120)
+  HTTP_CONNECT_TIMEOUT_S    connect timeout (default 30)
+
+Request timeouts stay with the callers (GEMINI_HTTP_TIMEOUT_S, OPENAI_TIMEOUT)
+and are passed per request. Clients are closed at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+_CLIENTS: Dict[tuple, Any] = {}
+_LOCK = threading.RLock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    return int(raw) if raw.isdigit() and int(raw) > 0 else default
+
+
+def pool_settings() -> Dict[str, float]:
+    return {
+        "max_connections": _env_int("HTTP_MAX_CONNECTIONS", 20),
+        "max_keepalive_connections": _env_int("HTTP_MAX_KEEPALIVE", 10),
+        "keepalive_expiry": _env_float("HTTP_KEEPALIVE_EXPIRY_S", 120.0),
+        "connect_timeout": _env_float("HTTP_CONNECT_TIMEOUT_S", 30.0),
+    }
+
+
+def _registered(key: tuple, factory: Callable[[], Any]) -> Any:
+    """The client stored under key, created by factory on first use."""
+    with _LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _CLIENTS[key] = factory()
+        return client
+
+
+def request_timeout(total_s: float, connect_s: Optional[float] = None):
+    """httpx.Timeout for one request: total_s for read/write/pool, connect capped at total_s."""
+    import httpx
+
+    connect = pool_settings()["connect_timeout"] if connect_s is None else float(connect_s)
+    return httpx.Timeout(total_s, connect=min(connect, total_s), read=total_s, write=total_s, pool=total_s)
+
+
+def get_http_client(name: str):
+    """Pooled httpx.Client for one logical service, shared by all threads."""
+    def make():
+        import httpx
+
+        s = pool_settings()
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=int(s["max_connections"]),
+                max_keepalive_connections=int(s["max_keepalive_connections"]),
+                keepalive_expiry=s["keepalive_expiry"],
+            ),
+            timeout=request_timeout(600.0),
+        )
+
+    return _registered(("http", name), make)
+
+
+def get_openai_client(api_key: Optional[str], timeout_s: float, max_retries: int):
+    """OpenAI client per (api_key, timeout, retries), all on the shared "openai" pool."""
+    def make():
+        from openai import OpenAI
+
+        return OpenAI(
+            api_key=api_key,
+            timeout=timeout_s,
+            max_retries=max_retries,
+            http_client=get_http_client("openai"),
+        )
+
+    return _registered(("openai", api_key, float(timeout_s), int(max_retries)), make)
+
+
+def get_genai_client(api_key: str):
+    """google-genai client for api_key."""
+    def make():
+        try:
+            from google import genai  # type: ignore
+        except Exception as e:
+            raise ImportError(
+                "google-genai is required for Gemini support. Install with: pip install google-genai"
+            ) from e
+        return genai.Client(api_key=api_key)
+
+    return _registered(("genai", api_key), make)
+
+
+def get_search_service(api_key: str):
+    """Custom Search API service for api_key (discovery document read once, not fetched)."""
+    def make():
+        from googleapiclient.discovery import build
+
+        return build("customsearch", "v1", developerKey=api_key, static_discovery=True, cache_discovery=False)
+
+    return _registered(("customsearch", api_key), make)
+
+
+def get_gcloud_tts_client():
+    """Cloud Text-to-Speech client (credentials from the environment)."""
+    def make():
+        from google.cloud import texttospeech
+
+        return texttospeech.TextToSpeechClient()
+
+    return _registered(("gcloud_tts",), make)
+
+
+def close_all() -> None:
+    """Close every registered client that holds connections."""
+    with _LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+
+atexit.register(close_all)
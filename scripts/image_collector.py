@@ -22,8 +22,8 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Try to import Google API client
+# (services are built by http_clients.get_search_service; HttpError doubles as the probe)
 try:
-    from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
     GOOGLE_API_AVAILABLE = True
 except ImportError:
@@ -43,39 +43,45 @@ from global_config import (
     ALLOWED_IMAGE_EXTENSIONS,
     GOOGLE_SEARCH_DAILY_LIMIT,
     GOOGLE_SEARCH_MAX_RESULTS_PER_QUERY,
-    GOOGLE_SEARCH_RESULTS_PER_PAGE
+    GOOGLE_SEARCH_RESULTS_PER_PAGE,
+    IMAGE_STORE_ENABLED,
+    IMAGE_DEDUP_ENABLED,
+    IMAGE_DEDUP_MAX_DISTANCE,
 )
+import http_clients
+from api_cassette import recorded_call
+from image_index import describe_bytes
+from quota_ledger import QuotaLedger
 
-# Daily usage tracking file
+# Daily usage tracking file (quota ledger; see quota_ledger.py)
 USAGE_TRACKING_FILE = Path.home() / '.podcast-maker' / 'google_search_usage.json'
 
 
+def get_search_service(api_key: str):
+    """Return the shared Custom Search API service for api_key (http_clients registry)."""
+    return http_clients.get_search_service(api_key)
+
+
+def _fetch_bytes(req: urllib.request.Request) -> bytes:
+    with urllib.request.urlopen(req, timeout=IMAGE_SEARCH_TIMEOUT) as response:
+        return response.read()
+
+
+def _quota_ledger() -> QuotaLedger:
+    return QuotaLedger(USAGE_TRACKING_FILE, GOOGLE_SEARCH_DAILY_LIMIT)
+
+
 def get_daily_usage() -> Dict[str, Union[str, int]]:
     """
     Get the current daily usage count from the tracking file.
     
     Returns:
-        Dictionary with 'date' (YYYY-MM-DD string) and 'count' (int)
+        Dictionary with 'date' (YYYY-MM-DD string), 'count' (int),
+        'reserved' (int, quota currently held by running collectors) and
+        'cache_hits' / 'cache_misses' (int, result pages served from / missing
+        in the search cache)
     """
-    today = date.today().isoformat()
-    
-    # Create directory if it doesn't exist
-    USAGE_TRACKING_FILE.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Read existing usage data
-    if USAGE_TRACKING_FILE.exists():
-        try:
-            with open(USAGE_TRACKING_FILE, 'r') as f:
-                data = json.load(f)
-                # Reset count if it's a new day
-                if data.get('date') != today:
-                    return {'date': today, 'count': 0}
-                return data
-        except Exception as e:
-            logger.warning(f"Error reading usage tracking file: {e}")
-            return {'date': today, 'count': 0}
-    
-    return {'date': today, 'count': 0}
+    return _quota_ledger().usage()
 
 
 def update_daily_usage(results_used: int) -> None:
@@ -85,14 +91,8 @@ def update_daily_usage(results_used: int) -> None:
     Args:
         results_used: Number of results used in the last API call
     """
-    usage = get_daily_usage()
-    usage['count'] += results_used
-    
-    # Write updated usage data
     try:
-        USAGE_TRACKING_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(USAGE_TRACKING_FILE, 'w') as f:
-            json.dump(usage, f)
+        _quota_ledger().add(results_used)
     except Exception as e:
         logger.warning(f"Error updating usage tracking file: {e}")
 
@@ -101,6 +101,8 @@ def check_daily_limit(requested_results: int) -> tuple[bool, int]:
     """
     Check if the requested number of results would exceed the daily limit.
     
+    Quota reserved by other running collectors counts as used.
+    
     Args:
         requested_results: Number of results requested
         
@@ -109,9 +111,7 @@ def check_daily_limit(requested_results: int) -> tuple[bool, int]:
         - can_proceed: True if we can make the request
         - available_results: Number of results available within the daily limit
     """
-    usage = get_daily_usage()
-    used = usage['count']
-    available = max(0, GOOGLE_SEARCH_DAILY_LIMIT - used)
+    available = _quota_ledger().available()
     
     if available == 0:
         return False, 0
@@ -320,7 +320,7 @@ def collect_images_for_topic(
     
     # Build Google Custom Search API service
     try:
-        service = build('customsearch', 'v1', developerKey=api_key)
+        service = get_search_service(api_key)
         logger.info("✓ Successfully connected to Google Custom Search API")
     except Exception as e:
         logger.error(f"Failed to build Google Custom Search API service: {e}")
@@ -331,12 +331,27 @@ def collect_images_for_topic(
         logger.error(f"Verify your setup at: https://console.cloud.google.com/apis/library/customsearch.googleapis.com")
         raise
     
+    # Cached result pages cost no quota (reruns, topics sharing queries)
+    try:
+        from search_cache import get_search_cache
+        search_cache = get_search_cache(USAGE_TRACKING_FILE.parent)
+    except Exception as e:
+        logger.warning(f"Search result cache unavailable: {e}")
+        search_cache = None
+
     # Check daily limit before starting
     usage = get_daily_usage()
-    logger.info(f"Daily usage: {usage['count']}/{GOOGLE_SEARCH_DAILY_LIMIT} results used today")
-    
-    can_proceed, available_results = check_daily_limit(num_images)
-    if not can_proceed:
+    logger.info(
+        f"Daily usage: {usage['count']}/{GOOGLE_SEARCH_DAILY_LIMIT} results used today"
+        f" ({usage.get('reserved', 0)} reserved by running collectors)"
+    )
+    if search_cache is not None:
+        logger.info(f"Search cache today: {usage.get('cache_hits', 0)} hits, {usage.get('cache_misses', 0)} misses")
+    
+    # Reserve our share of the remaining quota up front; pages are charged
+    # against the reservation and the unused part is released afterwards.
+    quota = _quota_ledger().reserve(num_images, owner=topic_title)
+    if quota.granted == 0 and search_cache is None:
         logger.error("="*80)
         logger.error("DAILY LIMIT REACHED")
         logger.error("="*80)
@@ -346,35 +361,30 @@ def collect_images_for_topic(
         logger.error("="*80)
         return []
     
-    if available_results < num_images:
-        logger.warning(f"Only {available_results} results available within daily limit (requested: {num_images})")
-        num_images = available_results
+    if quota.granted < num_images:
+        logger.warning(f"Only {quota.granted} results reserved within daily limit (requested: {num_images})")
+        if search_cache is None:
+            num_images = quota.granted
     
     # Collect image metadata from search results with pagination
     # We keep Google-visible titles for later burned overlays.
     image_items: List[Dict[str, Any]] = []
     images_per_query = max(1, num_images // len(topic_queries)) if topic_queries else num_images
     total_api_results = 0  # Track total API results for daily limit
+    cache_hits = cache_misses = 0  # Result pages from / missing in the search cache
     
-    for query in topic_queries[:5]:  # Limit to first 5 queries
-        logger.info(f"Searching for images: '{query}'")
+    try:
+        for query in topic_queries[:5]:  # Limit to first 5 queries
+            logger.info(f"Searching for images: '{query}'")
         
-        # Calculate how many results we need for this query
-        query_target = min(images_per_query, GOOGLE_SEARCH_MAX_RESULTS_PER_QUERY)
-        query_results: List[Dict[str, Any]] = []
-        start_index = 1  # Start at 1 (Google API convention)
+            # Calculate how many results we need for this query
+            query_target = min(images_per_query, GOOGLE_SEARCH_MAX_RESULTS_PER_QUERY)
+            query_results: List[Dict[str, Any]] = []
+            start_index = 1  # Start at 1 (Google API convention)
         
-        # Paginate through results until we have enough or reach the limit
-        while len(query_results) < query_target and start_index <= 91:  # Max start is 91 (to get results 91-100)
-            # Check if we still have quota available
-            can_proceed, remaining = check_daily_limit(GOOGLE_SEARCH_RESULTS_PER_PAGE)
-            if not can_proceed:
-                logger.warning(f"  Daily limit reached during pagination for query '{query}'")
-                break
-            
-            try:
-                # Search for images using Google Custom Search API with pagination
-                result = service.cse().list(
+            # Paginate through results until we have enough or reach the limit
+            while len(query_results) < query_target and start_index <= 91:  # Max start is 91 (to get results 91-100)
+                search_params = dict(
                     q=query,
                     cx=search_engine_id,
                     searchType='image',
@@ -383,77 +393,114 @@ def collect_images_for_topic(
                     start=start_index,  # Pagination parameter
                     safe='active',  # Safe search
                     imgSize='XXLARGE'  # Prefer large images (uppercase required by API)
-                ).execute()
+                )
+                cached = None
+                if search_cache is not None:
+                    try:
+                        cached = search_cache.get(search_params)
+                    except Exception as e:
+                        logger.debug(f"  Search cache read failed: {e}")
+                    if cached is not None:
+                        cache_hits += 1
+                    else:
+                        cache_misses += 1
+
+                # Check if we still have reserved quota (cached pages are free)
+                if cached is None and quota.remaining <= 0:
+                    logger.warning(f"  Reserved quota exhausted during pagination for query '{query}'")
+                    break
+            
+                try:
+                    if cached is not None:
+                        result = cached
+                        logger.info(f"  Using cached results (start={start_index})")
+                    else:
+                        # Search for images using Google Custom Search API with pagination
+                        result = recorded_call("cse", search_params, lambda: service.cse().list(**search_params).execute())
+                        if search_cache is not None:
+                            try:
+                                search_cache.put(search_params, result)
+                            except Exception as e:
+                                logger.debug(f"  Search cache write failed: {e}")
                 
-                # Extract image URLs from this page
-                page_items = result.get('items', [])
-                if page_items:
-                    for item in page_items:
-                        link = item.get('link')
-                        if not link:
-                            continue
-                        query_results.append(
-                            {
-                                "url": link,
-                                "title": item.get("title", ""),
-                                "displayLink": item.get("displayLink", ""),
-                                "snippet": item.get("snippet", ""),
-                                "contextLink": (item.get("image") or {}).get("contextLink", ""),
-                                "query": query,
-                            }
-                        )
-                        logger.info(f"  Found image {len(query_results)}: {str(item.get('title', 'No title'))[:50]}")
+                    # Extract image URLs from this page
+                    page_items = result.get('items', [])
+                    if page_items:
+                        for item in page_items:
+                            link = item.get('link')
+                            if not link:
+                                continue
+                            query_results.append(
+                                {
+                                    "url": link,
+                                    "title": item.get("title", ""),
+                                    "displayLink": item.get("displayLink", ""),
+                                    "snippet": item.get("snippet", ""),
+                                    "contextLink": (item.get("image") or {}).get("contextLink", ""),
+                                    "query": query,
+                                }
+                            )
+                            logger.info(f"  Found image {len(query_results)}: {str(item.get('title', 'No title'))[:50]}")
                     
-                    # Update daily usage counter
-                    total_api_results += len(page_items)
-                    update_daily_usage(len(page_items))
+                        # Update daily usage counter
+                        if cached is None:
+                            total_api_results += len(page_items)
+                            quota.consume(len(page_items))
                     
-                    logger.info(f"  Page results: {len(page_items)} images (start={start_index})")
-                else:
-                    logger.info(f"  No more results available for this query")
-                    break
+                        logger.info(f"  Page results: {len(page_items)} images (start={start_index})")
+                    else:
+                        logger.info(f"  No more results available for this query")
+                        break
                 
-                # Check if we have enough results for this query
-                if len(query_results) >= query_target:
-                    logger.info(f"  Collected {len(query_results)} images for query (target: {query_target})")
-                    break
+                    # Check if we have enough results for this query
+                    if len(query_results) >= query_target:
+                        logger.info(f"  Collected {len(query_results)} images for query (target: {query_target})")
+                        break
                 
-                # Get next page start index from API response
-                next_page = result.get('queries', {}).get('nextPage', [])
-                if next_page and 'startIndex' in next_page[0]:
-                    start_index = next_page[0]['startIndex']
-                    logger.info(f"  Moving to next page (start={start_index})")
-                else:
-                    logger.info(f"  No more pages available")
-                    break
+                    # Get next page start index from API response
+                    next_page = result.get('queries', {}).get('nextPage', [])
+                    if next_page and 'startIndex' in next_page[0]:
+                        start_index = next_page[0]['startIndex']
+                        logger.info(f"  Moving to next page (start={start_index})")
+                    else:
+                        logger.info(f"  No more pages available")
+                        break
                 
-            except HttpError as e:
-                logger.error(f"Google API error for query '{query}': {e}")
-                if e.resp.status == 403:
-                    logger.error("  ✗ API key or quota issue - check your Google Cloud Console")
-                    logger.error("    Verify API is enabled: https://console.cloud.google.com/apis/library/customsearch.googleapis.com")
-                    logger.error("    Check quota: https://console.cloud.google.com/apis/api/customsearch.googleapis.com/quotas")
-                elif e.resp.status == 400:
-                    logger.error("  ✗ Invalid request - check search engine ID and query parameters")
-                elif e.resp.status == 429:
-                    logger.error("  ✗ Rate limit exceeded - too many requests")
-                break
-            except Exception as e:
-                logger.error(f"Error searching for images with query '{query}': {e}")
-                import traceback
-                logger.debug(traceback.format_exc())
-                break
+                except HttpError as e:
+                    logger.error(f"Google API error for query '{query}': {e}")
+                    if e.resp.status == 403:
+                        logger.error("  ✗ API key or quota issue - check your Google Cloud Console")
+                        logger.error("    Verify API is enabled: https://console.cloud.google.com/apis/library/customsearch.googleapis.com")
+                        logger.error("    Check quota: https://console.cloud.google.com/apis/api/customsearch.googleapis.com/quotas")
+                    elif e.resp.status == 400:
+                        logger.error("  ✗ Invalid request - check search engine ID and query parameters")
+                    elif e.resp.status == 429:
+                        logger.error("  ✗ Rate limit exceeded - too many requests")
+                    break
+                except Exception as e:
+                    logger.error(f"Error searching for images with query '{query}': {e}")
+                    import traceback
+                    logger.debug(traceback.format_exc())
+                    break
         
-        # Add this query's results to the overall collection
-        image_items.extend(query_results)
-        logger.info(f"  Total images collected for query '{query}': {len(query_results)}")
+            # Add this query's results to the overall collection
+            image_items.extend(query_results)
+            logger.info(f"  Total images collected for query '{query}': {len(query_results)}")
         
-        # Stop if we have enough images overall
-        if len(image_items) >= num_images:
-            logger.info(f"Collected sufficient images: {len(image_items)}/{num_images}")
-            break
-    
+            # Stop if we have enough images overall
+            if len(image_items) >= num_images:
+                logger.info(f"Collected sufficient images: {len(image_items)}/{num_images}")
+                break
+    finally:
+        # Return unused quota even if pagination raised
+        quota.release()
     logger.info(f"Total API results used: {total_api_results}")
+    if search_cache is not None:
+        try:
+            _quota_ledger().record_cache(cache_hits, cache_misses)
+        except Exception as e:
+            logger.warning(f"Error recording search cache usage: {e}")
+        logger.info(f"Search cache this run: {cache_hits} hits, {cache_misses} misses")
     
     # Remove duplicates while preserving order
     seen = set()
@@ -494,7 +541,59 @@ def collect_images_for_topic(
     meta = _load_images_metadata(output_dir)
     known_filenames = {str(it.get("filename")) for it in meta.get("images", []) if isinstance(it, dict)}
 
-    for i, it in enumerate(unique_items[:num_images]):
+    # Shared store: images another topic (or an earlier day) already fetched are
+    # hardlinked instead of downloaded again.
+    store = None
+    if IMAGE_STORE_ENABLED:
+        try:
+            from image_store import get_image_store
+            store = get_image_store()
+        except Exception as e:
+            logger.warning(f"Image store unavailable, downloading directly: {e}")
+    store_hits = 0
+
+    # Near-duplicate filter: same photo at another size/crop from another host.
+    # Rejected candidates are replaced by the next unused search results.
+    dedup = None
+    near_dup_count = 0
+    if IMAGE_DEDUP_ENABLED:
+        from image_dedup import NearDuplicateIndex, dhash, format_hash, seed_index
+        dedup = NearDuplicateIndex(IMAGE_DEDUP_MAX_DISTANCE)
+        known_hashes = {
+            str(m.get("filename")): str(m.get("dhash"))
+            for m in meta.get("images", []) if isinstance(m, dict) and m.get("dhash")
+        }
+        seeded = seed_index(dedup, sorted(existing_images), known_hashes)
+        # Persist hashes computed from files so the next run does not decode them again
+        for m in meta.get("images", []):
+            if isinstance(m, dict) and not m.get("dhash") and seeded.get(str(m.get("filename"))):
+                m["dhash"] = seeded[str(m.get("filename"))]
+
+    def _near_duplicate(h: Optional[int], url: str) -> bool:
+        nonlocal near_dup_count
+        match = dedup.find(h) if dedup is not None else None
+        if match is None:
+            return False
+        near_dup_count += 1
+        logger.info(f"    ✗ Near-duplicate of {match[1]} (distance {match[0]}), skipping: {url[:60]}")
+        return True
+
+    def _accept_hash(h: Optional[int], image_path: Path, entry: Dict[str, Any]) -> None:
+        if dedup is not None and h is not None:
+            dedup.add(h, image_path.name)
+            entry["dhash"] = format_hash(h)
+
+    def _index_fields(entry: Dict[str, Any], image_path: Path, data: bytes) -> None:
+        # Dimensions/format/hash for image_index, so later stages need not re-probe the file
+        entry.update(describe_bytes(data))
+        entry["mtime_ns"] = image_path.stat().st_mtime_ns
+
+    for it in unique_items:
+        # Slots are filled in order; skipped or failed candidates are replaced
+        # by later results instead of leaving gaps.
+        i = len(downloaded_images)
+        if i >= num_images:
+            break
         url = str(it.get("url", ""))
         raw_title = str(it.get("title", ""))
         display_link = str(it.get("displayLink", ""))
@@ -549,6 +648,45 @@ def collect_images_for_topic(
             logger.warning(f"    ✗ Skipping invalid URL: {url[:60]}")
             continue
         
+        stored = None
+        if store is not None:
+            try:
+                stored = store.lookup_url(url)
+            except Exception as e:
+                logger.debug(f"    Image store lookup failed for {url[:60]}: {e}")
+        if stored is not None:
+            try:
+                stored_data = stored.read_bytes()
+            except OSError:
+                stored, stored_data = None, b""
+            h = dhash(stored_data) if dedup is not None and stored is not None else None
+            if _near_duplicate(h, url):
+                continue
+            try:
+                store.link(stored, image_path)
+            except Exception as e:
+                logger.debug(f"    Image store link failed for {url[:60]}: {e}")
+                stored = None
+        if stored is not None:
+            store_hits += 1
+            downloaded_images.append(image_path)
+            logger.info(f"  Image {start_index + i + 1}/{original_num_images} from shared store: {image_path.name}")
+            if image_path.name not in known_filenames:
+                entry = {
+                    "filename": image_path.name,
+                    "url": url,
+                    "title": raw_title,
+                    "title_clean": cleaned_title,
+                    "displayLink": display_link,
+                    "contextLink": str(it.get("contextLink", "")),
+                    "query": str(it.get("query", "")),
+                }
+                _accept_hash(h, image_path, entry)
+                _index_fields(entry, image_path, stored_data)
+                meta["images"].append(entry)
+                known_filenames.add(image_path.name)
+            continue
+
         # Download image with retry logic
         max_retries = 2
         for retry in range(max_retries + 1):
@@ -567,18 +705,36 @@ def collect_images_for_topic(
                     }
                 )
                 
-                with urllib.request.urlopen(req, timeout=IMAGE_SEARCH_TIMEOUT) as response:
-                    image_data = response.read()
-                    
+                image_data = recorded_call("image_download", {"url": url}, lambda: _fetch_bytes(req))
+
                 # Validate image data
                 if len(image_data) < 1024:  # Less than 1KB is suspicious
                     logger.warning(f"    ✗ Image too small ({len(image_data)} bytes), skipping")
                     break
+
+                h = dhash(image_data) if dedup is not None else None
+                if _near_duplicate(h, url):
+                    break
                 
-                # Save image
-                with open(image_path, 'wb') as f:
-                    f.write(image_data)
-                    os.fsync(f.fileno())  # Ensure OS writes data to disk (includes flush)
+                # Save image (into the shared store when enabled, linked into the topic)
+                saved = False
+                if store is not None:
+                    try:
+                        store.link(store.put_bytes(image_data, ext, url=url), image_path)
+                        saved = True
+                    except Exception as e:
+                        logger.debug(f"    Image store write failed, saving directly: {e}")
+                if not saved:
+                    # image_path may still be a hardlink into the store from an
+                    # earlier run; replace it rather than truncating the shared object
+                    tmp_path = image_path.with_name(f".{image_path.name}.{os.getpid()}.tmp")
+                    try:
+                        with open(tmp_path, 'wb') as f:
+                            f.write(image_data)
+                            os.fsync(f.fileno())  # Ensure OS writes data to disk (includes flush)
+                        os.replace(tmp_path, image_path)
+                    finally:
+                        tmp_path.unlink(missing_ok=True)
                 
                 downloaded_images.append(image_path)
                 logger.info(f"    ✓ Saved: {image_path.name} ({len(image_data) / 1024:.1f} KB)")
@@ -586,17 +742,18 @@ def collect_images_for_topic(
                 # Persist Google-visible title metadata for later video overlays.
                 try:
                     if image_path.name not in known_filenames:
-                        meta["images"].append(
-                            {
-                                "filename": image_path.name,
-                                "url": url,
-                                "title": raw_title,
-                                "title_clean": cleaned_title,
-                                "displayLink": display_link,
-                                "contextLink": str(it.get("contextLink", "")),
-                                "query": str(it.get("query", "")),
-                            }
-                        )
+                        entry = {
+                            "filename": image_path.name,
+                            "url": url,
+                            "title": raw_title,
+                            "title_clean": cleaned_title,
+                            "displayLink": display_link,
+                            "contextLink": str(it.get("contextLink", "")),
+                            "query": str(it.get("query", "")),
+                        }
+                        _accept_hash(h, image_path, entry)
+                        _index_fields(entry, image_path, image_data)
+                        meta["images"].append(entry)
                         known_filenames.add(image_path.name)
                 except Exception:
                     pass
@@ -625,6 +782,10 @@ def collect_images_for_topic(
     
     logger.info("="*80)
     logger.info(f"IMAGE COLLECTION COMPLETE: {len(downloaded_images)}/{num_images} images")
+    if store_hits:
+        logger.info(f"  Reused from shared image store: {store_hits}")
+    if near_dup_count:
+        logger.info(f"  Near-duplicates rejected: {near_dup_count}")
     
     # Verify all downloaded images exist and are readable
     logger.info("Verifying downloaded images...")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Near-duplicate image detection with difference hashes (dHash).
+
+Google image search often returns one photo at several sizes or crops from
+different hosts. A 64-bit dHash (grayscale 9x8 thumbnail, one bit per
+horizontally adjacent pixel pair) is stable under rescaling, recompression and
+light crops; two images within IMAGE_DEDUP_MAX_DISTANCE bits (Hamming distance)
+are treated as the same picture.
+
+Hashes are looked up in a BK-tree, so checking a candidate against a few hundred
+accepted images touches only a handful of nodes.
+
+Pillow is imported lazily; without it dhash() returns None and nothing is
+filtered.
+"""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_HASH_W, _HASH_H = 9, 8
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def dhash(data: bytes) -> Optional[int]:
+    """64-bit difference hash of encoded image bytes; None if undecodable."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            # JPEG: let the decoder downscale (DCT scaling) instead of decoding full size
+            im.draft("L", (_HASH_W * 8, _HASH_H * 8))
+            small = im.convert("L").resize((_HASH_W, _HASH_H), Image.BILINEAR)
+            px = list(small.tobytes())
+    except Exception:
+        return None
+    bits = 0
+    for y in range(_HASH_H):
+        row = px[y * _HASH_W:(y + 1) * _HASH_W]
+        for x in range(_HASH_W - 1):
+            bits = (bits << 1) | (1 if row[x] > row[x + 1] else 0)
+    return bits
+
+
+def dhash_file(path: Path) -> Optional[int]:
+    try:
+        return dhash(Path(path).read_bytes())
+    except OSError:
+        return None
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance."""
+
+    def __init__(self) -> None:
+        # node: (hash, label, {distance: child})
+        self._root: Optional[Tuple[int, str, Dict[int, tuple]]] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, h: int, label: str) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = (h, label, {})
+            return
+        node = self._root
+        while True:
+            d = hamming(h, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (h, label, {})
+                return
+            node = child
+
+    def search(self, h: int, radius: int) -> Iterator[Tuple[int, str]]:
+        """Yield (distance, label) for every stored hash within radius of h."""
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node_h, label, children = stack.pop()
+            d = hamming(h, node_h)
+            if d <= radius:
+                yield d, label
+            for cd, child in children.items():
+                if d - radius <= cd <= d + radius:
+                    stack.append(child)
+
+    def nearest_within(self, h: int, radius: int) -> Optional[Tuple[int, str]]:
+        best = None
+        for d, label in self.search(h, radius):
+            if best is None or d < best[0]:
+                best = (d, label)
+        return best
+
+
+class NearDuplicateIndex:
+    """Accepted images of a collection run; rejects candidates too close to one of them."""
+
+    def __init__(self, max_distance: int):
+        self.max_distance = max(0, int(max_distance))
+        self._tree = BKTree()
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    def find(self, h: Optional[int]) -> Optional[Tuple[int, str]]:
+        """(distance, label) of the closest accepted near-duplicate, if any."""
+        if h is None:
+            return None
+        return self._tree.nearest_within(h, self.max_distance)
+
+    def add(self, h: Optional[int], label: str) -> None:
+        if h is not None:
+            self._tree.add(h, label)
+
+
+def format_hash(h: Optional[int]) -> str:
+    return f"{h:016x}" if h is not None else ""
+
+
+def parse_hash(s: object) -> Optional[int]:
+    try:
+        return int(str(s), 16) if s else None
+    except ValueError:
+        return None
+
+
+def seed_index(index: NearDuplicateIndex, images: List[Path], known: Dict[str, str]) -> Dict[str, str]:
+    """Add existing images to index, reusing hex hashes from known (filename -> hex).
+
+    Returns filename -> hex hash for every image that could be hashed.
+    """
+    out: Dict[str, str] = {}
+    for p in images:
+        h = parse_hash(known.get(p.name)) if known.get(p.name) else dhash_file(p)
+        if h is None:
+            continue
+        index.add(h, p.name)
+        out[p.name] = format_hash(h)
+    return out
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Per-directory image index stored in images_metadata.json.
+
+image_collector already writes one entry per downloaded image (filename, url,
+titles). The index adds what later stages need so they do not have to re-probe
+files:
+
+    width, height, format     parsed from the image header (no ffprobe, no PIL)
+    size, mtime_ns            to detect files changed after indexing
+    content_hash              content_hash.hash_bytes of the file
+    dhash                     perceptual hash (image_dedup), when available
+
+Values are captured at download time. Entries of files changed since
+(size/mtime mismatch) are refreshed on first lookup, which only reads the file
+header. Files added by hand are described the same way but kept in memory only;
+images_metadata.json lists what image_collector downloaded.
+
+seed_hash_index hands the recorded hashes to content_hash's index, so prepared
+image manifests validate without re-reading the sources.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from content_hash import hash_bytes
+
+IMAGES_METADATA_FILENAME = "images_metadata.json"
+
+_HEADER_BYTES = 64 * 1024
+
+
+def sniff_image(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """(format, width, height) from the first bytes of a JPEG/PNG/WebP/GIF file."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        w, h = struct.unpack(">II", data[16:24])
+        return "png", w, h
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        w, h = struct.unpack("<HH", data[6:10])
+        return "gif", w, h
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            w, h = struct.unpack("<HH", data[26:30])
+            return "webp", w & 0x3FFF, h & 0x3FFF
+        if chunk == b"VP8L":
+            b = data[21:25]
+            w = 1 + (((b[1] & 0x3F) << 8) | b[0])
+            h = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+            return "webp", w, h
+        if chunk == b"VP8X":
+            w = 1 + int.from_bytes(data[24:27], "little")
+            h = 1 + int.from_bytes(data[27:30], "little")
+            return "webp", w, h
+        return None
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        n = len(data)
+        while i + 9 < n:
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                i += 2 if marker != 0xFF else 1
+                continue
+            seg_len = struct.unpack(">H", data[i + 2:i + 4])[0]
+            # SOF0..SOF15 except DHT (C4), JPG (C8), DAC (CC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                h, w = struct.unpack(">HH", data[i + 5:i + 9])
+                return "jpeg", w, h
+            i += 2 + seg_len
+    return None
+
+
+def describe_bytes(data: bytes) -> Dict[str, Any]:
+    """Index fields for an image held in memory (at download time)."""
+    info: Dict[str, Any] = {"size": len(data), "content_hash": hash_bytes(data)}
+    sniffed = sniff_image(data[:_HEADER_BYTES])
+    if sniffed:
+        info["format"], info["width"], info["height"] = sniffed
+    return info
+
+
+def _describe_header(path: Path) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        head = f.read(_HEADER_BYTES)
+    sniffed = sniff_image(head)
+    if not sniffed:
+        return {}
+    fmt, w, h = sniffed
+    return {"format": fmt, "width": w, "height": h}
+
+
+class ImageIndex:
+    """images_metadata.json of one images directory, keyed by filename."""
+
+    def __init__(self, images_dir: Path):
+        self.images_dir = Path(images_dir)
+        self.path = self.images_dir / IMAGES_METADATA_FILENAME
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if not isinstance(data, dict) or not isinstance(data.get("images"), list):
+            data = {"version": 1, "images": []}
+        self.data = data
+        self._by_name: Dict[str, Dict[str, Any]] = {
+            str(e.get("filename")): e for e in data["images"] if isinstance(e, dict) and e.get("filename")
+        }
+
+    def entry(self, path: Path) -> Dict[str, Any]:
+        """Up-to-date entry for path (refreshed from the header if the file changed)."""
+        path = Path(path)
+        st = path.stat()
+        e = self._by_name.get(path.name)
+        if e is None:
+            # Not downloaded by image_collector: describe it, but do not add a
+            # blank-title entry to images_metadata.json
+            e = self._by_name[path.name] = {"filename": path.name}
+        known_mtime = e.get("mtime_ns")
+        changed = e.get("size") != st.st_size or (known_mtime is not None and known_mtime != st.st_mtime_ns)
+        if changed or not e.get("width"):
+            if changed:
+                # content may differ: hashes are recomputed by whoever needs them
+                e.pop("content_hash", None)
+                e.pop("dhash", None)
+            e.update(_describe_header(path))
+            e["size"] = st.st_size
+            e["mtime_ns"] = st.st_mtime_ns
+            self._dirty = True
+        elif known_mtime is None:
+            e["mtime_ns"] = st.st_mtime_ns
+            self._dirty = True
+        return e
+
+    def dimensions(self, path: Path) -> Tuple[Optional[int], Optional[int]]:
+        try:
+            e = self.entry(path)
+        except OSError:
+            return (None, None)
+        if e.get("width") and e.get("height"):
+            return (int(e["width"]), int(e["height"]))
+        return (None, None)
+
+    def content_hash(self, path: Path) -> Optional[str]:
+        """Hash recorded at download time, if the file is unchanged since."""
+        try:
+            e = self.entry(path)
+        except OSError:
+            return None
+        return e.get("content_hash") or None
+
+    def save(self) -> None:
+        # Only directories image_collector manages carry an index; never create one elsewhere
+        if not self._dirty or not self.path.exists():
+            return
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(self.data, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"  ⚠ Failed to update image index (non-fatal): {e}")
+
+
+def seed_hash_index(hash_index: Any, paths: Iterable[Path]) -> None:
+    """Give content_hash's index the download-time hashes of unchanged files.
+
+    Manifest validation then matches those files without reading them.
+    """
+    indexes: Dict[Path, ImageIndex] = {}
+    for p in paths:
+        p = Path(p)
+        index = indexes.get(p.parent)
+        if index is None:
+            index = indexes[p.parent] = ImageIndex(p.parent)
+        try:
+            known = index.content_hash(p)
+            if known:
+                e = index.entry(p)
+                hash_index.seed(p, known, int(e["size"]), int(e["mtime_ns"]))
+        except (OSError, ValueError, KeyError):
+            continue
+    for index in indexes.values():
+        index.save()
+
+
+def list_images(images_dir: Path, extensions: Iterable[str]) -> List[Path]:
+    """Files in images_dir whose suffix is in extensions (unsorted; hidden files skipped)."""
+    exts = tuple(extensions)
+    try:
+        with os.scandir(images_dir) as it:
+            return [
+                Path(entry.path) for entry in it
+                if not entry.name.startswith(".") and os.path.splitext(entry.name)[1] in exts and entry.is_file()
+            ]
+    except OSError:
+        return []
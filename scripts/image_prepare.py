@@ -18,6 +18,7 @@ from typing import Dict, List, Tuple
 
 from config import load_topic_config, get_output_dir
 from global_config import CONTENT_TYPES
+from image_index import list_images
 from video_render import get_video_resolution_for_code, process_images_for_video
 
 
@@ -25,9 +26,10 @@ def _discover_images(output_dir: Path) -> List[Path]:
     images_dir = output_dir / "images"
     if not images_dir.exists():
         return []
+    listed = list_images(images_dir, (".jpg", ".jpeg", ".png", ".webp"))
     out: List[Path] = []
-    for ext in ("*.jpg", "*.jpeg", "*.png", "*.webp"):
-        out.extend(sorted(images_dir.glob(ext)))
+    for ext in (".jpg", ".jpeg", ".png", ".webp"):
+        out.extend(sorted(p for p in listed if p.suffix == ext))
     return out
 
 
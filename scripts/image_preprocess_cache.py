@@ -2,15 +2,25 @@
 """
 Preprocessed image cache backed by GitHub Release assets.
 
-We store composites (for undersized source images) in a ZIP asset named:
-  Assets_<TENANT_ID>_Images_<WxH>.zip
+The processed directory (composites for undersized source images plus
+manifest_<WxH>.json) is published incrementally (see cache_packs.py):
+  Assets_<TENANT_ID>_Images_<WxH>.index.json   file -> content hash + pack location
+  Assets_<TENANT_ID>_ImagePack_<hex>.pack      content-addressed packs, shared by all resolutions
 
-Inside the ZIP we keep the requested directory hierarchy:
-  Assets/<TENANT_ID>/Images/<WxH>/processed/<composite files>
-  Assets/<TENANT_ID>/Images/<WxH>/processed/manifest_<WxH>.json
+Only packs with new content are uploaded, and a restore downloads only the
+packs holding files that are missing locally.
 
-Why ZIP?
-- GitHub Release assets are flat in the UI (no folders). Zips preserve structure.
+Older releases only have a ZIP asset (Assets_<TENANT_ID>_Images_<WxH>.zip, with
+the hierarchy Assets/<TENANT_ID>/Images/<WxH>/processed/...); it is still
+restored when no index exists.
+
+TENANT_ASSETS_LOCAL_DIR=<dir> replaces the GitHub Release with a local
+directory (tests, offline runs).
+
+Manifest entries carry content hashes of the source (source_hash) and of the
+composite (out_hash), so a restored or freshly checked-out cache validates even
+though every mtime changed. Entries without hashes (older manifests) fall back
+to size+mtime.
 """
 
 from __future__ import annotations
@@ -23,7 +33,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from tenant_assets import ensure_release, download_asset, upload_asset, gh_available
+from cache_packs import _write_atomic, publish_dir, restore_dir
+from content_hash import get_hash_index
+from image_index import seed_hash_index
+from tenant_assets import get_release_store, release_store_available
 
 
 DEFAULT_TENANT_ID = "0000000001"
@@ -66,6 +79,22 @@ def images_asset_name(tenant_id: str, w: int, h: int) -> str:
     return f"Assets_{tenant_id}_Images_{w}x{h}.zip"
 
 
+def images_index_name(tenant_id: str, w: int, h: int) -> str:
+    return f"Assets_{tenant_id}_Images_{w}x{h}.index.json"
+
+
+def images_pack_prefix(tenant_id: str) -> str:
+    return f"Assets_{tenant_id}_ImagePack_"
+
+
+def _release_store(tenant_id: str):
+    return get_release_store(
+        get_tenant_assets_release_tag(tenant_id),
+        title=f"Tenant Assets {tenant_id}",
+        notes="Persistent cache for preprocessed images & bundles.",
+    )
+
+
 def _manifest_path(cache_dir: Path, w: int, h: int) -> Path:
     # cache_dir is the local processed-images directory
     return cache_dir / f"manifest_{w}x{h}.json"
@@ -80,42 +109,84 @@ def _zip_internal_prefix(tenant_id: str, w: int, h: int) -> str:
     return f"Assets/{tenant_id}/Images/{w}x{h}/processed/"
 
 
-def validate_local_manifest(manifest_path: Path, source_images: List[Path]) -> bool:
-    if not manifest_path.exists():
+def _entry_matches_source(e: dict, src: Path) -> bool:
+    st = src.stat()
+    if int(e.get("source_size", -1)) != int(st.st_size):
         return False
+    if e.get("source_hash"):
+        return get_hash_index().matches(src, e["source_hash"])
+    # legacy entry: allow small mtime skew
+    return abs(float(e.get("source_mtime", -1.0)) - float(st.st_mtime)) <= 1.0
+
+
+def _entry_output_ok(e: dict, out_dir: Path) -> bool:
+    if e.get("mode") != "composite":
+        return True
+    out_file = e.get("out_file")
+    if not out_file:
+        return False
+    out_path = out_dir / out_file
+    if not out_path.exists() or out_path.stat().st_size == 0:
+        return False
+    if e.get("out_hash"):
+        return get_hash_index().matches(out_path, e["out_hash"])
+    return True
+
+
+def match_manifest_entries(
+    manifest_path: Path, source_images: List[Path], *, partial: bool = False
+) -> Optional[Dict[str, dict]]:
+    """Map source file name -> manifest entry for sources the manifest still covers.
+
+    Sources are looked up by name, then by content hash, so renamed or moved
+    sources keep their entry. Returns None if the manifest is unreadable or,
+    unless partial=True, if any source is not covered.
+    """
+    if not manifest_path.exists():
+        return None
     try:
         data = json.loads(manifest_path.read_text(encoding="utf-8"))
     except Exception:
-        return False
-
-    # Build quick lookup: name -> (size, mtime, mode, out)
-    by_name: Dict[str, dict] = {e["source_name"]: e for e in data.get("entries", []) if "source_name" in e}
-    if len(by_name) < len(source_images):
-        return False
+        return None
+
+    entries = [e for e in data.get("entries", []) if isinstance(e, dict) and "source_name" in e]
+    by_name: Dict[str, dict] = {e["source_name"]: e for e in entries}
+    by_hash: Dict[str, dict] = {e["source_hash"]: e for e in entries if e.get("source_hash")}
+    if not partial and len(by_name) < len(source_images):
+        return None
+
+    index = get_hash_index()
+    # Hashes recorded at download time (images_metadata.json) spare re-reading sources
+    seed_hash_index(index, source_images)
+    matched: Dict[str, dict] = {}
+    try:
+        for src in source_images:
+            e = by_name.get(src.name)
+            ok = e is not None and _entry_matches_source(e, src)
+            if not ok and by_hash:
+                for algo_hash in {h.split(":", 1)[0] for h in by_hash}:
+                    try:
+                        e = by_hash.get(index.hash_file(src, algo_hash))
+                    except (OSError, ValueError):
+                        e = None
+                    if e is not None:
+                        ok = True
+                        break
+            if ok and _entry_output_ok(e, manifest_path.parent):
+                matched[src.name] = e
+            elif not partial:
+                return None
+    finally:
+        index.save()
+    return matched
 
-    for src in source_images:
-        st = src.stat()
-        e = by_name.get(src.name)
-        if not e:
-            return False
-        if int(e.get("source_size", -1)) != int(st.st_size):
-            return False
-        # allow small mtime skew
-        if abs(float(e.get("source_mtime", -1.0)) - float(st.st_mtime)) > 1.0:
-            return False
-        if e.get("mode") == "composite":
-            out_file = e.get("out_file")
-            if not out_file:
-                return False
-            out_path = manifest_path.parent / out_file
-            if not out_path.exists() or out_path.stat().st_size == 0:
-                return False
 
-    return True
+def validate_local_manifest(manifest_path: Path, source_images: List[Path]) -> bool:
+    return match_manifest_entries(manifest_path, source_images) is not None
 
 
 def restore_images_cache_from_release(source_images: List[Path], w: int, h: int, cache_dir: Path) -> bool:
-    """Attempt to restore the processed-images cache from the tenant Release asset.
+    """Attempt to restore the processed-images cache from the tenant Release assets.
 
     cache_dir is the *local processed-images directory* (e.g. outputs/.../processed_images).
     """
@@ -123,40 +194,31 @@ def restore_images_cache_from_release(source_images: List[Path], w: int, h: int,
         print("  ⓘ Tenant images cache restore disabled (CACHE_RESET or ENABLE_TENANT_ASSETS_CACHE=false)")
         return False
 
-    if not assets_enabled() or not gh_available():
+    if not assets_enabled() or not release_store_available():
         return False
 
     tenant_id = get_tenant_id()
-    tag = get_tenant_assets_release_tag(tenant_id)
-    asset = images_asset_name(tenant_id, w, h)
+    store = _release_store(tenant_id)
 
     tmp_dir = cache_dir / "_download_tmp"
     try:
-        ensure_release(tag, title=f"Tenant Assets {tenant_id}", notes="Persistent cache for preprocessed images & bundles.")
+        store.ensure()
 
         if tmp_dir.exists():
             shutil.rmtree(tmp_dir, ignore_errors=True)
         tmp_dir.mkdir(parents=True, exist_ok=True)
 
-        zip_path = download_asset(tag, asset, tmp_dir)
-
         composites_dir = _local_composites_dir(cache_dir)
         composites_dir.mkdir(parents=True, exist_ok=True)
 
-        prefix = _zip_internal_prefix(tenant_id, w, h)
-
-        with zipfile.ZipFile(zip_path, "r") as z:
-            members = [m for m in z.namelist() if m.startswith(prefix)]
-            if not members:
-                return False
-            for mname in members:
-                rel = mname[len(prefix):]
-                if not rel:
-                    continue
-                dest = composites_dir / rel
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                with z.open(mname) as srcf, open(dest, "wb") as outf:
-                    shutil.copyfileobj(srcf, outf)
+        stats = restore_dir(store, composites_dir, images_index_name(tenant_id, w, h), tmp_dir)
+        if stats is not None:
+            print(
+                f"  ✓ Restored prepared images from tenant assets: {stats['fetched']}/{stats['files']} file(s) "
+                f"fetched from {stats['packs']} pack(s)"
+            )
+        elif not _restore_legacy_zip(store, tenant_id, w, h, composites_dir, tmp_dir):
+            return False
 
         manifest = _manifest_path(cache_dir, w, h)
         return validate_local_manifest(manifest, source_images)
@@ -168,20 +230,38 @@ def restore_images_cache_from_release(source_images: List[Path], w: int, h: int,
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
+def _restore_legacy_zip(store, tenant_id: str, w: int, h: int, composites_dir: Path, tmp_dir: Path) -> bool:
+    """Extract the pre-index ZIP asset, if the release still only has that."""
+    zip_path = store.download(images_asset_name(tenant_id, w, h), tmp_dir)
+    prefix = _zip_internal_prefix(tenant_id, w, h)
+
+    with zipfile.ZipFile(zip_path, "r") as z:
+        members = [m for m in z.namelist() if m.startswith(prefix)]
+        if not members:
+            return False
+        for mname in members:
+            rel = mname[len(prefix):]
+            if not rel:
+                continue
+            # dest may be a hardlink into the image store: replace it, never truncate it
+            _write_atomic(composites_dir / rel, z.read(mname))
+    return True
+
+
 def publish_images_cache_to_release(source_images: List[Path], w: int, h: int, cache_dir: Path) -> bool:
     """
-    Publish cache_dir/processed contents + manifest to tenant release asset as zip.
+    Publish new cache_dir contents (composites + manifest) to the tenant release as packs.
     """
     if not images_cache_enabled():
         print("  ⓘ Tenant images cache publish disabled (CACHE_RESET or ENABLE_TENANT_ASSETS_CACHE=false)")
         return False
 
-    if not assets_enabled() or not gh_available():
+    if not assets_enabled() or not release_store_available():
         return False
 
     tenant_id = get_tenant_id()
-    tag = get_tenant_assets_release_tag(tenant_id)
-    asset = images_asset_name(tenant_id, w, h)
+    store = _release_store(tenant_id)
+    index_name = images_index_name(tenant_id, w, h)
 
     manifest = _manifest_path(cache_dir, w, h)
     if not validate_local_manifest(manifest, source_images):
@@ -192,27 +272,22 @@ def publish_images_cache_to_release(source_images: List[Path], w: int, h: int, c
     if not composites_dir.exists():
         return False
 
+    tmp_dir = cache_dir / "_upload_tmp"
     try:
-        ensure_release(tag, title=f"Tenant Assets {tenant_id}", notes="Persistent cache for preprocessed images & bundles.")
-        tmp_zip = cache_dir / f"_{asset}"
-        if tmp_zip.exists():
-            tmp_zip.unlink()
-
-        prefix = _zip_internal_prefix(tenant_id, w, h)
-        with zipfile.ZipFile(tmp_zip, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as z:
-            # include all files in processed (including manifest)
-            for p in composites_dir.rglob("*"):
-                # Avoid packaging temp download scratch (may exist after failed restores).
-                if "_download_tmp" in p.parts:
-                    continue
-                if p.is_file():
-                    arcname = prefix + p.relative_to(composites_dir).as_posix()
-                    z.write(p, arcname)
-
-        upload_asset(tag, tmp_zip, clobber=True)
-        tmp_zip.unlink(missing_ok=True)
-        print(f"  ✓ Published prepared images cache to tenant assets: {asset} (tag={tag})")
+        store.ensure()
+        # Scratch directories (_download_tmp after a failed restore, _upload_tmp) are never packed.
+        stats = publish_dir(store, composites_dir, index_name, images_pack_prefix(tenant_id), tmp_dir)
+        if stats["index_uploaded"]:
+            print(
+                f"  ✓ Published prepared images cache to tenant assets: {index_name} (tag={store.tag}; "
+                f"{stats['new_packs']} new pack(s), {stats['uploaded_bytes'] / (1024 * 1024):.1f} MB, "
+                f"{stats['reused']} file(s) already published)"
+            )
+        else:
+            print(f"  ✓ Prepared images cache already up to date in tenant assets: {index_name}")
         return True
     except Exception as e:
         print(f"  ⚠ Failed to publish prepared images cache (non-fatal): {e}")
-        return False
\ No newline at end of file
+        return False
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Content-addressed image store shared across topics and dates.
+
+News topics overlap heavily, so the same image URL used to be downloaded,
+composited and stored again for every topic and day. The store keeps each
+image once:
+
+    <IMAGE_STORE_DIR>/objects/<hh>/<algo>-<hex><ext>            downloaded images
+    <IMAGE_STORE_DIR>/derived/<kind>/<hh>/<algo>-<hex><ext>     e.g. composite_1080x1920
+    <IMAGE_STORE_DIR>/store.sqlite                             url/ref/derived index
+
+Per-topic files (outputs/<topic>/images/image_###.jpg, processed composites) are
+hardlinks to store objects (copies when the store is on another filesystem).
+Each link is recorded as a reference; gc() drops references whose files are
+gone and deletes objects, and their derived files, that nothing references for
+longer than IMAGE_STORE_GC_GRACE_HOURS.
+
+Usage:
+    python scripts/image_store.py stats
+    python scripts/image_store.py gc [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from content_hash import get_hash_index, hash_bytes
+from global_config import IMAGE_STORE_DIR, IMAGE_STORE_GC_GRACE_HOURS
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    url_hash TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS refs_hash ON refs(hash);
+CREATE TABLE IF NOT EXISTS derived (
+    kind TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    file TEXT NOT NULL,
+    PRIMARY KEY (kind, source_hash)
+);
+"""
+
+
+def _url_hash(url: str) -> str:
+    return hashlib.sha256(url.strip().encode("utf-8")).hexdigest()
+
+
+def _object_name(digest: str, ext: str) -> str:
+    return digest.replace(":", "-") + ext
+
+
+def _place(src: Path, dest: Path) -> None:
+    """Hardlink src to dest (replacing dest); copy when hardlinks are not possible."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+class ImageStore:
+    """Deduplicated image objects plus the references topics hold on them."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or IMAGE_STORE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / "store.sqlite"
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def object_path(self, digest: str, ext: str) -> Path:
+        name = _object_name(digest, ext)
+        return self.root / "objects" / name.split("-", 1)[-1][:2] / name
+
+    def _derived_path(self, kind: str, source_hash: str, ext: str) -> Path:
+        name = _object_name(source_hash, ext)
+        return self.root / "derived" / kind / name.split("-", 1)[-1][:2] / name
+
+    # -- objects ---------------------------------------------------------
+
+    def lookup_url(self, url: str) -> Optional[Path]:
+        """Stored object previously downloaded from url, if still present."""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT o.hash, o.ext FROM urls u JOIN objects o ON o.hash = u.hash WHERE u.url_hash = ?",
+                (_url_hash(url),),
+            ).fetchone()
+        if row is None:
+            return None
+        path = self.object_path(row["hash"], row["ext"])
+        return path if path.exists() else None
+
+    def put_bytes(self, data: bytes, ext: str, url: Optional[str] = None) -> Path:
+        """Store data (once per content hash) and remember url -> content."""
+        digest = hash_bytes(data)
+        path = self.object_path(digest, ext)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO objects (hash, ext, size, created_at, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(hash) DO UPDATE SET last_used = excluded.last_used",
+                (digest, ext, len(data), now, now),
+            )
+            if url:
+                conn.execute(
+                    "INSERT OR REPLACE INTO urls (url_hash, url, hash) VALUES (?, ?, ?)",
+                    (_url_hash(url), url, digest),
+                )
+        return path
+
+    def link(self, obj: Path, dest: Path) -> Path:
+        """Materialize a stored object (or derived file) at dest and record the reference."""
+        _place(obj, dest)
+        digest = obj.name.split(".", 1)[0].replace("-", ":", 1)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO refs (path, hash) VALUES (?, ?)",
+                (str(dest.resolve()), digest),
+            )
+            conn.execute("UPDATE objects SET last_used = ? WHERE hash = ?", (time.time(), digest))
+        return dest
+
+    # -- derived files (composites, other resolutions) ---------------------
+
+    def get_derived(self, kind: str, source_hash: str) -> Optional[Path]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT file FROM derived WHERE kind = ? AND source_hash = ?", (kind, source_hash)
+            ).fetchone()
+        if row is None:
+            return None
+        path = self.root / row["file"]
+        return path if path.exists() and path.stat().st_size > 0 else None
+
+    def put_derived(self, kind: str, source_hash: str, file: Path) -> Path:
+        """Adopt file as the `kind` derivative of source_hash; file is hardlinked, not moved."""
+        path = self._derived_path(kind, source_hash, file.suffix.lower())
+        _place(file, path)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO derived (kind, source_hash, file) VALUES (?, ?, ?)",
+                (kind, source_hash, path.relative_to(self.root).as_posix()),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO refs (path, hash) VALUES (?, ?)",
+                (str(file.resolve()), source_hash),
+            )
+        return path
+
+    # -- maintenance -----------------------------------------------------
+
+    def stats(self) -> Dict[str, int]:
+        with self._connection() as conn:
+            return {
+                "objects": conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0],
+                "bytes": conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0],
+                "urls": conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0],
+                "refs": conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0],
+                "derived": conn.execute("SELECT COUNT(*) FROM derived").fetchone()[0],
+            }
+
+    def gc(self, grace_hours: Optional[float] = None, dry_run: bool = False) -> Dict[str, int]:
+        """Drop dead references, then delete objects nothing has referenced for grace_hours."""
+        grace = IMAGE_STORE_GC_GRACE_HOURS if grace_hours is None else grace_hours
+        cutoff = time.time() - grace * 3600
+        result = {"dead_refs": 0, "objects": 0, "derived": 0, "bytes": 0}
+
+        with self._connection() as conn:
+            dead = [r["path"] for r in conn.execute("SELECT path FROM refs") if not os.path.exists(r["path"])]
+            result["dead_refs"] = len(dead)
+            if not dry_run:
+                conn.executemany("DELETE FROM refs WHERE path = ?", [(p,) for p in dead])
+            dead_set = set(dead)
+            live = {
+                r["hash"] for r in conn.execute("SELECT path, hash FROM refs") if r["path"] not in dead_set
+            }
+            orphans = [
+                r for r in conn.execute("SELECT hash, ext, size FROM objects WHERE last_used < ?", (cutoff,))
+                if r["hash"] not in live
+            ]
+            for r in orphans:
+                derived = conn.execute(
+                    "SELECT kind, file FROM derived WHERE source_hash = ?", (r["hash"],)
+                ).fetchall()
+                result["objects"] += 1
+                result["derived"] += len(derived)
+                result["bytes"] += int(r["size"])
+                if dry_run:
+                    continue
+                self.object_path(r["hash"], r["ext"]).unlink(missing_ok=True)
+                for d in derived:
+                    (self.root / d["file"]).unlink(missing_ok=True)
+                conn.execute("DELETE FROM derived WHERE source_hash = ?", (r["hash"],))
+                conn.execute("DELETE FROM urls WHERE hash = ?", (r["hash"],))
+                conn.execute("DELETE FROM objects WHERE hash = ?", (r["hash"],))
+
+            # Derived files of sources that never went through the store (local images)
+            stray = conn.execute(
+                "SELECT kind, source_hash, file FROM derived "
+                "WHERE source_hash NOT IN (SELECT hash FROM objects)"
+            ).fetchall()
+            for d in stray:
+                if d["source_hash"] in live:
+                    continue
+                result["derived"] += 1
+                if not dry_run:
+                    (self.root / d["file"]).unlink(missing_ok=True)
+                    conn.execute(
+                        "DELETE FROM derived WHERE kind = ? AND source_hash = ?", (d["kind"], d["source_hash"])
+                    )
+        return result
+
+
+_STORE: Optional[ImageStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """Process-wide store at IMAGE_STORE_DIR."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ImageStore()
+        return _STORE
+
+
+def source_hash(path: Path) -> str:
+    """Content hash used to key derived files of a (possibly store-linked) source image."""
+    return get_hash_index().hash_file(path)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Shared image store maintenance")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show object/reference counts")
+    gc_p = sub.add_parser("gc", help="Delete unreferenced objects")
+    gc_p.add_argument("--grace-hours", type=float, default=None)
+    gc_p.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    store = get_image_store()
+    if args.command == "stats":
+        for k, v in store.stats().items():
+            print(f"{k}: {v}")
+    else:
+        r = store.gc(args.grace_hours, dry_run=args.dry_run)
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(
+            f"{verb} {r['objects']} object(s), {r['derived']} derived file(s), "
+            f"{r['bytes'] / (1024 * 1024):.1f} MB; pruned {r['dead_refs']} dead reference(s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
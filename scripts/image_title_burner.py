@@ -18,6 +18,13 @@ Outputs:
 
 The burner is caching-aware: it skips re-burn if the output is newer than the
 source and the burn configuration (hosts + title mapping version) has not changed.
+
+Everything except the title is identical for every image of a resolution, so the
+top gradient and both host badges (with their glows) are rendered once per
+resolution into a single RGBA tile and composited onto each frame. Only the
+title glow is blurred per image, and only within the title's bounding box.
+Pools are burned in a process pool (IMAGE_TITLE_BURN_WORKERS, default: cores
+granted by the resource governor).
 """
 
 from __future__ import annotations
@@ -26,8 +33,10 @@ import hashlib
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
@@ -142,13 +151,8 @@ def _safe_filename_hash(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()[:16]
 
 
-def _find_font(prefer_bold: bool = False) -> ImageFont.FreeTypeFont:
-    """Best-effort font resolution.
-
-    Uses FONT_PATH env var if provided; otherwise tries common DejaVu fonts.
-    Falls back to PIL's default bitmap font.
-    """
-    font_path_env = (os.environ.get("FONT_PATH") or "").strip()
+@lru_cache(maxsize=8)
+def _resolve_font_path(prefer_bold: bool, font_path_env: str) -> Optional[str]:
     candidates: List[str] = []
     if font_path_env:
         candidates.append(font_path_env)
@@ -166,12 +170,29 @@ def _find_font(prefer_bold: bool = False) -> ImageFont.FreeTypeFont:
     for p in candidates:
         try:
             if p and Path(p).exists():
-                # caller sets size later via font_variant
-                return ImageFont.truetype(p, size=24)
+                ImageFont.truetype(p, size=24)
+                return p
         except Exception:
             continue
+    return None
+
 
-    return ImageFont.load_default()
+@lru_cache(maxsize=32)
+def _load_font(path: Optional[str], size: int) -> ImageFont.ImageFont:
+    if path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(path, size=size)
+
+
+def _find_font(prefer_bold: bool = False, size: int = 24) -> ImageFont.ImageFont:
+    """Best-effort font resolution.
+
+    Uses FONT_PATH env var if provided; otherwise tries common DejaVu fonts.
+    Falls back to PIL's default bitmap font. Font objects are cached per
+    (path, size); callers must not mutate them.
+    """
+    font_path_env = (os.environ.get("FONT_PATH") or "").strip()
+    return _load_font(_resolve_font_path(prefer_bold, font_path_env), size)
 
 
 def _truncate(text: str, max_chars: int) -> str:
@@ -227,6 +248,17 @@ def _gender_glow_rgba(gender: str) -> Tuple[int, int, int, int]:
     return (r, gg, b, 255)
 
 
+def _composite_clipped(base: Image.Image, tile: Image.Image, x: int, y: int) -> None:
+    """alpha_composite tile onto base at (x, y), clipping at the frame edges."""
+    w, h = base.size
+    tw, th = tile.size
+    sx, sy = max(0, -x), max(0, -y)
+    ex, ey = min(tw, w - x), min(th, h - y)
+    if ex <= sx or ey <= sy:
+        return
+    base.alpha_composite(tile, dest=(x + sx, y + sy), source=(sx, sy, ex, ey))
+
+
 def _draw_glow_text(
     base: Image.Image,
     xy: Tuple[int, int],
@@ -239,20 +271,26 @@ def _draw_glow_text(
     align: str = "left",
     anchor: Optional[str] = None,
 ) -> None:
-    """Draw glow by rendering text to a layer, blurring, then compositing."""
+    """Draw glow by rendering text to a layer, blurring, then compositing.
+
+    The glow layer only covers the text bounding box plus the blur's reach,
+    not the whole frame.
+    """
     if not text:
         return
 
-    w, h = base.size
-    layer = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    d2 = ImageDraw.Draw(base)
+    left, top, right, bottom = d2.textbbox(xy, text, font=font, align=align, anchor=anchor)
+    pad = 3 * max(1, int(glow_radius)) + 2
+    ox, oy = left - pad, top - pad
+    layer = Image.new("RGBA", (right - left + 2 * pad, bottom - top + 2 * pad), (0, 0, 0, 0))
     d = ImageDraw.Draw(layer)
 
     glow = (glow_rgb[0], glow_rgb[1], glow_rgb[2], glow_alpha)
-    d.text(xy, text, font=font, fill=glow, align=align, anchor=anchor)
+    d.text((xy[0] - ox, xy[1] - oy), text, font=font, fill=glow, align=align, anchor=anchor)
     layer = layer.filter(ImageFilter.GaussianBlur(radius=glow_radius))
-    base.alpha_composite(layer)
+    _composite_clipped(base, layer, ox, oy)
 
-    d2 = ImageDraw.Draw(base)
     d2.text(xy, text, font=font, fill=fill, align=align, anchor=anchor)
 
 
@@ -305,6 +343,73 @@ def _draw_badge(
     base.alpha_composite(badge)
 
 
+@dataclass(frozen=True)
+class _Layout:
+    top_h: int
+    title_size: int
+    badge_size: int
+    margin_x: int
+    margin_y: int
+    badge_w: int
+    badge_h: int
+
+
+def _layout(w: int, h: int, top_fraction: float) -> _Layout:
+    return _Layout(
+        top_h=max(1, int(h * top_fraction)),
+        title_size=max(22, int(h * 0.055)),
+        badge_size=max(16, int(h * 0.030)),
+        margin_x=int(w * 0.04),
+        margin_y=int(h * 0.03),
+        badge_w=max(240, int(w * 0.36)),
+        badge_h=max(26, int(h * 0.05)),
+    )
+
+
+@lru_cache(maxsize=8)
+def _static_overlay(w: int, h: int, top_fraction: float, hosts: Tuple[HostBadge, ...]) -> Image.Image:
+    """Top gradient + both host badges (with glows) as one RGBA tile anchored at (0, 0).
+
+    Built once per resolution/hosts per process and composited onto every frame.
+    """
+    lay = _layout(w, h, top_fraction)
+    badge_glow_pad = 3 * max(8, int(lay.badge_h * 0.35)) + 2
+    tile_h = min(h, max(lay.top_h, lay.margin_y + lay.badge_h + badge_glow_pad))
+    tile = Image.new("RGBA", (w, tile_h), (0, 0, 0, 0))
+
+    # Gradient: stronger at very top, fades by ~top_h
+    column = Image.new("L", (1, lay.top_h))
+    column.putdata([int(200 * (1 - y / max(1, lay.top_h)) ** 1.7) for y in range(lay.top_h)])
+    gradient = Image.new("RGBA", (w, lay.top_h), (0, 0, 0, 0))
+    gradient.putalpha(column.resize((w, lay.top_h), Image.NEAREST))
+    tile.alpha_composite(gradient)
+
+    badge_font = _find_font(prefer_bold=True, size=lay.badge_size)
+
+    # Host badges (ensure both are attempted)
+    h1 = hosts[0] if len(hosts) > 0 else HostBadge("", "other")
+    h2 = hosts[1] if len(hosts) > 1 else HostBadge("", "other")
+
+    # Left badge
+    _draw_badge(
+        tile,
+        (lay.margin_x, lay.margin_y, lay.margin_x + lay.badge_w, lay.margin_y + lay.badge_h),
+        text=_truncate(h1.name, 40),
+        font=badge_font,
+        glow_rgba=_gender_glow_rgba(h1.gender),
+    )
+
+    # Right badge
+    _draw_badge(
+        tile,
+        (w - lay.margin_x - lay.badge_w, lay.margin_y, w - lay.margin_x, lay.margin_y + lay.badge_h),
+        text=_truncate(h2.name, 40),
+        font=badge_font,
+        glow_rgba=_gender_glow_rgba(h2.gender),
+    )
+    return tile
+
+
 def burn_title_and_hosts(
     src_path: Path,
     dst_path: Path,
@@ -318,60 +423,13 @@ def burn_title_and_hosts(
         im = Image.open(src_path)
         im = im.convert("RGBA")
         w, h = im.size
+        lay = _layout(w, h, top_fraction)
 
-        top_h = max(1, int(h * top_fraction))
-
-        # Overlay for readability (top gradient)
-        overlay = Image.new("RGBA", (w, h), (0, 0, 0, 0))
-        od = ImageDraw.Draw(overlay)
-
-        # Gradient: stronger at very top, fades by ~top_h
-        for y in range(0, top_h):
-            # 0..1
-            t = y / max(1, top_h)
-            alpha = int(200 * (1 - t) ** 1.7)
-            od.line([(0, y), (w, y)], fill=(0, 0, 0, alpha))
-        im.alpha_composite(overlay)
+        # Gradient and host badges: cached per resolution
+        im.alpha_composite(_static_overlay(w, h, top_fraction, tuple(hosts)))
 
         draw = ImageDraw.Draw(im)
-
-        # Fonts
-        base_title_font = _find_font(prefer_bold=True)
-        base_badge_font = _find_font(prefer_bold=True)
-
-        # Dynamic sizing
-        title_size = max(22, int(h * 0.055))
-        badge_size = max(16, int(h * 0.030))
-        title_font = base_title_font.font_variant(size=title_size) if hasattr(base_title_font, "font_variant") else base_title_font
-        badge_font = base_badge_font.font_variant(size=badge_size) if hasattr(base_badge_font, "font_variant") else base_badge_font
-
-        # Layout
-        margin_x = int(w * 0.04)
-        margin_y = int(h * 0.03)
-        badge_h = max(26, int(h * 0.05))
-        badge_w = max(240, int(w * 0.36))
-
-        # Host badges (ensure both are attempted)
-        h1 = hosts[0] if len(hosts) > 0 else HostBadge("", "other")
-        h2 = hosts[1] if len(hosts) > 1 else HostBadge("", "other")
-
-        # Left badge
-        _draw_badge(
-            im,
-            (margin_x, margin_y, margin_x + badge_w, margin_y + badge_h),
-            text=_truncate(h1.name, 40),
-            font=badge_font,
-            glow_rgba=_gender_glow_rgba(h1.gender),
-        )
-
-        # Right badge
-        _draw_badge(
-            im,
-            (w - margin_x - badge_w, margin_y, w - margin_x, margin_y + badge_h),
-            text=_truncate(h2.name, 40),
-            font=badge_font,
-            glow_rgba=_gender_glow_rgba(h2.gender),
-        )
+        title_font = _find_font(prefer_bold=True, size=lay.title_size)
 
         # Title text (TikTok style, centered within top band)
         safe_title = _truncate(title, 140)
@@ -384,11 +442,11 @@ def burn_title_and_hosts(
                 lines[-1] = _truncate(lines[-1], 70)
 
             # Compute total block height
-            line_h = int(title_size * 1.12)
+            line_h = int(lay.title_size * 1.12)
             block_h = len(lines) * line_h
 
-            center_y = int(top_h * 0.62)
-            start_y = max(int(h * 0.02) + badge_h, center_y - block_h // 2)
+            center_y = int(lay.top_h * 0.62)
+            start_y = max(int(h * 0.02) + lay.badge_h, center_y - block_h // 2)
 
             for idx, line in enumerate(lines):
                 y = start_y + idx * line_h
@@ -399,7 +457,7 @@ def burn_title_and_hosts(
                     title_font,
                     fill=(255, 255, 255, 255),
                     glow_rgb=(200, 200, 200),  # silver glow
-                    glow_radius=max(2, int(title_size * 0.18)),
+                    glow_radius=max(2, int(lay.title_size * 0.18)),
                     glow_alpha=210,
                     align="center",
                     anchor="mm",
@@ -417,7 +475,8 @@ def burn_title_and_hosts(
         elif dst_path.suffix.lower() == ".webp":
             out.save(tmp, format="WEBP", quality=90, method=6)
         else:
-            out.save(tmp)
+            # tmp's ".tmp" suffix hides the format from PIL; take it from dst
+            out.save(tmp, format=Image.registered_extensions().get(dst_path.suffix.lower(), "PNG"))
 
         os.replace(tmp, dst_path)
         return True
@@ -426,6 +485,36 @@ def burn_title_and_hosts(
         return False
 
 
+def _burn_job(job: Tuple[str, str, str, Tuple[HostBadge, ...], float]) -> bool:
+    src, dst, title, hosts, top_fraction = job
+    return burn_title_and_hosts(Path(src), Path(dst), title=title, hosts=list(hosts), top_fraction=top_fraction)
+
+
+def _burn_workers(n_jobs: int) -> int:
+    raw = (os.environ.get("IMAGE_TITLE_BURN_WORKERS") or "").strip()
+    requested = int(raw) if raw.isdigit() else 0
+    try:
+        from resource_governor import get_governor
+        # ~1 decoded RGBA frame plus tiles per worker
+        workers = get_governor().pool_size(requested or None, mem_mb_per_worker=128)
+    except Exception:
+        workers = requested or (os.cpu_count() or 1)
+    return max(1, min(workers, n_jobs))
+
+
+def _run_burn_jobs(jobs: List[Tuple[str, str, str, Tuple[HostBadge, ...], float]]) -> List[bool]:
+    """Burn jobs in a process pool; small batches (or one worker) run inline."""
+    workers = _burn_workers(len(jobs))
+    if workers <= 1 or len(jobs) < 4:
+        return [_burn_job(j) for j in jobs]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_burn_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    except Exception as e:
+        print(f"  ⚠️  Parallel title burn failed ({e}); burning serially")
+        return [_burn_job(j) for j in jobs]
+
+
 def burn_prepared_pool(
     *,
     prepared_pool: List[Path],
@@ -487,8 +576,11 @@ def burn_prepared_pool(
     # If config changed, force re-burn by ignoring cached mtimes.
     force = prev_hash != burn_cfg_hash
 
-    entries: List[dict] = []
-    burned: List[Path] = []
+    # Slots keep prepared_pool ordering; cached items are filled immediately,
+    # the rest after the (parallel) burn.
+    slots: List[Optional[Tuple[Path, dict]]] = []
+    pending: List[Tuple[int, Path, dict]] = []
+    jobs: List[Tuple[str, str, str, Tuple[HostBadge, ...], float]] = []
 
     for src in prepared_pool:
         src = Path(src)
@@ -503,41 +595,36 @@ def burn_prepared_pool(
         # Determine title
         source_name = composite_to_source.get(src.name) or src.name
         title = titles_map.get(source_name) or titles_map.get(src.name) or fallback_title
+        entry = {
+            "source_file": str(src.name),
+            "source_name": str(source_name),
+            "source_size": int(st.st_size),
+            "source_mtime": float(st.st_mtime),
+            "out_file": str(dst.name),
+            "title_hash": _safe_filename_hash(title),
+        }
 
         # Cache check
         if not force and dst.exists():
             try:
                 if dst.stat().st_mtime >= st.st_mtime and dst.stat().st_size > 0:
-                    burned.append(dst)
-                    entries.append({
-                        "source_file": str(src.name),
-                        "source_name": str(source_name),
-                        "source_size": int(st.st_size),
-                        "source_mtime": float(st.st_mtime),
-                        "out_file": str(dst.name),
-                        "title_hash": _safe_filename_hash(title),
-                    })
+                    slots.append((dst, entry))
                     continue
             except Exception:
                 pass
 
-        ok = burn_title_and_hosts(
-            src,
-            dst,
-            title=title,
-            hosts=hosts,
-            top_fraction=top_fraction,
-        )
-        if ok and dst.exists() and dst.stat().st_size > 0:
-            burned.append(dst)
-            entries.append({
-                "source_file": str(src.name),
-                "source_name": str(source_name),
-                "source_size": int(st.st_size),
-                "source_mtime": float(st.st_mtime),
-                "out_file": str(dst.name),
-                "title_hash": _safe_filename_hash(title),
-            })
+        pending.append((len(slots), dst, entry))
+        slots.append(None)
+        jobs.append((str(src), str(dst), title, tuple(hosts), top_fraction))
+
+    if jobs:
+        results = _run_burn_jobs(jobs)
+        for (slot, dst, entry), ok in zip(pending, results):
+            if ok and dst.exists() and dst.stat().st_size > 0:
+                slots[slot] = (dst, entry)
+
+    burned: List[Path] = [s[0] for s in slots if s is not None]
+    entries: List[dict] = [s[1] for s in slots if s is not None]
 
     # Write manifest
     try:
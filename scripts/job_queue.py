@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""SQLite-backed local job queue for the pipeline daemon.
+
+`cli.py submit` enqueues run_for_topic jobs; `cli.py daemon` claims them one at
+a time. SQLite's locking makes submit/claim safe across processes on one host.
+
+Queue file: PIPELINE_QUEUE_DB, default <repo>/.cache/pipeline_queue.sqlite
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import get_repo_root
+
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic_id TEXT NOT NULL,
+    date_str TEXT,
+    modules TEXT,
+    tenant TEXT,
+    options TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_id ON jobs(status, id);
+"""
+
+
+def get_queue_path() -> Path:
+    env = os.environ.get("PIPELINE_QUEUE_DB", "").strip()
+    if env:
+        return Path(env)
+    return get_repo_root() / ".cache" / "pipeline_queue.sqlite"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _worker_is_dead(worker: Optional[str]) -> bool:
+    """True for a "host:pid" worker on this host whose process has exited."""
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    return not _pid_alive(int(pid))
+
+
+@dataclass
+class Job:
+    id: int
+    topic_id: str
+    date_str: Optional[str] = None
+    modules: Optional[List[str]] = None
+    tenant: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: str = STATUS_QUEUED
+    worker: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (STATUS_DONE, STATUS_FAILED)
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            topic_id=row["topic_id"],
+            date_str=row["date_str"],
+            modules=json.loads(row["modules"]) if row["modules"] else None,
+            tenant=row["tenant"],
+            options=json.loads(row["options"] or "{}"),
+            status=row["status"],
+            worker=row["worker"],
+            error=row["error"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+        )
+
+
+class JobQueue:
+    """Minimal FIFO job queue stored in a SQLite file."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else get_queue_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(
+        self,
+        topic_id: str,
+        date_str: Optional[str] = None,
+        *,
+        modules: Optional[List[str]] = None,
+        tenant: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        with self._connection() as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (topic_id, date_str, modules, tenant, options, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    topic_id,
+                    date_str,
+                    json.dumps(modules) if modules else None,
+                    tenant,
+                    json.dumps(options or {}),
+                    STATUS_QUEUED,
+                    time.time(),
+                ),
+            )
+            return int(cur.lastrowid)
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Atomically take the oldest queued job and mark it running."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (STATUS_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE id = ?",
+                (STATUS_RUNNING, worker, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        job = Job.from_row(row)
+        job.status, job.worker, job.started_at = STATUS_RUNNING, worker, now
+        return job
+
+    def requeue_orphaned(self) -> List[int]:
+        """Put running jobs of dead workers on this host back in the queue.
+
+        A daemon that crashes mid-job leaves it in `running`; call this at
+        startup so the job is picked up again. Workers on other hosts are left
+        alone since their pids cannot be checked from here.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, worker FROM jobs WHERE status = ?", (STATUS_RUNNING,)
+            ).fetchall()
+            orphaned = [row["id"] for row in rows if _worker_is_dead(row["worker"])]
+            for job_id in orphaned:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = NULL, started_at = NULL WHERE id = ?",
+                    (STATUS_QUEUED, job_id),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return orphaned
+
+    def complete(self, job_id: int, ok: bool, error: Optional[str] = None) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (STATUS_DONE if ok else STATUS_FAILED, error, time.time(), job_id),
+            )
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def wait(self, job_id: int, timeout: Optional[float] = None, poll_interval: float = 0.5) -> Optional[Job]:
+        """Poll until the job finishes or timeout expires; returns the last seen state."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.finished:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Probe each media file once: ffprobe results stored per directory.
+
+Render, validation, caption burn-in and TTS all need the duration, resolution
+or codecs of the same few files. probe_media(path) runs one full ffprobe
+(-show_format -show_streams) per file version and records the result in a
+store per media directory, keyed by filename and validated by size and
+mtime_ns. Later lookups, in this process or the next, return the stored result
+without a subprocess. A file rewritten in place (e.g. by caption burn-in) is
+probed again on its next lookup.
+
+Stores live under MEDIA_PROBE_DIR (default <repo>/.cache/media_probe), one JSON
+file per resolved directory path, never next to the media: outputs/<topic>/ is
+published and committed as is.
+
+Accessors (media_duration, video_stream, audio_stream, media_resolution) take
+the probed dict.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+MEDIA_METADATA_FILENAME = "media_metadata.json"  # legacy per-directory store (no longer written)
+STORE_VERSION = 2
+
+
+def get_store_dir() -> Path:
+    env = os.environ.get("MEDIA_PROBE_DIR", "").strip()
+    if env:
+        return Path(env)
+    from config import get_repo_root
+    return get_repo_root() / ".cache" / "media_probe"
+
+
+def store_path_for(directory: Path) -> Path:
+    key = hashlib.sha256(str(Path(directory).resolve()).encode("utf-8")).hexdigest()[:20]
+    return get_store_dir() / f"{key}.json"
+
+
+def run_ffprobe(path: Path) -> Dict[str, Any]:
+    """ffprobe's format and streams for path; RuntimeError if it cannot be probed."""
+    try:
+        result = subprocess.run([
+            'ffprobe', '-v', 'error',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            str(path)
+        ], capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffprobe failed (exit {e.returncode}): {(e.stderr or '').strip()}")
+    except FileNotFoundError:
+        raise RuntimeError("ffprobe not found - install FFmpeg to continue")
+    try:
+        data = json.loads(result.stdout or "{}")
+    except ValueError as e:
+        raise RuntimeError(f"Invalid ffprobe output: {e}")
+    return {"format": data.get("format") or {}, "streams": data.get("streams") or []}
+
+
+class MediaStore:
+    """Probe results of the media in one directory, keyed by filename."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.path = store_path_for(self.directory)
+        self._lock = threading.Lock()
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if not isinstance(data, dict) or data.get("version") != STORE_VERSION or not isinstance(data.get("files"), dict):
+            data = {"version": STORE_VERSION, "directory": str(self.directory.resolve()), "files": {}}
+        self.data = data
+
+    def lookup(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Stored metadata for path if the file is unchanged since it was probed."""
+        st = Path(path).stat()
+        with self._lock:
+            e = self.data["files"].get(Path(path).name)
+        if e and e.get("size") == st.st_size and e.get("mtime_ns") == st.st_mtime_ns:
+            return e
+        return None
+
+    def probe(self, path: Path) -> Dict[str, Any]:
+        path = Path(path)
+        cached = self.lookup(path)
+        if cached is not None:
+            return cached
+        st = path.stat()
+        info = run_ffprobe(path)
+        info["format"].pop("filename", None)  # the path it was probed at; callers know it
+        info["size"] = st.st_size
+        info["mtime_ns"] = st.st_mtime_ns
+        with self._lock:
+            self.data["files"][path.name] = info
+        self.save()
+        return info
+
+    def save(self) -> None:
+        with self._lock:
+            files = {n: e for n, e in self.data["files"].items() if (self.directory / n).exists()}
+            self.data["files"] = files
+            payload = json.dumps(self.data, indent=1, sort_keys=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            print(f"  ⚠ Failed to update media metadata store (non-fatal): {e}")
+
+
+_STORES: Dict[str, MediaStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_media_store(directory: Path) -> MediaStore:
+    """Process-wide store for directory, loaded on first use."""
+    key = str(Path(directory).resolve())
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = MediaStore(Path(directory))
+        return store
+
+
+def probe_media(path: Path) -> Dict[str, Any]:
+    """Metadata for path ({"format", "streams", ...}), probing only if not stored."""
+    path = Path(path)
+    return get_media_store(path.parent).probe(path)
+
+
+def video_stream(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    streams = info.get("streams") or []
+    for s in streams:
+        if s.get("codec_type") == "video":
+            return s
+    # Results without codec_type (selected-stream probes) list the video stream first
+    if streams and not any("codec_type" in s for s in streams):
+        return streams[0]
+    return None
+
+
+def audio_stream(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    for s in info.get("streams") or []:
+        if s.get("codec_type") == "audio":
+            return s
+    return None
+
+
+def media_duration(info: Dict[str, Any]) -> float:
+    """Container duration in seconds, else the longest stream's, else 0.0."""
+    try:
+        return float(info.get("format", {}).get("duration"))
+    except (TypeError, ValueError):
+        pass
+    durations = []
+    for s in info.get("streams") or []:
+        try:
+            durations.append(float(s.get("duration")))
+        except (TypeError, ValueError):
+            continue
+    return max(durations) if durations else 0.0
+
+
+def media_resolution(info: Dict[str, Any]) -> Tuple[int, int]:
+    """(width, height) of the video stream, or (0, 0)."""
+    s = video_stream(info)
+    if not s:
+        return 0, 0
+    try:
+        return int(s.get("width") or 0), int(s.get("height") or 0)
+    except (TypeError, ValueError):
+        return 0, 0
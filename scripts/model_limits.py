@@ -7,6 +7,8 @@ Purpose
   for the models used by this repo.
 - Keep callers safe by clamping any requested output budget to the model maximum.
 - Provide a lightweight prompt truncation helper that reserves an output budget.
+- Count tokens with the model's real BPE vocabulary (via `tiktoken`, when installed) so prompts
+  and output budgets are sized from token counts rather than a chars-per-token rule.
 
 Notes
 - These are hard model caps. You cannot exceed them via API parameters.
@@ -14,11 +16,23 @@ Notes
 
 If you add new models, extend the dictionaries below (prefer aliases, and prefix matching will
 cover snapshot variants like "gpt-4o-2024-05-13" or "gpt-4.1-2025-04-14".)
+
+Token counting
+- Vocabularies are loaded on first use and memoized per encoding. `tiktoken` fetches them once
+  into its cache; point TIKTOKEN_CACHE_DIR at a pre-populated directory for offline runs.
+- `tiktoken` is a pinned requirement. Only if it (or its vocabulary) cannot be loaded do counts
+  come from a built-in approximation that splits text the way the BPE pre-tokenizer does (words
+  with their leading space, 1-3 digit groups, punctuation runs, whitespace) and costs each piece
+  by length and script; a warning is printed once per encoding when that happens.
+- Texts above TOKEN_COUNT_FAST_PATH_CHARS are counted from evenly spaced samples and
+  extrapolated, unless an exact count is requested.
 """
 
 from __future__ import annotations
 
+import math
 import re
+from functools import lru_cache
 from typing import Dict, Iterable
 
 
@@ -182,29 +196,153 @@ def clamp_output_tokens(model: str, requested: int) -> int:
     return clamp_max_output_tokens(model, requested)
 
 
-def estimate_tokens(text: str) -> int:
-    # very rough: ~4 chars/token average in English
-    return max(1, int(len(text or "") / 4))
+# ======= Token counting =======================================================
 
+TOKEN_COUNT_FAST_PATH_CHARS = 200_000
+_FAST_PATH_SAMPLES = 32
+_FAST_PATH_SAMPLE_CHARS = 4096
 
-def truncate_text_to_fit_context(model: str, prompt: str, max_output_tokens: int) -> str:
-    """Ensure prompt fits within context window after reserving max_output_tokens.
+# Tokens per word of English dialogue with HOST_A/HOST_B tags, used when there is no
+# sample text of the expected output to measure.
+DEFAULT_TOKENS_PER_WORD = 1.4
 
-    Conservative heuristic (character-based). This is only used as a last resort; ideally
-    you keep prompts comfortably within the context window.
+# Models on the older cl100k_base vocabulary; everything else uses o200k_base.
+_CL100K_MODEL_PREFIXES = ("gpt-4-", "gpt-3.5")
+_CL100K_MODELS = ("gpt-4",)
 
-    - Reserves the output budget (clamped to model max output).
-    - Truncates the prompt to fit the remaining budget.
+# Pre-tokenizer approximation: contractions, words with an optional leading space,
+# 1-3 digit groups, punctuation runs, then whitespace.
+_PIECE_RE = re.compile(r"'(?:s|t|re|ve|m|ll|d)\b| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+", re.IGNORECASE)
+
+
+def encoding_name_for_model(model: str | None) -> str:
+    m = (model or "").strip().lower()
+    if m in _CL100K_MODELS or (m.startswith(_CL100K_MODEL_PREFIXES) and not m.startswith("gpt-4o")):
+        return "cl100k_base"
+    return "o200k_base"
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(name: str):
+    """tiktoken encoding `name`, or None if tiktoken or its vocabulary is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"  ⚠ tiktoken encoding {name} unavailable ({e}); token counts are approximate")
+        return None
+
+
+def _approx_piece_tokens(piece: str) -> int:
+    word = piece.strip()
+    if not word:
+        return 1  # a whitespace run
+    if word[0].isdigit():
+        return 1
+    if word[0].isalpha():
+        n = len(word)
+        if word.isascii():
+            # Common words (and their leading space) are one token; longer words split into ~5-char parts
+            return 1 if n <= 7 else 1 + (n - 3) // 5
+        cjk = sum(1 for c in word if ord(c) >= 0x2E80)
+        return max(1, math.ceil(cjk / 1.2) + math.ceil((n - cjk) / 4))
+    return 1 + (len(word) - 1) // 3  # punctuation run
+
+
+def _approx_count(text: str) -> int:
+    return sum(_approx_piece_tokens(p) for p in _PIECE_RE.findall(text))
+
+
+def _count_exact(text: str, encoding_name: str) -> int:
+    enc = _load_encoding(encoding_name)
+    if enc is not None:
+        return len(enc.encode_ordinary(text))
+    return _approx_count(text)
+
+
+def _count_sampled(text: str, encoding_name: str) -> int:
+    step = len(text) // _FAST_PATH_SAMPLES
+    sampled_chars = 0
+    sampled_tokens = 0
+    for i in range(_FAST_PATH_SAMPLES):
+        start = i * step
+        # Start and end samples on whitespace so words are not split
+        ws = text.find(" ", start, start + 64)
+        start = ws if ws != -1 else start
+        end = text.find(" ", start + _FAST_PATH_SAMPLE_CHARS, start + _FAST_PATH_SAMPLE_CHARS + 64)
+        end = end if end != -1 else start + _FAST_PATH_SAMPLE_CHARS
+        chunk = text[start:end]
+        sampled_chars += len(chunk)
+        sampled_tokens += _count_exact(chunk, encoding_name)
+    return int(round(sampled_tokens * len(text) / max(1, sampled_chars)))
+
+
+def count_tokens(text: str, model: str | None = None, *, exact: bool = False) -> int:
+    """Number of tokens in text for model's vocabulary (see module notes on the fallback).
+
+    Texts longer than TOKEN_COUNT_FAST_PATH_CHARS are estimated from samples unless exact=True.
     """
+    t = text or ""
+    if not t:
+        return 0
+    name = encoding_name_for_model(model)
+    if not exact and len(t) > TOKEN_COUNT_FAST_PATH_CHARS:
+        return _count_sampled(t, name)
+    return _count_exact(t, name)
+
+
+def estimate_tokens(text: str, model: str | None = None) -> int:
+    """Token count of text (at least 1); kept for callers of the old chars/4 estimate."""
+    return max(1, count_tokens(text, model))
+
+
+def tokens_per_word(sample: str, model: str | None = None, default: float = DEFAULT_TOKENS_PER_WORD) -> float:
+    """Measured tokens per whitespace-separated word in sample (default if it is too short)."""
+    words = len((sample or "").split())
+    if words < 200:
+        return default
+    return count_tokens(sample, model) / words
+
+
+def fit_text_to_tokens(text: str, max_tokens: int, model: str | None = None) -> str:
+    """Longest head of text with at most max_tokens tokens (cut at a whitespace boundary)."""
+    t = text or ""
+    max_tokens = max(0, int(max_tokens))
+    total = count_tokens(t, model, exact=True)
+    if total <= max_tokens:
+        return t
+    # Binary search on the cut position (counts grow with the prefix length), starting
+    # from a window around the average chars-per-token guess
+    lo, hi = 0, len(t)
+    guess = min(len(t), int(max_tokens * len(t) / total * 1.25) + 64)
+    if count_tokens(t[:guess], model, exact=True) > max_tokens:
+        hi = guess
+    else:
+        lo = guess
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(t[:mid], model, exact=True) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = t.rfind(" ", 0, lo + 1)
+    return t[: cut if cut > lo // 2 else lo].rstrip()
+
+
+def prompt_token_budget(model: str, max_output_tokens: int) -> int:
+    """Tokens left for the prompt after reserving the (clamped) output budget."""
     ctx = get_context_window_tokens(model)
     reserve = clamp_max_output_tokens(model, max_output_tokens)
-    budget = max(1, ctx - reserve)
+    return max(1, ctx - reserve)
+
 
-    # Convert token budget to char budget (~4 chars/token)
-    char_budget = budget * 4
-    p = prompt or ""
-    if len(p) <= char_budget:
-        return p
+def truncate_text_to_fit_context(model: str, prompt: str, max_output_tokens: int) -> str:
+    """Ensure prompt fits within context window after reserving max_output_tokens.
 
-    # Keep head by default.
-    return p[:char_budget]
+    This is only used as a last resort; ideally you keep prompts comfortably within the
+    context window.
+
+    - Reserves the output budget (clamped to model max output).
+    - Truncates the prompt (keeping its head) to the remaining token budget.
+    """
+    return fit_text_to_tokens(prompt or "", prompt_token_budget(model, max_output_tokens), model)
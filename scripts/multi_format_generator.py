@@ -26,17 +26,28 @@ logger = logging.getLogger(__name__)
 
 from global_config import CONTENT_TYPES
 
-# Try to import generator
-try:
-    from responses_api_generator import generate_all_content_two_pass
-    TWO_PASS_AVAILABLE = True
-except Exception as e:
-    _two_pass_import_error = str(e)
-    _two_pass_import_tb = traceback.format_exc()
-    logger.warning(f"Two-pass generator not available: {e}")
-    logger.warning(_two_pass_import_tb)
-    TWO_PASS_AVAILABLE = False
-    generate_all_content_two_pass = None  # type: ignore
+# The generator (and with it openai/httpx/gemini clients) is imported on first
+# use. video_render only needs get_enabled_content_types and must not pay for it.
+generate_all_content_two_pass = None  # type: ignore
+_two_pass_import_error = ""
+
+
+def _load_two_pass_generator():
+    """Import responses_api_generator once; return the entry point or None."""
+    global generate_all_content_two_pass, _two_pass_import_error
+    if generate_all_content_two_pass is not None:
+        return generate_all_content_two_pass
+    if _two_pass_import_error:
+        return None
+    try:
+        from responses_api_generator import generate_all_content_two_pass as _gen
+    except Exception as e:
+        _two_pass_import_error = str(e) or type(e).__name__
+        logger.warning(f"Two-pass generator not available: {e}")
+        logger.warning(traceback.format_exc())
+        return None
+    generate_all_content_two_pass = _gen
+    return _gen
 
 
 _generation_in_progress = False
@@ -109,9 +120,10 @@ def generate_multi_format_scripts(config: Dict[str, Any], sources: List[Dict[str
     try:
         _generation_in_progress = True
 
-        if not TWO_PASS_AVAILABLE or generate_all_content_two_pass is None:
+        generator = _load_two_pass_generator()
+        if generator is None:
             raise ImportError(
-                f"responses_api_generator.py is not available. Import error: {globals().get('_two_pass_import_error', 'unknown')}"
+                f"responses_api_generator.py is not available. Import error: {_two_pass_import_error or 'unknown'}"
             )
 
         content_specs = get_enabled_content_types(config)
@@ -126,7 +138,7 @@ def generate_multi_format_scripts(config: Dict[str, Any], sources: List[Dict[str
         logger.info("=" * 80)
 
         # Delegate execution to responses_api_generator (handles pass selection internally)
-        out = generate_all_content_two_pass(
+        out = generator(
             config,
             sources=sources or [],
             enabled_specs=content_specs,
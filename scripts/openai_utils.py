@@ -27,6 +27,7 @@ try:
 except ImportError:
     OpenAI = None
 
+from api_cassette import ReplayedResponse, encode_openai_response, recorded_call
 from global_config import get_openai_endpoint_type
 from model_limits import default_max_output_tokens, clamp_output_tokens
 
@@ -170,8 +171,51 @@ def create_openai_completion(
         **kwargs: Additional parameters passed to API
 
     Returns:
-        OpenAI API response
+        OpenAI API response (a ReplayedResponse when replaying an API cassette)
     """
+    request = {
+        "model": model,
+        "messages": messages,
+        "prompt": prompt,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "max_completion_tokens": max_completion_tokens,
+        "tools": tools,
+        "json_mode": json_mode,
+        "kwargs": kwargs,
+    }
+    response = recorded_call(
+        "openai",
+        request,
+        lambda: _create_openai_completion_live(
+            client, model, messages, prompt, temperature, max_tokens,
+            max_completion_tokens, tools, json_mode, output_file, **kwargs
+        ),
+        encode=encode_openai_response,
+        decode=ReplayedResponse,
+    )
+    if output_file and isinstance(response, ReplayedResponse):
+        try:
+            Path(str(output_file) + '.response.json').write_text(response.model_dump_json(indent=2), encoding='utf-8')
+        except Exception as e:
+            logger.warning(f'Failed to write full response JSON to disk: {e}')
+    return response
+
+
+def _create_openai_completion_live(
+    client: OpenAI,
+    model: str,
+    messages: Optional[List[Dict[str, Any]]] = None,
+    prompt: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    max_completion_tokens: Optional[int] = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    json_mode: bool = False,
+    output_file: Optional[str] = None,
+    **kwargs
+) -> Any:
+    """create_openai_completion without the cassette layer: always calls the API."""
     endpoint_type = get_openai_endpoint_type(model)
 
     # Transport-level retries are OFF by default to preserve the pipeline's
@@ -12,24 +12,33 @@ Assets created (examples):
 
 Inside each zip:
   Assets/<TENANT_ID>/Outputs/<topic>/<YYYYMMDD>/<Type>/<filename>
+
+Zips are streamed from the output files (see zip_bundle.py: media is STORED,
+text is DEFLATED), and the per-type zips are built in parallel
+(OUTPUT_ASSETS_ZIP_WORKERS, default: one per type up to the CPU budget).
+Uploads go through release_sync.py, so zips already in the release unchanged
+are not uploaded again.
 """
 
 from __future__ import annotations
 
 import os
-import shutil
 import tempfile
-import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 try:
     # Works when executed from repo root
-    from scripts.tenant_assets import ensure_release, upload_asset
+    from scripts.release_sync import sync_assets
+    from scripts.tenant_assets import GhReleaseStore, ensure_release
+    from scripts.zip_bundle import write_zip
 except Exception:
     # Works when executed from within scripts/
-    from tenant_assets import ensure_release, upload_asset
+    from release_sync import sync_assets
+    from tenant_assets import GhReleaseStore, ensure_release
+    from zip_bundle import write_zip
 
 
 @dataclass(frozen=True)
@@ -96,6 +105,9 @@ def _collect_files(topic_dir: Path, topic: str, date_yyyymmdd: str, patterns: Tu
     seen: set[str] = set()
     out: List[Path] = []
     for f in files:
+        # media_metadata.json: ffprobe store older runs kept in outputs/ (now under .cache/)
+        if f.name == "media_metadata.json":
+            continue
         if f.is_file():
             key = str(f.resolve())
             if key not in seen:
@@ -116,22 +128,23 @@ def build_zip_for_type(
     asset_name = f"Assets_{tid}_{out_type.name}_{topic}_{date_yyyymmdd}.zip"
     zip_path = build_dir / asset_name
 
-    # Create staging folder with desired structure
-    base = build_dir / "Assets" / tid / "Outputs" / topic / date_yyyymmdd / out_type.name
-    base.mkdir(parents=True, exist_ok=True)
-    for f in files:
-        shutil.copy2(f, base / f.name)
+    prefix = f"Assets/{tid}/Outputs/{topic}/{date_yyyymmdd}/{out_type.name}/"
+    write_zip(zip_path, ((f, prefix + f.name) for f in files))
+    return zip_path
 
-    # Zip the Assets/ root
-    assets_root = build_dir / "Assets"
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as z:
-        for p in assets_root.rglob("*"):
-            if p.is_file():
-                z.write(p, p.relative_to(build_dir).as_posix())
 
-    # Cleanup the staging 'Assets' tree, keep zip only
-    shutil.rmtree(assets_root, ignore_errors=True)
-    return zip_path
+def _zip_workers(n_types: int) -> int:
+    raw = (os.environ.get("OUTPUT_ASSETS_ZIP_WORKERS") or "").strip()
+    requested = int(raw) if raw.isdigit() else 0
+    try:
+        try:
+            from scripts.resource_governor import get_governor
+        except Exception:
+            from resource_governor import get_governor
+        workers = get_governor().pool_size(requested or None)
+    except Exception:
+        workers = requested or (os.cpu_count() or 1)
+    return max(1, min(workers, n_types))
 
 
 def publish_outputs_per_type(
@@ -150,14 +163,27 @@ def publish_outputs_per_type(
     if not topic_dir.exists():
         raise FileNotFoundError(f"Topic outputs directory not found: {topic_dir}")
 
-    results: Dict[str, str] = {}
+    built: Dict[str, Path] = {}
+    jobs = []
+    for out_type in OUTPUT_TYPES:
+        files = _collect_files(topic_dir, topic, date_yyyymmdd, out_type.patterns)
+        if files:
+            jobs.append((out_type, files))
+    if not jobs:
+        return {}
+
     with tempfile.TemporaryDirectory(prefix="tenant_outputs_") as td:
         build_dir = Path(td)
-        for out_type in OUTPUT_TYPES:
-            files = _collect_files(topic_dir, topic, date_yyyymmdd, out_type.patterns)
-            if not files:
-                continue
-            zip_path = build_zip_for_type(tid, topic, date_yyyymmdd, out_type, files, build_dir)
-            upload_asset(tag, zip_path, clobber=True)
-            results[out_type.name] = zip_path.name
-    return results
+        with ThreadPoolExecutor(max_workers=_zip_workers(len(jobs))) as pool:
+            futures = [
+                (out_type, pool.submit(build_zip_for_type, tid, topic, date_yyyymmdd, out_type, files, build_dir))
+                for out_type, files in jobs
+            ]
+            for out_type, fut in futures:
+                built[out_type.name] = fut.result()
+        # Zips whose content is already in the release are skipped
+        store = GhReleaseStore(tag, title=f"Tenant Assets ({tid})")
+        stats = sync_assets(store, [(zip_path, zip_path.name) for zip_path in built.values()])
+        if stats["failed"]:
+            raise RuntimeError(f"Failed to upload {stats['failed']} output zip(s) to {tag}")
+    return {name: zip_path.name for name, zip_path in built.items()}
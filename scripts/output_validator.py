@@ -6,12 +6,13 @@ Validates that rendered videos meet the exact specifications defined
 in output_profiles.yml. Used for post-render validation to ensure
 quality and consistency.
 """
-import subprocess
 import json
 from pathlib import Path
 from typing import Dict, Any, Tuple, Optional
 import yaml
 
+from media_probe import audio_stream, probe_media, video_stream
+
 # Path to output profiles configuration
 CONFIG_DIR = Path(__file__).parent.parent / 'config'
 OUTPUT_PROFILES_PATH = CONFIG_DIR / 'output_profiles.yml'
@@ -60,40 +61,21 @@ def get_video_metadata(video_path: Path) -> Dict[str, Any]:
     """
     Extract video metadata using ffprobe.
     
+    The probe result is shared with render and caption burn-in through the
+    media metadata store (see media_probe.py), so a file that was already
+    probed is not probed again.
+    
     Args:
         video_path: Path to video file
         
     Returns:
         Dictionary with video metadata
     """
-    cmd = [
-        'ffprobe',
-        '-v', 'quiet',
-        '-print_format', 'json',
-        '-show_format',
-        '-show_streams',
-        str(video_path)
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    data = json.loads(result.stdout)
-    
-    # Extract relevant information
-    video_stream = None
-    audio_stream = None
-    
-    for stream in data.get('streams', []):
-        if stream.get('codec_type') == 'video' and video_stream is None:
-            video_stream = stream
-        elif stream.get('codec_type') == 'audio' and audio_stream is None:
-            audio_stream = stream
-    
-    format_info = data.get('format', {})
-    
+    info = probe_media(video_path)
     return {
-        'video': video_stream,
-        'audio': audio_stream,
-        'format': format_info
+        'video': video_stream(info),
+        'audio': audio_stream(info),
+        'format': info.get('format', {})
     }
 
 
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Long-running pipeline worker.
+
+Keeps expensive per-process state warm between jobs and runs run_for_topic for
+each job taken from the local queue (job_queue.JobQueue):
+
+  - stage modules imported once (openai/google clients, PIL, yaml)
+  - OpenAI / Gemini / Custom Search / Cloud TTS clients built once per key
+  - YAML configs parsed once per file version
+  - ffmpeg capability probes (_ffmpeg_has_filter, xfade transitions) run once
+  - Piper voice models read once so they stay in the page cache
+
+Usage:
+    python cli.py daemon            # serve until interrupted
+    python cli.py submit --topic topic-01 --modules video --wait
+
+Note: global_config constants are read from the environment once, when the
+daemon starts. Restart the daemon after changing them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from job_queue import Job, JobQueue
+
+
+def _warm(label: str, fn: Callable[[], object], report: Dict[str, str]) -> None:
+    t0 = time.perf_counter()
+    try:
+        fn()
+        report[label] = f"ok ({(time.perf_counter() - t0) * 1000:.0f} ms)"
+    except Exception as e:
+        report[label] = f"skipped: {e}"
+
+
+def _warm_piper_voices() -> None:
+    from global_config import PIPER_VOICE_DIR, PIPER_VOICE_MAP
+
+    voice_dir = Path(os.path.expanduser(PIPER_VOICE_DIR))
+    voices = {v for qualities in PIPER_VOICE_MAP.values() for v in qualities.values()}
+    for voice in sorted(voices):
+        model = voice_dir / f"{voice}.onnx"
+        if model.exists():
+            with open(model, "rb") as f:
+                while f.read(1 << 20):
+                    pass
+
+
+def _warm_clients() -> None:
+    if os.getenv("OPENAI_API_KEY") or os.getenv("GPT_KEY"):
+        import responses_api_generator as rag
+        rag._get_openai_client(
+            os.getenv("OPENAI_API_KEY") or os.getenv("GPT_KEY"),
+            float(os.getenv("OPENAI_TIMEOUT", "600")),
+            int(os.getenv("OPENAI_MAX_RETRIES", "0")),
+        )
+    if os.getenv("GOOGLE_API_KEY"):
+        import gemini_utils
+        gemini_utils._get_client()
+    search_key = os.getenv("GOOGLE_CUSTOM_SEARCH_API_KEY")
+    if search_key:
+        import image_collector
+        image_collector.get_search_service(search_key)
+
+
+def warm_up() -> Dict[str, str]:
+    """Pre-load modules, configs, probes and clients; returns a status per item."""
+    import run_pipeline
+
+    report: Dict[str, str] = {}
+    for name in run_pipeline._LAZY_STAGE_MODULES:
+        _warm(f"import {name}", lambda name=name: run_pipeline._stage(name), report)
+    _warm("import image_collector", lambda: __import__("image_collector"), report)
+
+    import video_render
+    from captions import burner
+
+    repo_root = Path(__file__).resolve().parent.parent
+    _warm("video templates config", lambda: video_render.load_video_template_config(repo_root), report)
+    _warm("ffmpeg effects config", video_render.load_ffmpeg_effects_config, report)
+    _warm("ffmpeg xfade transitions", video_render.get_available_xfade_transitions, report)
+    _warm("ffmpeg filters", lambda: burner._ffmpeg_has_filter("subtitles"), report)
+    _warm("API clients", _warm_clients, report)
+    _warm("piper voices", _warm_piper_voices, report)
+    return report
+
+
+def run_job(job: Job) -> bool:
+    """Run one queued job in-process, scoping TENANT_ID to the job."""
+    from run_pipeline import run_for_topic
+
+    saved = {k: os.environ.get(k) for k in ("TENANT_ID", "USE_TENANT_OUTPUTS")}
+    try:
+        if job.tenant:
+            os.environ["TENANT_ID"] = str(job.tenant).strip()
+            os.environ.setdefault("USE_TENANT_OUTPUTS", "true")
+        opts = job.options or {}
+        return run_for_topic(
+            job.topic_id,
+            job.date_str,
+            modules=job.modules,
+            skip_validation=bool(opts.get("skip_validation", False)),
+            force=bool(opts.get("force", False)),
+            commit_each_module=opts.get("commit_each_module"),
+        )
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def serve(
+    queue: JobQueue,
+    *,
+    poll_interval: float = 1.0,
+    once: bool = False,
+    max_jobs: Optional[int] = None,
+    warm: bool = True,
+) -> int:
+    """Process jobs until interrupted. once=True drains the queue and returns."""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    if warm:
+        print("Warming pipeline daemon...")
+        for label, status in warm_up().items():
+            print(f"  {label}: {status}")
+    print(f"Pipeline daemon {worker} serving {queue.db_path}")
+    requeued = queue.requeue_orphaned()
+    if requeued:
+        print(f"  ⚠ Requeued {len(requeued)} job(s) left running by a stopped daemon: {requeued}")
+
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = queue.claim(worker)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Job {job.id}: {job.topic_id} {job.date_str or ''} modules={job.modules or 'all'}")
+        t0 = time.perf_counter()
+        error = None
+        try:
+            ok = run_job(job)
+        except Exception as e:
+            ok = False
+            error = f"{e}\n{traceback.format_exc()}"
+        queue.complete(job.id, ok, error)
+        processed += 1
+        print(f"Job {job.id}: {'done' if ok else 'failed'} in {time.perf_counter() - t0:.1f}s")
+    return processed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Pipeline worker daemon")
+    ap.add_argument("--queue", default=None, help="Queue DB path (default: PIPELINE_QUEUE_DB or .cache/pipeline_queue.sqlite)")
+    ap.add_argument("--poll-interval", type=float, default=1.0)
+    ap.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    ap.add_argument("--no-warm", action="store_true", help="Skip warm-up")
+    args = ap.parse_args()
+
+    queue = JobQueue(Path(args.queue) if args.queue else None)
+    try:
+        serve(queue, poll_interval=args.poll_interval, once=args.once, warm=not args.no_warm)
+    except KeyboardInterrupt:
+        print("Pipeline daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Daily API quota ledger shared by concurrent processes.
+
+The ledger is the usage tracking JSON file ({'date', 'count', 'reservations',
+'cache'}); 'cache' holds today's search result cache hits and misses.
+Every read-modify-write holds an exclusive flock on a sidecar lock file and
+replaces the JSON atomically, so parallel topics no longer lose counts.
+
+Collectors reserve quota before paginating and consume it as pages come back:
+
+    with ledger.reserve(100) as r:        # granted <= 100, fair share of what is left
+        while r.remaining > 0:
+            items = fetch_page()
+            r.consume(len(items))         # moves usage from reserved to counted
+    # unused remainder is released on exit
+
+A reservation grants at most an equal share of the unreserved quota among the
+collectors currently holding reservations (plus the new one), so one topic
+cannot starve the others. Reservations of dead processes, or older than
+RESERVATION_TTL_SECONDS, are dropped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: in-process locking only
+    fcntl = None
+
+
+RESERVATION_TTL_SECONDS = 3600
+
+_THREAD_LOCK = threading.Lock()
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class QuotaReservation:
+    """Quota held by one collector; see QuotaLedger.reserve."""
+
+    def __init__(self, ledger: "QuotaLedger", rid: str, granted: int):
+        self.ledger = ledger
+        self.id = rid
+        self.granted = granted
+        self.used = 0
+        self.closed = False
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.granted - self.used)
+
+    def consume(self, n: int) -> None:
+        """Record n results as used (counted even if they exceed the grant)."""
+        n = max(0, int(n))
+        if n == 0:
+            return
+        self.used += n
+        self.ledger._apply(self.id, used=n, remaining=self.remaining)
+
+    def release(self) -> None:
+        """Return the unused remainder to the pool."""
+        if not self.closed:
+            self.closed = True
+            self.ledger._apply(self.id, used=0, remaining=0)
+
+    def __enter__(self) -> "QuotaReservation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class QuotaLedger:
+    """Locked JSON ledger of today's usage and outstanding reservations."""
+
+    def __init__(self, path: Path, daily_limit: int):
+        self.path = Path(path)
+        self.daily_limit = int(daily_limit)
+
+    @property
+    def lock_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".lock")
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """Yield today's ledger state under an exclusive lock; changes are written back."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _THREAD_LOCK, open(self.lock_path, "a+") as lock_f:
+            if fcntl is not None:
+                fcntl.flock(lock_f.fileno(), fcntl.LOCK_EX)
+            try:
+                state = self._read()
+                before = json.dumps(state, sort_keys=True)
+                yield state
+                if json.dumps(state, sort_keys=True) != before:
+                    self._write(state)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_f.fileno(), fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Any]:
+        today = date.today().isoformat()
+        fresh = {"date": today, "count": 0, "reservations": {}, "cache": {"hits": 0, "misses": 0}}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return fresh
+        if not isinstance(data, dict) or data.get("date") != today:
+            return fresh
+        data["count"] = int(data.get("count") or 0)
+        res = data.get("reservations")
+        data["reservations"] = res if isinstance(res, dict) else {}
+        cache = data.get("cache") if isinstance(data.get("cache"), dict) else {}
+        data["cache"] = {"hits": int(cache.get("hits") or 0), "misses": int(cache.get("misses") or 0)}
+        self._prune(data)
+        return data
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _prune(state: Dict[str, Any]) -> None:
+        now = time.time()
+        for rid, r in list(state["reservations"].items()):
+            if (
+                not isinstance(r, dict)
+                or int(r.get("remaining") or 0) <= 0
+                or float(r.get("expires_at") or 0) < now
+                or not _pid_alive(int(r.get("pid") or 0))
+            ):
+                del state["reservations"][rid]
+
+    @staticmethod
+    def _reserved(state: Dict[str, Any]) -> int:
+        return sum(int(r.get("remaining") or 0) for r in state["reservations"].values())
+
+    # -- public API ------------------------------------------------------
+
+    def usage(self) -> Dict[str, Any]:
+        """{'date', 'count', 'reserved', 'cache_hits', 'cache_misses'} for today."""
+        with self._locked() as state:
+            return {
+                "date": state["date"],
+                "count": state["count"],
+                "reserved": self._reserved(state),
+                "cache_hits": state["cache"]["hits"],
+                "cache_misses": state["cache"]["misses"],
+            }
+
+    def add(self, n: int) -> None:
+        """Count n results used outside any reservation."""
+        with self._locked() as state:
+            state["count"] += int(n)
+
+    def record_cache(self, hits: int, misses: int) -> None:
+        """Count search result pages served from (hits) or missing in (misses) the cache."""
+        if hits <= 0 and misses <= 0:
+            return
+        with self._locked() as state:
+            state["cache"]["hits"] += max(0, int(hits))
+            state["cache"]["misses"] += max(0, int(misses))
+
+    def available(self, exclude: Optional[str] = None) -> int:
+        """Unreserved quota left today (exclude: ignore this reservation's hold)."""
+        with self._locked() as state:
+            reserved = self._reserved(state)
+            if exclude and exclude in state["reservations"]:
+                reserved -= int(state["reservations"][exclude].get("remaining") or 0)
+            return max(0, self.daily_limit - state["count"] - reserved)
+
+    def reserve(self, requested: int, owner: str = "") -> QuotaReservation:
+        """Reserve up to `requested` results (fair share; granted may be 0)."""
+        rid = uuid.uuid4().hex
+        with self._locked() as state:
+            free = max(0, self.daily_limit - state["count"] - self._reserved(state))
+            holders = len(state["reservations"])
+            share = -(-free // (holders + 1)) if holders else free
+            granted = max(0, min(int(requested), share))
+            if granted:
+                state["reservations"][rid] = {
+                    "remaining": granted,
+                    "owner": owner,
+                    "pid": os.getpid(),
+                    "expires_at": time.time() + RESERVATION_TTL_SECONDS,
+                }
+        return QuotaReservation(self, rid, granted)
+
+    def _apply(self, rid: str, used: int, remaining: int) -> None:
+        with self._locked() as state:
+            state["count"] += used
+            if remaining > 0 and rid in state["reservations"]:
+                state["reservations"][rid]["remaining"] = remaining
+            else:
+                state["reservations"].pop(rid, None)
+
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Upload a set of files to a release, transferring only what changed.
+
+sync_assets(store, [(path, asset_name), ...]) lists the release's assets once
+and skips every file whose remote asset has the same size and sha256. The
+sha256 comes from GitHub's asset digest when reported, otherwise from the
+upload manifest written by earlier runs. The remaining files are uploaded in
+parallel (RELEASE_UPLOAD_WORKERS, default 4) with retries and exponential
+backoff (RELEASE_UPLOAD_ATTEMPTS, default 3).
+
+The manifest (.cache/release_uploads/<tag>.json) records name -> size, sha256
+and source for every asset known to be in the release. It is rewritten after
+each successful upload, so an interrupted run resumes where it stopped.
+
+With prune=True, assets not in the given set are deleted afterwards, so the
+release ends up holding exactly these files without re-uploading unchanged
+ones.
+
+`store` is a tenant_assets release store (GhReleaseStore, LocalReleaseStore).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import get_repo_root
+from content_hash import get_hash_index
+
+
+MANIFEST_VERSION = 1
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    return int(raw) if raw.isdigit() and int(raw) > 0 else default
+
+
+def upload_workers() -> int:
+    return _env_int("RELEASE_UPLOAD_WORKERS", 4)
+
+
+def upload_attempts() -> int:
+    return _env_int("RELEASE_UPLOAD_ATTEMPTS", 3)
+
+
+def default_manifest_path(tag: str) -> Path:
+    return get_repo_root() / ".cache" / "release_uploads" / f"{tag}.json"
+
+
+def _load_manifest(path: Path) -> Dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    assets = data.get("assets")
+    return assets if isinstance(assets, dict) else {}
+
+
+def _save_manifest(path: Path, tag: str, assets: Dict[str, dict]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        payload = {"version": MANIFEST_VERSION, "tag": tag, "assets": assets}
+        tmp.write_text(json.dumps(payload, sort_keys=True, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"  ⚠ Failed to write upload manifest (non-fatal): {e}")
+
+
+def _upload_with_retry(store, path: Path, name: str, staging: Path, attempts: int) -> None:
+    # Assets are named after the uploaded file, so stage a link under the asset name
+    src = path
+    if path.name != name:
+        src = staging / name
+        if not src.exists():
+            src.symlink_to(path.resolve())
+    for attempt in range(attempts):
+        try:
+            store.upload(src, clobber=True)
+            return
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            wait = 2 ** attempt  # 1s, 2s, 4s, ...
+            print(f"  ⚠ Upload of {name} failed (attempt {attempt + 1}/{attempts}): {e}; retrying in {wait}s")
+            time.sleep(wait)
+
+
+def sync_assets(
+    store,
+    files: Iterable[Tuple[Path, str]],
+    *,
+    prune: bool = False,
+    manifest_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+    attempts: Optional[int] = None,
+) -> Dict[str, int]:
+    """Make the release hold files (path, asset name), uploading only changed content.
+
+    A later file with the same asset name replaces an earlier one. Returns
+    counts: uploaded, skipped, failed, deleted, uploaded_bytes.
+    """
+    wanted: Dict[str, Path] = {}
+    for path, name in files:
+        wanted[name] = Path(path)
+
+    manifest_path = manifest_path or default_manifest_path(store.tag)
+    manifest = _load_manifest(manifest_path)
+    remote = store.list_assets()
+    # Drop manifest entries for assets that are gone or were replaced behind our back
+    manifest = {n: e for n, e in manifest.items() if n in remote and remote[n].get("size") == e.get("size")}
+
+    hash_index = get_hash_index()
+    stats = {"uploaded": 0, "skipped": 0, "failed": 0, "deleted": 0, "uploaded_bytes": 0}
+    pending = []
+    for name, path in wanted.items():
+        size = path.stat().st_size
+        digest = hash_index.hash_file(path, "sha256")
+        r = remote.get(name)
+        known = None
+        if r and r.get("size") == size:
+            known = r.get("digest") or (manifest.get(name) or {}).get("sha256")
+        if known == digest:
+            stats["skipped"] += 1
+            manifest[name] = dict(manifest.get(name) or {}, size=size, sha256=digest)
+        else:
+            pending.append((name, path, size, digest))
+    hash_index.save()
+
+    attempts = attempts or upload_attempts()
+    if pending:
+        print(f"  ⬆ Uploading {len(pending)} of {len(wanted)} asset(s) to {store.tag} ({stats['skipped']} unchanged)")
+        with tempfile.TemporaryDirectory(prefix="release_sync_") as td, \
+                ThreadPoolExecutor(max_workers=max(1, min(workers or upload_workers(), len(pending)))) as pool:
+            futures = {
+                pool.submit(_upload_with_retry, store, path, name, Path(td), attempts): (name, path, size, digest)
+                for name, path, size, digest in pending
+            }
+            for fut in as_completed(futures):
+                name, path, size, digest = futures[fut]
+                try:
+                    fut.result()
+                except Exception as e:
+                    print(f"  ✗ Upload of {name} failed: {e}")
+                    stats["failed"] += 1
+                    continue
+                manifest[name] = {
+                    "size": size,
+                    "sha256": digest,
+                    "source": str(path),
+                    "uploaded_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                stats["uploaded"] += 1
+                stats["uploaded_bytes"] += size
+                _save_manifest(manifest_path, store.tag, manifest)
+
+    if prune:
+        for name in sorted(set(remote) - set(wanted)):
+            if store.delete(name):
+                stats["deleted"] += 1
+                manifest.pop(name, None)
+
+    _save_manifest(manifest_path, store.tag, manifest)
+    return stats
@@ -8,11 +8,13 @@ Workflow requirement:
 
 Goal:
 - Releases must contain ONLY final burned MP4 videos as flat assets (no folders, no zips, no archives).
-- Even if other steps/modules uploaded .zip assets earlier, this script deletes ALL existing release assets first,
-  then uploads ONLY the selected MP4s.
+- Even if other steps/modules uploaded .zip assets earlier, this script deletes every release asset that is not
+  one of the selected MP4s.
+- Videos already in the release with the same size and sha256 are not uploaded again; the rest are uploaded in
+  parallel with retries (see release_sync.py: RELEASE_UPLOAD_WORKERS, RELEASE_UPLOAD_ATTEMPTS).
 
 Behavior controls (env):
-- RESET_RELEASE_ASSETS: default "1" => delete all existing assets on the release before uploading videos
+- RESET_RELEASE_ASSETS: default "1" => delete all other existing assets on the release after uploading videos
 - RENAME_ASSETS_TO_CODE: default "1" => rename assets to "<CODE>.mp4" (e.g., "R8.mp4") stripping topic/date/tenant/etc.
 - FINAL_VIDEO_GLOB: default "outputs/**/*.mp4" => where to find candidate mp4s
 - FINAL_VIDEO_EXCLUDE_PATTERNS: default "raw,tts,images,script,subs,subtitle,caption,debug,tmp,preview" (comma-separated)
@@ -28,6 +30,9 @@ import pathlib
 import subprocess
 from typing import List, Optional
 
+from release_sync import sync_assets
+from tenant_assets import GhReleaseStore
+
 
 def _run(cmd: List[str], check: bool = True) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, check=check, text=True, capture_output=True)
@@ -38,13 +43,6 @@ def _env_flag(name: str, default: str = "0") -> bool:
     return v in ("1", "true", "yes", "y", "on")
 
 
-def _get_repo() -> str:
-    repo = os.getenv("GITHUB_REPOSITORY", "").strip()
-    if not repo:
-        raise RuntimeError("GITHUB_REPOSITORY is not set")
-    return repo
-
-
 def _get_tag() -> str:
     tag = os.getenv("RELEASE_TAG", "").strip()
     if not tag:
@@ -71,23 +69,6 @@ def _get_release_json(tag: str) -> Optional[dict]:
         return None
 
 
-def _delete_all_assets(tag: str) -> None:
-    rel = _get_release_json(tag)
-    if not rel:
-        return
-    assets = rel.get("assets") or []
-    for a in assets:
-        asset_id = a.get("id")
-        name = a.get("name")
-        if not asset_id:
-            continue
-        try:
-            _run(["gh", "api", "-X", "DELETE", f"repos/{_get_repo()}/releases/assets/{asset_id}"])
-            print(f"[release] deleted asset: {name}")
-        except subprocess.CalledProcessError as e:
-            print(f"[release] WARN failed to delete asset {name}: {e.stderr.strip() if e.stderr else e}", file=sys.stderr)
-
-
 def _ensure_release_exists(tag: str) -> None:
     rel = _get_release_json(tag)
     if rel:
@@ -141,11 +122,8 @@ def main() -> int:
 
     _ensure_release_exists(tag)
 
-    if reset_assets:
-        print("[release] Resetting release assets: deleting ALL existing assets first...")
-        _delete_all_assets(tag)
-
     used_names = set()
+    files = []
     for p in videos:
         name = _asset_name_from_path(p) if rename_to_code else os.path.basename(p)
         if name in used_names:
@@ -155,13 +133,17 @@ def main() -> int:
                 i += 1
             name = f"{stem}_{i}.mp4"
         used_names.add(name)
+        files.append((pathlib.Path(p), name))
 
-        spec = f"{p}#{name}"
-        print(f"[release] upload: {spec}")
-        _run(["gh", "release", "upload", tag, spec, "--clobber"])
-
-    print(f"[release] Done. Uploaded {len(videos)} video(s).")
-    return 0
+    if reset_assets:
+        print("[release] Resetting release assets: assets other than these videos will be deleted")
+    stats = sync_assets(GhReleaseStore(tag, title=tag), files, prune=reset_assets)
+
+    print(
+        f"[release] Done. {len(videos)} video(s): uploaded {stats['uploaded']}, "
+        f"unchanged {stats['skipped']}, failed {stats['failed']}, deleted {stats['deleted']} other asset(s)."
+    )
+    return 1 if stats["failed"] else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Process-wide CPU/memory budget for ffmpeg encodes, Piper workers and pools.
+
+Left alone, every libx264 encode spawns a thread per core and every Piper chunk
+worker assumes it owns the machine, so running TTS alongside encodes thrashes.
+The governor hands out thread and memory tokens from a budget sized to what the
+process may actually use (cgroup quota, CPU affinity, cgroup memory limit):
+
+    with get_governor().acquire(threads=cores, min_threads=1, mem_mb=1024) as grant:
+        cmd = apply_ffmpeg_thread_budget(cmd, grant.threads)
+        subprocess.run(cmd, ...)
+
+A grant blocks until at least min_threads and mem_mb are free and then takes up
+to `threads`, so an encode started while four Piper workers run gets the
+remaining cores instead of oversubscribing.
+
+Overrides: RESOURCE_CPU_LIMIT, RESOURCE_MEMORY_LIMIT_MB (0 = auto-detect).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from global_config import (
+    RESOURCE_CPU_LIMIT, RESOURCE_MEMORY_LIMIT_MB,
+    FFMPEG_ENCODE_MEM_MB, PIPER_PROCESS_MEM_MB,
+)
+
+
+_CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def detect_cpu_limit(cgroup_root: Path = _CGROUP_ROOT) -> int:
+    """Usable CPUs: min of affinity mask and cgroup v2/v1 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+
+    quota_cpus: Optional[float] = None
+    v2 = _read_text(cgroup_root / "cpu.max")
+    if v2:
+        parts = v2.split()
+        if len(parts) == 2 and parts[0] != "max":
+            try:
+                quota_cpus = int(parts[0]) / int(parts[1])
+            except (ValueError, ZeroDivisionError):
+                pass
+    else:
+        quota = _read_text(cgroup_root / "cpu" / "cpu.cfs_quota_us")
+        period = _read_text(cgroup_root / "cpu" / "cpu.cfs_period_us")
+        try:
+            if quota and period and int(quota) > 0:
+                quota_cpus = int(quota) / int(period)
+        except (ValueError, ZeroDivisionError):
+            pass
+
+    if quota_cpus is not None:
+        cpus = min(cpus, max(1, int(quota_cpus)))
+    return max(1, cpus)
+
+
+def detect_memory_limit_mb(cgroup_root: Path = _CGROUP_ROOT) -> int:
+    """Usable memory in MB: cgroup limit if set, else physical RAM."""
+    physical = 0
+    try:
+        physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        pass
+
+    limit = 0
+    for path in (cgroup_root / "memory.max", cgroup_root / "memory" / "memory.limit_in_bytes"):
+        raw = _read_text(path)
+        if raw and raw != "max":
+            try:
+                value = int(raw) // (1024 * 1024)
+            except ValueError:
+                continue
+            # cgroup v1 reports a huge sentinel when unlimited
+            if value > 0 and (physical == 0 or value < physical):
+                limit = value
+            break
+
+    return max(256, limit or physical or 4096)
+
+
+@dataclass
+class Grant:
+    threads: int
+    mem_mb: int
+
+
+class ResourceGovernor:
+    """Thread/memory token pool shared by everything this process spawns."""
+
+    def __init__(self, cpus: int, memory_mb: int):
+        self.total_threads = max(1, int(cpus))
+        self.total_mem_mb = max(1, int(memory_mb))
+        self._free_threads = self.total_threads
+        self._free_mem_mb = self.total_mem_mb
+        self._cond = threading.Condition()
+
+    @property
+    def free_threads(self) -> int:
+        with self._cond:
+            return self._free_threads
+
+    def _take(self, threads: int, min_threads: int, mem_mb: int, timeout: Optional[float]) -> Grant:
+        min_threads = max(1, min(min_threads, threads, self.total_threads))
+        threads = max(min_threads, min(threads, self.total_threads))
+        mem_mb = max(0, min(mem_mb, self.total_mem_mb))
+        with self._cond:
+            ok = self._cond.wait_for(
+                lambda: self._free_threads >= min_threads and self._free_mem_mb >= mem_mb,
+                timeout=timeout,
+            )
+            if not ok:
+                raise TimeoutError(f"No resources for {min_threads} thread(s) / {mem_mb} MB")
+            granted = min(threads, self._free_threads)
+            self._free_threads -= granted
+            self._free_mem_mb -= mem_mb
+            return Grant(granted, mem_mb)
+
+    def _give(self, grant: Grant) -> None:
+        with self._cond:
+            self._free_threads += grant.threads
+            self._free_mem_mb += grant.mem_mb
+            self._cond.notify_all()
+
+    @contextmanager
+    def acquire(
+        self,
+        threads: int = 1,
+        *,
+        min_threads: int = 1,
+        mem_mb: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Grant]:
+        """Hold up to `threads` tokens (at least min_threads) and mem_mb for the block."""
+        grant = self._take(threads, min_threads, mem_mb, timeout)
+        try:
+            yield grant
+        finally:
+            self._give(grant)
+
+    @contextmanager
+    def encode_slot(self, mem_mb: Optional[int] = None) -> Iterator[Grant]:
+        """Grant for one ffmpeg/x264 encode: whatever cores are free, at least one."""
+        mem = FFMPEG_ENCODE_MEM_MB if mem_mb is None else mem_mb
+        with self.acquire(self.total_threads, min_threads=1, mem_mb=mem) as grant:
+            yield grant
+
+    @contextmanager
+    def piper_slot(self) -> Iterator[Grant]:
+        """Grant for one Piper synthesis process."""
+        with self.acquire(1, mem_mb=PIPER_PROCESS_MEM_MB) as grant:
+            yield grant
+
+    def piper_concurrency(self, requested: int) -> int:
+        """Cap Piper worker count by cores and by memory per Piper process."""
+        by_mem = self.total_mem_mb // max(1, PIPER_PROCESS_MEM_MB)
+        return max(1, min(int(requested), self.total_threads, by_mem))
+
+    def pool_size(self, requested: Optional[int] = None, mem_mb_per_worker: int = 0) -> int:
+        """Worker count for CPU-bound preprocessing pools."""
+        size = self.total_threads if not requested else min(int(requested), self.total_threads)
+        if mem_mb_per_worker > 0:
+            size = min(size, self.total_mem_mb // mem_mb_per_worker)
+        return max(1, size)
+
+
+def apply_ffmpeg_thread_budget(cmd: List[str], threads: int) -> List[str]:
+    """Return cmd with encoder/filter thread counts pinned to `threads`.
+
+    `-threads` placed as an output option sets libx264's `threads`; filter
+    graph threads are capped as well. Existing values are replaced. The last
+    element of cmd is assumed to be the output path.
+    """
+    n = str(max(1, int(threads)))
+    out = list(cmd)
+    for flag in ("-threads", "-filter_complex_threads", "-filter_threads"):
+        while flag in out:
+            i = out.index(flag)
+            del out[i:i + 2]
+    extra = ["-threads", n]
+    if "-filter_complex" in out:
+        # global option: must precede the inputs
+        out[1:1] = ["-filter_complex_threads", n]
+    elif "-vf" in out:
+        out[1:1] = ["-filter_threads", n]
+    return out[:-1] + extra + out[-1:]
+
+
+_GOVERNOR: Optional[ResourceGovernor] = None
+_GOVERNOR_LOCK = threading.Lock()
+
+
+def get_governor() -> ResourceGovernor:
+    """Process-wide governor, sized on first use."""
+    global _GOVERNOR
+    with _GOVERNOR_LOCK:
+        if _GOVERNOR is None:
+            cpus = RESOURCE_CPU_LIMIT or detect_cpu_limit()
+            mem = RESOURCE_MEMORY_LIMIT_MB or detect_memory_limit_mb()
+            _GOVERNOR = ResourceGovernor(cpus, mem)
+        return _GOVERNOR
@@ -56,17 +56,30 @@ try:
 except Exception:  # pragma: no cover
     OpenAI = None  # type: ignore
 
-from model_limits import clamp_output_tokens, default_max_output_tokens
+from model_limits import (
+    clamp_output_tokens,
+    count_tokens,
+    default_max_output_tokens,
+    fit_text_to_tokens,
+    prompt_token_budget,
+    tokens_per_word as measure_tokens_per_word,
+)
+from http_clients import get_openai_client
 from openai_utils import create_openai_completion, extract_completion_text
 
 try:
-    from gemini_utils import gemini_generate_once  # type: ignore
+    from gemini_utils import gemini_generate_chunked, gemini_generate_once, gemini_generate_parallel  # type: ignore
 except Exception:  # pragma: no cover
     gemini_generate_once = None  # type: ignore
-    gemini_generate_once = None  # type: ignore
+    gemini_generate_chunked = None  # type: ignore
+    gemini_generate_parallel = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+def _get_openai_client(api_key: Optional[str], timeout_s: float, max_retries: int):
+    """Shared OpenAI client (http_clients registry); reused across passes and topics in one process."""
+    return get_openai_client(api_key, timeout_s, max_retries)
+
 
 # ---------------------------------------------------------------------------
 # Small utilities
@@ -692,7 +705,8 @@ def _make_mock_outputs_from_source_text(config: Dict[str, Any], enabled_specs: L
         "video_description": _as_str(raw.get("video_description") or raw.get("description") or ""),
         "video_tags": _as_str(raw.get("video_tags") or raw.get("tags") or ""),
         }]
-    # Gemini: enforce ONE request total and bypass Pass A/B entirely.
+    # Gemini: bypass Pass A/B. One JSON request for all items, continued if truncated,
+    # or one request per item with GEMINI_PARALLEL_ITEMS (see _run_gemini_single_pass_all_v2)
     if _is_gemini_config(config):
         sources_in = sources if isinstance(sources, list) else []
         a_specs, b_specs = _enabled_specs_from_content_specs(config.get("content_specs") or [])
@@ -704,14 +718,16 @@ def _make_mock_outputs_from_source_text(config: Dict[str, Any], enabled_specs: L
 
     long_specs, nonlong_specs = _enabled_specs_from_content_specs(enabled_specs)
 
-    # Gemini: modern single request only (no Pass A / Pass B; no chunking; no continuations)
+    # Gemini: no Pass A / Pass B. One JSON request for all items, continued if truncated,
+    # or one request per item with GEMINI_PARALLEL_ITEMS (see _run_gemini_single_pass_all_v2)
     if _is_gemini_model(_pick_model_pass_b(config)):
         all_specs = list(long_specs) + list(nonlong_specs)
         out_all = _run_gemini_single_pass_all_v2(client, config, all_specs, sources_in)
         return {"content": out_all.get("content", []), "sources": sources_in, "pass_a_raw_text": ""}
 
 
-    # Gemini: single request only. Generate ALL items (including long/L1) in one response.
+    # Gemini: ALL items (including long/L1) in one JSON response, continued if truncated
+    # (or per item with GEMINI_PARALLEL_ITEMS).
     if _is_gemini_model(_pick_model_pass_b(config)):
         all_specs = list(long_specs) + list(nonlong_specs)
         out_all = _run_gemini_single_pass_all_v2(client, config, all_specs, sources_in)
@@ -827,7 +843,9 @@ def _gemini_part_tokens(env_key: str, default: int) -> int:
 def _gemini_generate_text(*, model: str, prompt: str, json_mode: bool) -> str:
     """Gemini generation (single request).
 
-    IMPORTANT: Exactly ONE HTTP request per call (no chunking / continuation).
+    Exactly ONE HTTP request per call (no continuation). Script content goes through
+    _run_gemini_single_pass_all_v2 instead, which continues truncated output and can
+    fan out per item.
     """
     if gemini_generate_once is None:
         raise ImportError(
@@ -1069,12 +1087,26 @@ def _parse_pass_a_text(pass_a_text: str) -> Tuple[str, str]:
 
 
 
-def _estimate_max_output_tokens_from_specs(specs: list[dict], *, tokens_per_word: float = 2.2, overhead: int = 2500, floor: int = 4096) -> int:
+def _estimate_max_output_tokens_from_specs(
+    specs: list[dict],
+    *,
+    model: str | None = None,
+    sample_text: str = "",
+    tokens_per_word: float | None = None,
+    unmeasured_tokens_per_word: float = 2.2,
+    overhead: int = 2500,
+    floor: int = 4096,
+) -> int:
     """Estimate an appropriate `max_output_tokens` for a set of requested content specs.
 
     This is a reliability guard: requesting the *model maximum* output tokens for every call increases the chance
     of network/proxy disconnects on long-running responses. Instead, we size the budget to what the request
     actually needs (still within the model's hard cap), while allowing an explicit override via config/env.
+
+    Tokens per word are measured with the model's tokenizer on `sample_text` (text like the expected output, e.g.
+    the Pass A script for Pass B) unless given; the result is doubled for reasoning tokens and word-count drift.
+    Without a usable sample, `unmeasured_tokens_per_word` applies: the factors these budgets used before token
+    counting (2.2 for Pass A, 2.0 for Pass B), which have been enough in practice, reasoning included.
     """
     total_words = 0
     for s in specs or []:
@@ -1085,10 +1117,33 @@ def _estimate_max_output_tokens_from_specs(specs: list[dict], *, tokens_per_word
         if mw > 0:
             total_words += mw
 
+    if tokens_per_word is None:
+        tokens_per_word = measure_tokens_per_word(sample_text, model, default=unmeasured_tokens_per_word)
     est = int((int(total_words * tokens_per_word) + int(overhead)) * 2)
     if est < floor:
         est = floor
     return est
+
+
+def _fit_pass_b_prompt(
+    config: Dict[str, Any],
+    nonlong_specs: List[Dict[str, Any]],
+    sources_text: str,
+    script_text: str,
+    model: str,
+    max_out: int,
+) -> str:
+    """Pass B prompt, with the long script shortened if the prompt would not fit next to max_out."""
+    prompt = _build_pass_b_prompt_from_pass_a(config, nonlong_specs, sources_text, script_text)
+    overflow = count_tokens(prompt, model, exact=True) - prompt_token_budget(model, max_out)
+    if overflow <= 0:
+        return prompt
+    script_tokens = count_tokens(script_text, model, exact=True)
+    logger.warning(f"Pass B prompt exceeds the context window of {model} by {overflow} tokens; shortening LONG_SCRIPT.")
+    script_text = fit_text_to_tokens(script_text, max(0, script_tokens - overflow), model)
+    return _build_pass_b_prompt_from_pass_a(config, nonlong_specs, sources_text, script_text)
+
+
 # ---------------------------------------------------------------------------
 # Pass runners (real OpenAI paths)
 # ---------------------------------------------------------------------------
@@ -1104,7 +1159,7 @@ def _run_pass_a(
     model = _pick_model_pass_a(config)
     prompt = _build_pass_a_prompt(config, long_specs)
 
-    # Gemini path (chunked to fit CI constraints).
+    # Gemini path (one request; plain-text output).
     if _is_gemini_model(model):
         raw_text = _gemini_generate_text(model=model, prompt=prompt, json_mode=False)
         raw_text = raw_text.strip() if isinstance(raw_text, str) else ""
@@ -1115,12 +1170,12 @@ def _run_pass_a(
     requested_cfg = config.get("pass_a_max_output_tokens")
     force_max = str(os.getenv("OPENAI_FORCE_MAX_OUTPUT", "false")).strip().lower() in ("1", "true", "yes", "y")
     if requested_cfg is None and not force_max:
-        requested_out = _estimate_max_output_tokens_from_specs(long_specs)
+        requested_out = _estimate_max_output_tokens_from_specs(long_specs, model=model)
     else:
         # Respect explicit config override, but optionally cap oversize values unless force_max is set.
         requested_out = _safe_int(requested_cfg, default_max_output_tokens(model))
         if not force_max:
-            est = _estimate_max_output_tokens_from_specs(long_specs)
+            est = _estimate_max_output_tokens_from_specs(long_specs, model=model)
             if requested_out > int(est * 1.8):
                 logger.warning(f"pass_a_max_output_tokens={requested_out} is far above estimated need ({est}); capping to estimate for stability. Set OPENAI_FORCE_MAX_OUTPUT=true to override.")
                 requested_out = est
@@ -1185,15 +1240,16 @@ def _run_pass_b_from_pass_a(
     requested_cfg = config.get("pass_b_max_output_tokens")
     force_max = str(os.getenv("OPENAI_FORCE_MAX_OUTPUT", "false")).strip().lower() in ("1", "true", "yes", "y")
     if requested_cfg is None and not force_max:
-        requested_out = _estimate_max_output_tokens_from_specs(nonlong_specs, tokens_per_word=2.0, overhead=1800, floor=2048)
+        requested_out = _estimate_max_output_tokens_from_specs(nonlong_specs, model=model, sample_text=script_text, unmeasured_tokens_per_word=2.0, overhead=1800, floor=2048)
     else:
         requested_out = _safe_int(requested_cfg, default_max_output_tokens(model))
         if not force_max:
-            est = _estimate_max_output_tokens_from_specs(nonlong_specs, tokens_per_word=2.0, overhead=1800, floor=2048)
+            est = _estimate_max_output_tokens_from_specs(nonlong_specs, model=model, sample_text=script_text, unmeasured_tokens_per_word=2.0, overhead=1800, floor=2048)
             if requested_out > int(est * 2.0):
                 logger.warning(f"pass_b_max_output_tokens={requested_out} is far above estimated need ({est}); capping to estimate for stability. Set OPENAI_FORCE_MAX_OUTPUT=true to override.")
                 requested_out = est
     max_out = clamp_output_tokens(model, requested_out)
+    prompt = _fit_pass_b_prompt(config, nonlong_specs, sources_text, script_text, model, max_out)
 
     resp = create_openai_completion(
         client=client,
@@ -1309,11 +1365,11 @@ def _run_single_pass_b(
     requested_cfg = config.get("pass_b_max_output_tokens")
     force_max = str(os.getenv("OPENAI_FORCE_MAX_OUTPUT", "false")).strip().lower() in ("1", "true", "yes", "y")
     if requested_cfg is None and not force_max:
-        requested_out = _estimate_max_output_tokens_from_specs(nonlong_specs, tokens_per_word=2.0, overhead=1800, floor=2048)
+        requested_out = _estimate_max_output_tokens_from_specs(nonlong_specs, model=model, unmeasured_tokens_per_word=2.0, overhead=1800, floor=2048)
     else:
         requested_out = _safe_int(requested_cfg, default_max_output_tokens(model))
         if not force_max:
-            est = _estimate_max_output_tokens_from_specs(nonlong_specs, tokens_per_word=2.0, overhead=1800, floor=2048)
+            est = _estimate_max_output_tokens_from_specs(nonlong_specs, model=model, unmeasured_tokens_per_word=2.0, overhead=1800, floor=2048)
             if requested_out > int(est * 2.0):
                 logger.warning(f"pass_b_max_output_tokens={requested_out} is far above estimated need ({est}); capping to estimate for stability. Set OPENAI_FORCE_MAX_OUTPUT=true to override.")
                 requested_out = est
@@ -1476,11 +1532,15 @@ def _run_gemini_single_pass_all(client, config: dict, specs: list[dict], sources
 
 
 
-def _run_gemini_single_pass_all_v2(client, config: dict, specs: list[dict], sources_in: list[dict]) -> dict:
-    """Gemini: ONE request, returns STRICT JSON with all requested items (including L1 if requested)."""
-    model = _pick_model_pass_b(config)
-    max_out = clamp_output_tokens(model, default_max_output_tokens(model))
+def _gemini_parallel_workers(config: dict) -> int:
+    """Concurrent Gemini requests for independent items (GEMINI_PARALLEL_ITEMS); 0/1 keeps one request."""
+    raw = config.get("gemini_parallel_items") if isinstance(config, dict) else None
+    if raw is None:
+        raw = os.getenv("GEMINI_PARALLEL_ITEMS", "")
+    return max(0, _safe_int(raw, 0))
+
 
+def _build_gemini_items_prompt(specs: list[dict], sources_in: list[dict]) -> str:
     # Build requested items list with required word counts (no Pass A/Pass B special casing).
     req_lines = []
     for s in specs:
@@ -1493,7 +1553,7 @@ def _run_gemini_single_pass_all_v2(client, config: dict, specs: list[dict], sour
 
     req_txt = "\n".join(req_lines)
 
-    prompt = f"""System: Return only valid JSON.
+    return f"""System: Return only valid JSON.
 
 You are generating multiple content items based on SOURCE_ITEMS.
 Do NOT introduce any new facts beyond SOURCE_ITEMS.
@@ -1509,15 +1569,10 @@ Return STRICT JSON only:
 {{"content":[{{"code":"S1","type":"short","script":"...","video_title":"...","video_description":"...","video_tags":"tag1, tag2"}}]}}
 """
 
-    txt = _gemini_generate_text(
-        model=model,
-        prompt=prompt,
-        max_output_tokens=max_out,
-        temperature=float(config.get("temperature", 0.2)),
-        json_mode=True,
-    )
 
-    data: dict = {}
+def _parse_gemini_content(txt: str) -> list[dict]:
+    """The 'content' list of a Gemini items response (repairing control characters if needed)."""
+    data: Any = {}
     if isinstance(txt, str):
         try:
             data = json.loads(txt)
@@ -1532,9 +1587,56 @@ Return STRICT JSON only:
                 else:
                     raise
 
-    out = _normalize_single_pass_payload(data=data, config=config, model=model)
-    _enforce_unique_video_metadata(out.get("content") or [])
-    return out
+    out = data if isinstance(data, dict) else {}
+    # common wrappers
+    for key in ("output", "result", "data"):
+        if "content" not in out and isinstance(out.get(key), dict):
+            out = out[key]
+    if not isinstance(out.get("content"), list):
+        raise RuntimeError("Gemini single-pass returned JSON without a 'content' list.")
+    return [it for it in out["content"] if isinstance(it, dict)]
+
+
+def _run_gemini_single_pass_all_v2(client, config: dict, specs: list[dict], sources_in: list[dict]) -> dict:
+    """Gemini: STRICT JSON with all requested items (including L1 if requested).
+
+    By default all items come from ONE request. Output tokens are sized from the
+    specs' word counts; a response cut off at that budget is continued until the
+    JSON closes (gemini_generate_chunked). With GEMINI_PARALLEL_ITEMS=N (N > 1)
+    each item is generated by its own request, N at a time: items only depend on
+    SOURCE_ITEMS, so they can be written independently.
+    """
+    if gemini_generate_chunked is None:
+        raise ImportError(
+            "Gemini support is unavailable: missing gemini_utils / google credentials"
+        )
+    model = _pick_model_pass_b(config)
+    cap = clamp_output_tokens(model, _safe_int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS"), 0) or default_max_output_tokens(model))
+    temperature = float(config.get("temperature", 0.2))
+    workers = _gemini_parallel_workers(config)
+
+    groups = [[s] for s in specs] if workers > 1 and len(specs) > 1 else [list(specs)]
+    jobs = [
+        {
+            "model": model,
+            "base_prompt": _build_gemini_items_prompt(group, sources_in),
+            "max_output_tokens_per_part": cap,
+            "total_output_tokens": _estimate_max_output_tokens_from_specs(group, model=model),
+            "temperature": temperature,
+        }
+        for group in groups
+    ]
+    if len(jobs) > 1:
+        print(f"  Gemini: generating {len(jobs)} items in parallel ({min(workers, len(jobs))} at a time)")
+        texts = gemini_generate_parallel(jobs, workers=workers)
+    else:
+        texts = [gemini_generate_chunked(**jobs[0])[0]]
+
+    content: list[dict] = []
+    for txt in texts:
+        content.extend(_parse_gemini_content(txt))
+    _enforce_unique_video_metadata(content)
+    return {"content": content, "sources": sources_in}
 
 
 
@@ -1559,7 +1661,8 @@ def generate_all_content_two_pass(*args, **kwargs) -> Dict[str, Any]:
     if len(args) >= 4 and not isinstance(args[0], dict):
         client, config, pass_a_long_script, sources = args[0], args[1], args[2], args[3]
 
-        # Gemini: enforce ONE request total and bypass Pass A/B entirely (legacy call style)
+        # Gemini (legacy call style): bypass Pass A/B. One JSON request for all items,
+        # continued if truncated, or one per item with GEMINI_PARALLEL_ITEMS
         if _is_gemini_model(_pick_model_pass_b(config)):
             sources_in = sources if isinstance(sources, list) else []
             a_specs, b_specs = _enabled_specs_from_content_specs((config.get("content_specs") if isinstance(config, dict) else []) or [])
@@ -1610,7 +1713,7 @@ def generate_all_content_two_pass(*args, **kwargs) -> Dict[str, Any]:
         # Long-form script generation can take minutes for large outputs.
         timeout_s = float(os.getenv("OPENAI_TIMEOUT", "600"))
         max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "0"))  # default 0 to enforce single-request per pass
-        client = OpenAI(api_key=api_key, timeout=timeout_s, max_retries=max_retries)
+        client = _get_openai_client(api_key, timeout_s, max_retries)
 
     long_specs, nonlong_specs = _enabled_specs_from_content_specs(enabled_specs)
 
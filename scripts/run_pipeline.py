@@ -4,23 +4,45 @@
 Implements the new architecture:
   - Each module writes its own outputs under tenant-aware output dirs
   - Optional commit after each module
+
+Stage modules (script_generate, tts_generate, video_render) are imported
+lazily, only when their stage runs, so `cli.py validate` and partial runs do
+not pay for openai/google/PIL imports.
 """
 
 from __future__ import annotations
 
 import argparse
+import importlib
 import os
+import sys
 import traceback
 from datetime import datetime
 from pathlib import Path
+from types import ModuleType
 from typing import List
 
-import script_generate
-import tts_generate
-import video_render
-
 from config import get_repo_root, get_output_dir
-from git_commit import commit_paths
+from commit_strategy import StageCommitter, resolve_stage_outputs
+
+
+# Stage modules resolved on first attribute access (PEP 562), e.g.
+# `run_pipeline.video_render`. Keeps module-level access working for callers
+# and tests that patch stage entry points.
+_LAZY_STAGE_MODULES = ("script_generate", "tts_generate", "video_render")
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name in _LAZY_STAGE_MODULES:
+        mod = importlib.import_module(name)
+        globals()[name] = mod
+        return mod
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _stage(name: str) -> ModuleType:
+    """Return a stage module, importing it on first use."""
+    return globals().get(name) or __getattr__(name)
 
 
 def _bool_env(name: str, default: bool = False) -> bool:
@@ -38,18 +60,34 @@ def _commit_enabled(cli_flag: bool | None) -> bool:
     return _bool_env("COMMIT_EACH_MODULE", False)
 
 
-def _commit_module(module_name: str, topic_id: str, date_str: str) -> None:
-    repo_root = get_repo_root()
-    out_dir = get_output_dir(topic_id)
+def _make_committer(topic_id: str, date_str: str) -> StageCommitter:
+    from global_config import (
+        COMMIT_MAX_FILE_MB, COMMIT_LARGE_FILE_POLICY,
+        COMMIT_BATCH_MAX_SECONDS, COMMIT_BATCH_MAX_MB, COMMIT_ASYNC,
+    )
     tenant = os.environ.get("TENANT_ID", "0000000001")
-    msg = f"[{tenant}] {topic_id} {date_str} - {module_name}"
-    commit_paths(repo_root, [out_dir], msg)
+    return StageCommitter(
+        get_repo_root(),
+        f"[{tenant}] {topic_id} {date_str}",
+        max_file_bytes=int(COMMIT_MAX_FILE_MB * 1024 * 1024),
+        large_file_policy=COMMIT_LARGE_FILE_POLICY,
+        batch_max_seconds=COMMIT_BATCH_MAX_SECONDS,
+        batch_max_bytes=int(COMMIT_BATCH_MAX_MB * 1024 * 1024),
+        run_async=COMMIT_ASYNC,
+    )
+
+
+def _commit_module(committer: StageCommitter | None, module_name: str, topic_id: str, date_str: str) -> None:
+    if committer is None:
+        return
+    out_dir = get_output_dir(topic_id)
+    committer.add_stage(module_name, resolve_stage_outputs(module_name, out_dir, topic_id, date_str))
 
 
-def _run_validation(force: bool) -> bool:
+def _run_validation(force: bool, use_cache: bool | None = None) -> bool:
     try:
         from system_validator import validate_system
-        is_valid, result = validate_system(verbose=False)
+        is_valid, result = validate_system(verbose=False, use_cache=use_cache)
         if is_valid:
             return True
         if force:
@@ -78,14 +116,25 @@ def run_for_topic(
             print("Validation failed")
             return False
 
-    do_commit = _commit_enabled(commit_each_module)
+    committer = _make_committer(topic_id, date_str) if _commit_enabled(commit_each_module) else None
+    try:
+        return _run_modules(topic_id, date_str, modules, committer)
+    finally:
+        if committer is not None:
+            committer.close()
+
 
+def _run_modules(
+    topic_id: str,
+    date_str: str,
+    modules: List[str],
+    committer: StageCommitter | None,
+) -> bool:
     if "scripts" in modules:
         print("Module: scripts")
-        if not script_generate.generate_for_topic(topic_id, date_str):
+        if not _stage("script_generate").generate_for_topic(topic_id, date_str):
             return False
-        if do_commit:
-            _commit_module("scripts", topic_id, date_str)
+        _commit_module(committer, "scripts", topic_id, date_str)
 
     if "images" in modules:
         print("Module: images")
@@ -101,10 +150,12 @@ def run_for_topic(
             # Prefer canonical search queries emitted by scripts module.
             # 1) In-process cache (most reliable when running modules sequentially in one process)
             # 2) Written JSON file
+            # The cache only exists if the scripts stage ran in this process, so
+            # do not import script_generate just to look at it.
             queries = None
             try:
-                import script_generate as _sg
-                cached = _sg.get_cached_search_queries(topic_id, date_str)
+                _sg = sys.modules.get("script_generate")
+                cached = _sg.get_cached_search_queries(topic_id, date_str) if _sg else None
                 if cached:
                     queries = cached
             except Exception:
@@ -131,30 +182,26 @@ def run_for_topic(
         except Exception as e:
             print(f"Image collection failed (non-fatal): {e}")
             print(traceback.format_exc())
-        if do_commit:
-            _commit_module("images", topic_id, date_str)
+        _commit_module(committer, "images", topic_id, date_str)
 
     if "tts" in modules:
         print("Module: tts")
-        if not tts_generate.generate_for_topic(topic_id, date_str):
+        if not _stage("tts_generate").generate_for_topic(topic_id, date_str):
             return False
-        if do_commit:
-            _commit_module("tts", topic_id, date_str)
+        _commit_module(committer, "tts", topic_id, date_str)
 
     if "prepare_images" in modules:
         print("Module: prepare_images")
         from image_prepare import prepare_for_topic
         if not prepare_for_topic(topic_id, date_str):
             return False
-        if do_commit:
-            _commit_module("prepare_images", topic_id, date_str)
+        _commit_module(committer, "prepare_images", topic_id, date_str)
 
     if "video" in modules:
         print("Module: video")
-        if not video_render.render_for_topic(topic_id, date_str):
+        if not _stage("video_render").render_for_topic(topic_id, date_str):
             return False
-        if do_commit:
-            _commit_module("video", topic_id, date_str)
+        _commit_module(committer, "video", topic_id, date_str)
 
     return True
 
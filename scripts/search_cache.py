@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Persistent cache of Google Custom Search result pages.
+
+Every `cse().list` page costs daily quota (GOOGLE_SEARCH_DAILY_LIMIT). Topics
+often share queries, and reruns repeat them, so pages are cached by
+(query, start, search params) for GOOGLE_SEARCH_CACHE_TTL_HOURS. Expired pages
+are purged whenever the cache is opened. Hits and misses are counted by the
+collector in the daily usage ledger (quota_ledger.QuotaLedger.record_cache).
+
+Storage is SQLite (GOOGLE_SEARCH_CACHE_DB, default next to the usage tracking
+file), which makes concurrent topics on one host safe.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from global_config import GOOGLE_SEARCH_CACHE_TTL_HOURS
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    response TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+DROP TABLE IF EXISTS stats;
+"""
+
+# Params that identify a result page; the API key does not change results.
+_KEY_PARAMS = ("q", "cx", "searchType", "imgType", "num", "start", "safe", "imgSize")
+
+
+def page_key(params: Dict[str, Any]) -> str:
+    ident = {k: params.get(k) for k in _KEY_PARAMS if params.get(k) is not None}
+    if isinstance(ident.get("q"), str):
+        ident["q"] = " ".join(ident["q"].split()).lower()
+    return hashlib.sha256(json.dumps(ident, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """TTL cache of search responses."""
+
+    def __init__(self, db_path: Path, ttl_hours: float = GOOGLE_SEARCH_CACHE_TTL_HOURS):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = max(0.0, float(ttl_hours)) * 3600
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached response for params if younger than the TTL."""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT response, fetched_at FROM pages WHERE key = ?", (page_key(params),)
+            ).fetchone()
+            if row is not None and time.time() - row["fetched_at"] <= self.ttl_seconds:
+                try:
+                    response = json.loads(row["response"])
+                except ValueError:
+                    response = None
+                if response is not None:
+                    return response
+        return None
+
+    def put(self, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (key, params, response, fetched_at) VALUES (?, ?, ?, ?)",
+                (page_key(params), json.dumps(params, sort_keys=True), json.dumps(response), time.time()),
+            )
+
+    def purge_expired(self) -> int:
+        with self._connection() as conn:
+            cur = conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            return cur.rowcount
+
+
+def get_search_cache(default_dir: Path) -> Optional[SearchCache]:
+    """Cache at GOOGLE_SEARCH_CACHE_DB (or default_dir/google_search_cache.sqlite); None when disabled."""
+    if GOOGLE_SEARCH_CACHE_TTL_HOURS <= 0:
+        return None
+    env = os.environ.get("GOOGLE_SEARCH_CACHE_DB", "").strip()
+    cache = SearchCache(Path(env) if env else default_dir / "google_search_cache.sqlite")
+    cache.purge_expired()
+    return cache
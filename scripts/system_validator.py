@@ -2,12 +2,21 @@
 """
 System validation module.
 Validates environment, dependencies, configurations, and system state before pipeline execution.
+
+Each check's outcome is cached in .cache/system_validation.json together with a
+fingerprint of the inputs it reads (package locations, env vars, Piper files and
+voice dir, topic config hashes). Only checks whose fingerprint changed are re-run,
+in parallel; the rest are replayed from the cache.
 """
+import hashlib
+import importlib.util
+import json
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,9 +24,30 @@ logger = logging.getLogger(__name__)
 
 from global_config import (
     validate_environment, validate_topic_config,
-    REQUIRE_GPT_KEY, REQUIRE_GOOGLE_API_KEY_FOR_PREMIUM
+    REQUIRE_GPT_KEY, REQUIRE_GOOGLE_API_KEY_FOR_PREMIUM,
+    PIPER_VOICE_DIR, SYSTEM_VALIDATION_CACHE_ENABLED
 )
 
+# Bump to invalidate all cached validation results
+VALIDATION_CACHE_VERSION = 1
+
+REQUIRED_PACKAGES = {
+    'requests': 'Core HTTP library',
+    'openai': 'ChatGPT script generation'
+}
+
+OPTIONAL_PACKAGES = {
+    'piper': 'Local TTS (Piper)',
+    'google.cloud.texttospeech': 'Premium TTS (Google Cloud)',
+    'google.genai': 'Gemini Developer API (google-genai)',
+    'bs4': 'HTML parsing (deprecated - not used in v2 architecture)'
+}
+
+PIPER_LIBRARIES = [
+    'libpiper_phonemize.so',
+    'libonnxruntime.so'
+]
+
 
 class ValidationResult:
     """Container for validation results."""
@@ -53,6 +83,33 @@ class ValidationResult:
         """Increment total checks count."""
         self.checks_total += 1
     
+    def merge(self, other: "ValidationResult") -> None:
+        """Append another result's messages and counters (no re-logging)."""
+        self.errors.extend(other.errors)
+        self.warnings.extend(other.warnings)
+        self.info.extend(other.info)
+        self.checks_passed += other.checks_passed
+        self.checks_total += other.checks_total
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'errors': list(self.errors),
+            'warnings': list(self.warnings),
+            'info': list(self.info),
+            'checks_passed': self.checks_passed,
+            'checks_total': self.checks_total,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ValidationResult":
+        result = cls()
+        result.errors = list(data.get('errors', []))
+        result.warnings = list(data.get('warnings', []))
+        result.info = list(data.get('info', []))
+        result.checks_passed = int(data.get('checks_passed', 0))
+        result.checks_total = int(data.get('checks_total', 0))
+        return result
+    
     def is_valid(self) -> bool:
         """Check if validation passed (no errors)."""
         return len(self.errors) == 0
@@ -96,20 +153,8 @@ def check_python_version(result: ValidationResult) -> None:
 
 def check_dependencies(result: ValidationResult) -> None:
     """Check required Python packages."""
-    required_packages = {
-        'requests': 'Core HTTP library',
-        'openai': 'ChatGPT script generation'
-    }
-    
-    optional_packages = {
-        'piper': 'Local TTS (Piper)',
-        'google.cloud.texttospeech': 'Premium TTS (Google Cloud)',
-        'google.genai': 'Gemini Developer API (google-genai)',
-        'bs4': 'HTML parsing (deprecated - not used in v2 architecture)'
-    }
-    
     # Check required packages
-    for package, description in required_packages.items():
+    for package, description in REQUIRED_PACKAGES.items():
         result.increment_total()
         try:
             if package == 'requests':
@@ -123,7 +168,7 @@ def check_dependencies(result: ValidationResult) -> None:
             result.add_error(f"Missing required package: {package} ({description})")
     
     # Check optional packages
-    for package, description in optional_packages.items():
+    for package, description in OPTIONAL_PACKAGES.items():
         result.increment_total()
         try:
             if package == 'piper':
@@ -274,11 +319,7 @@ def check_tts_binaries(result: ValidationResult) -> None:
             result.add_warning("Piper binary is not executable (may need chmod +x)")
         
         # Check for required libraries
-        required_libs = [
-            'libpiper_phonemize.so',
-            'libonnxruntime.so'
-        ]
-        for lib in required_libs:
+        for lib in PIPER_LIBRARIES:
             result.increment_total()
             lib_path = repo_root / 'piper' / lib
             if lib_path.exists():
@@ -339,40 +380,224 @@ def check_disk_space(result: ValidationResult) -> None:
         result.add_warning(f"Could not check disk space: {e}")
 
 
-def validate_system(verbose: bool = True) -> Tuple[bool, ValidationResult]:
+def check_global_environment(result: ValidationResult) -> None:
+    """Run global_config.validate_environment and record its findings."""
+    env_validation = validate_environment()
+    for error in env_validation.get('errors', []):
+        result.add_error(f"Environment: {error}")
+    for warning in env_validation.get('warnings', []):
+        result.add_warning(f"Environment: {warning}")
+
+
+# ============================================================================
+# Validation cache
+# ============================================================================
+
+def _repo_root() -> Path:
+    return Path(__file__).resolve().parent.parent
+
+
+def _file_sig(path: Path) -> Optional[List[int]]:
+    """(size, mtime_ns) of a path, or None if it does not exist."""
+    try:
+        st = path.stat()
+        return [st.st_size, st.st_mtime_ns]
+    except OSError:
+        return None
+
+
+def _module_sig(name: str) -> Optional[List[Any]]:
+    """Locate a package without importing it; its file stat stands in for the version."""
+    try:
+        spec = importlib.util.find_spec(name)
+    except Exception:
+        return None
+    if spec is None:
+        return None
+    origin = spec.origin or ''
+    if origin and os.path.exists(origin):
+        return [origin, _file_sig(Path(origin))]
+    return [origin or ','.join(spec.submodule_search_locations or [])]
+
+
+def _env_sig(*names: str) -> Dict[str, Optional[str]]:
+    """Hash env var values so secrets never land in the cache file."""
+    out: Dict[str, Optional[str]] = {}
+    for name in names:
+        value = os.getenv(name)
+        out[name] = hashlib.sha256(value.encode('utf-8')).hexdigest()[:16] if value else None
+    return out
+
+
+def _source_sig(*module_files: str) -> List[Optional[List[int]]]:
+    here = Path(__file__).resolve().parent
+    return [_file_sig(here / name) for name in module_files]
+
+
+def _dependencies_inputs() -> Any:
+    packages = list(REQUIRED_PACKAGES) + list(OPTIONAL_PACKAGES)
+    return [sys.executable, {name: _module_sig(name) for name in packages}]
+
+
+def _environment_variables_inputs() -> Any:
+    return [_env_sig('GPT_KEY', 'OPENAI_API_KEY', 'GOOGLE_API_KEY'),
+            REQUIRE_GPT_KEY, REQUIRE_GOOGLE_API_KEY_FOR_PREMIUM]
+
+
+def _directories_inputs() -> Any:
+    root = _repo_root()
+    return [str(root), (root / 'topics').is_dir(), (root / 'scripts').is_dir()]
+
+
+def _topic_configurations_inputs() -> Any:
+    topics_dir = _repo_root() / 'topics'
+    hashes = {}
+    if topics_dir.is_dir():
+        for topic_file in sorted(topics_dir.glob('topic-*.json')):
+            try:
+                hashes[topic_file.name] = hashlib.sha256(topic_file.read_bytes()).hexdigest()
+            except OSError:
+                hashes[topic_file.name] = None
+    return [hashes, _source_sig('config.py', 'global_config.py')]
+
+
+def _tts_binaries_inputs() -> Any:
+    from config import get_repo_root
+
+    root = get_repo_root()
+    piper_dir = root / 'piper'
+    paths = [root / 'piper_linux_x86_64.tar.gz', piper_dir / 'piper']
+    paths += [piper_dir / lib for lib in PIPER_LIBRARIES]
+    voice_dir = Path(os.path.expanduser(PIPER_VOICE_DIR))
+    return [
+        {str(p): _file_sig(p) for p in paths},
+        os.access(piper_dir / 'piper', os.X_OK),
+        [str(voice_dir), _file_sig(voice_dir)],
+    ]
+
+
+def _rss_dependencies_inputs() -> Any:
+    return [sys.executable, _module_sig('feedgen')]
+
+
+def _global_environment_inputs() -> Any:
+    return [_env_sig('GPT_KEY', 'GOOGLE_API_KEY'), _module_sig('openai'), _module_sig('requests'),
+            _source_sig('global_config.py')]
+
+
+# (name, check, inputs). inputs=None means the check is volatile and always runs.
+VALIDATION_CHECKS: List[Tuple[str, Callable[[ValidationResult], None], Optional[Callable[[], Any]]]] = [
+    ('python_version', check_python_version, lambda: [sys.executable, sys.version]),
+    ('dependencies', check_dependencies, _dependencies_inputs),
+    ('environment_variables', check_environment_variables, _environment_variables_inputs),
+    ('directories', check_directories, _directories_inputs),
+    ('topic_configurations', check_topic_configurations, _topic_configurations_inputs),
+    ('data_sources', check_data_sources, lambda: []),
+    ('tts_binaries', check_tts_binaries, _tts_binaries_inputs),
+    ('rss_dependencies', check_rss_dependencies, _rss_dependencies_inputs),
+    ('disk_space', check_disk_space, None),
+    ('global_environment', check_global_environment, _global_environment_inputs),
+]
+
+
+def get_validation_cache_path() -> Path:
+    return _repo_root() / '.cache' / 'system_validation.json'
+
+
+def compute_check_fingerprint(inputs: Callable[[], Any]) -> Optional[str]:
+    """Fingerprint a check's inputs; None if they cannot be determined."""
+    try:
+        payload = json.dumps([VALIDATION_CACHE_VERSION, inputs()], sort_keys=True, default=str)
+    except Exception:
+        return None
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _load_validation_cache(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != VALIDATION_CACHE_VERSION:
+        return {}
+    checks = data.get('checks')
+    return checks if isinstance(checks, dict) else {}
+
+
+def _save_validation_cache(path: Path, checks: Dict[str, Any]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps({'version': VALIDATION_CACHE_VERSION, 'checks': checks}, indent=2),
+                       encoding='utf-8')
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not write validation cache: {e}")
+
+
+def _run_check(check: Callable[[ValidationResult], None]) -> ValidationResult:
+    partial = ValidationResult()
+    try:
+        check(partial)
+    except Exception as e:
+        partial.add_error(f"Validation check {check.__name__} crashed: {e}")
+    return partial
+
+
+def validate_system(verbose: bool = True, use_cache: Optional[bool] = None) -> Tuple[bool, ValidationResult]:
     """
     Run complete system validation.
     
     Args:
         verbose: Print detailed results
+        use_cache: Reuse cached per-check results whose input fingerprint is
+            unchanged (default: SYSTEM_VALIDATION_CACHE_ENABLED)
         
     Returns:
         Tuple of (is_valid, validation_result)
     """
-    result = ValidationResult()
+    if use_cache is None:
+        use_cache = SYSTEM_VALIDATION_CACHE_ENABLED
     
     if verbose:
         print("\n" + "=" * 80)
         print("PODCAST MAKER SYSTEM VALIDATION")
         print("=" * 80 + "\n")
     
-    # Run all validation checks
-    check_python_version(result)
-    check_dependencies(result)
-    check_environment_variables(result)
-    check_directories(result)
-    check_topic_configurations(result)
-    check_data_sources(result)
-    check_tts_binaries(result)
-    check_rss_dependencies(result)
-    check_disk_space(result)
-    
-    # Use global_config validation
-    env_validation = validate_environment()
-    for error in env_validation.get('errors', []):
-        result.add_error(f"Environment: {error}")
-    for warning in env_validation.get('warnings', []):
-        result.add_warning(f"Environment: {warning}")
+    cache_path = get_validation_cache_path()
+    cached = _load_validation_cache(cache_path) if use_cache else {}
+    
+    partials: Dict[str, ValidationResult] = {}
+    fingerprints: Dict[str, Optional[str]] = {}
+    stale: List[Tuple[str, Callable[[ValidationResult], None]]] = []
+    for name, check, inputs in VALIDATION_CHECKS:
+        fingerprint = compute_check_fingerprint(inputs) if (use_cache and inputs) else None
+        fingerprints[name] = fingerprint
+        entry = cached.get(name)
+        if fingerprint and isinstance(entry, dict) and entry.get('fingerprint') == fingerprint:
+            partials[name] = ValidationResult.from_dict(entry.get('result', {}))
+        else:
+            stale.append((name, check))
+    
+    # Run changed checks in parallel; each writes to its own result object.
+    if stale:
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            futures = {name: pool.submit(_run_check, check) for name, check in stale}
+            for name, future in futures.items():
+                partials[name] = future.result()
+    
+    result = ValidationResult()
+    for name, _, _ in VALIDATION_CHECKS:
+        result.merge(partials[name])
+    reused = [name for name, _, _ in VALIDATION_CHECKS if name not in dict(stale)]
+    if reused:
+        result.add_info(f"Reused cached validation for: {', '.join(reused)}")
+    
+    if use_cache and stale:
+        for name, _ in stale:
+            if fingerprints.get(name):
+                cached[name] = {'fingerprint': fingerprints[name], 'result': partials[name].to_dict()}
+        _save_validation_cache(cache_path, cached)
     
     # Print summary
     if verbose:
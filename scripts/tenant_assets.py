@@ -10,10 +10,12 @@ Important constraint:
 
 from __future__ import annotations
 
+import json
 import os
+import shutil
 import subprocess
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 
 def get_bool_env(name: str, default: bool = False) -> bool:
@@ -102,6 +104,30 @@ def download_asset(tag: str, asset_name: str, dest_dir: Path) -> Path:
     return fp
 
 
+def list_assets(tag: str) -> Dict[str, dict]:
+    """
+    Existing assets of a release: name -> {"id", "name", "size", "digest"}.
+    digest is GitHub's "sha256:<hex>" when reported, else None. Returns {} if
+    the release does not exist.
+    """
+    rc, rel_id, _ = _run(["gh", "api", f"repos/{{owner}}/{{repo}}/releases/tags/{tag}", "--jq", ".id"])
+    if rc != 0 or not rel_id:
+        return {}
+    rc, out, err = _run([
+        "gh", "api", "--paginate",
+        f"repos/{{owner}}/{{repo}}/releases/{rel_id}/assets?per_page=100",
+        "--jq", ".[] | {id, name, size, digest}"
+    ])
+    if rc != 0:
+        raise RuntimeError(f"Failed to list assets of {tag}: {err}")
+    assets: Dict[str, dict] = {}
+    for line in out.splitlines():
+        if line.strip():
+            a = json.loads(line)
+            assets[a["name"]] = a
+    return assets
+
+
 def delete_asset(tag: str, asset_name: str) -> bool:
     """Delete a release asset if it exists. Returns True if deleted."""
     # gh returns non-zero if asset is not found; treat that as "not deleted".
@@ -111,4 +137,87 @@ def delete_asset(tag: str, asset_name: str) -> bool:
     # Non-fatal; caller may be cleaning up legacy assets.
     if err:
         print(f"  ⓘ Could not delete asset (may not exist): tag={tag} asset={asset_name}: {err}")
-    return False
\ No newline at end of file
+    return False
+
+
+class GhReleaseStore:
+    """Assets of one GitHub Release, via the gh CLI."""
+
+    def __init__(self, tag: str, title: str, notes: str = ""):
+        self.tag = tag
+        self.title = title
+        self.notes = notes
+
+    def ensure(self) -> None:
+        ensure_release(self.tag, title=self.title, notes=self.notes)
+
+    def upload(self, file_path: Path, clobber: bool = True) -> None:
+        upload_asset(self.tag, file_path, clobber=clobber)
+
+    def download(self, asset_name: str, dest_dir: Path) -> Path:
+        return download_asset(self.tag, asset_name, dest_dir)
+
+    def list_assets(self) -> Dict[str, dict]:
+        return list_assets(self.tag)
+
+    def delete(self, asset_name: str) -> bool:
+        return delete_asset(self.tag, asset_name)
+
+
+class LocalReleaseStore:
+    """A directory standing in for a release (one file per asset); for tests and offline runs."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.tag = self.root.name
+
+    def ensure(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def upload(self, file_path: Path, clobber: bool = True) -> None:
+        dest = self.root / file_path.name
+        if dest.exists() and not clobber:
+            raise RuntimeError(f"Failed to upload asset to {self.tag}: {file_path.name}: already exists")
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        shutil.copyfile(file_path, tmp)
+        os.replace(tmp, dest)
+
+    def download(self, asset_name: str, dest_dir: Path) -> Path:
+        src = self.root / asset_name
+        if not src.is_file():
+            raise RuntimeError(f"Failed to download asset {asset_name} from {self.tag}: not found")
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        return Path(shutil.copyfile(src, dest_dir / asset_name))
+
+    def list_assets(self) -> Dict[str, dict]:
+        # Like GitHub, report a sha256 digest for every asset
+        from content_hash import hash_file_uncached
+
+        if not self.root.is_dir():
+            return {}
+        return {
+            p.name: {"id": None, "name": p.name, "size": p.stat().st_size, "digest": hash_file_uncached(p, "sha256")}
+            for p in sorted(self.root.iterdir())
+            if p.is_file() and not p.name.startswith(".")
+        }
+
+    def delete(self, asset_name: str) -> bool:
+        p = self.root / asset_name
+        if not p.is_file():
+            return False
+        p.unlink()
+        return True
+
+
+def release_store_available() -> bool:
+    """True if get_release_store() can reach a store (local stand-in or gh)."""
+    return bool(os.environ.get("TENANT_ASSETS_LOCAL_DIR")) or gh_available()
+
+
+def get_release_store(tag: str, title: str, notes: str = ""):
+    """Release asset store for tag; TENANT_ASSETS_LOCAL_DIR=<dir> uses <dir>/<tag> instead of gh."""
+    local = os.environ.get("TENANT_ASSETS_LOCAL_DIR", "").strip()
+    if local:
+        return LocalReleaseStore(Path(local) / tag)
+    return GhReleaseStore(tag, title, notes)
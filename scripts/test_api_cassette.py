@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for recording and replaying external API calls.
+"""
+import os
+import sys
+import tempfile
+import urllib.error
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import api_cassette
+from api_cassette import CassetteReplayError, recorded_call
+
+
+def _env(tmp, mode, **extra):
+    env = {"API_CASSETTE": str(Path(tmp) / "cassette"), "API_CASSETTE_MODE": mode}
+    env.update(extra)
+    return patch.dict(os.environ, env)
+
+
+def test_record_then_replay_with_timing():
+    """Responses, bytes and failures are replayed in order, paced by the recorded latency."""
+    with tempfile.TemporaryDirectory() as tmp:
+        clock = iter([10.0, 10.8, 20.0, 20.1, 30.0, 30.25, 40.0, 40.5])
+        results = [urllib.error.HTTPError("https://x/a.jpg", 503, "Service Unavailable", None, None), b"\x89PNG" * 400]
+
+        def download():
+            r = results.pop(0)
+            if isinstance(r, Exception):
+                raise r
+            return r
+
+        with _env(tmp, "record"), patch.object(api_cassette.time, "monotonic", lambda: next(clock)):
+            page = recorded_call("cse", {"q": "rates", "start": 1}, lambda: {"items": [{"link": "https://x/a.jpg"}]})
+            try:
+                recorded_call("image_download", {"url": "https://x/a.jpg"}, download)
+                raise AssertionError("expected HTTPError")
+            except urllib.error.HTTPError:
+                pass
+            data = recorded_call("image_download", {"url": "https://x/a.jpg"}, download)
+        assert list((Path(tmp) / "cassette" / "image_download").glob("*.1.bin"))
+
+        def offline():
+            raise AssertionError("network used during replay")
+
+        with _env(tmp, "replay", API_CASSETTE_SPEED="2"), patch.object(api_cassette.time, "sleep") as sleep:
+            assert recorded_call("cse", {"q": "rates", "start": 1}, offline) == page
+            try:
+                recorded_call("image_download", {"url": "https://x/a.jpg"}, offline)
+                raise AssertionError("expected HTTPError")
+            except urllib.error.HTTPError as e:
+                assert e.code == 503
+            assert recorded_call("image_download", {"url": "https://x/a.jpg"}, offline) == data
+            assert [round(c.args[0], 3) for c in sleep.call_args_list] == [0.4, 0.05, 0.125]
+            try:
+                recorded_call("cse", {"q": "rates", "start": 11}, offline)
+                raise AssertionError("expected a replay miss")
+            except CassetteReplayError:
+                pass
+        with _env(tmp, "replay", API_CASSETTE_SPEED="0", API_CASSETTE_MATCH="sequence"):
+            assert recorded_call("cse", {"q": "rates", "start": 11}, offline) == page
+    print("✓ Calls recorded and replayed with their timing")
+
+
+def test_llm_calls_replay_offline():
+    """OpenAI and Gemini calls replay through the real helpers without a client or key."""
+    from openai_utils import create_openai_completion, extract_completion_text
+    import gemini_utils
+
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content='{"content": []}'))],
+        usage=None,
+        model_dump=lambda: {"choices": [{"message": {"content": '{"content": []}'}}], "usage": None},
+    )
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: response)))
+    messages = [{"role": "user", "content": "Write S1"}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with _env(tmp, "record", GOOGLE_API_KEY="test"):
+            live = create_openai_completion(client, "gpt-4o-mini", messages=messages, json_mode=True)
+            with patch.object(gemini_utils, "_gemini_request_live", return_value=("{}", "STOP")):
+                assert gemini_utils.gemini_generate_once(model="gemini-3-flash", prompt="Write S1") == "{}"
+
+        with _env(tmp, "replay", API_CASSETTE_SPEED="0"), patch.dict(os.environ, {"GOOGLE_API_KEY": ""}):
+            out_file = Path(tmp) / "pass_b"
+            replayed = create_openai_completion(None, "gpt-4o-mini", messages=messages, json_mode=True,
+                                                output_file=str(out_file))
+            assert extract_completion_text(replayed) == extract_completion_text(live)
+            assert Path(str(out_file) + ".response.json").exists()
+            assert gemini_utils.gemini_generate_once(model="gemini-3-flash", prompt="Write S1") == "{}"
+    print("✓ LLM calls replay offline")
+
+
+def main():
+    print("=" * 60)
+    print("API Cassette Tests")
+    print("=" * 60)
+
+    try:
+        test_record_then_replay_with_timing()
+        test_llm_calls_replay_offline()
+        print("\n" + "=" * 60)
+        print("✓ All API cassette tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared, cached ASS overlay compiler.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from captions import ass_overlays
+from captions.ass_overlays import OverlayStyle, build_overlays_ass, get_glyph_metrics, wrap_text
+from captions.burner import build_overlays_ass_from_segments
+
+
+def _args(**overrides):
+    args = dict(
+        width=1080,
+        height=1920,
+        caption_segments=[
+            {"start": 0.0, "end": 2.5, "text": "Alice: Hello there", "speaker": "A"},
+            {"start": 2.5, "end": 5.0, "text": "Hi!", "speaker": "B"},
+        ],
+        title_segments=[{"start": 0.0, "end": 5.0, "text": "Storm hits the coast"}],
+        a_gender="female",
+        b_gender="male",
+        known_names=["Alice"],
+        hide_speaker_names=True,
+        style=OverlayStyle(),
+    )
+    args.update(overrides)
+    return args
+
+
+def test_wrap_uses_measured_widths():
+    """Narrow glyphs fit more per line than wide ones; overflow gets an ellipsis."""
+    m = get_glyph_metrics(None, 60)
+    assert m.text_width("iiii") < m.text_width("WWWW")
+    narrow = wrap_text(" ".join(["il"] * 40), None, 60, 600, 10)
+    wide = wrap_text(" ".join(["WM"] * 40), None, 60, 600, 10)
+    assert len(narrow) < len(wide)
+    for line in narrow + wide:
+        assert m.text_width(line) <= 600 or " " not in line, line
+    clipped = wrap_text("word " * 200, None, 60, 600, 2)
+    assert len(clipped) == 2 and clipped[-1].endswith("...")
+    assert m.text_width(clipped[-1]) <= 600
+    print("✓ Wrapping follows measured glyph widths")
+
+
+def test_overlays_cached_by_inputs():
+    """Same inputs reuse the compiled file; any change compiles a new one."""
+    with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"ASS_OVERLAY_CACHE_DIR": tmp}):
+        first = build_overlays_ass(**_args())
+        text = first.read_text(encoding="utf-8")
+        assert "CapGlowFemale,,0,0,0,,Hello there" in text, "speaker prefix hidden, A glows female"
+        assert "CapGlowMale,,0,0,0,,Hi!" in text
+
+        with patch.object(ass_overlays, "compile_overlays", side_effect=AssertionError("recompiled")):
+            assert build_overlays_ass(**_args()) == first
+
+        shown = build_overlays_ass(**_args(hide_speaker_names=False))
+        assert shown != first and "Alice: Hello there" in shown.read_text(encoding="utf-8")
+        assert build_overlays_ass(**_args(width=1920, height=1080)) != first
+    print("✓ Compiled overlays cached by their inputs")
+
+
+def test_long_track_compiles_quickly():
+    """A 45-minute captions track compiles well under a second."""
+    words = "the storm moved north overnight bringing heavy rain and strong winds to coastal towns".split()
+    caps = []
+    for i in range(900):  # one caption every 3 s
+        text = " ".join(words[(i + k) % len(words)] for k in range(12))
+        caps.append({"start": i * 3.0, "end": i * 3.0 + 3.0, "text": text, "speaker": "AB"[i % 2]})
+    with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"ASS_OVERLAY_CACHE_DIR": tmp}):
+        t0 = time.perf_counter()
+        path = build_overlays_ass(**_args(caption_segments=caps))
+        elapsed = time.perf_counter() - t0
+        assert path.read_text(encoding="utf-8").count("Dialogue: 1,") == 901
+    assert elapsed < 1.0, f"compile took {elapsed:.3f}s"
+    print(f"✓ 900 captions compiled in {elapsed * 1000:.0f} ms")
+
+
+def test_render_wrapper_accepts_hide_speaker_names():
+    """The renderer's helper takes hide_speaker_names (legacy concat mode passes it)."""
+    with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"ASS_OVERLAY_CACHE_DIR": tmp}):
+        path = build_overlays_ass_from_segments(
+            video_path=Path(tmp) / "x.mp4",
+            width=1920,
+            height=1080,
+            caption_segments=[{"start": 0.0, "end": 1.0, "text": "A: Good morning"}],
+            hide_speaker_names=False,
+        )
+        assert "A: Good morning" in path.read_text(encoding="utf-8")
+    print("✓ Renderer wrapper honours hide_speaker_names")
+
+
+def main():
+    print("=" * 60)
+    print("ASS Overlay Tests")
+    print("=" * 60)
+
+    try:
+        test_wrap_uses_measured_widths()
+        test_overlays_cached_by_inputs()
+        test_long_track_compiles_quickly()
+        test_render_wrapper_accepts_hide_speaker_names()
+        print("\n" + "=" * 60)
+        print("✓ All ASS overlay tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental (pack-based) cache publishing to release assets.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cache_packs import publish_dir, restore_dir
+from tenant_assets import LocalReleaseStore
+
+INDEX = "Assets_1_Images_1920x1080.index.json"
+PREFIX = "Assets_1_ImagePack_"
+
+
+def _env(tmp):
+    return patch.dict(os.environ, {
+        "CONTENT_HASH_INDEX": str(Path(tmp) / "hashes.json"),
+        "TENANT_ASSETS_PACK_MAX_MB": "0.05",  # ~51 KB: one 40 KB image per pack
+    })
+
+
+def _packs(store):
+    return sorted(p.name for p in store.root.glob(f"{PREFIX}*.pack"))
+
+
+def test_publish_uploads_only_new_content():
+    """A second publish after one change uploads one pack and a new index."""
+    with tempfile.TemporaryDirectory() as tmp, _env(tmp):
+        store = LocalReleaseStore(Path(tmp) / "release")
+        store.ensure()
+        processed = Path(tmp) / "processed"
+        processed.mkdir()
+        for i in range(3):
+            (processed / f"image_{i:03d}.jpg").write_bytes(bytes([i]) * 40_000)
+        (processed / "manifest_1920x1080.json").write_text('{"entries": []}')
+        (processed / "_download_tmp").mkdir()
+        (processed / "_download_tmp" / "junk.zip").write_bytes(b"x" * 40_000)
+
+        first = publish_dir(store, processed, INDEX, PREFIX, Path(tmp) / "up")
+        assert first["files"] == 4 and first["new_packs"] == 3 and first["index_uploaded"] == 1, first
+        assert len(_packs(store)) == 3
+
+        again = publish_dir(store, processed, INDEX, PREFIX, Path(tmp) / "up")
+        assert again["new_packs"] == 0 and again["index_uploaded"] == 0, again
+
+        (processed / "image_001.jpg").write_bytes(b"\xff" * 40_000)
+        (processed / "image_003.jpg").write_bytes(bytes([0]) * 40_000)  # same content as image_000
+        delta = publish_dir(store, processed, INDEX, PREFIX, Path(tmp) / "up")
+        assert delta["new_packs"] == 1 and delta["reused"] == 3, delta
+        assert len(_packs(store)) == 4
+    print("✓ Only new content is packed and uploaded")
+
+
+def test_restore_fetches_only_missing_packs():
+    """Restore downloads just the packs for files that are missing or different."""
+    with tempfile.TemporaryDirectory() as tmp, _env(tmp):
+        store = LocalReleaseStore(Path(tmp) / "release")
+        store.ensure()
+        src = Path(tmp) / "src"
+        src.mkdir()
+        for i in range(3):
+            (src / f"image_{i:03d}.jpg").write_bytes(bytes([i + 1]) * 40_000)
+        (src / "manifest_1920x1080.json").write_text('{"entries": []}')
+        publish_dir(store, src, INDEX, PREFIX, Path(tmp) / "up")
+
+        dest = Path(tmp) / "dest"
+        full = restore_dir(store, dest, INDEX, Path(tmp) / "down")
+        assert full == {"files": 4, "fetched": 4, "packs": 3}, full
+        for p in src.iterdir():
+            assert (dest / p.name).read_bytes() == p.read_bytes()
+
+        (dest / "image_002.jpg").write_bytes(b"corrupt")
+        partial = restore_dir(store, dest, INDEX, Path(tmp) / "down")
+        assert partial == {"files": 4, "fetched": 1, "packs": 1}, partial
+        assert (dest / "image_002.jpg").read_bytes() == (src / "image_002.jpg").read_bytes()
+
+        assert restore_dir(store, dest, "missing.index.json", Path(tmp) / "down") is None
+    print("✓ Restore fetches only the packs it needs")
+
+
+def main():
+    print("=" * 60)
+    print("Cache Pack Tests")
+    print("=" * 60)
+
+    try:
+        test_publish_uploads_only_new_content()
+        test_restore_fetches_only_missing_packs()
+        print("\n" + "=" * 60)
+        print("✓ All cache pack tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
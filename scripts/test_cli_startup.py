@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Import-time budget tests for the CLI entry points.
+
+Batch jobs spawn many short-lived `cli.py` invocations, so importing the
+pipeline runner must not drag in stage modules or heavy third-party clients.
+Each check runs in a fresh interpreter so sys.modules reflects a cold start.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Generous ceiling for a cold `import run_pipeline` on a CI runner.
+IMPORT_BUDGET_SECONDS = 1.0
+
+# Modules that must only load once their stage actually runs.
+HEAVY_MODULES = [
+    "script_generate",
+    "tts_generate",
+    "video_render",
+    "responses_api_generator",
+    "openai",
+    "httpx",
+    "googleapiclient",
+    "google.cloud.texttospeech",
+    "PIL",
+    "yaml",
+]
+
+
+def _cold_import(module: str) -> dict:
+    code = (
+        "import json, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - t0\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(SCRIPTS_DIR),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    lines = proc.stdout.strip().splitlines()
+    result = json.loads(lines[-1])
+    result["stdout"] = lines[:-1]
+    return result
+
+
+def test_run_pipeline_import_is_lazy():
+    """Importing run_pipeline must not import any stage or client module."""
+    result = _cold_import("run_pipeline")
+    assert result["heavy"] == [], f"Eagerly imported: {result['heavy']}"
+    print("✓ run_pipeline imports no stage modules")
+
+
+def test_run_pipeline_import_within_budget():
+    """Cold import of run_pipeline stays within the startup budget."""
+    result = _cold_import("run_pipeline")
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS, (
+        f"import run_pipeline took {result['elapsed']:.3f}s (budget {IMPORT_BUDGET_SECONDS}s)"
+    )
+    print(f"✓ import run_pipeline: {result['elapsed'] * 1000:.1f} ms")
+
+
+def test_tts_generate_import_is_silent():
+    """tts_generate must not print warnings at import time."""
+    result = _cold_import("tts_generate")
+    assert result["stdout"] == [], f"Unexpected import-time output: {result['stdout']}"
+    print("✓ tts_generate imports silently")
+
+
+def test_stage_modules_resolve_lazily():
+    """Stage modules remain reachable as run_pipeline attributes."""
+    import run_pipeline
+
+    assert run_pipeline._stage("video_render") is run_pipeline.video_render
+    assert hasattr(run_pipeline.video_render, "render_for_topic")
+    print("✓ run_pipeline.video_render resolves on access")
+
+
+def main():
+    print("=" * 60)
+    print("CLI Startup Tests")
+    print("=" * 60)
+
+    try:
+        test_run_pipeline_import_is_lazy()
+        test_run_pipeline_import_within_budget()
+        test_tts_generate_import_is_silent()
+        test_stage_modules_resolve_lazily()
+        print("\n" + "=" * 60)
+        print("✓ All CLI startup tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
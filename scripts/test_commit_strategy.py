@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the commit-each-module strategy layer.
+
+Uses a throwaway git repository to check that only declared stage outputs are
+staged, that oversized media is skipped, and that stage commits coalesce.
+"""
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from commit_strategy import StageCommitter, resolve_stage_outputs
+
+
+TOPIC = "topic-01"
+DATE = "20250101"
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _init_repo(tmp: str) -> Path:
+    repo = Path(tmp)
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "test@example.com")
+    _git(repo, "config", "user.name", "test")
+    (repo / "README").write_text("x")
+    _git(repo, "add", "README")
+    _git(repo, "commit", "-q", "-m", "init")
+    return repo
+
+
+def _tracked(repo: Path) -> set:
+    return set(_git(repo, "ls-files").split())
+
+
+def test_resolve_stage_outputs_only_declared_files():
+    """Stage resolution ignores unrelated files in the output dir."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        (out / f"{TOPIC}-{DATE}-S1.script.json").write_text("{}")
+        (out / f"{TOPIC}-{DATE}-S1.m4a").write_bytes(b"a")
+        (out / f"{TOPIC}-{DATE}-S1.tts_ledger.json").write_text("{}")
+        (out / "scratch.tmp").write_text("x")
+
+        scripts = [p.name for p in resolve_stage_outputs("scripts", out, TOPIC, DATE)]
+        tts = [p.name for p in resolve_stage_outputs("tts", out, TOPIC, DATE)]
+
+        assert scripts == [f"{TOPIC}-{DATE}-S1.script.json"], scripts
+        assert tts == [f"{TOPIC}-{DATE}-S1.m4a", f"{TOPIC}-{DATE}-S1.tts_ledger.json"], tts
+    print("✓ Only declared stage outputs are resolved")
+
+
+def test_large_files_skipped_and_stages_coalesced():
+    """Large media stays untracked and both stages land in one commit."""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = _init_repo(tmp)
+        out = repo / "outputs" / TOPIC
+        out.mkdir(parents=True)
+        (out / f"{TOPIC}-{DATE}-S1.script.json").write_text("{}")
+        (out / f"{TOPIC}-{DATE}-S1.m4a").write_bytes(b"a" * 10)
+        (out / f"{TOPIC}-{DATE}-S1.mp4").write_bytes(b"v" * 4096)
+        (out / "scratch.tmp").write_text("x")
+
+        committer = StageCommitter(
+            repo, "[t] topic-01 20250101",
+            max_file_bytes=1024,
+            batch_max_seconds=3600,
+            batch_max_bytes=10 * 1024 * 1024,
+            run_async=True,
+        )
+        for stage in ("scripts", "tts", "video"):
+            committer.add_stage(stage, resolve_stage_outputs(stage, out, TOPIC, DATE))
+        made = committer.close()
+
+        tracked = _tracked(repo)
+        assert made == 1, f"Expected one coalesced commit, got {made}"
+        assert f"outputs/{TOPIC}/{TOPIC}-{DATE}-S1.script.json" in tracked
+        assert f"outputs/{TOPIC}/{TOPIC}-{DATE}-S1.m4a" in tracked
+        assert f"outputs/{TOPIC}/{TOPIC}-{DATE}-S1.mp4" not in tracked, "Large MP4 must be skipped"
+        assert f"outputs/{TOPIC}/scratch.tmp" not in tracked, "Undeclared files must not be staged"
+        subject = _git(repo, "log", "-1", "--format=%s").strip()
+        assert subject == "[t] topic-01 20250101 - scripts, tts, video", subject
+    print("✓ Large files skipped, stages coalesced into one commit")
+
+
+def test_size_budget_flushes_batch():
+    """Exceeding the byte budget commits immediately."""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = _init_repo(tmp)
+        out = repo / "outputs" / TOPIC
+        out.mkdir(parents=True)
+        (out / f"{TOPIC}-{DATE}-S1.script.json").write_text("{}" * 100)
+        (out / f"{TOPIC}-{DATE}-S1.m4a").write_bytes(b"a" * 100)
+
+        committer = StageCommitter(
+            repo, "[t] topic-01 20250101",
+            max_file_bytes=1024 * 1024,
+            batch_max_seconds=3600,
+            batch_max_bytes=1,
+            run_async=False,
+        )
+        committer.add_stage("scripts", resolve_stage_outputs("scripts", out, TOPIC, DATE))
+        assert committer.commits_made == 1, "Byte budget should trigger a flush"
+        committer.add_stage("tts", resolve_stage_outputs("tts", out, TOPIC, DATE))
+        assert committer.close() == 2
+    print("✓ Byte budget flushes pending commits")
+
+
+def main():
+    print("=" * 60)
+    print("Commit Strategy Tests")
+    print("=" * 60)
+
+    try:
+        test_resolve_stage_outputs_only_declared_files()
+        test_large_files_skipped_and_stages_coalesced()
+        test_size_budget_flushes_batch()
+        print("\n" + "=" * 60)
+        print("✓ All commit strategy tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -109,6 +109,27 @@ def test_concat_file_uses_absolute_paths():
         concat_file.unlink()
 
 
+def test_concat_references_prepared_images_in_place():
+    """The single-pass concat file points at the prepared-cache paths themselves."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        processed = Path(temp_dir) / "_prepared_images" / "1920x1080" / "processed"
+        processed.mkdir(parents=True)
+        images = [processed / "image_001.jpg", Path(temp_dir) / "images" / "it's.png"]
+        segments = [
+            {"image": images[0], "duration": 4.0},
+            {"image": images[1], "duration": 6.0},
+        ]
+        concat_path = Path(temp_dir) / "_tmp_render" / "video.concat.txt"
+        video_render._write_concat_demuxer_file(segments, concat_path)
+
+        lines = concat_path.read_text(encoding="utf-8").splitlines()
+        assert lines[0] == f"file '{images[0]}'", lines[0]
+        assert lines[1] == "duration 4.000000"
+        assert lines[2] == f"file '{images[1].parent}/it'\\''s.png'", lines[2]
+        assert lines[-1] == lines[2], "last image is repeated so its duration is respected"
+    print("✓ Concat file references prepared images in place")
+
+
 def main():
     """Run the test."""
     print("="*70)
@@ -118,6 +139,7 @@ def main():
     
     try:
         test_concat_file_uses_absolute_paths()
+        test_concat_references_prepared_images_in_place()
         print()
         print("="*70)
         print("✓ Test passed! Concat files use absolute paths.")
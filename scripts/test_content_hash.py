@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for content-hash validation of prepared-image manifests.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import content_hash
+from content_hash import HashIndex, hash_file_uncached
+from image_preprocess_cache import match_manifest_entries, validate_local_manifest
+
+
+def _write_manifest(processed: Path, sources, composite: Path) -> Path:
+    entries = []
+    for src in sources:
+        st = src.stat()
+        entry = {
+            "source_name": src.name,
+            "source_size": st.st_size,
+            "source_mtime": st.st_mtime,
+            "source_hash": hash_file_uncached(src),
+            "mode": "passthrough",
+            "out_file": None,
+            "out_hash": None,
+        }
+        if src.name == composite.name:
+            entry.update(mode="composite", out_file=composite.name, out_hash=hash_file_uncached(composite))
+        entries.append(entry)
+    manifest = processed / "manifest_1080x1920.json"
+    manifest.write_text(json.dumps({"entries": entries}), encoding="utf-8")
+    return manifest
+
+
+def test_index_skips_rehash_until_file_changes():
+    """Unchanged files are served from the persisted index."""
+    with tempfile.TemporaryDirectory() as tmp:
+        f = Path(tmp) / "a.jpg"
+        f.write_bytes(b"one")
+        index_path = Path(tmp) / "index.json"
+        idx = HashIndex(index_path)
+        digest = idx.hash_file(f)
+        idx.save()
+
+        idx = HashIndex(index_path)
+        with patch.object(content_hash, "hash_file_uncached", side_effect=AssertionError("rehashed")):
+            assert idx.hash_file(f) == digest
+
+        f.write_bytes(b"two!")
+        assert idx.hash_file(f) != digest
+    print("✓ Hash index reuses digests of unchanged files")
+
+
+def test_manifest_survives_mtime_reset():
+    """A restore that rewrites every mtime keeps the manifest valid."""
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch.dict(os.environ, {"CONTENT_HASH_INDEX": str(Path(tmp) / "index.json")}):
+        src_dir, processed = Path(tmp) / "images", Path(tmp) / "processed"
+        src_dir.mkdir()
+        processed.mkdir()
+        a, b = src_dir / "a.jpg", src_dir / "b.jpg"
+        a.write_bytes(b"small image")
+        b.write_bytes(b"large image")
+        composite = processed / "a.jpg"
+        composite.write_bytes(b"composite")
+        manifest = _write_manifest(processed, [a, b], composite)
+
+        for p in (a, b, composite):
+            os.utime(p, (1_000_000, 1_000_000))
+        assert validate_local_manifest(manifest, [a, b])
+
+        composite.write_bytes(b"corrupted")
+        assert not validate_local_manifest(manifest, [a, b])
+    print("✓ Manifest validated by content, not mtime")
+
+
+def test_renamed_source_matched_by_hash():
+    """A renamed source keeps its entry; partial matching reports the rest."""
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch.dict(os.environ, {"CONTENT_HASH_INDEX": str(Path(tmp) / "index.json")}):
+        src_dir, processed = Path(tmp) / "images", Path(tmp) / "processed"
+        src_dir.mkdir()
+        processed.mkdir()
+        a = src_dir / "a.jpg"
+        a.write_bytes(b"small image")
+        composite = processed / "a.jpg"
+        composite.write_bytes(b"composite")
+        manifest = _write_manifest(processed, [a], composite)
+
+        moved = src_dir / "renamed.jpg"
+        a.rename(moved)
+        new = src_dir / "new.jpg"
+        new.write_bytes(b"new image")
+
+        matched = match_manifest_entries(manifest, [moved, new], partial=True)
+        assert set(matched) == {"renamed.jpg"}, matched
+        assert matched["renamed.jpg"]["out_file"] == "a.jpg"
+        assert match_manifest_entries(manifest, [moved, new]) is None
+    print("✓ Renamed sources matched by content hash")
+
+
+def main():
+    print("=" * 60)
+    print("Content Hash Manifest Tests")
+    print("=" * 60)
+
+    try:
+        test_index_skips_rehash_until_file_changes()
+        test_manifest_survives_mtime_reset()
+        test_renamed_source_matched_by_hash()
+        print("\n" + "=" * 60)
+        print("✓ All content hash tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for batched, concurrent premium TTS against a local stub of the Cloud TTS REST API.
+"""
+import base64
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gcloud_tts_batch import plan_requests, synthesize_to_cache
+import tts_generate
+
+RATE = 16000
+SEGMENT_S = 0.30
+BREAK_S = 0.25
+
+
+def _tone(level, seconds):
+    return array("h", [level if i % 2 else -level for i in range(int(RATE * seconds))])
+
+
+def _wav_b64(samples):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(samples.tobytes())
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+class StubTTS:
+    """Cloud TTS stand-in: one tone per utterance (level 1000 * (index + 1)), marks at their starts."""
+
+    def __init__(self, *, throttle_first=False, drop_marks=False):
+        self.bodies = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttle_first = throttle_first
+        self.drop_marks = drop_marks
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.bodies.append(body)
+                    throttle = stub.throttle_first and len(stub.bodies) == 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(0.05)
+                with stub.lock:
+                    stub.in_flight -= 1
+                if throttle:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    self.wfile.write(b'{"error": "quota"}')
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(json.dumps(stub.respond(body)).encode())
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def respond(self, body):
+        ssml = body["input"].get("ssml")
+        if not ssml:
+            return {"audioContent": _wav_b64(_tone(500, SEGMENT_S))}
+        marks = re.findall(r'<mark name="(u\d+)"/>', ssml)
+        samples, timepoints = array("h"), []
+        for i, name in enumerate(marks):
+            timepoints.append({"markName": name, "timeSeconds": len(samples) / RATE})
+            samples.extend(_tone(1000 * (i + 1), SEGMENT_S))
+            samples.extend(array("h", [0] * int(RATE * BREAK_S)))
+        return {"audioContent": _wav_b64(samples), "timepoints": [] if self.drop_marks else timepoints}
+
+    def close(self):
+        self.server.shutdown()
+
+
+def _levels(path):
+    with wave.open(str(path), "rb") as w:
+        frames = array("h", w.readframes(w.getnframes()))
+        return max(abs(x) for x in frames), w.getnframes() / w.getframerate()
+
+
+A, B, J = "en-US-Neural2-D", "en-US-Neural2-F", "en-US-Journey-D"
+ITEMS = [
+    (A, "Welcome back."), (A, "Rates held at four and a half percent."), (A, "Markets noticed."),
+    (B, "They did."),
+    (A, "x " * 200),
+    (J, "Journey voices take plain text."),
+]
+
+
+def test_batched_requests_split_into_cache():
+    """Short same-voice runs share an SSML request; marks split them into per-chunk cache WAVs."""
+    assert [len(t) for _, t in plan_requests(ITEMS)] == [3, 1, 1, 1]
+    stub = StubTTS(throttle_first=True)
+    try:
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"GOOGLE_API_KEY": "test"}):
+            cache = Path(tmp)
+            stats = synthesize_to_cache(ITEMS, cache, endpoint=stub.url, concurrency=4, per_minute=6000)
+            assert stats == {"cached": 0, "synthesized": 6, "failed": 0, "requests": 5}, stats
+            assert stub.max_in_flight > 1, stub.max_in_flight
+            batch = [b for b in stub.bodies if "ssml" in b["input"]]
+            assert batch and batch[0]["enableTimePointing"] == ["SSML_MARK"]
+            assert all("ssml" not in b["input"] for b in stub.bodies if b["voice"]["name"] == J)
+
+            for i, (_, text) in enumerate(ITEMS[:3]):
+                key = tts_generate.compute_tts_cache_key("gemini", A, text)
+                peak, dur = _levels(cache / f"{key}.wav")
+                assert peak == 1000 * (i + 1), (i, peak)
+                assert abs(dur - (SEGMENT_S + BREAK_S)) < 0.01, dur
+                meta = json.loads((cache / f"{key}.meta.json").read_text())
+                assert meta["batched"] and meta["version"] == tts_generate.TTS_CACHE_VERSION
+
+            # the sequential path now only reads the cache
+            with patch.object(tts_generate, "generate_tts_gemini", side_effect=AssertionError("synthesized again")):
+                for voice, text in ITEMS:
+                    assert tts_generate.generate_tts_chunk(text.strip(), voice, True, cache).exists()
+            again = synthesize_to_cache(ITEMS, cache, endpoint=stub.url)
+            assert again["cached"] == 6 and again["requests"] == 0
+    finally:
+        stub.close()
+    print("✓ Batched requests split into the TTS cache")
+
+
+def test_batch_without_marks_resent_per_chunk():
+    """When marks do not come back, the batch's chunks are synthesized one per request."""
+    stub = StubTTS(drop_marks=True)
+    try:
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"GOOGLE_API_KEY": "test"}):
+            stats = synthesize_to_cache(ITEMS[:3], Path(tmp), endpoint=stub.url, per_minute=0)
+            assert stats["synthesized"] == 3 and stats["requests"] == 4, stats
+            assert [("ssml" in b["input"]) for b in stub.bodies].count(False) == 3
+    finally:
+        stub.close()
+    print("✓ Batch without marks re-sent per chunk")
+
+
+def main():
+    print("=" * 60)
+    print("Batched Premium TTS Tests")
+    print("=" * 60)
+
+    try:
+        test_batched_requests_split_into_cache()
+        test_batch_without_marks_resent_per_chunk()
+        print("\n" + "=" * 60)
+        print("✓ All batched premium TTS tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for budgeted, structure-aware Gemini continuation and parallel items.
+"""
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import gemini_utils
+from gemini_utils import JsonProgress, gemini_generate_chunked
+
+MODEL = "gemini-3-flash-preview"
+
+
+def test_json_progress_is_exact():
+    """Brackets inside strings and escaped quotes do not end the document."""
+    doc = '{"content":[{"code":"S1","script":"HOST_A: a } or ] and \\"quoted {\\" text"}]}'
+    p = JsonProgress()
+    pieces = [doc[i:i + 7] for i in range(0, len(doc), 7)]
+    fed = "```json\n"
+    assert not p.feed(fed) and not p.started
+    for piece in pieces[:-1]:
+        fed += piece
+        assert not p.feed(piece)
+    assert p.feed(pieces[-1] + "\n```")
+    fed += pieces[-1] + "\n```"
+    assert json.loads(fed[p.start:p.end]) == json.loads(doc)
+
+    open_doc = JsonProgress()
+    open_doc.feed('{"content":[{"script":"ends in a string {')
+    assert open_doc.in_string and open_doc.stack == ["{", "[", "{"]
+    assert "inside a JSON string" in open_doc.describe() and "}]}" in open_doc.describe()
+    print("✓ JSON structural state tracked exactly")
+
+
+def test_chunked_stops_when_balanced():
+    """Parts are sized from the remaining budget; repeats are dropped; stops at the close."""
+    doc = json.dumps({"content": [{"code": "L1", "script": "HOST_A: " + " ".join(f"word{i}" for i in range(600))}]})
+    cut = len(doc) // 2
+    replies = [
+        (doc[:cut], "MAX_TOKENS"),
+        (doc[cut - 40:] + "\nDone!", "STOP"),  # repeats the tail, then chatter after the close
+        ("never requested", "STOP"),
+    ]
+    calls = []
+
+    def fake_request(**kw):
+        calls.append(kw)
+        return replies[len(calls) - 1]
+
+    with patch.object(gemini_utils, "_gemini_request", side_effect=fake_request):
+        full, parts = gemini_generate_chunked(
+            model=MODEL, base_prompt="Write L1", total_output_tokens=2000, min_part_tokens=256,
+        )
+    assert full == doc, full[-80:]
+    assert len(calls) == 2 and len(parts) == 2
+    assert calls[0]["max_output_tokens"] == 2000 and calls[0]["json_mode"]
+    assert 256 <= calls[1]["max_output_tokens"] < 2000 and not calls[1]["json_mode"]
+    assert "inside a JSON string value" in calls[1]["prompt"]
+    assert f"Provide next part after '{gemini_utils._last_n_words(doc[:cut])}'" in calls[1]["prompt"]
+    print("✓ Continuation sized from budget and stopped when balanced")
+
+
+def test_items_generated_in_parallel():
+    """With GEMINI_PARALLEL_ITEMS each spec is its own request; results keep spec order."""
+    import responses_api_generator as rag
+
+    specs = [
+        {"code": "S1", "type": "short", "max_words": 120},
+        {"code": "S2", "type": "short", "max_words": 120},
+        {"code": "R1", "type": "reels", "max_words": 60},
+    ]
+    config = {"llm_model_pass_b": MODEL, "content_specs": specs}
+    threads = set()
+
+    def fake_request(**kw):
+        threads.add(threading.get_ident())
+        codes = re.findall(r"^- (\w+): type=", kw["prompt"], re.M)
+        content = [{"code": c, "type": "short", "script": f"HOST_A: {c}", "video_title": f"T {c}",
+                    "video_description": "d", "video_tags": "a, b"} for c in codes]
+        return json.dumps({"content": content}), "STOP"
+
+    with patch.object(gemini_utils, "_gemini_request", side_effect=fake_request) as req:
+        with patch.dict(os.environ, {"GEMINI_PARALLEL_ITEMS": "3"}):
+            out = rag._run_gemini_single_pass_all_v2(None, config, specs, [])
+        assert [it["code"] for it in out["content"]] == ["S1", "S2", "R1"]
+        assert req.call_count == 3
+
+        with patch.dict(os.environ, {"GEMINI_PARALLEL_ITEMS": "0"}):
+            out = rag._run_gemini_single_pass_all_v2(None, config, specs, [])
+        assert [it["code"] for it in out["content"]] == ["S1", "S2", "R1"]
+        assert req.call_count == 4
+    print("✓ Independent items generated in parallel requests")
+
+
+def main():
+    print("=" * 60)
+    print("Gemini Chunking Tests")
+    print("=" * 60)
+
+    try:
+        test_json_progress_is_exact()
+        test_chunked_stops_when_balanced()
+        test_items_generated_in_parallel()
+        print("\n" + "=" * 60)
+        print("✓ All Gemini chunking tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-wide API client registry.
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import http_clients
+
+
+class FakeResponse:
+    def __init__(self, text, finish):
+        self.status_code = 200
+        self.text = ""
+        self._data = {"candidates": [{"finishReason": finish, "content": {"parts": [{"text": text}]}}]}
+
+    def json(self):
+        return self._data
+
+
+class FakePool:
+    """Stands in for the pooled httpx.Client; records requests, closes once."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.posts = []
+        self.closed = 0
+
+    def post(self, url, **kwargs):
+        self.posts.append((url, kwargs))
+        return FakeResponse(*self.replies.pop(0))
+
+    def close(self):
+        self.closed += 1
+
+
+def test_registry_creates_each_client_once():
+    """Concurrent lookups share one client per key; close_all closes them."""
+    made = []
+
+    def factory():
+        made.append(1)
+        return FakePool([])
+
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(http_clients._registered(("test", "k"), factory)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(made) == 1 and all(c is got[0] for c in got)
+    assert http_clients._registered(("test", "other"), factory) is not got[0]
+
+    http_clients.close_all()
+    assert got[0].closed == 1 and not http_clients._CLIENTS
+    with patch.dict(os.environ, {"HTTP_MAX_CONNECTIONS": "4", "HTTP_KEEPALIVE_EXPIRY_S": "30"}):
+        s = http_clients.pool_settings()
+    assert s["max_connections"] == 4 and s["keepalive_expiry"] == 30.0 and s["max_keepalive_connections"] == 10
+    print("✓ Registry creates each client once")
+
+
+def test_gemini_parts_reuse_pool():
+    """All parts of a chunked Gemini generation go through the same pooled client."""
+    import gemini_utils
+
+    doc = json.dumps({"content": [{"code": "S1", "script": "HOST_A: " + " ".join(f"w{i}" for i in range(50))}]})
+    pool = FakePool([(doc[:60], "MAX_TOKENS"), (doc[60:], "STOP")])
+    http_clients._CLIENTS[("http", "gemini")] = pool
+    try:
+        with patch.dict(os.environ, {"GOOGLE_API_KEY": "test", "API_CASSETTE_MODE": "off",
+                                     "GEMINI_HTTP_TIMEOUT_S": "90"}), \
+                patch.object(http_clients, "request_timeout", side_effect=lambda t, c=None: (t, c)):
+            full, parts = gemini_utils.gemini_generate_chunked(
+                model="gemini-3-flash", base_prompt="Write S1", total_output_tokens=4000,
+            )
+        assert full == doc and len(parts) == 2
+        assert len(pool.posts) == 2
+        assert all(kw["timeout"] == (90.0, None) for _, kw in pool.posts)
+        assert pool.posts[0][0].endswith("/gemini-3-flash-preview:generateContent")
+    finally:
+        http_clients._CLIENTS.pop(("http", "gemini"), None)
+    print("✓ Gemini parts reuse one connection pool")
+
+
+def main():
+    print("=" * 60)
+    print("HTTP Client Registry Tests")
+    print("=" * 60)
+
+    try:
+        test_registry_creates_each_client_once()
+        test_gemini_parts_reuse_pool()
+        print("\n" + "=" * 60)
+        print("✓ All HTTP client registry tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for near-duplicate image filtering (dHash + BK-tree).
+"""
+import io
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from global_config import IMAGE_DEDUP_MAX_DISTANCE
+from image_dedup import BKTree, NearDuplicateIndex, dhash, format_hash, hamming, parse_hash
+
+
+def _picture(seed: int, size=(640, 480), quality: int = 92) -> bytes:
+    """JPEG of a random arrangement of shaded ellipses (a stand-in for a photo)."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    im = Image.new("RGB", (640, 480), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(im)
+    for _ in range(25):
+        x, y = rng.randrange(-100, 640), rng.randrange(-100, 480)
+        w, h = rng.randrange(60, 300), rng.randrange(60, 300)
+        draw.ellipse((x, y, x + w, y + h), fill=tuple(rng.randrange(256) for _ in range(3)))
+    if size != im.size:
+        im = im.resize(size, Image.LANCZOS)
+    buf = io.BytesIO()
+    im.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def test_bktree_matches_linear_scan():
+    """BK-tree radius search returns exactly what a linear scan finds."""
+    rng = random.Random(7)
+    hashes = [rng.getrandbits(64) for _ in range(300)]
+    tree = BKTree()
+    for i, h in enumerate(hashes):
+        tree.add(h, f"image_{i:03d}.jpg")
+    assert len(tree) == 300
+
+    for probe in hashes[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        for radius in (0, 6, 20):
+            expected = sorted(
+                (hamming(probe, h), f"image_{i:03d}.jpg") for i, h in enumerate(hashes)
+                if hamming(probe, h) <= radius
+            )
+            assert sorted(tree.search(probe, radius)) == expected
+    print("✓ BK-tree search matches linear scan")
+
+
+def test_near_duplicate_index_threshold():
+    """Candidates within max_distance bits are reported; others are not."""
+    index = NearDuplicateIndex(max_distance=6)
+    base = 0x0F0F_F0F0_3C3C_A5A5
+    index.add(base, "image_000.jpg")
+    index.add(None, "undecodable.jpg")
+
+    assert index.find(base ^ 0b111) == (3, "image_000.jpg")
+    assert index.find(base ^ 0xFF) is None, "8 differing bits is a different picture"
+    assert index.find(None) is None
+    assert len(index) == 1
+    print("✓ Near-duplicate threshold applied")
+
+
+def test_hash_hex_roundtrip():
+    h = 0x00AB_CDEF_0123_4567
+    assert format_hash(h) == "00abcdef01234567"
+    assert parse_hash(format_hash(h)) == h
+    assert parse_hash("") is None and parse_hash("zz") is None
+    print("✓ Hash hex round-trip")
+
+
+def test_dhash_tolerates_resize_and_recompression():
+    """A rescaled, recompressed copy stays within the threshold; another picture does not."""
+    original = dhash(_picture(1))
+    copy = dhash(_picture(1, size=(400, 300), quality=45))
+    other = dhash(_picture(2))
+    assert None not in (original, copy, other), "Pillow is required to hash JPEG bytes"
+
+    assert hamming(original, copy) <= IMAGE_DEDUP_MAX_DISTANCE, hamming(original, copy)
+    assert hamming(original, other) > IMAGE_DEDUP_MAX_DISTANCE, hamming(original, other)
+    assert dhash(b"not an image") is None
+    print("✓ dHash matches a resized/recompressed copy and separates a different picture")
+
+
+class _FakeSearchService:
+    """cse().list(**params).execute() returning one page of fixed results."""
+
+    def __init__(self, links):
+        self.links = links
+        self.calls = 0
+
+    def cse(self):
+        return self
+
+    def list(self, **params):
+        return self
+
+    def execute(self):
+        self.calls += 1
+        return {"items": [{"link": u, "title": f"Result {u}", "displayLink": "example.com"} for u in self.links]}
+
+
+def test_collector_replaces_near_duplicate_with_later_result():
+    """A near-duplicate download is rejected and its slot goes to the next unused result."""
+    import image_collector
+
+    pictures = {
+        "https://a.example.com/photo.jpg": _picture(1),
+        "https://b.example.com/photo-small.jpg": _picture(1, size=(400, 300), quality=45),
+        "https://c.example.com/other.jpg": _picture(2),
+        "https://d.example.com/third.jpg": _picture(3),
+    }
+    fetched = []
+
+    def fake_fetch(req):
+        fetched.append(req.full_url)
+        return pictures[req.full_url]
+
+    service = _FakeSearchService(list(pictures))
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        out = tmp / "images"
+        with patch.object(image_collector, "GOOGLE_API_AVAILABLE", True), \
+             patch.object(image_collector, "HttpError", Exception, create=True), \
+             patch.object(image_collector, "get_search_service", lambda key: service), \
+             patch.object(image_collector, "_fetch_bytes", fake_fetch), \
+             patch.object(image_collector, "USAGE_TRACKING_FILE", tmp / "usage" / "usage.json"), \
+             patch.object(image_collector, "IMAGE_STORE_ENABLED", False), \
+             patch.object(image_collector, "IMAGE_DEDUP_ENABLED", True):
+            result = image_collector.collect_images_for_topic(
+                "Dedup Topic",
+                ["dedup query"],
+                out,
+                num_images=2,
+                api_key="AIza-test",
+                search_engine_id="test:engine",
+            )
+
+        assert service.calls == 1
+        assert [p.name for p in result] == ["image_000.jpg", "image_001.jpg"]
+        assert fetched == [
+            "https://a.example.com/photo.jpg",
+            "https://b.example.com/photo-small.jpg",
+            "https://c.example.com/other.jpg",
+        ], fetched
+        assert (out / "image_000.jpg").read_bytes() == pictures["https://a.example.com/photo.jpg"]
+        assert (out / "image_001.jpg").read_bytes() == pictures["https://c.example.com/other.jpg"]
+
+        meta = json.loads((out / image_collector.IMAGES_METADATA_FILENAME).read_text(encoding="utf-8"))
+        by_name = {m["filename"]: m for m in meta["images"]}
+        assert by_name["image_001.jpg"]["url"] == "https://c.example.com/other.jpg"
+        assert all(m.get("dhash") for m in by_name.values())
+    print("✓ Collector rejects a near-duplicate and fills the slot from later results")
+
+
+def main():
+    print("=" * 60)
+    print("Image Dedup Tests")
+    print("=" * 60)
+
+    try:
+        test_bktree_matches_linear_scan()
+        test_near_duplicate_index_threshold()
+        test_hash_hex_roundtrip()
+        test_dhash_tolerates_resize_and_recompression()
+        test_collector_replaces_near_duplicate_with_later_result()
+        print("\n" + "=" * 60)
+        print("✓ All image dedup tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the images_metadata.json dimension/format index.
+"""
+import json
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from image_index import ImageIndex, describe_bytes, list_images, sniff_image
+
+
+def _png(w, h):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", w, h) + b"\x08\x02\x00\x00\x00"
+
+
+def _jpeg(w, h):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, h, w, 3) + b"\x00" * 6
+    return b"\xff\xd8" + app0 + sof0 + b"\xff\xd9"
+
+
+def test_sniff_headers():
+    """PNG, GIF and JPEG dimensions are read from the header bytes alone."""
+    assert sniff_image(_png(1920, 1080)) == ("png", 1920, 1080)
+    assert sniff_image(b"GIF89a" + struct.pack("<HH", 320, 200) + b"\x00" * 8) == ("gif", 320, 200)
+    assert sniff_image(_jpeg(800, 600)) == ("jpeg", 800, 600)
+    assert sniff_image(b"<html>not an image</html>") is None
+    info = describe_bytes(_png(64, 48))
+    assert info["width"] == 64 and info["height"] == 48 and info["format"] == "png"
+    assert info["size"] == len(_png(64, 48)) and info["content_hash"]
+    print("✓ Image headers sniffed without decoding")
+
+
+def test_index_refreshes_changed_files():
+    """Recorded dimensions are served until the file changes, then re-read."""
+    with tempfile.TemporaryDirectory() as tmp:
+        images = Path(tmp)
+        img = images / "image_000.png"
+        img.write_bytes(_png(100, 50))
+        entry = {"filename": img.name, "title": "t", **describe_bytes(img.read_bytes())}
+        entry["mtime_ns"] = img.stat().st_mtime_ns
+        (images / "images_metadata.json").write_text(json.dumps({"version": 1, "images": [entry]}))
+
+        index = ImageIndex(images)
+        assert index.dimensions(img) == (100, 50)
+        assert index.content_hash(img) == entry["content_hash"]
+
+        img.write_bytes(_png(1280, 720) + b"\x00" * 16)
+        assert index.dimensions(img) == (1280, 720)
+        assert index.content_hash(img) is None, "stale hash must be dropped"
+
+        hand_added = images / "extra.jpg"
+        hand_added.write_bytes(_jpeg(640, 480))
+        assert index.dimensions(hand_added) == (640, 480)
+        index.save()
+
+        saved = json.loads((images / "images_metadata.json").read_text())
+        by_name = {e["filename"]: e for e in saved["images"]}
+        assert by_name["image_000.png"]["width"] == 1280 and by_name["image_000.png"]["title"] == "t"
+        assert "extra.jpg" not in by_name, "hand-added files must not get blank metadata entries"
+    print("✓ Index refreshes entries of changed and hand-added files")
+
+
+def test_list_images_sees_files_despite_unchanged_mtime():
+    """Listings filter by extension and never go stale on coarse directory mtimes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        (d / "a.jpg").write_bytes(b"x")
+        (d / "notes.txt").write_bytes(b"x")
+        (d / ".hidden.jpg").write_bytes(b"x")
+        (d / "dir.jpg").mkdir()
+        os.utime(d, ns=(1_000_000_000, 1_000_000_000))
+        assert [p.name for p in list_images(d, (".jpg",))] == ["a.jpg"]
+
+        # Same directory mtime (coarse timestamps): the new file is still listed
+        (d / "b.jpg").write_bytes(b"x")
+        os.utime(d, ns=(1_000_000_000, 1_000_000_000))
+        assert sorted(p.name for p in list_images(d, (".jpg",))) == ["a.jpg", "b.jpg"]
+        assert list_images(d / "missing", (".jpg",)) == []
+    print("✓ Directory listings filtered and never stale")
+
+
+def main():
+    print("=" * 60)
+    print("Image Index Tests")
+    print("=" * 60)
+
+    try:
+        test_sniff_headers()
+        test_index_refreshes_changed_files()
+        test_list_images_sees_files_despite_unchanged_mtime()
+        print("\n" + "=" * 60)
+        print("✓ All image index tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
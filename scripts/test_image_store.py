@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared content-addressed image store.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from image_store import ImageStore
+
+
+def test_same_url_stored_once_and_linked():
+    """A URL downloaded for one topic is linked, not re-stored, for the next."""
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch.dict(os.environ, {"CONTENT_HASH_INDEX": str(Path(tmp) / "index.json")}):
+        store = ImageStore(Path(tmp) / "store")
+        url = "https://example.com/photo.jpg"
+        assert store.lookup_url(url) is None
+
+        obj = store.put_bytes(b"x" * 2048, ".jpg", url=url)
+        a = store.link(obj, Path(tmp) / "topic-01" / "images" / "image_000.jpg")
+        hit = store.lookup_url(url)
+        assert hit == obj
+        b = store.link(hit, Path(tmp) / "topic-02" / "images" / "image_004.jpg")
+
+        assert a.read_bytes() == b.read_bytes() == b"x" * 2048
+        assert os.stat(a).st_ino == os.stat(obj).st_ino, "topic file should hardlink the object"
+        stats = store.stats()
+        assert stats["objects"] == 1 and stats["refs"] == 2, stats
+    print("✓ Same URL stored once, linked into both topics")
+
+
+def test_gc_keeps_referenced_objects():
+    """GC removes only objects (and derivatives) nothing references."""
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch.dict(os.environ, {"CONTENT_HASH_INDEX": str(Path(tmp) / "index.json")}):
+        store = ImageStore(Path(tmp) / "store")
+        kept = store.put_bytes(b"kept" * 512, ".jpg", url="https://a/1.jpg")
+        gone = store.put_bytes(b"gone" * 512, ".png", url="https://a/2.png")
+        kept_link = store.link(kept, Path(tmp) / "topic-01" / "image_000.jpg")
+        gone_link = store.link(gone, Path(tmp) / "topic-02" / "image_000.png")
+
+        composite = Path(tmp) / "topic-02" / "processed" / "image_000.png"
+        composite.parent.mkdir(parents=True)
+        composite.write_bytes(b"composite")
+        gone_hash = gone.name.split(".")[0].replace("-", ":", 1)
+        derived = store.put_derived("composite_1080x1920", gone_hash, composite)
+        assert store.get_derived("composite_1080x1920", gone_hash) == derived
+
+        gone_link.unlink()
+        composite.unlink()
+        dry = store.gc(grace_hours=0, dry_run=True)
+        assert dry["objects"] == 1 and gone.exists()
+
+        result = store.gc(grace_hours=0)
+        assert result["objects"] == 1 and result["derived"] == 1, result
+        assert result["dead_refs"] == 2
+        assert not gone.exists() and not derived.exists()
+        assert kept.exists() and kept_link.exists()
+        assert store.lookup_url("https://a/2.png") is None
+        assert store.lookup_url("https://a/1.jpg") == kept
+    print("✓ GC removes only unreferenced objects")
+
+
+def main():
+    print("=" * 60)
+    print("Image Store Tests")
+    print("=" * 60)
+
+    try:
+        test_same_url_stored_once_and_linked()
+        test_gc_keeps_referenced_objects()
+        print("\n" + "=" * 60)
+        print("✓ All image store tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
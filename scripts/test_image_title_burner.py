@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled title burner: parallel vs serial output, the cached
+per-resolution overlay tile, and glow clipping at the frame edges.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PIL import Image, ImageDraw
+
+import image_title_burner as itb
+from image_title_burner import HostBadge, burn_prepared_pool
+
+TOPIC_CFG = {
+    "title": "Fallback Title",
+    "voice_a_name": "Alex",
+    "voice_a_gender": "male",
+    "voice_b_name": "Sam",
+    "voice_b_gender": "female",
+}
+
+
+def _make_pool(images_dir: Path, count: int = 6) -> list:
+    images_dir.mkdir(parents=True, exist_ok=True)
+    pool, items = [], []
+    for i in range(count):
+        path = images_dir / f"image_{i:03d}.png"
+        im = Image.new("RGB", (320, 180), (30 * i % 255, 90, 200 - 20 * i))
+        ImageDraw.Draw(im).rectangle((10 * i, 40, 10 * i + 60, 120), fill=(255, 255, 255))
+        im.save(path)
+        pool.append(path)
+        items.append({"local_file": path.name, "google_title": f"Headline number {i} about the topic"})
+    (images_dir / "metadata.json").write_text(json.dumps({"items": items}), encoding="utf-8")
+    return pool
+
+
+def _burn(pool: list, images_dir: Path, cache_dir: Path) -> tuple:
+    burned = burn_prepared_pool(
+        prepared_pool=pool,
+        cache_dir=cache_dir,
+        images_dir=images_dir,
+        topic_cfg=TOPIC_CFG,
+        target_width=320,
+        target_height=180,
+    )
+    manifest = json.loads((cache_dir / "processed_burned" / "manifest_burn_320x180.json").read_text(encoding="utf-8"))
+    return burned, manifest
+
+
+def test_pooled_and_serial_burns_match():
+    """The process pool produces the same images and manifest order as a serial burn."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        images_dir = tmp / "images"
+        pool = _make_pool(images_dir)
+
+        with patch.dict(os.environ, {"ENABLE_IMAGE_TITLE_BURN": "true"}):
+            with patch.object(itb, "_burn_workers", lambda n: 1):
+                serial, serial_manifest = _burn(pool, images_dir, tmp / "serial")
+            with patch.object(itb, "_burn_workers", lambda n: min(3, n)):
+                pooled, pooled_manifest = _burn(pool, images_dir, tmp / "pooled")
+
+        assert [p.name for p in serial] == [p.name for p in pool]
+        assert [p.name for p in pooled] == [p.name for p in pool]
+        assert serial_manifest["entries"] == pooled_manifest["entries"]
+        assert serial_manifest["burn_cfg_hash"] == pooled_manifest["burn_cfg_hash"]
+        for a, b in zip(serial, pooled):
+            assert Image.open(a).tobytes() == Image.open(b).tobytes(), a.name
+    print("✓ Pooled and serial burns give identical outputs and manifest")
+
+
+def test_cached_overlay_matches_fresh_render():
+    """The memoized overlay tile is pixel-identical to one rendered from scratch."""
+    hosts = (HostBadge("Alex", "male"), HostBadge("Sam", "female"))
+    itb._static_overlay.cache_clear()
+    first = itb._static_overlay(640, 360, 0.2, hosts)
+    cached = itb._static_overlay(640, 360, 0.2, hosts)
+    fresh = itb._static_overlay.__wrapped__(640, 360, 0.2, hosts)
+
+    assert cached is first, "Second call should hit the cache"
+    assert cached is not fresh
+    assert cached.mode == fresh.mode == "RGBA"
+    assert cached.size == fresh.size
+    assert cached.tobytes() == fresh.tobytes()
+    print("✓ Cached overlay tile matches a fresh render")
+
+
+def test_glow_is_clipped_at_frame_edges():
+    """Glow reaching past the frame is clipped: no exception, no wrap-around."""
+    font = itb._find_font(prefer_bold=True, size=28)
+    for xy in ((0, 0), (200, 100)):
+        base = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+        itb._draw_glow_text(
+            base, xy, "EDGE", font,
+            fill=(255, 255, 255, 255),
+            glow_rgb=(200, 200, 200),
+            glow_radius=6,
+            glow_alpha=210,
+            align="center",
+            anchor="mm",
+        )
+        assert base.size == (200, 100)
+        alpha = base.getchannel("A")
+        x, y = xy
+        near = (max(0, x - 40), max(0, y - 30), min(200, x + 40), min(100, y + 30))
+        assert alpha.crop(near).getbbox() is not None, f"Glow missing near {xy}"
+        # The opposite corner would only be touched if the layer wrapped around
+        far = (0, 0, 100, 50) if x else (100, 50, 200, 100)
+        assert alpha.crop(far).getbbox() is None, f"Glow at {xy} wrapped to {far}"
+
+    # A tile entirely outside the frame is a no-op
+    base = Image.new("RGBA", (50, 50), (0, 0, 0, 0))
+    itb._composite_clipped(base, Image.new("RGBA", (20, 20), (255, 0, 0, 255)), 60, -30)
+    assert base.getchannel("A").getbbox() is None
+    print("✓ Glow is clipped at frame edges")
+
+
+def main():
+    print("=" * 60)
+    print("Image Title Burner Tests")
+    print("=" * 60)
+
+    try:
+        test_pooled_and_serial_burns_match()
+        test_cached_overlay_matches_fresh_render()
+        test_glow_is_clipped_at_frame_edges()
+        print("\n" + "=" * 60)
+        print("✓ All image title burner tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared media metadata store (one ffprobe per file version).
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import media_probe
+from media_probe import MEDIA_METADATA_FILENAME, MediaStore, media_duration, media_resolution, probe_media, store_path_for
+
+PROBE = {
+    "streams": [
+        {"index": 0, "codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920,
+         "pix_fmt": "yuv420p", "r_frame_rate": "30/1"},
+        {"index": 1, "codec_type": "audio", "codec_name": "aac"},
+    ],
+    "format": {"filename": "/home/runner/work/outputs/x.mp4", "duration": "61.500000",
+               "format_name": "mov,mp4,m4a,3gp,3g2,mj2"},
+}
+
+
+def _fake_ffprobe(calls):
+    def run(cmd, **kwargs):
+        assert cmd[0] == "ffprobe", cmd
+        calls.append(cmd[-1])
+        return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(PROBE), stderr="")
+    return run
+
+
+def test_each_file_probed_once():
+    """Lookups reuse the stored probe across stores; a rewritten file is probed again."""
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as store_dir:
+        video = Path(tmp) / "topic-01-20250101-S1.mp4"
+        video.write_bytes(b"video")
+        calls = []
+        with patch.dict(os.environ, {"MEDIA_PROBE_DIR": store_dir}), \
+             patch.object(media_probe.subprocess, "run", side_effect=_fake_ffprobe(calls)):
+            info = probe_media(video)
+            assert media_duration(info) == 61.5 and media_resolution(info) == (1080, 1920)
+            assert probe_media(video) is info
+            # a fresh store (next process) reads the stored probe instead of probing
+            again = MediaStore(Path(tmp)).probe(video)
+            assert media_resolution(again) == (1080, 1920)
+            assert len(calls) == 1, calls
+            # stored under MEDIA_PROBE_DIR, never in the (published) media directory
+            assert store_path_for(Path(tmp)).parent == Path(store_dir)
+            assert store_path_for(Path(tmp)).exists()
+            assert not (Path(tmp) / MEDIA_METADATA_FILENAME).exists()
+            assert "filename" not in json.loads(store_path_for(Path(tmp)).read_text())["files"][video.name]["format"]
+
+            video.write_bytes(b"burned video")
+            probe_media(video)
+            assert len(calls) == 2, calls
+    print("✓ Each file version is probed once")
+
+
+def test_validation_and_burn_in_reuse_probe():
+    """Output validation and caption burn-in queries make no subprocess calls."""
+    import output_validator
+    import captions_subflow
+
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as store_dir:
+        video = Path(tmp) / "topic-01-20250101-R1.mp4"
+        video.write_bytes(b"video")
+        calls = []
+        with patch.dict(os.environ, {"MEDIA_PROBE_DIR": store_dir}), \
+             patch.object(media_probe.subprocess, "run", side_effect=_fake_ffprobe(calls)):
+            probe_media(video)
+        with patch.object(subprocess, "run", side_effect=AssertionError("subprocess called")):
+            meta = output_validator.get_video_metadata(video)
+            assert meta["video"]["codec_name"] == "h264" and meta["audio"]["codec_name"] == "aac"
+            assert meta["format"]["duration"] == "61.500000"
+            assert captions_subflow._probe_video_resolution(video) == (1080, 1920)
+            assert captions_subflow._probe_video_duration(video) == 61.5
+        assert calls == [str(video)]
+    print("✓ Validation and burn-in reuse the stored probe")
+
+
+def main():
+    print("=" * 60)
+    print("Media Probe Tests")
+    print("=" * 60)
+
+    try:
+        test_each_file_probed_once()
+        test_validation_and_burn_in_reuse_probe()
+        print("\n" + "=" * 60)
+        print("✓ All media probe tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
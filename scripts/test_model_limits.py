@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for token counting and token-based prompt/output budgeting.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import model_limits
+from model_limits import (
+    count_tokens,
+    encoding_name_for_model,
+    fit_text_to_tokens,
+    tokens_per_word,
+    truncate_text_to_fit_context,
+)
+
+DIALOGUE = (
+    "HOST_A: Welcome back. On 2025-03-14 the central bank held rates at 4.5%, citing sticky inflation.\n"
+    "HOST_B: Right, and markets had priced in a cut, so yields jumped almost immediately.\n"
+)
+
+
+def test_counts_follow_bpe_pieces():
+    """Counts track BPE pieces, not characters; vocabularies are chosen per model."""
+    assert count_tokens("") == 0
+    assert count_tokens("The quick brown fox jumps over the lazy dog.") == 10
+    # same length, very different token counts
+    assert count_tokens("a b c d e f g h i j") > 2 * count_tokens("internationalization")
+    assert encoding_name_for_model("gpt-4") == "cl100k_base"
+    assert encoding_name_for_model("gpt-4-turbo") == "cl100k_base"
+    assert encoding_name_for_model("gpt-4o-mini") == "o200k_base"
+    assert encoding_name_for_model("gpt-5.2") == "o200k_base"
+    assert model_limits._load_encoding("o200k_base") is model_limits._load_encoding("o200k_base")
+    print("✓ Token counts follow BPE pieces")
+
+
+def test_fast_path_and_truncation():
+    """Large texts are estimated from samples; truncation lands just under the budget."""
+    big = DIALOGUE * 4000  # ~700 KB
+    exact = count_tokens(big, exact=True)
+    fast = count_tokens(big)
+    assert abs(fast - exact) / exact < 0.02, (fast, exact)
+
+    cut = fit_text_to_tokens(big, 5000)
+    n = count_tokens(cut, exact=True)
+    assert 4900 <= n <= 5000 and big.startswith(cut), n
+
+    prompt = truncate_text_to_fit_context("gpt-4", big, 4000)  # 8192 context
+    assert count_tokens(prompt, "gpt-4", exact=True) <= 8192 - 4000
+    assert truncate_text_to_fit_context("gpt-4.1", DIALOGUE, 4000) == DIALOGUE
+    print("✓ Fast path and token-based truncation")
+
+
+def test_tokens_per_word_measured_from_sample():
+    """Output budgets use the measured ratio of a representative sample."""
+    assert tokens_per_word("too short") == model_limits.DEFAULT_TOKENS_PER_WORD
+    ratio = tokens_per_word(DIALOGUE * 20)
+    assert 1.0 < ratio < 2.2, ratio
+
+    from responses_api_generator import _estimate_max_output_tokens_from_specs
+    specs = [{"code": "M1", "max_words": 1200}, {"code": "S1", "max_words": 300}]
+    est = _estimate_max_output_tokens_from_specs(specs, sample_text=DIALOGUE * 20, overhead=1800, floor=2048)
+    assert est == int((int(1500 * ratio) + 1800) * 2), est
+
+    # No sample to measure (Pass A): the pre-tokenizer budget factor is kept
+    assert _estimate_max_output_tokens_from_specs(specs) == int((int(1500 * 2.2) + 2500) * 2)
+    print("✓ Output budget sized from measured tokens per word")
+
+
+def main():
+    print("=" * 60)
+    print("Model Limits Tests")
+    print("=" * 60)
+
+    try:
+        test_counts_follow_bpe_pieces()
+        test_fast_path_and_truncation()
+        test_tokens_per_word_measured_from_sample()
+        print("\n" + "=" * 60)
+        print("✓ All model limits tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the local job queue and the warm pipeline daemon.
+
+run_for_topic is stubbed; these tests cover queue semantics and how the daemon
+dispatches jobs, not the pipeline stages themselves.
+"""
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import run_pipeline
+from job_queue import JobQueue, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING
+from pipeline_daemon import serve
+
+
+def test_queue_claims_jobs_in_order():
+    """Jobs are claimed FIFO and each only once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(Path(tmp) / "queue.sqlite")
+        first = queue.submit("topic-01", "20250101", modules=["video"])
+        second = queue.submit("topic-02")
+
+        job = queue.claim("w1")
+        assert job.id == first and job.modules == ["video"]
+        assert queue.get(first).status == STATUS_RUNNING
+        assert queue.claim("w2").id == second
+        assert queue.claim("w3") is None
+    print("✓ Queue claims jobs FIFO")
+
+
+def test_daemon_runs_jobs_with_job_tenant():
+    """The daemon runs queued jobs and scopes TENANT_ID to each job."""
+    seen = []
+
+    def fake_run(topic_id, date_str, **kwargs):
+        seen.append((topic_id, date_str, kwargs["modules"], os.environ.get("TENANT_ID")))
+        return topic_id != "topic-bad"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(Path(tmp) / "queue.sqlite")
+        ok_id = queue.submit("topic-01", "20250101", modules=["video"], tenant="0000000042")
+        bad_id = queue.submit("topic-bad")
+
+        with patch.object(run_pipeline, "run_for_topic", side_effect=fake_run), \
+             patch.dict(os.environ, {"TENANT_ID": "0000000001"}):
+            processed = serve(queue, once=True, warm=False)
+            tenant_after = os.environ.get("TENANT_ID")
+
+        assert processed == 2
+        assert seen[0] == ("topic-01", "20250101", ["video"], "0000000042"), seen[0]
+        assert seen[1][3] == "0000000001", "Jobs without a tenant keep the daemon's tenant"
+        assert tenant_after == "0000000001", "Job tenant must not leak after the job"
+        assert queue.get(ok_id).status == STATUS_DONE
+        assert queue.get(bad_id).status == STATUS_FAILED
+    print("✓ Daemon dispatches jobs and records status")
+
+
+def test_orphaned_running_jobs_are_requeued():
+    """Jobs left running by a dead worker on this host are claimed again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(Path(tmp) / "queue.sqlite")
+        orphan = queue.submit("topic-01")
+        live = queue.submit("topic-02")
+        host = socket.gethostname()
+        queue.claim(f"{host}:999999999")
+        queue.claim(f"{host}:{os.getpid()}")
+
+        assert queue.requeue_orphaned() == [orphan]
+        assert queue.get(orphan).status == STATUS_QUEUED
+        assert queue.get(live).status == STATUS_RUNNING
+        assert queue.claim("w2").id == orphan
+    print("✓ Orphaned running jobs are requeued")
+
+
+def test_wait_returns_finished_job():
+    """wait() returns as soon as the job has finished."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(Path(tmp) / "queue.sqlite")
+        job_id = queue.submit("topic-01")
+        queue.complete(queue.claim("w1").id, True)
+        job = queue.wait(job_id, timeout=1)
+        assert job.status == STATUS_DONE
+    print("✓ wait() returns finished job")
+
+
+def main():
+    print("=" * 60)
+    print("Pipeline Daemon Tests")
+    print("=" * 60)
+
+    try:
+        test_queue_claims_jobs_in_order()
+        test_daemon_runs_jobs_with_job_tenant()
+        test_orphaned_running_jobs_are_requeued()
+        test_wait_returns_finished_job()
+        print("\n" + "=" * 60)
+        print("✓ All pipeline daemon tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrency-safe Google Search quota ledger.
+"""
+import json
+import multiprocessing
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from quota_ledger import QuotaLedger
+
+
+def _add_many(path: str, n: int) -> None:
+    ledger = QuotaLedger(Path(path), 100000)
+    for _ in range(n):
+        ledger.add(1)
+
+
+def test_parallel_processes_do_not_lose_counts():
+    """Concurrent read-modify-write from several processes is serialized."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "usage.json"
+        procs = [multiprocessing.Process(target=_add_many, args=(str(path), 50)) for _ in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(timeout=60)
+        assert QuotaLedger(path, 100000).usage()["count"] == 200
+    print("✓ No lost updates across processes")
+
+
+def test_reservations_share_quota_fairly():
+    """Reservations cap later grants and release unused quota."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = QuotaLedger(Path(tmp) / "usage.json", 100)
+        first = ledger.reserve(80)
+        assert first.granted == 80
+        second = ledger.reserve(80)
+        assert second.granted == 10, "Second collector gets half of the 20 left"
+        assert ledger.available() == 10
+
+        first.consume(30)
+        first.release()
+        usage = ledger.usage()
+        assert usage["count"] == 30 and usage["reserved"] == 10, usage
+        assert ledger.available() == 60
+
+        with second:
+            second.consume(10)
+            assert second.remaining == 0
+        assert ledger.usage() == {
+            "date": usage["date"], "count": 40, "reserved": 0, "cache_hits": 0, "cache_misses": 0,
+        }
+    print("✓ Reservations shared and released")
+
+
+def test_cache_counts_in_daily_usage():
+    """Search cache hits/misses are reported with today's usage and reset with it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "usage.json"
+        ledger = QuotaLedger(path, 100)
+        ledger.record_cache(3, 2)
+        ledger.record_cache(1, 0)
+        usage = ledger.usage()
+        assert (usage["cache_hits"], usage["cache_misses"]) == (4, 2), usage
+        assert json.loads(path.read_text())["cache"] == {"hits": 4, "misses": 2}
+
+        data = json.loads(path.read_text())
+        data["date"] = "2000-01-01"
+        path.write_text(json.dumps(data))
+        assert ledger.usage()["cache_hits"] == 0
+    print("✓ Cache hits/misses recorded in daily usage")
+
+
+def test_dead_process_reservation_dropped():
+    """Reservations held by processes that no longer exist are ignored."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "usage.json"
+        ledger = QuotaLedger(path, 100)
+        ledger.reserve(50)
+        data = json.loads(path.read_text())
+        for r in data["reservations"].values():
+            r["pid"] = 2 ** 22 + 12345
+        path.write_text(json.dumps(data))
+        assert ledger.available() == 100
+    print("✓ Stale reservations pruned")
+
+
+def main():
+    print("=" * 60)
+    print("Quota Ledger Tests")
+    print("=" * 60)
+
+    try:
+        test_parallel_processes_do_not_lose_counts()
+        test_reservations_share_quota_fairly()
+        test_cache_counts_in_daily_usage()
+        test_dead_process_reservation_dropped()
+        print("\n" + "=" * 60)
+        print("✓ All quota ledger tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental, parallel release uploads.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from release_sync import sync_assets
+from tenant_assets import LocalReleaseStore
+
+
+def _env(tmp):
+    return patch.dict(os.environ, {"CONTENT_HASH_INDEX": str(Path(tmp) / "hashes.json")})
+
+
+class FlakyStore(LocalReleaseStore):
+    """Fails the first upload of each asset, and counts uploads."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    def upload(self, file_path, clobber=True):
+        self.calls.append(file_path.name)
+        if self.calls.count(file_path.name) == 1:
+            raise RuntimeError("connection reset")
+        super().upload(file_path, clobber=clobber)
+
+
+def test_republish_transfers_only_changes():
+    """Unchanged videos are skipped, changed ones re-uploaded, strays pruned."""
+    with tempfile.TemporaryDirectory() as tmp, _env(tmp):
+        store = LocalReleaseStore(Path(tmp) / "release")
+        store.ensure()
+        (store.root / "old.zip").write_bytes(b"zip")
+        out = Path(tmp) / "outputs"
+        out.mkdir()
+        videos = []
+        for i in range(5):
+            p = out / f"topic-01-20250101-R{i}.mp4"
+            p.write_bytes(os.urandom(2_000))
+            videos.append((p, f"R{i}.mp4"))
+        manifest = Path(tmp) / "manifest.json"
+
+        first = sync_assets(store, videos, prune=True, manifest_path=manifest, workers=3)
+        assert first == {"uploaded": 5, "skipped": 0, "failed": 0, "deleted": 1, "uploaded_bytes": 10_000}, first
+        assert sorted(p.name for p in store.root.iterdir()) == [f"R{i}.mp4" for i in range(5)]
+        assert (store.root / "R3.mp4").read_bytes() == videos[3][0].read_bytes()
+        recorded = json.loads(manifest.read_text())["assets"]
+        assert set(recorded) == {f"R{i}.mp4" for i in range(5)}
+        assert recorded["R0.mp4"]["sha256"].startswith("sha256:")
+
+        videos[2][0].write_bytes(os.urandom(2_000))
+        again = sync_assets(store, videos, prune=True, manifest_path=manifest)
+        assert again["uploaded"] == 1 and again["skipped"] == 4 and again["deleted"] == 0, again
+        assert (store.root / "R2.mp4").read_bytes() == videos[2][0].read_bytes()
+    print("✓ Republishing uploads only changed assets")
+
+
+def test_uploads_retry_and_manifest_skips_without_digest():
+    """Transient failures are retried; the manifest stands in for a missing remote digest."""
+    with tempfile.TemporaryDirectory() as tmp, _env(tmp):
+        store = FlakyStore(Path(tmp) / "release")
+        store.ensure()
+        a = Path(tmp) / "a.zip"
+        a.write_bytes(b"a" * 5_000)
+        manifest = Path(tmp) / "manifest.json"
+
+        with patch("release_sync.time.sleep") as sleep:
+            stats = sync_assets(store, [(a, a.name)], manifest_path=manifest, attempts=3)
+        assert stats["uploaded"] == 1 and stats["failed"] == 0, stats
+        assert store.calls == ["a.zip", "a.zip"] and sleep.call_count == 1
+
+        no_digest = {n: dict(e, digest=None) for n, e in LocalReleaseStore.list_assets(store).items()}
+        with patch.object(FlakyStore, "list_assets", return_value=no_digest):
+            assert sync_assets(store, [(a, a.name)], manifest_path=manifest)["skipped"] == 1
+            manifest.unlink()
+            with patch("release_sync.time.sleep"):
+                assert sync_assets(store, [(a, a.name)], manifest_path=manifest)["uploaded"] == 1
+    print("✓ Uploads retried; manifest used when the release has no digest")
+
+
+def main():
+    print("=" * 60)
+    print("Release Sync Tests")
+    print("=" * 60)
+
+    try:
+        test_republish_transfers_only_changes()
+        test_uploads_retry_and_manifest_skips_without_digest()
+        print("\n" + "=" * 60)
+        print("✓ All release sync tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
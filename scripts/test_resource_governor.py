@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the CPU/memory resource governor.
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from resource_governor import (
+    ResourceGovernor,
+    apply_ffmpeg_thread_budget,
+    detect_cpu_limit,
+    detect_memory_limit_mb,
+)
+
+
+def test_cgroup_v2_limits_detected():
+    """cpu.max and memory.max quotas cap the detected budget."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "cpu.max").write_text("150000 100000\n")
+        (root / "memory.max").write_text(str(768 * 1024 * 1024))
+        assert detect_cpu_limit(root) == 1, "1.5 CPUs of quota rounds down to 1"
+        assert detect_memory_limit_mb(root) == 768
+
+        (root / "cpu.max").write_text("max 100000\n")
+        (root / "memory.max").write_text("max\n")
+        assert detect_cpu_limit(root) >= 1
+        assert detect_memory_limit_mb(root) >= 256
+    print("✓ cgroup v2 limits detected")
+
+
+def test_encode_gets_remaining_cores():
+    """An encode started while Piper workers run gets only the free cores."""
+    gov = ResourceGovernor(cpus=8, memory_mb=16384)
+    with gov.piper_slot(), gov.piper_slot(), gov.piper_slot():
+        with gov.encode_slot() as grant:
+            assert grant.threads == 5, grant
+            assert gov.free_threads == 0
+    assert gov.free_threads == 8
+    print("✓ Encode grant sized to free cores")
+
+
+def test_acquire_blocks_until_released():
+    """A grant waits for min_threads to become free."""
+    gov = ResourceGovernor(cpus=2, memory_mb=4096)
+    order = []
+
+    def worker():
+        with gov.acquire(2, min_threads=2):
+            order.append("second")
+
+    with gov.acquire(1):
+        t = threading.Thread(target=worker)
+        t.start()
+        time.sleep(0.05)
+        order.append("first")
+    t.join(timeout=2)
+    assert order == ["first", "second"], order
+    print("✓ acquire blocks until tokens are free")
+
+
+def test_piper_concurrency_bounded_by_memory():
+    """Piper workers are capped by cores and memory."""
+    gov = ResourceGovernor(cpus=16, memory_mb=1024)
+    assert gov.piper_concurrency(8) == 1024 // 512
+    gov = ResourceGovernor(cpus=2, memory_mb=65536)
+    assert gov.piper_concurrency(8) == 2
+    print("✓ Piper concurrency bounded")
+
+
+def test_apply_ffmpeg_thread_budget():
+    """Thread flags are pinned and existing values replaced."""
+    cmd = ["ffmpeg", "-y", "-i", "in.mp4", "-filter_complex", "x", "-threads", "0", "out.mp4"]
+    out = apply_ffmpeg_thread_budget(cmd, 3)
+    assert out[-1] == "out.mp4"
+    assert out[-3:-1] == ["-threads", "3"]
+    assert out.count("-threads") == 1
+    assert out[1:3] == ["-filter_complex_threads", "3"]
+    print("✓ ffmpeg thread budget applied")
+
+
+def main():
+    print("=" * 60)
+    print("Resource Governor Tests")
+    print("=" * 60)
+
+    try:
+        test_cgroup_v2_limits_detected()
+        test_encode_gets_remaining_cores()
+        test_acquire_blocks_until_released()
+        test_piper_concurrency_bounded_by_memory()
+        test_apply_ffmpeg_thread_budget()
+        print("\n" + "=" * 60)
+        print("✓ All resource governor tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
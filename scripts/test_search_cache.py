@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the Custom Search result cache.
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from search_cache import SearchCache, page_key
+
+
+PARAMS = dict(q="Climate  Summit", cx="abc:123", searchType="image", num=10, start=1)
+
+
+def test_hit_after_put_and_expiry():
+    """A stored page is served until the TTL; expired pages are purged."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SearchCache(Path(tmp) / "cache.sqlite", ttl_hours=1)
+        assert cache.get(PARAMS) is None
+        cache.put(PARAMS, {"items": [{"link": "https://x/1.jpg"}]})
+
+        same_query = dict(PARAMS, q="climate summit")
+        assert cache.get(same_query)["items"][0]["link"] == "https://x/1.jpg"
+        assert cache.get(dict(PARAMS, start=11)) is None, "Other pages are separate entries"
+
+        with patch("search_cache.time.time", return_value=time.time() + 7200):
+            assert cache.get(PARAMS) is None, "Expired entries are misses"
+            assert cache.purge_expired() == 1
+    print("✓ Cache hit/miss, TTL and purge")
+
+
+def test_key_ignores_api_key():
+    assert page_key(dict(PARAMS, key="AIza1")) == page_key(PARAMS)
+    assert page_key(dict(PARAMS, imgSize="XXLARGE")) != page_key(PARAMS)
+    print("✓ Page key covers search params only")
+
+
+def test_concurrent_access():
+    """Parallel collectors can read and write the cache."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SearchCache(Path(tmp) / "cache.sqlite", ttl_hours=1)
+        errors = []
+        lookups = []
+
+        def worker(n):
+            try:
+                for start in range(1, 50, 10):
+                    params = dict(PARAMS, start=start)
+                    lookups.append(cache.get(params) is not None)
+                    if not lookups[-1]:
+                        cache.put(params, {"items": [{"n": n}]})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        assert len(lookups) == 30
+        assert all(cache.get(dict(PARAMS, start=start)) for start in range(1, 50, 10))
+    print("✓ Concurrent cache access")
+
+
+def main():
+    print("=" * 60)
+    print("Search Cache Tests")
+    print("=" * 60)
+
+    try:
+        test_hit_after_put_and_expiry()
+        test_key_ignores_api_key()
+        test_concurrent_access()
+        print("\n" + "=" * 60)
+        print("✓ All search cache tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
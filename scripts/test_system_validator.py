@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for cached system validation.
+
+Verifies that per-check results are reused while their input fingerprint is
+unchanged and that only checks whose inputs changed are re-run.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import system_validator
+
+
+def _counting_checks(calls):
+    """Wrap every registered check so each invocation is recorded."""
+    wrapped = []
+    for name, check, inputs in system_validator.VALIDATION_CHECKS:
+        def run(result, _name=name, _check=check):
+            calls.append(_name)
+            _check(result)
+        run.__name__ = check.__name__
+        wrapped.append((name, run, inputs))
+    return wrapped
+
+
+def test_second_run_reuses_cached_checks():
+    """An unchanged environment replays every cacheable check."""
+    with tempfile.TemporaryDirectory() as tmp:
+        calls = []
+        cache_path = Path(tmp) / "system_validation.json"
+        with patch.object(system_validator, "get_validation_cache_path", return_value=cache_path), \
+             patch.object(system_validator, "VALIDATION_CHECKS", _counting_checks(calls)):
+            ok1, first = system_validator.validate_system(verbose=False, use_cache=True)
+            assert cache_path.exists(), "Cache file should be written"
+            calls.clear()
+            ok2, second = system_validator.validate_system(verbose=False, use_cache=True)
+
+        assert calls == ["disk_space"], f"Only volatile checks should re-run, ran: {calls}"
+        assert ok1 == ok2
+        assert first.errors == second.errors
+        assert first.checks_total == second.checks_total
+    print("✓ Cached checks reused on second run")
+
+
+def test_env_change_reruns_only_affected_checks():
+    """Changing an API key re-runs the checks that read it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        calls = []
+        cache_path = Path(tmp) / "system_validation.json"
+        with patch.object(system_validator, "get_validation_cache_path", return_value=cache_path), \
+             patch.object(system_validator, "VALIDATION_CHECKS", _counting_checks(calls)):
+            with patch.dict(os.environ, {"GOOGLE_API_KEY": "key-one"}):
+                system_validator.validate_system(verbose=False, use_cache=True)
+            calls.clear()
+            with patch.dict(os.environ, {"GOOGLE_API_KEY": "key-two"}):
+                system_validator.validate_system(verbose=False, use_cache=True)
+
+        assert sorted(calls) == ["disk_space", "environment_variables", "global_environment"], calls
+        assert "key-one" not in cache_path.read_text(encoding="utf-8"), "Secrets must not be cached"
+    print("✓ Env var change re-runs only affected checks")
+
+
+def test_use_cache_false_runs_everything():
+    """Disabling the cache runs every check and writes nothing."""
+    with tempfile.TemporaryDirectory() as tmp:
+        calls = []
+        cache_path = Path(tmp) / "system_validation.json"
+        with patch.object(system_validator, "get_validation_cache_path", return_value=cache_path), \
+             patch.object(system_validator, "VALIDATION_CHECKS", _counting_checks(calls)):
+            system_validator.validate_system(verbose=False, use_cache=False)
+
+        assert len(calls) == len(system_validator.VALIDATION_CHECKS)
+        assert not cache_path.exists()
+    print("✓ use_cache=False bypasses the cache")
+
+
+def main():
+    print("=" * 60)
+    print("System Validator Cache Tests")
+    print("=" * 60)
+
+    try:
+        test_second_run_reuses_cached_checks()
+        test_env_change_reruns_only_affected_checks()
+        test_use_cache_false_runs_everything()
+        print("\n" + "=" * 60)
+        print("✓ All system validator tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
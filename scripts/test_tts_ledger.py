@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTS synthesis ledger and split hints.
+"""
+import json
+import sys
+import tempfile
+import wave
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import tts_generate
+from tts_generate import generate_tts_with_retry
+from tts_ledger import SynthesisLedger, get_split_hints
+
+TRICKY = ("The committee voted seven to two, and the dissenters, both regional presidents, "
+          "argued that the balance sheet runoff should slow before any cut.")
+
+
+def _fake_piper(limit, calls):
+    """Piper stand-in that fails on texts longer than limit and writes a short WAV otherwise."""
+    def synth(text, voice, output_path):
+        calls.append(text)
+        if len(text) > limit:
+            return False
+        with wave.open(str(output_path), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\x10\x00\xf0\xff" * 800)
+        return True
+    return synth
+
+
+def test_ledger_records_retries_per_voice():
+    """Attempts, failures and splits are counted per chunk and aggregated per voice."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp)
+        calls = []
+        ledger = SynthesisLedger(item="topic-01-20250101-S1")
+        with patch.object(tts_generate, "generate_tts_piper", side_effect=_fake_piper(60, calls)):
+            parts = generate_tts_with_retry(TRICKY, "en_US-ryan-high", False, cache, ledger=ledger)
+            generate_tts_with_retry("Short and fine.", "en_US-lessac-high", False, cache, ledger=ledger)
+            generate_tts_with_retry("Short and fine.", "en_US-lessac-high", False, cache, ledger=ledger)
+
+        assert " ".join(t for t, _ in parts) == TRICKY and all(len(t) <= 60 for t, _ in parts)
+        summary = ledger.summary()
+        ryan = summary["by_voice"]["en_US-ryan-high"]
+        assert ryan["chunks"] == 1 and ryan["splits"] >= 2 and ryan["failures"] == ryan["splits"]
+        assert ryan["attempts"] == len(calls) - 1 and ryan["provider"] == "piper"
+        lessac = summary["by_voice"]["en_US-lessac-high"]
+        assert lessac["chunks"] == 2 and lessac["cached"] == 1 and lessac["attempts_per_chunk"] == 1.0
+        assert summary["totals"]["chunks"] == 3 and summary["totals"]["failed_chunks"] == 0
+        assert summary["totals"]["chars_per_second"] and summary["problem_chunks"][0]["chars"] == len(TRICKY)
+
+        out = cache / "topic-01-20250101-S1.tts_ledger.json"
+        ledger.write(out)
+        assert json.loads(out.read_text())["totals"]["splits"] == ryan["splits"]
+    print("✓ Ledger records retries per chunk and voice")
+
+
+def test_known_problem_text_goes_straight_to_pieces():
+    """One failure is not enough; after repeated runs the pieces are used directly."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp)
+        hints = get_split_hints(cache)
+        calls = []
+        with patch.object(tts_generate, "generate_tts_piper", side_effect=_fake_piper(60, calls)):
+            hints.begin_run()
+            first = generate_tts_with_retry(TRICKY, "en_US-ryan-high", False, cache)
+            assert hints.pieces("piper", "en_US-ryan-high", TRICKY) is None, "one failure may be transient"
+
+            hints.begin_run()
+            calls.clear()
+            again = generate_tts_with_retry(TRICKY, "en_US-ryan-high", False, cache)
+            assert calls[0] == TRICKY, "the whole text is retried before its pieces are used"
+            assert all(len(t) > 60 for t in calls), "pieces that worked come from the cache"
+        assert again == first
+        pieces = hints.pieces("piper", "en_US-ryan-high", TRICKY)
+        assert pieces == [t for t, _ in first]
+
+        ledger = SynthesisLedger()
+        with patch.object(tts_generate, "generate_tts_piper", side_effect=AssertionError("synthesized again")):
+            hints.begin_run()
+            second = generate_tts_with_retry(TRICKY, "en_US-ryan-high", False, cache, ledger=ledger)
+        assert second == first
+        assert ledger.chunks[0]["presplit"] and ledger.chunks[0]["failures"] == 0
+        assert ledger.chunks[0]["cached"] == len(pieces)
+    print("✓ Known-problem texts go straight to their pieces after repeated failures")
+
+
+def test_whole_text_success_drops_hint():
+    """A text that synthesizes whole again loses its hint."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp)
+        hints = get_split_hints(cache)
+        for _ in range(2):
+            hints.begin_run()
+            hints.remember("piper", "en_US-ryan-high", TRICKY, ["a", "b"])
+        assert hints.pieces("piper", "en_US-ryan-high", TRICKY) == ["a", "b"]
+
+        hints.forget("piper", "en_US-ryan-high", TRICKY)
+        assert hints.pieces("piper", "en_US-ryan-high", TRICKY) is None
+        assert json.loads((cache / "split_hints.json").read_text())["texts"] == {}
+    print("✓ Whole-text success drops the split hint")
+
+
+def main():
+    print("=" * 60)
+    print("TTS Ledger Tests")
+    print("=" * 60)
+
+    try:
+        test_ledger_records_retries_per_voice()
+        test_known_problem_text_goes_straight_to_pieces()
+        test_whole_text_success_drops_hint()
+        print("\n" + "=" * 60)
+        print("✓ All TTS ledger tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
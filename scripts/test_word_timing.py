@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for word timings aligned from synthesized audio and the captions built from them.
+"""
+import math
+import sys
+import tempfile
+import wave
+from array import array
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import tts_generate
+from word_timing import get_word_timings, timings_path, wav_duration
+
+RATE = 16000
+
+
+def _write_wav(path, segments):
+    """segments: [(seconds, voiced)] -> 16-bit mono WAV of tone bursts and silence."""
+    samples = array("h")
+    for seconds, voiced in segments:
+        for i in range(int(seconds * RATE)):
+            samples.append(int(8000 * math.sin(2 * math.pi * 220 * i / RATE)) if voiced else 0)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(samples.tobytes())
+
+
+def test_words_follow_voiced_audio():
+    """Each word lands on its own burst; pauses fall between words and are cached."""
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = Path(tmp) / "utt.wav"
+        # three equal-weight words: 0.1-0.5, 1.0-1.4, 1.6-2.0
+        _write_wav(wav, [(0.1, False), (0.4, True), (0.5, False), (0.4, True),
+                         (0.2, False), (0.4, True), (0.1, False)])
+        assert abs(wav_duration(wav) - 2.1) < 1e-6
+
+        timings = get_word_timings(wav, "alpha bravo delta")
+        assert timings["duration"] == 2.1
+        expected = [(0.1, 0.5), (1.0, 1.4), (1.6, 2.0)]
+        for w, (start, end) in zip(timings["words"], expected):
+            assert abs(w["start"] - start) <= 0.02 and abs(w["end"] - end) <= 0.02, timings["words"]
+        assert timings_path(wav).exists()
+
+        with patch("word_timing.read_envelope", side_effect=AssertionError("recomputed")):
+            assert get_word_timings(wav, "alpha bravo delta") == timings
+        assert get_word_timings(wav, "other text here")["text"] == "other text here"
+    print("✓ Word timings follow voiced audio and are cached")
+
+
+def test_captions_use_word_timings_without_probing():
+    """Caption blocks start and end on aligned words, offset by WAV durations and gaps."""
+    with tempfile.TemporaryDirectory() as tmp:
+        first = Path(tmp) / "a.wav"
+        second = Path(tmp) / "b.wav"
+        _write_wav(first, [(0.3, False), (0.4, True), (0.2, False), (0.4, True), (0.3, False)])
+        _write_wav(second, [(0.5, True), (0.5, False)])
+        utterances = [
+            {"speaker": "A", "text": "one two", "audio_path": str(first)},
+            {"speaker": "B", "text": "three", "audio_path": str(second)},
+        ]
+        with patch.object(tts_generate, "probe_duration_seconds", side_effect=AssertionError("ffprobe")):
+            caps = tts_generate.build_captions_from_utterances(
+                utterances, gap_ms=500, max_words_per_line=1, target_lines=1, max_lines=1
+            )
+        assert [c["text"] for c in caps] == ["one", "two", "three"]
+        assert abs(caps[0]["start"] - 0.3) <= 0.02
+        assert caps[0]["end"] == caps[1]["start"], "no blank flash between blocks"
+        assert abs(caps[1]["start"] - 0.9) <= 0.02 and abs(caps[1]["end"] - 1.3) <= 0.02
+        # second utterance starts after 1.6s of audio and a 0.5s gap
+        assert abs(caps[2]["start"] - 2.1) <= 0.02 and abs(caps[2]["end"] - 2.6) <= 0.02
+        assert caps[2]["speaker"] == "B"
+    print("✓ Captions built from word timings without ffprobe")
+
+
+def main():
+    print("=" * 60)
+    print("Word Timing Tests")
+    print("=" * 60)
+
+    try:
+        test_words_follow_voiced_audio()
+        test_captions_use_word_timings_without_probing()
+        print("\n" + "=" * 60)
+        print("✓ All word timing tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
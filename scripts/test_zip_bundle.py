@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming output bundle writer.
+"""
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from output_assets import OutputType, build_zip_for_type
+from zip_bundle import choose_compression, write_zip
+
+
+def test_compression_chosen_per_file():
+    """Media and incompressible data are stored; text is deflated."""
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        (d / "video.mp4").write_bytes(b"\x00" * 10_000)
+        (d / "script.txt").write_text("the quick brown fox " * 2_000)
+        (d / "noise.bin").write_bytes(os.urandom(100_000))
+        assert choose_compression(d / "video.mp4") == zipfile.ZIP_STORED
+        assert choose_compression(d / "script.txt") == zipfile.ZIP_DEFLATED
+        assert choose_compression(d / "noise.bin") == zipfile.ZIP_STORED
+    print("✓ STORED vs DEFLATED chosen per file")
+
+
+def test_zip_streamed_from_sources():
+    """Bundles are written from the source paths with the per-type layout."""
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        outputs = d / "outputs" / "topic-01"
+        (outputs / "nested").mkdir(parents=True)
+        a = outputs / "topic-01-20250101-L1.mp4"
+        b = outputs / "nested" / "topic-01-20250101-S1.mp4"
+        a.write_bytes(os.urandom(50_000))
+        b.write_bytes(os.urandom(20_000))
+        build = d / "build"
+        build.mkdir()
+
+        zip_path = build_zip_for_type(
+            "0000000001", "topic-01", "20250101", OutputType("Video", ("*.mp4",)), [a, b], build
+        )
+        assert zip_path.name == "Assets_0000000001_Video_topic-01_20250101.zip"
+        assert sorted(p.name for p in build.iterdir()) == [zip_path.name], "no staging tree left behind"
+        prefix = "Assets/0000000001/Outputs/topic-01/20250101/Video/"
+        with zipfile.ZipFile(zip_path) as z:
+            infos = {i.filename: i for i in z.infolist()}
+            assert set(infos) == {prefix + a.name, prefix + b.name}
+            assert all(i.compress_type == zipfile.ZIP_STORED for i in infos.values())
+            assert z.read(prefix + a.name) == a.read_bytes()
+
+        dup = write_zip(build / "dup.zip", [(a, "x.mp4"), (b, "x.mp4")])
+        with zipfile.ZipFile(build / "dup.zip") as z:
+            assert z.namelist() == ["x.mp4"] and z.read("x.mp4") == b.read_bytes()
+        assert dup["stored"] == 1
+    print("✓ Zip streamed from sources without staging")
+
+
+def main():
+    print("=" * 60)
+    print("Zip Bundle Tests")
+    print("=" * 60)
+
+    try:
+        test_compression_chosen_per_file()
+        test_zip_streamed_from_sources()
+        print("\n" + "=" * 60)
+        print("✓ All zip bundle tests passed")
+        print("=" * 60)
+        return 0
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,6 +33,8 @@ from global_config import (
     TTS_CACHE_ENABLED,
     TTS_SAMPLE_RATE
 )
+from resource_governor import get_governor
+from word_timing import get_word_timings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -230,14 +232,16 @@ def synthesize_chunk(chunk: TTSChunk, voice: str, speed: float, output_dir: Path
                 '--sentence_silence', '0.2'  # 200ms pause between sentences
             ]
             
-            # Run with timeout
-            result = subprocess.run(
-                cmd,
-                input=chunk.text.encode('utf-8'),
-                capture_output=True,
-                timeout=60,  # 1 minute timeout per chunk
-                env=env
-            )
+            # Run with timeout, holding a Piper slot from the resource governor
+            with get_governor().piper_slot() as grant:
+                env['OMP_NUM_THREADS'] = str(grant.threads)
+                result = subprocess.run(
+                    cmd,
+                    input=chunk.text.encode('utf-8'),
+                    capture_output=True,
+                    timeout=60,  # 1 minute timeout per chunk
+                    env=env
+                )
             
             chunk.end_time = time.time()
             
@@ -301,6 +305,8 @@ def synthesize_chunks_parallel(chunks: List[TTSChunk], voice_a: str, voice_b: st
     """
     if concurrency is None:
         concurrency = TTS_CONCURRENCY
+    # Never run more Piper workers than the node's CPU/memory budget allows
+    concurrency = get_governor().piper_concurrency(concurrency)
     
     logger.info(f"Synthesizing {len(chunks)} chunks with concurrency={concurrency}")
     
@@ -465,6 +471,25 @@ def generate_tts_with_chunking(dialogue: List[Dict], voice_a: str, voice_b: str,
             logger.error("Stitching failed")
             return False
         
+        # Word timings per chunk, in stitch order, for caption building
+        # (chunks are concatenated back to back, without gaps)
+        utterances = []
+        for c in successful_chunks:
+            timings = get_word_timings(c.output_file, c.text)
+            if timings is None:
+                utterances = []
+                break
+            utterances.append({
+                'speaker': c.speaker,
+                'text': c.text,
+                'duration': timings['duration'],
+                'words': timings['words'],
+            })
+        if utterances:
+            words_file = output_file.parent / f"{output_file.stem}_words.json"
+            with open(words_file, 'w') as f:
+                json.dump({'gap_ms': 0, 'utterances': utterances}, f)
+        
         # Step 4: Generate telemetry report
         total_time = time.time() - start_time
         
@@ -490,7 +515,7 @@ def generate_tts_with_chunking(dialogue: List[Dict], voice_a: str, voice_b: str,
     finally:
         # Cleanup: Remove chunk files (but keep cache)
         try:
-            for chunk_file in work_dir.glob("chunk_*.wav"):
+            for chunk_file in work_dir.glob("chunk_*"):
                 chunk_file.unlink()
             # Remove empty directory
             if not any(work_dir.iterdir()):
@@ -6,8 +6,9 @@ import sys
 import os
 import hashlib
 import subprocess
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import glob
 import re
@@ -26,13 +27,28 @@ from global_config import (
     CAPTIONS_TARGET_LINES,
 )
 
-# Import TTS chunker for long-form audio
-try:
-    from tts_chunker import generate_tts_with_chunking
-    TTS_CHUNKER_AVAILABLE = True
-except ImportError:
-    TTS_CHUNKER_AVAILABLE = False
-    print("Warning: tts_chunker not available - long-form audio may have issues")
+from media_probe import media_duration, probe_media
+from tts_ledger import SynthesisLedger, get_split_hints
+from word_timing import compute_word_timings, get_word_timings, wav_duration
+
+# TTS chunker for long-form audio is imported on first use (see
+# _load_tts_chunker) so importing this module stays cheap and silent.
+# TTS_CHUNKER_AVAILABLE flips to False if that import fails.
+TTS_CHUNKER_AVAILABLE = True
+_TTS_CHUNKER = None
+
+
+def _load_tts_chunker():
+    """Return tts_chunker.generate_tts_with_chunking, or None if unavailable."""
+    global _TTS_CHUNKER, TTS_CHUNKER_AVAILABLE
+    if _TTS_CHUNKER is None and TTS_CHUNKER_AVAILABLE:
+        try:
+            from tts_chunker import generate_tts_with_chunking
+            _TTS_CHUNKER = generate_tts_with_chunking
+        except ImportError:
+            TTS_CHUNKER_AVAILABLE = False
+            print("Warning: tts_chunker not available - long-form audio may have issues")
+    return _TTS_CHUNKER if TTS_CHUNKER_AVAILABLE else None
 
 # TTS cache version - increment to invalidate all TTS caches
 TTS_CACHE_VERSION = "1.0"
@@ -51,6 +67,12 @@ def compute_tts_cache_key(provider: str, voice: str, text: str) -> str:
     return hashlib.sha256(combined.encode('utf-8')).hexdigest()
 
 
+def _get_gcloud_tts_client():
+    """Return the process-wide Google Cloud TTS client (http_clients registry)."""
+    from http_clients import get_gcloud_tts_client
+    return get_gcloud_tts_client()
+
+
 def generate_tts_gemini(text: str, voice: str, output_path: Path) -> bool:
     """
     Generate TTS using Google Cloud Text-to-Speech API.
@@ -62,8 +84,8 @@ def generate_tts_gemini(text: str, voice: str, output_path: Path) -> bool:
         try:
             from google.cloud import texttospeech
             
-            # Initialize client (will use credentials from environment)
-            client = texttospeech.TextToSpeechClient()
+            # Reuse client (uses credentials from environment)
+            client = _get_gcloud_tts_client()
             
             # Set up synthesis input
             synthesis_input = texttospeech.SynthesisInput(text=text)
@@ -149,11 +171,14 @@ def generate_tts_piper(text: str, voice: str, output_path: Path) -> bool:
             ld_library_path = env.get('LD_LIBRARY_PATH', '')
             env['LD_LIBRARY_PATH'] = f"{piper_dir}:{ld_library_path}" if ld_library_path else piper_dir
         
-        result = subprocess.run([
-            piper_binary,
-            '--model', str(voice_path),
-            '--output_file', str(output_path)
-        ], input=text.encode('utf-8'), capture_output=True, env=env, timeout=60)
+        from resource_governor import get_governor
+        with get_governor().piper_slot() as grant:
+            env['OMP_NUM_THREADS'] = str(grant.threads)
+            result = subprocess.run([
+                piper_binary,
+                '--model', str(voice_path),
+                '--output_file', str(output_path)
+            ], input=text.encode('utf-8'), capture_output=True, env=env, timeout=60)
         
         if result.returncode == 0:
             return True
@@ -183,26 +208,6 @@ def trim_silence(audio_path: Path) -> bool:
         return False
 
 
-def _probe_duration_seconds(media_path: Path) -> float:
-    """Return media duration in seconds using ffprobe."""
-    try:
-        result = subprocess.run(
-            [
-                'ffprobe',
-                '-v', 'error',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(media_path)
-            ],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return float(result.stdout.strip())
-    except Exception:
-        return 0.0
-
-
 def _format_srt_timestamp(seconds: float) -> str:
     """Format seconds as SRT timestamp: HH:MM:SS,mmm"""
     if seconds < 0:
@@ -267,18 +272,26 @@ def _write_captions_srt(captions: List[Dict[str, Any]], srt_path: Path) -> None:
             f.write(f"{cap['text']}\n\n")
 
 
+def _tts_provider(premium: bool) -> str:
+    # Force Piper when premium parameter is False, regardless of GOOGLE_API_KEY presence
+    # This ensures we use local TTS for non-premium topics (controlled by premium_tts config field)
+    return 'gemini' if premium else 'piper'
+
+
+def tts_cache_path(text: str, voice: str, premium: bool, cache_dir: Path) -> Path:
+    """Cache WAV for a text chunk (may not exist yet)."""
+    return cache_dir / f"{compute_tts_cache_key(_tts_provider(premium), voice, text)}.wav"
+
+
 def generate_tts_chunk(text: str, voice: str, premium: bool, cache_dir: Path) -> Path:
     """
     Generate or retrieve cached TTS for a text chunk.
     
     Raises an exception if TTS generation fails, ensuring fail-fast behavior.
     """
-    # Force Piper when premium parameter is False, regardless of GOOGLE_API_KEY presence
-    # This ensures we use local TTS for non-premium topics (controlled by premium_tts config field)
-    provider = 'gemini' if premium else 'piper'
-    cache_key = compute_tts_cache_key(provider, voice, text)
-    cache_path = cache_dir / f"{cache_key}.wav"
-    meta_path = cache_dir / f"{cache_key}.meta.json"
+    provider = _tts_provider(premium)
+    cache_path = tts_cache_path(text, voice, premium, cache_dir)
+    meta_path = cache_path.with_name(f"{cache_path.stem}.meta.json")
     
     # Check if cache exists and is valid
     if cache_path.exists() and meta_path.exists():
@@ -317,13 +330,22 @@ def generate_tts_chunk(text: str, voice: str, premium: bool, cache_dir: Path) ->
                 "Ensure voice models are available in ~/.local/share/piper-tts/voices/"
             )
     
+    finalize_cache_entry(cache_path, text, provider, voice)
+    return cache_path
+
+
+def finalize_cache_entry(cache_path: Path, text: str, provider: str, voice: str, **meta_extra: Any) -> None:
+    """Record metadata for a freshly synthesized cache WAV, trim it and align its word timings."""
+    meta_path = cache_path.with_name(f"{cache_path.stem}.meta.json")
+
     # Save metadata for cache validation
     try:
         meta_data = {
             'version': TTS_CACHE_VERSION,
             'provider': provider,
             'voice': voice,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat(),
+            **meta_extra,
         }
         with open(meta_path, 'w') as f:
             json.dump(meta_data, f, indent=2)
@@ -331,7 +353,12 @@ def generate_tts_chunk(text: str, voice: str, premium: bool, cache_dir: Path) ->
         print(f"  Warning: Failed to save cache metadata: {e}")
     
     trim_silence(cache_path)
-    return cache_path
+
+    # Word timings for captions are aligned once here and cached beside the WAV
+    try:
+        compute_word_timings(cache_path, text)
+    except Exception as e:
+        print(f"  Warning: Failed to align word timings: {e}")
 
 
 def _build_concat_filter(audio_files: List[Path], gap_sec: float) -> tuple:
@@ -499,37 +526,73 @@ def generate_tts_with_retry(
     cache_dir: Path,
     *,
     max_chars: int = 500,
+    ledger: Optional[SynthesisLedger] = None,
     _depth: int = 0,
+    _record: Optional[Dict[str, Any]] = None,
 ) -> List[tuple[str, Path]]:
     """Generate TTS for text with retry-by-splitting on failure.
 
     - Enforces max_chars (best-effort) for initial splitting.
     - If a provider call fails for a chunk, split that chunk into 2 parts and retry.
+    - A chunk that failed whole on earlier runs goes straight to the pieces that
+      worked then (split hints, see tts_ledger.py).
+    - With a ledger, each call is recorded as one chunk: attempts, splits, timing.
     - Returns a list of (text_part, audio_path) in correct playback order.
     """
     s = (text or "").strip()
     if not s:
         return []
 
+    if ledger is not None and _record is None:
+        record = ledger.start_chunk(s, voice, _tts_provider(premium))
+        ok = False
+        try:
+            parts = generate_tts_with_retry(
+                s, voice, premium, cache_dir, max_chars=max_chars, _depth=_depth, _record=record
+            )
+            ok = True
+            return parts
+        finally:
+            ledger.add(record, ok)
+
     # Hard safety to avoid runaway recursion.
     if _depth > 10:
         raise RuntimeError("TTS retry recursion limit reached")
 
+    def retry(part: str) -> List[tuple[str, Path]]:
+        return generate_tts_with_retry(
+            part, voice, premium, cache_dir, max_chars=max_chars, _depth=_depth + 1, _record=_record
+        )
+
     # Ensure we don't exceed configured max_chars for initial attempts.
     if len(s) > max_chars:
         parts: List[tuple[str, Path]] = []
         for p in split_into_chunks(s, max_chars=max_chars):
-            parts.extend(
-                generate_tts_with_retry(
-                    p, voice, premium, cache_dir, max_chars=max_chars, _depth=_depth + 1
-                )
-            )
+            parts.extend(retry(p))
+        return parts
+
+    provider = _tts_provider(premium)
+    hints = get_split_hints(cache_dir)
+    pieces = hints.pieces(provider, voice, s)
+    if pieces:
+        if _record is not None:
+            _record["presplit"] = True
+        parts = []
+        for p in pieces:
+            parts.extend(retry(p))
         return parts
 
+    cached = tts_cache_path(s, voice, premium, cache_dir).exists()
+    t0 = time.monotonic()
     try:
         audio_path = generate_tts_chunk(s, voice, premium, cache_dir)
+        if _record is not None:
+            SynthesisLedger.attempt(_record, len(s), time.monotonic() - t0, ok=True, cached=cached)
+        hints.forget(provider, voice, s)
         return [(s, audio_path)]
     except Exception:
+        if _record is not None:
+            SynthesisLedger.attempt(_record, len(s), time.monotonic() - t0, ok=False, cached=False)
         # Split and retry
         if len(s) <= 20:
             # Too small to split further meaningfully.
@@ -538,19 +601,14 @@ def generate_tts_with_retry(
         left, right = _split_text_near_middle(s)
         if not left and not right:
             raise
+        if _record is not None:
+            _record["splits"] += 1
         out: List[tuple[str, Path]] = []
         if left:
-            out.extend(
-                generate_tts_with_retry(
-                    left, voice, premium, cache_dir, max_chars=max_chars, _depth=_depth + 1
-                )
-            )
+            out.extend(retry(left))
         if right:
-            out.extend(
-                generate_tts_with_retry(
-                    right, voice, premium, cache_dir, max_chars=max_chars, _depth=_depth + 1
-                )
-            )
+            out.extend(retry(right))
+        hints.remember(provider, voice, s, [t for t, _ in out])
         return out
 
 
@@ -572,12 +630,15 @@ def tts_chunks_to_audio(dialogue_chunks: List[Dict[str, str]], audio_path: Path,
     # Check if chunking is enabled (from topic config or global default)
     # Topic config takes precedence over global default
     use_chunking = config.get('tts_use_chunking', TTS_USE_CHUNKING)
+    if premium and use_chunking:
+        # tts_chunker drives Piper only; premium voices use batched Cloud TTS (see _tts_traditional)
+        use_chunking = False
     
     # Calculate total character count for logging
     total_chars = sum(len(chunk.get('text', '')) for chunk in dialogue_chunks)
     
     # Use chunking strategy if enabled and available
-    if use_chunking and TTS_CHUNKER_AVAILABLE:
+    if use_chunking and _load_tts_chunker() is not None:
         print(f"Using chunking strategy ({total_chars} chars)")
         return _tts_with_chunking(dialogue_chunks, audio_path, config)
     elif use_chunking and not TTS_CHUNKER_AVAILABLE:
@@ -648,6 +709,7 @@ def _tts_with_chunking(dialogue_chunks: List[Dict[str, str]], audio_path: Path,
     temp_wav = audio_path.with_suffix('.wav')
     
     # Use tts_chunker module
+    generate_tts_with_chunking = _load_tts_chunker()
     success = generate_tts_with_chunking(
         dialogue=dialogue_chunks,
         voice_a=voice_a,
@@ -664,28 +726,43 @@ def _tts_with_chunking(dialogue_chunks: List[Dict[str, str]], audio_path: Path,
     success = convert_to_aac(temp_wav, audio_path)
 
     # Captions for chunked mode (best-effort).
-    # We allocate the final audio duration across dialogue chunks using word-count weighting.
+    # The chunker leaves per-chunk word timings next to the WAV; without them we
+    # allocate the final audio duration across dialogue chunks by word count.
+    words_file = temp_wav.with_name(f"{temp_wav.stem}_words.json")
     try:
         if success:
-            total_dur = probe_duration_seconds(audio_path)
-            if total_dur > 0:
-                captions = build_captions_from_dialogue_estimate(
-                    dialogue_chunks=dialogue_chunks,
-                    total_duration_s=total_dur,
-                    gap_ms=500,
+            captions = []
+            if words_file.exists():
+                with open(words_file, 'r', encoding='utf-8') as f:
+                    timed = json.load(f)
+                captions = build_captions_from_utterances(
+                    utterances=timed.get('utterances', []),
+                    gap_ms=int(timed.get('gap_ms', 0)),
                     max_words_per_line=CAPTIONS_WORDS_PER_LINE,
                     target_lines=CAPTIONS_TARGET_LINES,
                     max_lines=CAPTIONS_MAX_LINES,
                 )
-                if captions:
-                    srt_path = audio_path.with_suffix('.captions.srt')
-                    json_path = audio_path.with_suffix('.captions.json')
-                    write_captions_srt(captions, srt_path)
-                    with open(json_path, 'w', encoding='utf-8') as f:
-                        json.dump({'captions': captions, 'dialogue_chunks': dialogue_chunks}, f, indent=2, ensure_ascii=False)
-                    print(f"  ✓ Captions generated (chunked): {srt_path.name}")
+            if not captions:
+                total_dur = probe_duration_seconds(audio_path)
+                if total_dur > 0:
+                    captions = build_captions_from_dialogue_estimate(
+                        dialogue_chunks=dialogue_chunks,
+                        total_duration_s=total_dur,
+                        gap_ms=500,
+                        max_words_per_line=CAPTIONS_WORDS_PER_LINE,
+                        target_lines=CAPTIONS_TARGET_LINES,
+                        max_lines=CAPTIONS_MAX_LINES,
+                    )
+            if captions:
+                srt_path = audio_path.with_suffix('.captions.srt')
+                json_path = audio_path.with_suffix('.captions.json')
+                write_captions_srt(captions, srt_path)
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump({'captions': captions, 'dialogue_chunks': dialogue_chunks}, f, indent=2, ensure_ascii=False)
+                print(f"  ✓ Captions generated (chunked): {srt_path.name}")
     except Exception as e:
         print(f"  ⚠ Caption generation failed in chunked mode (non-fatal): {e}")
+    words_file.unlink(missing_ok=True)
 
     # Clean up temp file
     if temp_wav.exists():
@@ -803,29 +880,42 @@ def _tts_traditional(dialogue_chunks: List[Dict[str, str]], audio_path: Path,
     print(f"Using voices: A={voice_a}, B={voice_b}")
     
     cache_dir = get_cache_dir()
+    ledger = SynthesisLedger(item=audio_path.stem)
+    # Whole-text failures count toward split hints once per item run
+    get_split_hints(cache_dir).begin_run()
+    if premium:
+        ledger.prefetch = _prefetch_premium_tts(dialogue_chunks, voice_a, voice_b, cache_dir)
     
     audio_files = []
     utterances = []  # [{speaker, text, audio_path}]
     
-    for chunk in dialogue_chunks:
-        speaker = chunk['speaker']
-        text = chunk['text']
-        voice = voice_a if speaker == 'A' else voice_b
-        
-        # Split long texts into smaller chunks
-        text_chunks = split_into_chunks(text, max_chars=500)
-        
-        for text_chunk in text_chunks:
-            # Generate TTS; if provider fails for this chunk, split by 2 and retry.
-            for part_text, audio_file in generate_tts_with_retry(
-                text_chunk, voice, premium, cache_dir, max_chars=500
-            ):
-                audio_files.append(audio_file)
-                utterances.append({
-                    'speaker': speaker,
-                    'text': part_text,
-                    'audio_path': str(audio_file)
-                })
+    try:
+        for chunk in dialogue_chunks:
+            speaker = chunk['speaker']
+            text = chunk['text']
+            voice = voice_a if speaker == 'A' else voice_b
+
+            # Split long texts into smaller chunks
+            text_chunks = split_into_chunks(text, max_chars=500)
+
+            for text_chunk in text_chunks:
+                # Generate TTS; if provider fails for this chunk, split by 2 and retry.
+                for part_text, audio_file in generate_tts_with_retry(
+                    text_chunk, voice, premium, cache_dir, max_chars=500, ledger=ledger
+                ):
+                    audio_files.append(audio_file)
+                    utterances.append({
+                        'speaker': speaker,
+                        'text': part_text,
+                        'audio_path': str(audio_file)
+                    })
+    finally:
+        # Synthesis cost of this item (attempts, splits, chars/s per voice)
+        ledger.write(audio_path.with_suffix('.tts_ledger.json'))
+        totals = ledger.summary()['totals']
+        if totals['splits'] or totals['failures']:
+            print(f"  ⚠ TTS retries: {totals['failures']} failed call(s), {totals['splits']} split(s) "
+                  f"over {totals['chunks']} chunk(s)")
     
     if not audio_files:
         print("No audio files generated")
@@ -868,18 +958,43 @@ def _tts_traditional(dialogue_chunks: List[Dict[str, str]], audio_path: Path,
     return success
 
 
+def _prefetch_premium_tts(dialogue_chunks: List[Dict[str, str]], voice_a: str, voice_b: str,
+                          cache_dir: Path) -> Optional[Dict[str, int]]:
+    """Fill the TTS cache for every chunk with batched, concurrent Cloud TTS requests (best-effort).
+
+    Uses the same chunk texts as the loop in _tts_traditional, which then finds
+    them cached; anything left over is synthesized there one chunk at a time.
+    """
+    hints = get_split_hints(cache_dir)
+    items = []
+    for chunk in dialogue_chunks:
+        voice = voice_a if chunk['speaker'] == 'A' else voice_b
+        for text_chunk in split_into_chunks(chunk['text'], max_chars=500):
+            text_chunk = text_chunk.strip()
+            # Texts known to fail whole are requested as the pieces that worked
+            for piece in hints.pieces(_tts_provider(True), voice, text_chunk) or [text_chunk]:
+                items.append((voice, piece))
+    try:
+        from gcloud_tts_batch import synthesize_to_cache
+        return synthesize_to_cache(items, cache_dir)
+    except Exception as e:
+        print(f"  ⚠ Batched premium TTS unavailable, synthesizing chunk by chunk: {e}")
+        return None
+
+
 def probe_duration_seconds(path: Path) -> float:
-    """Return media duration in seconds using ffprobe (best-effort)."""
+    """Return media duration in seconds (best-effort).
+
+    WAVs are read from their header; anything else is probed once per file
+    version through the media metadata store (see media_probe.py).
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.wav':
+        dur = wav_duration(path)
+        if dur > 0:
+            return dur
     try:
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=nokey=1:noprint_wrappers=1',
-            str(path)
-        ]
-        out = subprocess.check_output(cmd, text=True).strip()
-        return float(out) if out else 0.0
+        return media_duration(probe_media(path))
     except Exception:
         return 0.0
 
@@ -955,6 +1070,13 @@ def build_captions_from_utterances(
 ) -> List[Dict[str, Any]]:
     """Build tight-sync captions based on per-utterance audio durations.
 
+    Each block starts at its first word and runs until the next block starts
+    (or its last word ends), using word timings aligned at synthesis time
+    (see word_timing.py). Utterances may carry those timings inline as
+    `duration` and `words`; otherwise they are read from (or computed into)
+    the cache beside `audio_path`. Utterances without usable timings fall back
+    to spreading their probed duration by word count.
+
     Output caption segments include a `speaker` field (A/B) when available so
     downstream burn-in can apply gender-based glow without showing names.
     """
@@ -967,35 +1089,55 @@ def build_captions_from_utterances(
         text = (utt.get('text') or '').strip()
         speaker = (utt.get('speaker') or '').strip()  # expected 'A' or 'B'
         audio_path = Path(utt.get('audio_path', ''))
+        words = text.split()
+
+        timings = utt if 'words' in utt and 'duration' in utt else None
+        if timings is None and text and utt.get('audio_path'):
+            timings = get_word_timings(audio_path, text)
+        word_times = timings.get('words') if timings else None
+        if word_times is not None and len(word_times) != len(words):
+            word_times = None
 
         # Advance even if empty (keeps timing stable)
-        dur = probe_duration_seconds(audio_path) if audio_path.exists() else 0.0
+        if timings and float(timings.get('duration') or 0) > 0:
+            dur = float(timings['duration'])
+        else:
+            dur = probe_duration_seconds(audio_path) if audio_path.exists() else 0.0
         if dur <= 0:
             # Conservative fallback: ~2.4 w/s
-            words_tmp = text.split()
-            dur = max(1.2, len(words_tmp) / 2.4) if text else 0.0
+            dur = max(1.2, len(words) / 2.4) if text else 0.0
 
         if not text:
             t += dur + gap_s
             continue
 
-        words = text.split()
         total_words = max(1, len(words))
+        utt_start = t
+        utt_captions: List[Dict[str, Any]] = []
+        first_word = 0
 
         blocks = _split_words_into_blocks(words, max_words_per_line, target_lines, max_lines)
         for block_words in blocks:
             block_text = _render_block_text(block_words, max_words_per_line, target_lines, max_lines)
+            last_word = first_word + len(block_words) - 1
             if not block_text:
+                first_word = last_word + 1
                 continue
 
-            block_word_count = max(1, len(block_words))
-            block_dur = dur * (block_word_count / total_words)
-
-            start = t
-            end = t + block_dur
+            if word_times:
+                start = max(t, utt_start + float(word_times[first_word]['start']))
+                end = utt_start + float(word_times[last_word]['end'])
+            else:
+                block_word_count = max(1, len(block_words))
+                start = t
+                end = t + dur * (block_word_count / total_words)
             if end - start < 0.20:
                 end = start + 0.20
 
+            # No blank flashes between blocks of one utterance
+            if utt_captions:
+                utt_captions[-1]['end'] = max(utt_captions[-1]['end'], start)
+
             cap = {
                 'index': idx,
                 'start': start,
@@ -1004,17 +1146,16 @@ def build_captions_from_utterances(
             }
             if speaker:
                 cap['speaker'] = speaker
-            captions.append(cap)
+            utt_captions.append(cap)
 
             idx += 1
             t = end
+            first_word = last_word + 1
+
+        captions.extend(utt_captions)
 
         # Advance past remaining part of utterance and the gap.
-        if captions:
-            t = max(t, captions[-1]['start'] + dur)
-        else:
-            t += dur
-        t += gap_s
+        t = max(t, utt_start + dur) + gap_s
 
     return captions
 
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Synthesis ledger and split hints for chunk-level TTS retries.
+
+generate_tts_with_retry splits a failing chunk near the middle and retries the
+halves. The ledger records, for every chunk it is given, what that cost:
+
+    {"voice": "en-US-Journey-D", "provider": "gemini", "chars": 480,
+     "attempts": 3, "failures": 1, "splits": 1, "cached": 0, "presplit": false,
+     "seconds": 4.2, "synth_chars": 480, "synth_seconds": 3.9, "ok": true}
+
+summary() aggregates the chunks of one item (one audio output) in total and per
+voice, including characters per second of actual synthesis. _tts_traditional
+writes it as <item>.tts_ledger.json next to the m4a.
+
+Chunks that only succeeded after splitting are remembered in SplitHints
+(split_hints.json in the TTS cache directory) with the pieces that worked,
+keyed by provider, voice and text. A single failure may be transient (429,
+network), and synthesizing in pieces costs prosody and caption blocks, so a
+hint is only used once the whole text has failed on SPLIT_HINT_MIN_FAILURES
+separate runs (begin_run() marks the start of one, e.g. one item in
+_tts_traditional). Later runs then go straight to the same pieces, which skips the
+failing attempts and reuses their cached audio. Hints expire
+SPLIT_HINT_TTL_DAYS after the last failure, and a whole-text success drops the
+hint, so the text is retried whole again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+LEDGER_VERSION = 1
+SPLIT_HINTS_FILENAME = "split_hints.json"
+SPLIT_HINTS_VERSION = 2
+SPLIT_HINT_MIN_FAILURES = 2  # runs in which the whole text failed before its pieces are used
+SPLIT_HINT_TTL_DAYS = 14
+
+
+class SynthesisLedger:
+    """Per-chunk synthesis records for one item."""
+
+    def __init__(self, item: str = ""):
+        self.item = item
+        self.chunks: List[Dict[str, Any]] = []
+        self.prefetch: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def start_chunk(self, text: str, voice: str, provider: str) -> Dict[str, Any]:
+        """A new record for one chunk; add() it once the chunk is done."""
+        return {
+            "voice": voice,
+            "provider": provider,
+            "chars": len(text),
+            "attempts": 0,
+            "failures": 0,
+            "splits": 0,
+            "cached": 0,
+            "presplit": False,
+            "seconds": 0.0,
+            "synth_chars": 0,
+            "synth_seconds": 0.0,
+            "ok": False,
+            "_t0": time.monotonic(),
+        }
+
+    @staticmethod
+    def attempt(record: Dict[str, Any], chars: int, seconds: float, *, ok: bool, cached: bool) -> None:
+        """One synthesis call made for the chunk (or a piece of it)."""
+        record["attempts"] += 1
+        if cached:
+            record["cached"] += 1
+        elif ok:
+            record["synth_chars"] += chars
+            record["synth_seconds"] += seconds
+        if not ok:
+            record["failures"] += 1
+
+    def add(self, record: Dict[str, Any], ok: bool) -> None:
+        record["ok"] = ok
+        record["seconds"] = round(time.monotonic() - record.pop("_t0", time.monotonic()), 3)
+        record["synth_seconds"] = round(record["synth_seconds"], 3)
+        with self._lock:
+            self.chunks.append(record)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            chunks = list(self.chunks)
+        by_voice: Dict[str, Dict[str, Any]] = {}
+        for c in chunks:
+            _accumulate(by_voice.setdefault(c["voice"], _empty_totals(c["provider"])), c)
+        total = _empty_totals(",".join(sorted({c["provider"] for c in chunks})))
+        for c in chunks:
+            _accumulate(total, c)
+        for agg in [total] + list(by_voice.values()):
+            _finish(agg)
+        worst = sorted(
+            (c for c in chunks if c["splits"] or c["failures"]),
+            key=lambda c: (c["attempts"], c["seconds"]),
+            reverse=True,
+        )[:10]
+        return {
+            "version": LEDGER_VERSION,
+            "item": self.item,
+            "totals": total,
+            "by_voice": by_voice,
+            "prefetch": self.prefetch,
+            "problem_chunks": worst,
+        }
+
+    def write(self, path: Path) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            print(f"  ⚠ Failed to write TTS ledger (non-fatal): {e}")
+
+
+def _empty_totals(provider: str) -> Dict[str, Any]:
+    return {
+        "provider": provider, "chunks": 0, "chars": 0, "attempts": 0, "failures": 0, "splits": 0,
+        "cached": 0, "presplit": 0, "failed_chunks": 0, "seconds": 0.0,
+        "synth_chars": 0, "synth_seconds": 0.0,
+    }
+
+
+def _accumulate(agg: Dict[str, Any], c: Dict[str, Any]) -> None:
+    agg["chunks"] += 1
+    for k in ("chars", "attempts", "failures", "splits", "cached", "seconds", "synth_chars", "synth_seconds"):
+        agg[k] += c[k]
+    agg["presplit"] += int(bool(c["presplit"]))
+    agg["failed_chunks"] += int(not c["ok"])
+
+
+def _finish(agg: Dict[str, Any]) -> None:
+    agg["seconds"] = round(agg["seconds"], 3)
+    agg["synth_seconds"] = round(agg["synth_seconds"], 3)
+    agg["chars_per_second"] = round(agg["synth_chars"] / agg["synth_seconds"], 1) if agg["synth_seconds"] > 0 else None
+    # calls per chunk: 1.0 means no retries or splits
+    agg["attempts_per_chunk"] = round(agg["attempts"] / agg["chunks"], 2) if agg["chunks"] else None
+
+
+def hint_key(provider: str, voice: str, text: str) -> str:
+    return hashlib.sha256(f"{provider}|{voice}|{text}".encode("utf-8")).hexdigest()
+
+
+class SplitHints:
+    """Pieces that synthesized successfully for texts that failed whole."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._counted: set = set()  # keys whose failure this run already counted
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if not isinstance(data, dict) or data.get("version") != SPLIT_HINTS_VERSION or not isinstance(data.get("texts"), dict):
+            data = {"version": SPLIT_HINTS_VERSION, "texts": {}}
+        self.data = data
+
+    def begin_run(self) -> None:
+        """Start a new run: the next whole-text failure of each text counts again."""
+        with self._lock:
+            self._counted.clear()
+
+    def pieces(self, provider: str, voice: str, text: str) -> Optional[List[str]]:
+        """Pieces to synthesize instead of text, once it has failed whole on enough runs."""
+        with self._lock:
+            e = self.data["texts"].get(hint_key(provider, voice, text))
+        if not e or not isinstance(e.get("pieces"), list) or len(e["pieces"]) < 2:
+            return None
+        if int(e.get("failures") or 0) < SPLIT_HINT_MIN_FAILURES:
+            return None
+        if time.time() - float(e.get("updated_at") or 0) > SPLIT_HINT_TTL_DAYS * 86400:
+            return None
+        return [str(p) for p in e["pieces"]]
+
+    def remember(self, provider: str, voice: str, text: str, pieces: List[str]) -> None:
+        """Record that text failed whole (counted once per run) and which pieces worked."""
+        key = hint_key(provider, voice, text)
+        with self._lock:
+            e = self.data["texts"].get(key) or {}
+            expired = time.time() - float(e.get("updated_at") or 0) > SPLIT_HINT_TTL_DAYS * 86400
+            failures = 0 if expired else int(e.get("failures") or 0)
+            if key not in self._counted:
+                self._counted.add(key)
+                failures += 1
+            self.data["texts"][key] = {
+                "pieces": list(pieces),
+                "chars": len(text),
+                "failures": failures,
+                "updated_at": time.time(),
+            }
+            payload = json.dumps(self.data, indent=1, sort_keys=True)
+        self._write(payload)
+
+    def forget(self, provider: str, voice: str, text: str) -> None:
+        """text synthesized whole: drop its hint."""
+        with self._lock:
+            if self.data["texts"].pop(hint_key(provider, voice, text), None) is None:
+                return
+            payload = json.dumps(self.data, indent=1, sort_keys=True)
+        self._write(payload)
+
+    def _write(self, payload: str) -> None:
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            print(f"  ⚠ Failed to update TTS split hints (non-fatal): {e}")
+
+
+_HINTS: Dict[str, SplitHints] = {}
+_HINTS_LOCK = threading.Lock()
+
+
+def get_split_hints(cache_dir: Path) -> SplitHints:
+    """Process-wide split hints of a TTS cache directory."""
+    key = str(Path(cache_dir).resolve())
+    with _HINTS_LOCK:
+        hints = _HINTS.get(key)
+        if hints is None:
+            hints = _HINTS[key] = SplitHints(Path(cache_dir) / SPLIT_HINTS_FILENAME)
+        return hints
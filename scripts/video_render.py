@@ -18,25 +18,29 @@ import os
 import sys
 import subprocess
 import tempfile
-import urllib.request
 import glob
 import shutil
 import math
-import errno
 import hashlib
 import random
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from image_preprocess_cache import restore_images_cache_from_release, publish_images_cache_to_release, get_tenant_id
+from image_preprocess_cache import (
+    restore_images_cache_from_release, publish_images_cache_to_release, get_tenant_id,
+    match_manifest_entries,
+)
+from content_hash import get_hash_index
+from image_index import ImageIndex, list_images, seed_hash_index
+from media_probe import media_duration, media_resolution, probe_media
 from captions.burner import build_overlays_ass_from_segments
+from resource_governor import get_governor, apply_ffmpeg_thread_budget
 from datetime import datetime
 
-import yaml
 from config import load_topic_config, get_output_dir, get_data_dir
 from global_config import (
     IMAGE_TRANSITION_MIN_SEC, IMAGE_TRANSITION_MAX_SEC,
     VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS,
-    IMAGES_SUBDIR, ENABLE_IMAGE_CLEANUP,
+    IMAGES_SUBDIR, ENABLE_IMAGE_CLEANUP, IMAGE_STORE_ENABLED,
     CONTENT_TYPES, get_video_resolution_for_code,
     ALLOWED_IMAGE_EXTENSIONS,
     ENABLE_VIDEO_GENERATION, ENABLE_VIDEO_AUDIO_MUX,
@@ -65,7 +69,6 @@ from multi_format_generator import get_enabled_content_types
 # These can be overridden from global_config if needed
 DEFAULT_IMAGE_DURATION_SECONDS = IMAGE_TRANSITION_MIN_SEC  # Default duration per image
 BACKGROUND_COLOR = 'black'  # Background color (used for legacy functions)
-ENOTSUP_FALLBACK = 95  # Fallback errno value when errno.ENOTSUP is unavailable
 
 # File size thresholds for output verification
 MIN_OUTPUT_SIZE_BYTES = 100_000  # 100KB - minimum size for valid Blender output
@@ -81,6 +84,24 @@ BACKGROUND_BRIGHTNESS = -0.3  # Brightness adjustment for blurred background (-1
 VIGNETTE_ANGLE = math.pi / 4  # Vignette angle in radians (PI/4 = 45 degrees)
 GRAIN_INTENSITY = 5  # Noise/grain intensity for texture (0-100)
 
+# Parsed YAML configs keyed by path -> ((mtime_ns, size), data). Reloaded when the file changes.
+_YAML_CONFIG_CACHE: Dict[str, Any] = {}
+
+
+def _load_yaml_cached(path: Path) -> dict:
+    """Parse a YAML config once per file version; returns a private copy."""
+    import copy
+
+    st = path.stat()
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = _YAML_CONFIG_CACHE.get(str(path))
+    if hit is None or hit[0] != sig:
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            hit = (sig, yaml.safe_load(f) or {})
+        _YAML_CONFIG_CACHE[str(path)] = hit
+    return copy.deepcopy(hit[1])
+
 
 def load_video_template_config(repo_root: Path) -> dict:
     """
@@ -110,8 +131,7 @@ def load_video_template_config(repo_root: Path) -> dict:
     cfg_path = repo_root / "config" / "video_templates.yml"
     if not cfg_path.exists():
         return {}
-    with open(cfg_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return _load_yaml_cached(cfg_path)
 
 
 def load_ffmpeg_effects_config() -> dict:
@@ -156,25 +176,34 @@ def load_ffmpeg_effects_config() -> dict:
             print(f"  ⚠ Warning: FFmpeg effects config not found: {config_path}")
             return {}
         
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f) or {}
-        
-        return config
+        return _load_yaml_cached(config_path)
     except Exception as e:
         print(f"  ⚠ Warning: Failed to load FFmpeg effects config: {e}")
         return {}
 
 
+_XFADE_TRANSITIONS_CACHE: Optional[List[str]] = None
+
+
 def get_available_xfade_transitions() -> list:
     """
     Get list of available xfade transitions from FFmpeg build.
     
     Parses output of: ffmpeg -h filter=xfade
+    The probe runs once per process; its result (including the default set
+    used when probing fails) is memoized for the lifetime of the process.
     
     Returns:
         List of available transition names (e.g., ['fade', 'wipeleft', ...])
         Returns common default set if parsing fails.
     """
+    global _XFADE_TRANSITIONS_CACHE
+    if _XFADE_TRANSITIONS_CACHE is None:
+        _XFADE_TRANSITIONS_CACHE = _probe_xfade_transitions()
+    return list(_XFADE_TRANSITIONS_CACHE)
+
+
+def _probe_xfade_transitions() -> list:
     import re
     
     try:
@@ -799,7 +828,6 @@ def render_slideshow_ffmpeg_effects(
         ffmpeg_cmd.extend([
             '-pix_fmt', 'yuv420p',
             '-r', str(fps),
-            '-threads', '0',
             '-movflags', '+faststart',
             '-t', str(duration),  # Exact duration
             str(output_path)
@@ -810,13 +838,14 @@ def render_slideshow_ffmpeg_effects(
         try:
             timeout_env = os.environ.get('FFMPEG_TIMEOUT_SEC', '').strip()
             timeout = int(timeout_env) if timeout_env.isdigit() else None
-            result = subprocess.run(
-                ffmpeg_cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=timeout
-            )
+            with get_governor().encode_slot() as grant:
+                result = subprocess.run(
+                    apply_ffmpeg_thread_budget(ffmpeg_cmd, grant.threads),
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=timeout
+                )
             print(f"  ✓ FFmpeg rendering completed")
         except subprocess.CalledProcessError as e:
             print(f"  ✗ FFmpeg command failed (exit code {e.returncode})")
@@ -830,39 +859,15 @@ def render_slideshow_ffmpeg_effects(
             print(f"  ✗ FFmpeg rendering timed out")
             return False
         
-        # Validate output using ffprobe
+        # Validate output using ffprobe (the result is kept for later validation and burn-in)
         print(f"  Validating output with ffprobe...")
         try:
-            # Get video duration and resolution
-            probe_result = subprocess.run([
-                'ffprobe', '-v', 'error',
-                '-select_streams', 'v:0',
-                '-show_entries', 'stream=width,height,duration',
-                '-show_entries', 'format=duration',
-                '-of', 'json',
-                str(output_path)
-            ], capture_output=True, text=True, check=True)
-            
-            probe_data = json.loads(probe_result.stdout)
-            
-            # Extract stream info
-            streams = probe_data.get('streams', [])
-            if not streams:
+            info = probe_media(output_path)
+            output_width, output_height = media_resolution(info)
+            if not output_width:
                 print(f"  ✗ No video stream found in output")
                 return False
-            
-            stream = streams[0]
-            output_width = stream.get('width')
-            output_height = stream.get('height')
-            
-            # Get duration (try stream first, then format)
-            output_duration = stream.get('duration')
-            if output_duration is None:
-                format_info = probe_data.get('format', {})
-                output_duration = format_info.get('duration')
-            
-            if output_duration is not None:
-                output_duration = float(output_duration)
+            output_duration = media_duration(info) or None
             
             # Validate resolution
             if output_width != width or output_height != height:
@@ -890,7 +895,7 @@ def render_slideshow_ffmpeg_effects(
             
             return True
             
-        except subprocess.CalledProcessError as e:
+        except RuntimeError as e:
             print(f"  ✗ ffprobe validation failed: {e}")
             return False
         except Exception as e:
@@ -977,26 +982,14 @@ def get_blender_output_path(video_path: Path) -> Path:
 
 
 def get_audio_duration(audio_path: Path) -> float:
-    """Return audio duration in seconds using ffprobe."""
+    """Return audio duration in seconds (ffprobe, once per file version; see media_probe)."""
     try:
-        result = subprocess.run([
-            'ffprobe', '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(audio_path)
-        ], capture_output=True, text=True, check=True)
-        value = result.stdout.strip()
-        if not value:
-            raise RuntimeError("ffprobe returned empty duration")
-        return float(value)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"ffprobe failed (exit {e.returncode}): {e.stderr.strip()}")
-    except FileNotFoundError:
-        raise RuntimeError("ffprobe not found - install FFmpeg to continue")
-    except ValueError as e:
-        raise RuntimeError(f"Invalid duration from ffprobe: {e}")
-    except Exception as e:
+        duration = media_duration(probe_media(audio_path))
+    except OSError as e:
         raise RuntimeError(f"Failed to read audio duration with ffprobe: {e}")
+    if duration <= 0:
+        raise RuntimeError("ffprobe returned empty duration")
+    return duration
 
 
 def _find_images_metadata(start_dir: Path) -> Optional[Path]:
@@ -1320,20 +1313,25 @@ def _compute_static_image_segments(images: List[Path], total_duration: float) ->
         segs[-1]["end"] = total_duration
         segs[-1]["duration"] = max(0.001, segs[-1]["end"] - segs[-1]["start"])
     return segs
+
+
+def _concat_file_line(img: Path) -> str:
+    """`file '...'` directive for an image referenced in place (absolute, quoted)."""
+    p = str(Path(img).absolute()).replace("\\", "/").replace("'", "'\\''")
+    return f"file '{p}'"
+
+
 def _write_concat_demuxer_file(segments: List[Dict[str, Any]], concat_path: Path) -> None:
     """Write an ffmpeg concat-demuxer file from segments."""
     if not segments:
         raise ValueError("No segments provided for concat file")
     lines = []
     for seg in segments:
-        img = Path(seg["image"])
         dur = float(seg["duration"])
-        p = str(img).replace("\\", "/").replace("'", "\\'")
-        lines.append(f"file '{p}'")
+        lines.append(_concat_file_line(seg["image"]))
         lines.append(f"duration {dur:.6f}")
     # Repeat last file once so its duration is respected
-    p_last = str(Path(segments[-1]["image"])).replace("\\", "/").replace("'", "\\'")
-    lines.append(f"file '{p_last}'")
+    lines.append(_concat_file_line(segments[-1]["image"]))
     concat_path.parent.mkdir(parents=True, exist_ok=True)
     concat_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
@@ -1464,7 +1462,9 @@ def _render_slideshow_ffmpeg_concat_single_pass(
     print("  Executing FFmpeg (concat single-pass overlays)...")
     try:
         timeout = max(300, int(duration * 6 + 120))
-        subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True, timeout=timeout)
+        with get_governor().encode_slot() as grant:
+            subprocess.run(apply_ffmpeg_thread_budget(ffmpeg_cmd, grant.threads),
+                           check=True, capture_output=True, text=True, timeout=timeout)
         return True
     except subprocess.TimeoutExpired:
         print("  ✗ FFmpeg timed out (possible infinite duration).")
@@ -1608,7 +1608,8 @@ def burn_in_captions_if_present(
         ])
         cmd.append(str(tmp_out))
 
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        with get_governor().encode_slot() as grant:
+            subprocess.run(apply_ffmpeg_thread_budget(cmd, grant.threads), check=True, capture_output=True, text=True)
         return True
 
     # 1) Attempt libass subtitles filter
@@ -1706,6 +1707,7 @@ def check_renderer_available(renderer_type: str = 'ffmpeg') -> tuple[bool, str]:
 def download_image(url: str, output_path: Path) -> bool:
     """Download image from URL."""
     try:
+        import urllib.request
         urllib.request.urlretrieve(url, output_path)
         return True
     except Exception as e:
@@ -1726,12 +1728,7 @@ def discover_images(images_dir: Path) -> List[Path]:
     Returns:
         List of image paths, sorted lexicographically by filename
     """
-    image_files = []
-    
-    for ext in ALLOWED_IMAGE_EXTENSIONS:
-        # Create glob pattern (extensions already include the dot)
-        pattern = f'*{ext}'
-        image_files.extend(images_dir.glob(pattern))
+    image_files = list_images(images_dir, ALLOWED_IMAGE_EXTENSIONS)
     
     # Sort by filename (deterministic order)
     return sorted(image_files, key=lambda p: p.name)
@@ -2200,42 +2197,24 @@ def process_images_for_video(
     # Manifest-based cache: if present and valid, skip expensive preprocessing.
     manifest_path = processed_dir / f"manifest_{target_width}x{target_height}.json"
 
-    def _manifest_valid() -> bool:
+    def _manifest_entries() -> Optional[Dict[str, dict]]:
         try:
-            import json as _json
-            if not manifest_path.exists():
-                return False
-            data = _json.loads(manifest_path.read_text(encoding="utf-8"))
-            by_name = {e.get("source_name"): e for e in data.get("entries", [])}
-            if len(by_name) < len(images):
-                return False
-            for src in images:
-                st = src.stat()
-                e = by_name.get(src.name)
-                if not e:
-                    return False
-                if int(e.get("source_size", -1)) != int(st.st_size):
-                    return False
-                if abs(float(e.get("source_mtime", -1.0)) - float(st.st_mtime)) > 1.0:
-                    return False
-                if e.get("mode") == "composite":
-                    out_file = e.get("out_file")
-                    if not out_file:
-                        return False
-                    # Backward-compat: older manifests used 'composite_#####' output names.
-                    # We now preserve the original filename for composite outputs so title
-                    # lookups can reliably match images_metadata.json. Force a re-process
-                    # when we detect the legacy naming.
-                    if str(out_file).startswith("composite_"):
-                        return False
-                    outp = processed_dir / out_file
-                    if not outp.exists() or outp.stat().st_size == 0:
-                        return False
-            return True
+            matched = match_manifest_entries(manifest_path, images)
         except Exception:
-            return False
-
-    if not _manifest_valid():
+            return None
+        if matched is None:
+            return None
+        for e in matched.values():
+            # Backward-compat: older manifests used 'composite_#####' output names.
+            # We now preserve the original filename for composite outputs so title
+            # lookups can reliably match images_metadata.json. Force a re-process
+            # when we detect the legacy naming.
+            if e.get("mode") == "composite" and str(e.get("out_file")).startswith("composite_"):
+                return None
+        return matched
+
+    matched = _manifest_entries()
+    if matched is None:
         # Attempt restore from tenant assets release (persistent cache)
         try:
             restored = restore_images_cache_from_release(images, target_width, target_height, processed_dir)
@@ -2243,14 +2222,12 @@ def process_images_for_video(
                 print(f"  ✓ Restored prepared images from tenant assets (tenant={get_tenant_id()})")
         except Exception as e:
             print(f"  ⓘ Tenant assets restore attempt failed: {e}")
+        matched = _manifest_entries()
 
-    if _manifest_valid():
+    if matched is not None:
         # Build processed list from manifest without invoking FFmpeg.
-        import json as _json
-        data = _json.loads(manifest_path.read_text(encoding="utf-8"))
-        by_name = {e.get("source_name"): e for e in data.get("entries", [])}
         for src in images:
-            e = by_name.get(src.name, {})
+            e = matched.get(src.name, {})
             if e.get("mode") == "composite":
                 processed_images.append(processed_dir / e["out_file"])
             else:
@@ -2258,6 +2235,47 @@ def process_images_for_video(
         print(f"  ✓ Using cached prepared images (manifest) for {target_width}x{target_height}; skipping preprocessing")
         return processed_images
 
+    # Entries still valid for individual sources (content-hash match) let us
+    # reuse their composites even though the manifest as a whole is stale.
+    try:
+        reusable = match_manifest_entries(manifest_path, images, partial=True) or {}
+    except Exception:
+        reusable = {}
+    hash_index = get_hash_index()
+
+    # Dimensions (and download-time content hashes) come from images_metadata.json;
+    # ffprobe is only needed for images the index cannot describe.
+    seed_hash_index(hash_index, images)
+    image_indexes: Dict[Path, ImageIndex] = {}
+
+    def _indexed_dimensions(src: Path) -> tuple:
+        index = image_indexes.get(src.parent)
+        if index is None:
+            index = image_indexes[src.parent] = ImageIndex(src.parent)
+        width, height = index.dimensions(src)
+        if width is None or height is None:
+            return get_image_dimensions(src)
+        return width, height
+
+    # Composites are shared across topics through the image store, keyed by source content.
+    image_store = None
+    if IMAGE_STORE_ENABLED:
+        try:
+            from image_store import get_image_store
+            image_store = get_image_store()
+        except Exception as e:
+            print(f"  ⓘ Image store unavailable: {e}")
+    composite_kind = f"composite_{target_width}x{target_height}"
+    shared_count = 0
+
+    def _shared_composite(src: Path) -> Optional[Path]:
+        if image_store is None:
+            return None
+        try:
+            return image_store.get_derived(composite_kind, hash_index.hash_file(src))
+        except Exception:
+            return None
+
     total = len(images)
     print(f"  Processing {total} images for {target_width}x{target_height} video...")
 
@@ -2270,7 +2288,7 @@ def process_images_for_video(
     manifest_entries: List[dict] = []
 
     for i, img_path in enumerate(images):
-        img_width, img_height = get_image_dimensions(img_path)
+        img_width, img_height = _indexed_dimensions(img_path)
 
         # Default output is the original image (passthrough)
         out_path: Path = img_path
@@ -2285,19 +2303,40 @@ def process_images_for_video(
             # preprocessing.
             composite_path = processed_dir / img_path.name
 
-            # Reuse cache if the composite exists and is newer than the source.
+            # Reuse cache if the manifest vouches for the composite's content, or
+            # (no manifest entry) if it exists and is newer than the source.
+            prev = reusable.get(img_path.name) or {}
             try:
-                if composite_path.exists() and composite_path.stat().st_mtime >= img_path.stat().st_mtime:
+                if prev.get("mode") == "composite" and prev.get("out_file") == composite_path.name:
+                    cached_count += 1
+                    out_path = composite_path
+                    status = f"{img_width}x{img_height} - cached composite"
+                elif composite_path.exists() and composite_path.stat().st_mtime >= img_path.stat().st_mtime:
                     cached_count += 1
                     out_path = composite_path
                     status = f"{img_width}x{img_height} - cached composite"
                 else:
-                    status = f"{img_width}x{img_height} - creating composite"
-                    if create_blurred_background_composite(img_path, composite_path, target_width, target_height):
+                    shared = _shared_composite(img_path)
+                    if shared is not None:
+                        image_store.link(shared, composite_path)
+                        cached_count += 1
+                        shared_count += 1
                         out_path = composite_path
+                        status = f"{img_width}x{img_height} - shared composite"
                     else:
-                        status = f"{img_width}x{img_height} - composite failed, using original"
-                        out_path = img_path
+                        status = f"{img_width}x{img_height} - creating composite"
+                        # Never let ffmpeg overwrite a file that may be hardlinked into the store
+                        composite_path.unlink(missing_ok=True)
+                        if create_blurred_background_composite(img_path, composite_path, target_width, target_height):
+                            out_path = composite_path
+                            if image_store is not None:
+                                try:
+                                    image_store.put_derived(composite_kind, hash_index.hash_file(img_path), composite_path)
+                                except Exception as e:
+                                    print(f"    ⓘ Could not share composite via image store: {e}")
+                        else:
+                            status = f"{img_width}x{img_height} - composite failed, using original"
+                            out_path = img_path
             except Exception as e:
                 status = f"{img_width}x{img_height} - composite error ({e}), using original"
                 out_path = img_path
@@ -2315,8 +2354,10 @@ def process_images_for_video(
                 'source_name': img_path.name,
                 'source_size': int(st.st_size),
                 'source_mtime': float(st.st_mtime),
+                'source_hash': hash_index.hash_file(img_path),
                 'mode': 'composite' if (out_path != img_path) else 'passthrough',
                 'out_file': (out_path.name if (out_path != img_path) else None),
+                'out_hash': (hash_index.hash_file(out_path) if (out_path != img_path) else None),
             }
             manifest_entries.append(entry)
         except Exception:
@@ -2327,7 +2368,7 @@ def process_images_for_video(
         created_count = max(0, undersized_count - cached_count)
         print(
             "  ✓ Preprocess summary: "
-            f"undersized={undersized_count} (created={created_count}, cached={cached_count}), "
+            f"undersized={undersized_count} (created={created_count}, cached={cached_count}, shared={shared_count}), "
             f"ok={passthrough_count}, unknown_dims={unknown_dim_count}"
         )
     else:
@@ -2345,6 +2386,9 @@ def process_images_for_video(
         print(f"  ✓ Wrote preprocess manifest: {manifest_path.name}")
     except Exception as e:
         print(f"  ⚠ Failed to write preprocess manifest (non-fatal): {e}")
+    hash_index.save()
+    for index in image_indexes.values():
+        index.save()
 
     # Publish prepared images to tenant assets release immediately after processing
     try:
@@ -2760,11 +2804,11 @@ def create_video_from_images(background_images: List[Path], audio_path: Optional
         with open(concat_file, 'w') as f:
             for img, duration in image_durations[:-1]:  # All but last
                 # Use absolute paths with single quotes for -safe 0 compatibility
-                f.write(f"file '{img.absolute()}'\n")
+                f.write(_concat_file_line(img) + "\n")
                 f.write(f"duration {duration}\n")
             # Add last image without duration (it will play until end)
             if image_durations:
-                f.write(f"file '{image_durations[-1][0].absolute()}'\n")
+                f.write(_concat_file_line(image_durations[-1][0]) + "\n")
         
         # Create video from images
         print(f"  Generating video: {output_path.name}")
@@ -2888,7 +2932,9 @@ def create_video_from_images(background_images: List[Path], audio_path: Optional
         print(f"    Output: {output_path}")
         
         try:
-            result = subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True)
+            with get_governor().encode_slot() as grant:
+                subprocess.run(apply_ffmpeg_thread_budget(ffmpeg_cmd, grant.threads),
+                               check=True, capture_output=True, text=True)
         except subprocess.CalledProcessError as e:
             print(f"  ✗ FFmpeg command failed with exit code {e.returncode}")
             if e.stderr:
@@ -2906,20 +2952,11 @@ def create_video_from_images(background_images: List[Path], audio_path: Optional
         
         # Get final video info
         try:
-            result = subprocess.run([
-                'ffprobe', '-v', 'error',
-                '-show_entries', 'format=duration,size',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(output_path)
-            ], capture_output=True, text=True, check=True)
-            lines = result.stdout.strip().split('\n')
-            if len(lines) >= 2:
-                video_duration = float(lines[0])
-                video_size_bytes = int(lines[1])
-                video_size_mb = video_size_bytes / (1024 * 1024)
-                print(f"  ✓ Video created: {output_path.name}")
-                print(f"    Duration: {video_duration:.2f}s, Size: {video_size_mb:.2f}MB")
-        except:
+            video_duration = media_duration(probe_media(output_path))
+            video_size_mb = output_path.stat().st_size / (1024 * 1024)
+            print(f"  ✓ Video created: {output_path.name}")
+            print(f"    Duration: {video_duration:.2f}s, Size: {video_size_mb:.2f}MB")
+        except Exception:
             print(f"  ✓ Video created: {output_path.name}")
 
         # Single-pass FFmpeg effects mode burns overlays during the encode.
@@ -3176,7 +3213,6 @@ def render_multi_format_for_topic(topic_id: str, date_str: str,
         print(f"Rendering {code}: {audio_path.name}")
         print(f"{'='*60}")
 
-        video_images_dir = None
         try:
             # Compute audio duration once for determinism
             audio_duration = get_audio_duration(audio_path)
@@ -3216,37 +3252,16 @@ def render_multi_format_for_topic(topic_id: str, date_str: str,
             ]
             image_cursor = (image_cursor + needed_images) % len(prepared_pool)
 
-            # Materialize selected images into a dedicated directory to preserve order
-            video_images_dir = output_dir / f"{code}_images"
-            if video_images_dir.exists():
-                shutil.rmtree(video_images_dir)
-            video_images_dir.mkdir(parents=True, exist_ok=True)
-
-            materialized_images = []
-            for idx, img in enumerate(selected_images, start=1):
-                target = video_images_dir / f"{idx:05d}{img.suffix.lower()}"
-                try:
-                    target.symlink_to(img.resolve())
-                except OSError as e:
-                    if e.errno in (
-                        errno.EPERM,
-                        errno.EACCES,
-                        getattr(errno, 'EOPNOTSUPP', ENOTSUP_FALLBACK),
-                        getattr(errno, 'ENOTSUP', ENOTSUP_FALLBACK),
-                    ):
-                        shutil.copy2(img, target)
-                    else:
-                        raise
-                materialized_images.append(target)
-
             print(f"  Target resolution: {video_width}x{video_height}")
             print(f"  Audio file: {audio_path}")
             print(f"  Output file: {video_path}")
-            print(f"  Images available: {len(image_files)} (using {len(materialized_images)} for this render)")
+            print(f"  Images available: {len(image_files)} (using {len(selected_images)} for this render)")
             print(f"  Audio duration: {audio_duration:.2f}s")
 
-            # Images are already pre-processed (blurred background composites cached by resolution)
-            processed_images = materialized_images
+            # Images are already pre-processed (blurred background composites cached by resolution).
+            # The ordered list goes straight to the renderer; the concat file references the
+            # prepared-cache paths, so nothing is symlinked or copied per render.
+            processed_images = selected_images
 
             # Determine content type from code prefix
             code_prefix = code[0].upper()
@@ -3282,12 +3297,6 @@ def render_multi_format_for_topic(topic_id: str, date_str: str,
             import traceback
             traceback.print_exc()
             fail_count += 1
-        finally:
-            if video_images_dir and video_images_dir.exists():
-                try:
-                    shutil.rmtree(video_images_dir)
-                except (FileNotFoundError, PermissionError):
-                    pass
     
     # Step 4: Clean up images
     print(f"\nStep 4: Cleaning up images...")
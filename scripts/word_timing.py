@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Word-level timings for synthesized speech.
+
+Neither Piper nor Google TTS hand back word alignments in the way we call them,
+so timings are recovered offline from the synthesized PCM:
+
+  - the WAV is read with the stdlib `wave` module (no ffprobe) and reduced to a
+    10 ms RMS envelope
+  - frames above an adaptive threshold are "voiced"; silences shorter than
+    MIN_PAUSE_S are treated as part of the surrounding speech
+  - each word gets a share of the voiced time proportional to its length, plus
+    a little extra after punctuation, and that voiced-time position is mapped
+    back onto the real timeline, so pauses fall between words instead of
+    stretching them
+
+Timings are stored next to the cached WAV as <key>.words.json:
+
+    {"version": 1, "duration": 3.21, "text": "...", "size": 141164,
+     "words": [{"word": "Hello", "start": 0.05, "end": 0.41}, ...]}
+
+and reused for as long as the WAV (by size) and text are unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import wave
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+TIMINGS_VERSION = 1
+FRAME_S = 0.010
+MIN_PAUSE_S = 0.080
+
+# Voiced threshold: a fraction of a high percentile of frame energy, with an
+# absolute floor so near-silent files do not mark noise as speech.
+_THRESHOLD_FRACTION = 0.08
+_THRESHOLD_FLOOR = 120.0
+_PUNCT_WEIGHT = {",": 1.5, ";": 2.0, ":": 2.0, ".": 3.0, "!": 3.0, "?": 3.0}
+
+
+def timings_path(wav_path: Path) -> Path:
+    """Sidecar path for a WAV's word timings (<stem>.words.json)."""
+    return wav_path.with_suffix(".words.json")
+
+
+def wav_duration(wav_path: Path) -> float:
+    """Duration of a PCM WAV in seconds from its header, or 0.0 if unreadable."""
+    try:
+        with wave.open(str(wav_path), "rb") as w:
+            rate = w.getframerate()
+            return w.getnframes() / float(rate) if rate else 0.0
+    except (OSError, EOFError, wave.Error):
+        return 0.0
+
+
+def read_envelope(wav_path: Path, frame_s: float = FRAME_S) -> Optional[Tuple[List[float], float]]:
+    """RMS per frame_s frame of a 16-bit PCM WAV (channels mixed), plus its duration.
+
+    Returns None for files the stdlib cannot decode (compressed, 8/24/32-bit).
+    """
+    try:
+        with wave.open(str(wav_path), "rb") as w:
+            if w.getsampwidth() != 2:
+                return None
+            rate = w.getframerate()
+            channels = w.getnchannels()
+            raw = w.readframes(w.getnframes())
+    except (OSError, EOFError, wave.Error):
+        return None
+    if not rate:
+        return None
+
+    samples = array("h")
+    samples.frombytes(raw[: len(raw) - len(raw) % 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+
+    step = max(1, int(rate * frame_s)) * channels
+    envelope = []
+    for i in range(0, len(samples), step):
+        frame = samples[i:i + step]
+        envelope.append(math.sqrt(sum(x * x for x in frame) / len(frame)))
+    return envelope, len(samples) / float(channels * rate)
+
+
+def _voiced_mask(envelope: List[float], frame_s: float) -> List[bool]:
+    ordered = sorted(envelope)
+    reference = ordered[int(len(ordered) * 0.95)] if ordered else 0.0
+    threshold = max(_THRESHOLD_FLOOR, reference * _THRESHOLD_FRACTION)
+    mask = [e >= threshold for e in envelope]
+
+    # Close short gaps (stop consonants, breaths) so they count as speech
+    min_pause = max(1, int(round(MIN_PAUSE_S / frame_s)))
+    first = next((i for i, v in enumerate(mask) if v), None)
+    if first is None:
+        return mask
+    last = len(mask) - 1 - next(i for i, v in enumerate(reversed(mask)) if v)
+    i = first
+    while i <= last:
+        if mask[i]:
+            i += 1
+            continue
+        j = i
+        while j <= last and not mask[j]:
+            j += 1
+        if j - i < min_pause:
+            for k in range(i, j):
+                mask[k] = True
+        i = j
+    return mask
+
+
+def _word_weight(word: str) -> float:
+    letters = sum(1 for c in word if c.isalnum())
+    weight = max(1, letters) + 1.0  # +1: the transition into the word
+    tail = word.rstrip("\"')]}”’")[-1:]
+    return weight + _PUNCT_WEIGHT.get(tail, 0.0)
+
+
+def align_words(text: str, envelope: List[float], duration: float, frame_s: float = FRAME_S) -> List[Dict]:
+    """Spread text.split() over the voiced frames of envelope.
+
+    Returns [{"word", "start", "end"}] in seconds, monotonic, within [0, duration].
+    """
+    words = text.split()
+    if not words:
+        return []
+    voiced = [i for i, v in enumerate(_voiced_mask(envelope, frame_s)) if v]
+    if not voiced:
+        # Nothing above the threshold: spread evenly over the whole file
+        step = duration / len(words)
+        return [{"word": w, "start": round(i * step, 3), "end": round((i + 1) * step, 3)}
+                for i, w in enumerate(words)]
+
+    weights = [_word_weight(w) for w in words]
+    total = sum(weights)
+    n = len(voiced)
+
+    def _at(position: float) -> float:
+        # Voiced-time position (0..n frames) -> seconds on the real timeline
+        k = min(n - 1, max(0, int(position)))
+        return min(duration, (voiced[k] + (position - k)) * frame_s)
+
+    out = []
+    acc = 0.0
+    for word, weight in zip(words, weights):
+        start_pos = n * acc / total
+        acc += weight
+        end_pos = n * acc / total
+        start = _at(start_pos)
+        end = _at(end_pos - 1e-6) if end_pos > start_pos else start
+        if end_pos >= n:
+            end = min(duration, (voiced[-1] + 1) * frame_s)
+        out.append({"word": word, "start": round(start, 3), "end": round(max(start, end), 3)})
+    return out
+
+
+def compute_word_timings(wav_path: Path, text: str) -> Optional[Dict]:
+    """Align text against wav_path and write the .words.json sidecar.
+
+    Returns the timings dict, or None if the audio cannot be decoded.
+    """
+    decoded = read_envelope(wav_path)
+    if decoded is None:
+        return None
+    envelope, duration = decoded
+    data = {
+        "version": TIMINGS_VERSION,
+        "duration": round(duration, 3),
+        "text": text,
+        "size": wav_path.stat().st_size,
+        "words": align_words(text, envelope, duration),
+    }
+    path = timings_path(wav_path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+    return data
+
+
+def load_word_timings(wav_path: Path, text: str) -> Optional[Dict]:
+    """Cached timings for wav_path if they match its current size and text."""
+    try:
+        data = json.loads(timings_path(wav_path).read_text(encoding="utf-8"))
+        size = wav_path.stat().st_size
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != TIMINGS_VERSION:
+        return None
+    if data.get("text") != text or data.get("size") != size:
+        return None
+    return data
+
+
+def get_word_timings(wav_path: Path, text: str) -> Optional[Dict]:
+    """Cached timings for wav_path, computing (and caching) them if needed."""
+    if not wav_path.is_file():
+        return None
+    return load_word_timings(wav_path, text) or compute_word_timings(wav_path, text)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Streaming ZIP writer for output bundles.
+
+Members are written straight from their source paths under the requested
+archive names (no staging copy). Each member is STORED or DEFLATED on its own:
+
+  - known compressed media (MP4, M4A, MP3, JPEG, PNG, WebP, ...) are STORED
+  - anything else is sampled: if zlib cannot shrink the first 64 KB by at
+    least 10%, the file is STORED, otherwise DEFLATED
+
+so text, JSON and subtitles still compress while video and audio cost no CPU.
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+COMPRESSED_SUFFIXES = frozenset({
+    ".mp4", ".mov", ".mkv", ".webm", ".m4a", ".mp3", ".aac", ".ogg", ".opus",
+    ".jpg", ".jpeg", ".png", ".webp", ".gif",
+    ".zip", ".gz", ".bz2", ".xz", ".zst", ".7z",
+})
+
+_SAMPLE_BYTES = 64 * 1024
+_SMALL_FILE_BYTES = 4 * 1024
+_MIN_GAIN = 0.10
+
+
+def choose_compression(path: Path) -> int:
+    """zipfile.ZIP_STORED or ZIP_DEFLATED for path (by suffix, else by an entropy sample)."""
+    if path.suffix.lower() in COMPRESSED_SUFFIXES:
+        return zipfile.ZIP_STORED
+    try:
+        with open(path, "rb") as f:
+            sample = f.read(_SAMPLE_BYTES)
+    except OSError:
+        return zipfile.ZIP_DEFLATED
+    if len(sample) < _SMALL_FILE_BYTES:
+        return zipfile.ZIP_DEFLATED
+    gain = 1.0 - len(zlib.compress(sample, 1)) / len(sample)
+    return zipfile.ZIP_DEFLATED if gain >= _MIN_GAIN else zipfile.ZIP_STORED
+
+
+def write_zip(zip_path: Path, members: Iterable[Tuple[Path, str]], compresslevel: int = 6) -> Dict[str, int]:
+    """Write (source path, archive name) members to zip_path, streaming each file.
+
+    A later member with the same archive name replaces an earlier one. The
+    archive is written to a temporary name and moved into place when complete.
+    Returns counts: stored, deflated, bytes_in.
+    """
+    by_name: Dict[str, Path] = {}
+    for src, arcname in members:
+        by_name.pop(arcname, None)
+        by_name[arcname] = Path(src)
+
+    stats = {"stored": 0, "deflated": 0, "bytes_in": 0}
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = zip_path.with_name(f".{zip_path.name}.{os.getpid()}.tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w", allowZip64=True) as z:
+            for arcname, src in by_name.items():
+                method = choose_compression(src)
+                z.write(
+                    src,
+                    arcname,
+                    compress_type=method,
+                    compresslevel=compresslevel if method == zipfile.ZIP_DEFLATED else None,
+                )
+                stats["stored" if method == zipfile.ZIP_STORED else "deflated"] += 1
+                stats["bytes_in"] += src.stat().st_size
+        os.replace(tmp, zip_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return stats